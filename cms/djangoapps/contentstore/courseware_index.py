@@ -2,11 +2,14 @@
 from __future__ import absolute_import
 from abc import ABCMeta, abstractmethod
 from datetime import timedelta
+import hashlib
+import json
 import logging
 import re
 from six import add_metaclass
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext as _
 from django.core.urlresolvers import resolve
 
@@ -26,6 +29,13 @@ from xmodule.library_tools import normalize_key_for_search
 # how far back from the trigger point to look back in order to index
 REINDEX_AGE = timedelta(0, 60)  # 60 seconds
 
+# CONTENT_HASH_TIMEOUT is how long the hash of each document sent to the index,
+# and the version of each course last indexed, are remembered, so that recent
+# changes indexing can skip sending documents which haven't changed, and only
+# look at the blocks changed since that version. A full reindex always sends
+# every document.
+CONTENT_HASH_TIMEOUT = int(timedelta(days=7).total_seconds())
+
 log = logging.getLogger('edx.modulestore')
 
 
@@ -41,6 +51,11 @@ def strip_html_content_to_text(html_content):
     return text_content
 
 
+def content_hash(item_index):
+    """ Returns a hash of the content of the index document item_index """
+    return hashlib.sha1(json.dumps(item_index, sort_keys=True, default=unicode)).hexdigest()
+
+
 def indexing_is_enabled():
     """
     Checks to see if the indexing feature is enabled
@@ -86,7 +101,7 @@ class SearchIndexerBase(object):
 
     @classmethod
     @abstractmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
 
     @classmethod
@@ -99,6 +114,24 @@ class SearchIndexerBase(object):
         """ Modifies usage_id to submit to index """
         return usage_id
 
+    @classmethod
+    def _get_block_changes(cls, modulestore, structure_key, since_version):  # pylint: disable=unused-argument
+        """
+        Returns the BlockChanges of the structure since since_version, or None if they can't be found.
+        Base implementation never finds them.
+        """
+        return None
+
+    @classmethod
+    def _indexed_version_key(cls, structure_key):
+        """ Cache key of the version of the structure last indexed """
+        return u"{}.indexed_version.{}".format(cls.INDEX_NAME, structure_key)
+
+    @classmethod
+    def _content_hash_key(cls, item_id):
+        """ Cache key of the content hash of the document with item_id last sent to the index """
+        return u"{}.content_hash.{}".format(cls.INDEX_NAME, item_id)
+
     @classmethod
     def remove_deleted_items(cls, searcher, structure_key, exclude_items):
         """
@@ -113,6 +146,68 @@ class SearchIndexerBase(object):
         result_ids = [result["data"]["id"] for result in response["results"]]
         for result_id in result_ids:
             searcher.remove(cls.DOCUMENT_TYPE, result_id)
+        # Forget the content of removed documents, so that they are sent again if they come back
+        cache.delete_many([cls._content_hash_key(result_id) for result_id in result_ids])
+
+    @classmethod
+    def remove_items(cls, searcher, item_ids):
+        """
+        remove the items with the given ids from the search index, if they are present
+        """
+        for item_id in item_ids:
+            try:
+                searcher.remove(cls.DOCUMENT_TYPE, item_id)
+            except Exception as err:  # pylint: disable=broad-except
+                # items which were never indexable are not in the index to remove
+                log.debug('Could not remove item from index: %s - %r', item_id, err)
+        cache.delete_many([cls._content_hash_key(item_id) for item_id in item_ids])
+
+    @classmethod
+    def send_items_index(cls, searcher, items_index, skip_unchanged, error_list):
+        """
+        Send index documents to the search index
+
+        Arguments:
+        searcher - search engine to send the documents to
+
+        items_index - list of (location, item_index) pairs of the documents to send
+
+        skip_unchanged (bool) - whether to skip documents whose content is the same as when they were last sent
+
+        error_list - list to append errors to
+
+        Returns:
+        Number of documents which are up to date in the index
+        """
+        hash_keys = [cls._content_hash_key(item_index['id']) for __, item_index in items_index]
+        # A single round trip to the cache for the hashes of all of the documents
+        sent_hashes = cache.get_many(hash_keys) if skip_unchanged else {}
+
+        new_hashes = {}
+        failed_hash_keys = []
+        indexed_count = 0
+        for (location, item_index), hash_key in zip(items_index, hash_keys):
+            item_hash = content_hash(item_index)
+            if sent_hashes.get(hash_key) == item_hash:
+                indexed_count += 1
+                continue
+
+            try:
+                searcher.index(cls.DOCUMENT_TYPE, item_index)
+            except Exception as err:  # pylint: disable=broad-except
+                # broad exception so that index operation does not fail on one item of many
+                log.warning('Could not index item: %s - %r', location, err)
+                error_list.append(_('Could not index item: {}').format(location))
+                failed_hash_keys.append(hash_key)
+            else:
+                new_hashes[hash_key] = item_hash
+                indexed_count += 1
+
+        if new_hashes:
+            cache.set_many(new_hashes, CONTENT_HASH_TIMEOUT)
+        if failed_hash_keys:
+            cache.delete_many(failed_hash_keys)
+        return indexed_count
 
     @classmethod
     def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE):
@@ -129,7 +224,11 @@ class SearchIndexerBase(object):
             (within REINDEX_AGE above ^^) will have their index updated, others skip
             updating their index but are still walked through in order to identify
             which items may need to be removed from the index
-            If None, then a full reindex takes place
+            If None, then a full reindex takes place; otherwise, documents whose
+            content hasn't changed since they were last sent to the index are skipped,
+            and if the modulestore can tell which blocks changed since the version
+            last indexed, only those blocks, their descendants and their ancestors
+            are indexed, regardless of the time
 
         Returns:
         Number of items that have been added to the index
@@ -142,10 +241,14 @@ class SearchIndexerBase(object):
         structure_key = cls.normalize_structure_key(structure_key)
         location_info = cls._get_location_info(structure_key)
 
-        # Wrap counter in dictionary - otherwise we seem to lose scope inside the embedded function `index_item`
-        indexed_count = {
-            "count": 0
-        }
+        # (location, item_index) pairs of the documents to send to the index, which
+        # are sent together once the whole structure has been walked
+        items_index = []
+        indexed_count = 0
+
+        # The changes since the version last indexed, if only those are being indexed
+        block_changes = None
+        incremental = False
 
         # indexed_items is a list of all the items that we wish to remain in the
         # index, whether or not we are planning to actually update their index.
@@ -153,9 +256,9 @@ class SearchIndexerBase(object):
         # list - those are ready to be destroyed
         indexed_items = set()
 
-        def index_item(item, skip_index=False, groups_usage_info=None):
+        def index_item(item, skip_index=False, groups_usage_info=None, in_changed_subtree=False):
             """
-            Add this item to the search index and indexed_items list
+            Add this item's index document to items_index, and the item to the indexed_items list
 
             Arguments:
             item - item to add to index, its children will be processed recursively
@@ -165,9 +268,19 @@ class SearchIndexerBase(object):
                 This should really only be passed from the recursive child calls when
                 this method has determined that it is safe to do so
 
+            in_changed_subtree - when indexing changes incrementally, whether one of
+                the item's ancestors has changed, which may change what it inherits
+
             Returns:
             item_content_groups - content groups assigned to indexed item
             """
+            if incremental:
+                changes_location = item.location.version_agnostic().replace(branch=None)
+                in_changed_subtree = in_changed_subtree or changes_location in block_changes.changed
+                if not in_changed_subtree and changes_location not in block_changes.ancestors:
+                    # neither the item, nor anything it contains or inherits from, has changed
+                    return
+
             is_indexable = hasattr(item, "index_dictionary")
             item_index_dictionary = item.index_dictionary() if is_indexable else None
             # if it's not indexable and it does not have children, then ignore
@@ -183,8 +296,10 @@ class SearchIndexerBase(object):
             indexed_items.add(item_id)
             if item.has_children:
                 # determine if it's okay to skip adding the children herein based upon how recently any may have changed
-                skip_child_index = skip_index or \
-                    (triggered_at is not None and (triggered_at - item.subtree_edited_on) > reindex_age)
+                skip_child_index = skip_index or (
+                    not incremental and triggered_at is not None and
+                    (triggered_at - item.subtree_edited_on) > reindex_age
+                )
                 children_groups_usage = []
                 for child_item in item.get_children():
                     if modulestore.has_published_version(child_item):
@@ -192,7 +307,8 @@ class SearchIndexerBase(object):
                             index_item(
                                 child_item,
                                 skip_index=skip_child_index,
-                                groups_usage_info=groups_usage_info
+                                groups_usage_info=groups_usage_info,
+                                in_changed_subtree=in_changed_subtree
                             )
                         )
                 if None in children_groups_usage:
@@ -211,8 +327,7 @@ class SearchIndexerBase(object):
                     item_index['start_date'] = item.start
                 item_index['content_groups'] = item_content_groups if item_content_groups else None
                 item_index.update(cls.supplemental_fields(item))
-                searcher.index(cls.DOCUMENT_TYPE, item_index)
-                indexed_count["count"] += 1
+                items_index.append((item.location, item_index))
                 return item_content_groups
             except Exception as err:  # pylint: disable=broad-except
                 # broad exception so that index operation does not fail on one item of many
@@ -221,7 +336,14 @@ class SearchIndexerBase(object):
 
         try:
             with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
-                structure = cls._fetch_top_level(modulestore, structure_key)
+                indexed_version = (
+                    cache.get(cls._indexed_version_key(structure_key)) if triggered_at is not None else None
+                )
+                block_changes = cls._get_block_changes(modulestore, structure_key, indexed_version)
+                incremental = block_changes is not None and block_changes.changed is not None
+
+                # when indexing incrementally, only the changed parts of the structure are loaded
+                structure = cls._fetch_top_level(modulestore, structure_key, depth=0 if incremental else None)
                 groups_usage_info = cls.fetch_group_usage(modulestore, structure)
 
                 # First perform any additional indexing from the structure object
@@ -230,7 +352,15 @@ class SearchIndexerBase(object):
                 # Now index the content
                 for item in structure.get_children():
                     index_item(item, groups_usage_info=groups_usage_info)
-                cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                indexed_count = cls.send_items_index(
+                    searcher, items_index, skip_unchanged=triggered_at is not None, error_list=error_list
+                )
+                if incremental:
+                    cls.remove_items(
+                        searcher, [unicode(cls._id_modifier(usage_key)) for usage_key in block_changes.deleted]
+                    )
+                else:
+                    cls.remove_deleted_items(searcher, structure_key, indexed_items)
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
             log.exception(
@@ -243,7 +373,10 @@ class SearchIndexerBase(object):
         if error_list:
             raise SearchIndexingError('Error(s) present during indexing', error_list)
 
-        return indexed_count["count"]
+        if block_changes is not None:
+            cache.set(cls._indexed_version_key(structure_key), block_changes.version, CONTENT_HASH_TIMEOUT)
+
+        return indexed_count
 
     @classmethod
     def _do_reindex(cls, modulestore, structure_key):
@@ -330,9 +463,14 @@ class CoursewareSearchIndexer(SearchIndexerBase):
         return structure_key
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_course(structure_key, depth=None)
+        return modulestore.get_course(structure_key, depth=depth)
+
+    @classmethod
+    def _get_block_changes(cls, modulestore, structure_key, since_version):
+        """ Returns the BlockChanges of the course since since_version, if its modulestore versions courses """
+        return modulestore.get_block_changes(structure_key, since_version)
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
@@ -418,9 +556,9 @@ class LibrarySearchIndexer(SearchIndexerBase):
         return normalize_key_for_search(structure_key)
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_library(structure_key, depth=None)
+        return modulestore.get_library(structure_key, depth=depth)
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
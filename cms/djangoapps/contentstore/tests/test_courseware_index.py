@@ -443,13 +443,69 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         # index based on time, will include an index of the origin sequential
         # because it is in a common subtree but not of the original vertical
         # because the original sequential's subtree is too old
+        # the split modulestore can tell which blocks changed since the last index
+        # instead, so it only indexes the new blocks and their chapter
         new_indexed_count = self.index_recent_changes(store, before_time)
-        self.assertEqual(new_indexed_count, 5)
+        is_split = store.get_modulestore_type(self.course.id) == ModuleStoreEnum.Type.split
+        self.assertEqual(new_indexed_count, 4 if is_split else 5)
 
         # full index again
         indexed_count = self.reindex_course(store)
         self.assertEqual(indexed_count, 7)
 
+    def _test_changed_blocks_index(self, store):
+        """ Make sure that the split modulestore only reindexes the blocks changed since the last index """
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+
+        sequential2 = ItemFactory.create(
+            parent_location=self.chapter.location,
+            category='sequential',
+            display_name='Section 2',
+            modulestore=store,
+            publish_item=True,
+        )
+        self.sequential.display_name = "Lesson 1 renamed"
+        self.update_item(store, self.sequential)
+        self.publish_item(store, self.sequential.location)
+
+        # whatever the time, the changed sequentials, their chapter and the blocks
+        # inheriting from them are indexed
+        indexed_count = self.index_recent_changes(store, datetime.now(UTC))
+        self.assertEqual(indexed_count, 5)
+
+        # a deleted block is removed from the index without looking at the rest of the course
+        self.delete_item(store, sequential2.location)
+        indexed_count = self.index_recent_changes(store, datetime.now(UTC))
+        self.assertEqual(indexed_count, 1)
+        response = self.search()
+        self.assertEqual(response["total"], 4)
+
+    def _test_unchanged_items_not_sent(self, store):
+        """ Make sure that a time based request to index only sends the documents which have changed """
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+
+        before_time = datetime.now(UTC)
+        self.html_unit.data = "Some new content"
+        self.update_item(store, self.html_unit)
+        self.publish_item(store, self.vertical.location)
+
+        # the whole tree has changed recently, but only the html unit's document is different
+        with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+            indexed_count = self.index_recent_changes(store, before_time)
+        self.assertEqual(indexed_count, 4)
+        self.assertEqual(mock_index.call_count, 1)
+        self.assertEqual(mock_index.call_args[0][1]['id'], unicode(self.html_unit.location))
+
+        # a full reindex sends all of the documents again
+        with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+            indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+        self.assertEqual(mock_index.call_count, 4)
+
     def _test_course_about_property_index(self, store):
         """ Test that informational properties in the course object end up in the course_info index """
         display_name = "Help, I need somebody!"
@@ -582,6 +638,13 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_exception(self, store_type):
         self._perform_test_using_store(store_type, self._test_exception)
 
+    def test_changed_blocks_index(self):
+        self._perform_test_using_store(ModuleStoreEnum.Type.split, self._test_changed_blocks_index)
+
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_unchanged_items_not_sent(self, store_type):
+        self._perform_test_using_store(store_type, self._test_unchanged_items_not_sent)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_course_about_property_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_course_about_property_index)
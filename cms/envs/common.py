@@ -184,6 +184,8 @@ sys.path.append(COMMON_ROOT / 'djangoapps')
 # For geolocation ip database
 GEOIP_PATH = REPO_ROOT / "common/static/data/geoip/GeoIP.dat"
 GEOIPV6_PATH = REPO_ROOT / "common/static/data/geoip/GeoIPv6.dat"
+# How many IP addresses to remember the country of, per process, for embargo checks
+EMBARGO_GEOIP_CACHE_SIZE = 10000
 
 ############################# WEB CONFIGURATION #############################
 # This is where we stick our compiled template files.
@@ -366,6 +368,11 @@ MODULESTORE = {
     }
 }
 
+# Local disk cache for the bodies of course assets too large to keep in
+# memcached, served by contentserver.middleware.StaticContentServer. Set to a
+# dict with the cache 'DIRECTORY' and its 'MAX_SIZE' in bytes to enable it.
+STATIC_CONTENT_DISK_CACHE = None
+
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG/TEMPLATE_DEBUG in your environment settings files, not here
 DEBUG = False
@@ -729,6 +736,7 @@ INSTALLED_APPS = (
     'edx_jsme',    # Molecular Structure
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
 )
 
 
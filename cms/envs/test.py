@@ -214,6 +214,8 @@ FEATURES['ENABLE_SERVICE_STATUS'] = True
 
 # Toggles embargo on for testing
 FEATURES['EMBARGO'] = True
+# Tests mock the GeoIP country of the same addresses differently
+EMBARGO_GEOIP_CACHE_SIZE = 0
 
 # set up some testing for microsites
 MICROSITE_CONFIGURATION = {
@@ -0,0 +1,347 @@
+"""
+A local disk cache for the bodies of large course assets.
+
+Memcached can only hold assets that fit in memory in one piece, so the
+StaticContentServer used to read every large asset, such as a video, from
+GridFS on every request. `AssetDiskCache` keeps copies of them in files on
+the local disk instead, named after the asset location and its
+`last_modified_at` timestamp, so replacing an asset makes the new version a
+different file and never requires invalidating the old one. Cached files are
+memory-mapped when served, so the body, or any byte range of it, is read from
+the OS page cache as it is sent rather than buffered by the worker.
+
+An asset is copied to the cache as it is streamed to the first client
+requesting it, so a miss costs no more than serving without the cache. Only
+one request copies a given asset at a time; concurrent misses on it are
+served from the contentstore. The total size of the cache is kept in an
+index file, so the cache directory is only walked when files must be evicted.
+
+The cache is configured with the STATIC_CONTENT_DISK_CACHE setting:
+
+    STATIC_CONTENT_DISK_CACHE = {
+        'DIRECTORY': '/tmp/edx-asset-cache',   # where cached files are kept
+        'MAX_SIZE': 10 * 1024 * 1024 * 1024,   # in bytes
+    }
+
+It is disabled when the setting is None.
+"""
+import errno
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import time
+
+from django.conf import settings
+
+from xmodule.contentstore.content import StaticContent
+
+log = logging.getLogger(__name__)
+
+# Size of the chunks in which memory-mapped assets are streamed out
+MMAP_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Suffix of the file an asset is written to while it is being cached
+PART_SUFFIX = '.part'
+
+# Seconds after which a part file that isn't written to any more is assumed
+# to have been left by a request that died, and may be replaced
+PART_FILE_TIMEOUT = 10 * 60
+
+# Names of the files holding the total size of the cached files, and locking it
+SIZE_INDEX_FILENAME = 'size'
+SIZE_LOCK_FILENAME = 'size.lock'
+
+# Eviction deletes files until the cache is at most this fraction of its
+# maximum size, so that it doesn't have to run again on the next miss
+EVICTION_TARGET_RATIO = 0.9
+
+
+def content_version_key(location, last_modified_at):
+    """
+    Return a hex digest identifying the version of the asset at `location`
+    last modified at `last_modified_at`. Used both to name cached files and
+    as the asset's ETag.
+    """
+    hasher = hashlib.sha1(unicode(location).encode('utf-8'))
+    hasher.update('\n')
+    hasher.update(last_modified_at.isoformat() if last_modified_at is not None else '')
+    return hasher.hexdigest()
+
+
+def content_metadata(content):
+    """
+    Return a StaticContent with the metadata of `content` but no data, to be
+    kept in memcached in place of an asset whose body is in the disk cache.
+    """
+    return StaticContent(
+        content.location, content.name, content.content_type, None,
+        last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+        import_path=content.import_path, length=content.length, locked=content.locked
+    )
+
+
+class MappedStaticContent(StaticContent):
+    """
+    StaticContent whose data is a memory-mapped file in the disk cache.
+    """
+    def __init__(self, content, mapped_file):
+        super(MappedStaticContent, self).__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=len(mapped_file), locked=content.locked
+        )
+        self._mapped_file = mapped_file
+
+    @property
+    def data(self):
+        return self._mapped_file[:]
+
+    def stream_data(self):
+        return self.stream_data_in_range(0, self.length - 1)
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        position = first_byte
+        while position <= last_byte:
+            end = min(position + MMAP_STREAM_CHUNK_SIZE, last_byte + 1)
+            yield self._mapped_file[position:end]
+            position = end
+
+    def close(self):
+        self._mapped_file.close()
+
+
+class CachingStaticContent(StaticContent):
+    """
+    StaticContent which streams the body of a StaticContentStream, copying it
+    to the disk cache as it goes.
+    """
+    def __init__(self, content, disk_cache):
+        super(CachingStaticContent, self).__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked
+        )
+        self._content = content
+        self._disk_cache = disk_cache
+
+    def stream_data(self):
+        """
+        Stream the body, and cache it once all of it has been read, unless
+        another request is caching it already.
+        """
+        part_file = self._disk_cache.open_part_file(self._content)
+        complete = False
+        try:
+            for chunk in self._content.stream_data():
+                if part_file is not None:
+                    try:
+                        part_file.write(chunk)
+                    except IOError:
+                        # e.g. the disk is full; keep serving the asset
+                        log.exception(u"Could not cache asset %s on disk", unicode(self.location))
+                        self._close_part_file(part_file, False)
+                        part_file = None
+                yield chunk
+            complete = True
+        finally:
+            # The client may also have gone away before the end
+            if part_file is not None:
+                self._close_part_file(part_file, complete)
+
+    def _close_part_file(self, part_file, complete):
+        """
+        Close `part_file`, and cache it if `complete`.
+        """
+        part_file.close()
+        self._disk_cache.close_part_file(self._content, complete)
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included), without
+        caching it.
+        """
+        return self._content.stream_data_in_range(first_byte, last_byte)
+
+    def close(self):
+        self._content.close()
+
+
+class AssetDiskCache(object):
+    """
+    A cache of asset bodies in files under `directory`, using at most about
+    `max_size` bytes of disk. When it is full, the least recently accessed
+    files are evicted.
+    """
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Return the AssetDiskCache configured by the STATIC_CONTENT_DISK_CACHE
+        setting, or None if it is disabled.
+        """
+        config = getattr(settings, 'STATIC_CONTENT_DISK_CACHE', None)
+        if not config:
+            return None
+        return cls(config['DIRECTORY'], config['MAX_SIZE'])
+
+    def path_for(self, content):
+        """
+        Return the path of the file caching the current version of `content`.
+        """
+        key = content_version_key(content.location, content.last_modified_at)
+        return os.path.join(self.directory, key[:2], key)
+
+    def _is_cached_file(self, filename):
+        """
+        Return True if `filename` holds the body of a cached asset.
+        """
+        return filename not in (SIZE_INDEX_FILENAME, SIZE_LOCK_FILENAME) and not filename.endswith(PART_SUFFIX)
+
+    def get(self, content):
+        """
+        Return a MappedStaticContent for the cached body of `content`, which
+        only needs to carry the asset's metadata, or None if it isn't cached.
+        """
+        path = self.path_for(content)
+        try:
+            with open(path, 'rb') as cached_file:
+                mapped_file = mmap.mmap(cached_file.fileno(), 0, access=mmap.ACCESS_READ)
+            # Mark the file as recently used, even if the disk is mounted noatime
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            # ValueError is raised when mapping an empty file
+            return None
+        return MappedStaticContent(content, mapped_file)
+
+    def put(self, content):
+        """
+        Return a StaticContent for `content`, a StaticContentStream, whose
+        stream_data() copies the body to the cache as it is streamed out.
+        """
+        return CachingStaticContent(content, self)
+
+    def open_part_file(self, content):
+        """
+        Create and open the file `content` is written to while it is being
+        cached. Returns None if another request is writing it already, or if
+        it can't be created.
+
+        The part file is created exclusively, so it also serves as the lock
+        on caching that version of the asset.
+        """
+        part_path = self.path_for(content) + PART_SUFFIX
+        try:
+            self._make_directory(os.path.dirname(part_path))
+            for __ in range(2):
+                try:
+                    part_fd = os.open(part_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0644)
+                except OSError as exception:
+                    if exception.errno != errno.EEXIST:
+                        raise
+                    try:
+                        if time.time() - os.stat(part_path).st_mtime < PART_FILE_TIMEOUT:
+                            return None
+                        # Left by a request that died
+                        os.remove(part_path)
+                    except OSError:
+                        pass
+                else:
+                    return os.fdopen(part_fd, 'wb')
+        except (IOError, OSError):
+            log.exception(u"Could not cache asset %s on disk", unicode(content.location))
+        return None
+
+    def close_part_file(self, content, complete):
+        """
+        Move the part file the body of `content` was written to into place if
+        `complete`, or else delete it. Files are renamed into place, so
+        concurrent requests never see a partial one.
+        """
+        path = self.path_for(content)
+        part_path = path + PART_SUFFIX
+        try:
+            if complete and not os.path.exists(path):
+                os.rename(part_path, path)
+                self._add_size(os.path.getsize(path))
+            else:
+                os.remove(part_path)
+        except (IOError, OSError):
+            log.exception(u"Could not cache asset %s on disk", unicode(content.location))
+
+    def _make_directory(self, directory):
+        """
+        Create `directory` if it doesn't exist yet.
+        """
+        try:
+            os.makedirs(directory)
+        except OSError as exception:
+            if exception.errno != errno.EEXIST:
+                raise
+
+    def _add_size(self, size):
+        """
+        Add `size` bytes to the total size of the cache kept in its index,
+        and evict files if it no longer fits in `max_size` bytes. The index
+        is locked meanwhile, so that concurrent requests don't lose updates.
+        """
+        with open(os.path.join(self.directory, SIZE_LOCK_FILENAME), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                index_path = os.path.join(self.directory, SIZE_INDEX_FILENAME)
+                try:
+                    with open(index_path) as index_file:
+                        total_size = int(index_file.read()) + size
+                except (IOError, ValueError):
+                    # No index yet, or a corrupt one; the walk below rebuilds it
+                    total_size = None
+
+                if total_size is None or total_size > self.max_size:
+                    total_size = self._evict()
+
+                with open(index_path, 'w') as index_file:
+                    index_file.write(str(total_size))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _evict(self):
+        """
+        If the cache doesn't fit in `max_size` bytes, delete the least
+        recently accessed cached files until it is at most
+        EVICTION_TARGET_RATIO of that size. Files still mapped by a request
+        stay readable until it finishes. Returns the size of the files left.
+        """
+        cached_files = []
+        total_size = 0
+        for dirpath, __, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not self._is_cached_file(filename):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                cached_files.append((stat.st_atime, stat.st_size, path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return total_size
+
+        cached_files.sort()
+        for __, size, path in cached_files:
+            if total_size <= self.max_size * EVICTION_TARGET_RATIO:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+        return total_size
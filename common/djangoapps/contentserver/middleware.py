@@ -15,6 +15,7 @@ from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from cache_toolbox.core import get_cached_content, set_cached_content
+from contentserver.disk_cache import AssetDiskCache, content_metadata, content_version_key
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -41,27 +42,12 @@ class StaticContentServer(object):
                 response.status_code = 400
                 return response
 
-            # first look in our cache so we don't have to round-trip to the DB
-            content = get_cached_content(loc)
-            if content is None:
-                # nope, not in cache, let's fetch from DB
-                try:
-                    content = AssetManager.find(loc, as_stream=True)
-                except (ItemNotFoundError, NotFoundError):
-                    response = HttpResponse()
-                    response.status_code = 404
-                    return response
-
-                # since we fetched it from DB, let's cache it going forward, but only if it's < 1MB
-                # this is because I haven't been able to find a means to stream data out of memcached
-                if content.length is not None:
-                    if content.length < 1048576:
-                        # since we've queried as a stream, let's read in the stream into memory to set in cache
-                        content = content.copy_to_in_mem()
-                        set_cached_content(content)
-            else:
-                # NOP here, but we may wish to add a "cache-hit" counter in the future
-                pass
+            try:
+                content = self.load_content(loc)
+            except (ItemNotFoundError, NotFoundError):
+                response = HttpResponse()
+                response.status_code = 404
+                return response
 
             # Check that user has access to content
             if getattr(content, "locked", False):
@@ -80,10 +66,18 @@ class StaticContentServer(object):
             # convert over the DB persistent last modified timestamp to a HTTP compatible
             # timestamp, so we can simply compare the strings
             last_modified_at_str = content.last_modified_at.strftime("%a, %d-%b-%Y %H:%M:%S GMT")
+            etag = '"{}"'.format(content_version_key(content.location, content.last_modified_at))
 
             # see if the client has cached this content, if so then compare the
-            # timestamps, if they are the same then just return a 304 (Not Modified)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
+            # entity tags, or else the timestamps, and if they are the same then
+            # just return a 304 (Not Modified)
+            if 'HTTP_IF_NONE_MATCH' in request.META:
+                if_none_match = [tag.strip() for tag in request.META['HTTP_IF_NONE_MATCH'].split(',')]
+                if etag in if_none_match or '*' in if_none_match:
+                    response = HttpResponseNotModified()
+                    response['ETag'] = etag
+                    return response
+            elif 'HTTP_IF_MODIFIED_SINCE' in request.META:
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
@@ -96,10 +90,6 @@ class StaticContentServer(object):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # Data from cache (StaticContent) has no easy byte management, so we use the DB instead (StaticContentStream)
-                if type(content) == StaticContent:
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -145,9 +135,56 @@ class StaticContentServer(object):
             response['Accept-Ranges'] = 'bytes'
             response['Content-Type'] = content.content_type
             response['Last-Modified'] = last_modified_at_str
+            response['ETag'] = etag
 
             return response
 
+    @property
+    def disk_cache(self):
+        """
+        The AssetDiskCache for large assets, or None if it is disabled.
+        """
+        return AssetDiskCache.from_settings()
+
+    def load_content(self, loc):
+        """
+        Return the content of the asset at `loc`, from the caches if possible.
+
+        Assets under 1MB are kept whole in memcached. For larger assets, only
+        their metadata is kept in memcached and their body is kept in the local
+        disk cache, if it is enabled, from which it is streamed without being
+        read into memory. It is copied to the disk cache as it is first served.
+
+        Raises ItemNotFoundError or NotFoundError if there is no such asset.
+        """
+        # first look in our cache so we don't have to round-trip to the DB
+        content = get_cached_content(loc)
+        if content is not None:
+            if content.data is not None:
+                return content
+            # only the metadata of a large asset is cached, look for its body on disk
+            disk_cache = self.disk_cache
+            if disk_cache is not None:
+                cached_content = disk_cache.get(content)
+                if cached_content is not None:
+                    return cached_content
+
+        # nope, not in cache, let's fetch from DB
+        content = AssetManager.find(loc, as_stream=True)
+        if content.length is None:
+            return content
+
+        if content.length < 1048576:
+            # since we've queried as a stream, let's read in the stream into memory to set in cache
+            content = content.copy_to_in_mem()
+            set_cached_content(content)
+        else:
+            disk_cache = self.disk_cache
+            if disk_cache is not None:
+                set_cached_content(content_metadata(content))
+                return disk_cache.put(content)
+        return content
+
 
 def parse_range_header(header_value, content_length):
     """
@@ -4,9 +4,17 @@ Tests for StaticContentServer
 import copy
 import ddt
 import logging
+import os
+import shutil
+import tempfile
 import unittest
+from datetime import datetime
+from StringIO import StringIO
 from uuid import uuid4
 
+from mock import patch
+from pytz import UTC
+
 from django.conf import settings
 from django.test.client import Client
 from django.test.utils import override_settings
@@ -17,6 +25,10 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
+from opaque_keys.edx.locator import CourseLocator
+from xmodule.contentstore.content import StaticContentStream
+
+from contentserver.disk_cache import AssetDiskCache, content_metadata
 from contentserver.middleware import parse_range_header
 from student.models import CourseEnrollment
 
@@ -192,6 +204,122 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
         )
         self.assertEqual(resp.status_code, 416)
 
+    def test_range_request_cached_content(self):
+        """
+        Test that a range request for content served from the cache returns the
+        requested bytes.
+        """
+        full_content = self.client.get(self.url_unlocked).content
+        first_byte = self.length_unlocked / 4
+        last_byte = self.length_unlocked / 2
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}'.format(
+            first=first_byte, last=last_byte)
+        )
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp.content, full_content[first_byte:last_byte + 1])
+
+    def test_if_none_match(self):
+        """
+        Test that a request with the ETag of the content in If-None-Match
+        outputs 304 Not Modified, and one with another ETag the full content.
+        """
+        etag = self.client.get(self.url_unlocked)['ETag']
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other", "tags"')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['ETag'], etag)
+
+
+class AssetDiskCacheTestCase(unittest.TestCase):
+    """
+    Tests for the AssetDiskCache.
+    """
+    def setUp(self):
+        super(AssetDiskCacheTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.disk_cache = AssetDiskCache(self.directory, max_size=1000)
+        self.course_key = CourseLocator('edX', 'toy', '2012_Fall')
+
+    def make_content(self, name, data, last_modified_at=datetime(2015, 1, 1, tzinfo=UTC)):
+        """
+        Return a StaticContentStream for an asset called `name` with `data`.
+        """
+        return StaticContentStream(
+            self.course_key.make_asset_key('asset', name), name, 'text/plain', StringIO(data),
+            last_modified_at=last_modified_at, length=len(data)
+        )
+
+    def cache(self, content):
+        """
+        Serve `content` through the disk cache, returning the body streamed.
+        """
+        return ''.join(self.disk_cache.put(content).stream_data())
+
+    def test_put_and_get(self):
+        content = self.make_content('asset.txt', 'abcdefghij')
+        self.assertIsNone(self.disk_cache.get(content))
+
+        self.assertEqual(self.cache(content), 'abcdefghij')
+
+        cached_content = self.disk_cache.get(content_metadata(content))
+        self.assertEqual(cached_content.length, 10)
+        self.assertEqual(cached_content.content_type, 'text/plain')
+        self.assertEqual(''.join(cached_content.stream_data()), 'abcdefghij')
+        self.assertEqual(''.join(cached_content.stream_data_in_range(2, 4)), 'cde')
+
+    def test_new_version_not_cached(self):
+        self.cache(self.make_content('asset.txt', 'abcdefghij'))
+        new_version = self.make_content('asset.txt', 'klmnopqrst', last_modified_at=datetime(2015, 2, 1, tzinfo=UTC))
+        self.assertIsNone(self.disk_cache.get(new_version))
+
+    def test_partially_streamed_not_cached(self):
+        content = self.make_content('asset.txt', 'abcdefghij')
+        stream = self.disk_cache.put(content).stream_data()
+        next(stream)
+        # The client went away
+        stream.close()
+        self.assertIsNone(self.disk_cache.get(content))
+        self.assertEqual(self.cache(self.make_content('asset.txt', 'abcdefghij')), 'abcdefghij')
+        self.assertIsNotNone(self.disk_cache.get(content))
+
+    def test_concurrent_misses(self):
+        first_stream = self.disk_cache.put(self.make_content('asset.txt', 'abcdefghij')).stream_data()
+        next(first_stream)
+
+        # Another request is served without caching the asset again
+        content = self.make_content('asset.txt', 'abcdefghij')
+        with patch('contentserver.disk_cache.os.rename') as mock_rename:
+            self.assertEqual(self.cache(content), 'abcdefghij')
+        self.assertFalse(mock_rename.called)
+
+        list(first_stream)
+        self.assertIsNotNone(self.disk_cache.get(content))
+
+    def test_size_index(self):
+        self.cache(self.make_content('first.txt', 'a' * 300))
+        # The cache isn't walked while it fits
+        with patch('contentserver.disk_cache.os.walk') as mock_walk:
+            self.cache(self.make_content('second.txt', 'b' * 300))
+        self.assertFalse(mock_walk.called)
+        with open(os.path.join(self.directory, 'size')) as index_file:
+            self.assertEqual(index_file.read(), '600')
+
+    def test_eviction(self):
+        old_content = self.make_content('old.txt', 'a' * 600)
+        self.cache(old_content)
+        os.utime(self.disk_cache.path_for(old_content), (0, 0))
+
+        new_content = self.make_content('new.txt', 'b' * 600)
+        self.cache(new_content)
+        self.assertIsNone(self.disk_cache.get(old_content))
+        self.assertIsNotNone(self.disk_cache.get(new_content))
+        with open(os.path.join(self.directory, 'size')) as index_file:
+            self.assertEqual(index_file.read(), '600')
+
 
 @ddt.ddt
 class ParseRangeHeaderTestCase(unittest.TestCase):
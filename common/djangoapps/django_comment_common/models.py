@@ -6,7 +6,7 @@ from django.contrib.auth.models import User
 from django.dispatch import receiver
 from django.db.models.signals import post_save
 from django.utils.translation import ugettext_noop
-from student.models import CourseEnrollment
+from student.models import CourseEnrollment, BULK_ENROLL_DONE
 
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -40,6 +40,15 @@ def assign_default_role_on_enrollment(sender, instance, **kwargs):
     assign_default_role(instance.course_id, instance.user)
 
 
+@receiver(BULK_ENROLL_DONE)
+def assign_default_role_on_bulk_enrollment(sender, course_id, users, **kwargs):  # pylint: disable=unused-argument
+    """
+    Assign forum default role 'Student' to all the users enrolled at once
+    """
+    role, __ = Role.objects.get_or_create(course_id=course_id, name=FORUM_ROLE_STUDENT)
+    role.users.add(*users)
+
+
 def assign_default_role(course_id, user):
     """
     Assign forum default role 'Student' to user
@@ -6,7 +6,11 @@ This API is exposed via the middleware(emabargo/middileware.py) layer but may be
 
 """
 import logging
+import threading
+from collections import OrderedDict
+
 import pygeoip
+from dogapi import dog_stats_api
 
 from django.core.cache import cache
 from django.conf import settings
@@ -150,17 +154,74 @@ def _get_user_country_from_profile(user):
     return profile_country
 
 
+class _CountryCodeCache(object):
+    """
+    The country codes of the most recently looked up IP addresses, evicting
+    the least recently used first.  Its size is the EMBARGO_GEOIP_CACHE_SIZE
+    setting; 0 disables it.
+    """
+    MISSING = object()
+
+    def __init__(self):
+        self._country_codes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ip_addr):
+        """
+        Return the country code cached for `ip_addr`, or MISSING.
+        """
+        with self._lock:
+            country_code = self._country_codes.pop(ip_addr, self.MISSING)
+            if country_code is not self.MISSING:
+                # Re-insert to mark this entry as the most recently used
+                self._country_codes[ip_addr] = country_code
+        dog_stats_api.increment(
+            'embargo.geoip_cache.{}'.format('miss' if country_code is self.MISSING else 'hit')
+        )
+        return country_code
+
+    def set(self, ip_addr, country_code, max_size):
+        """
+        Cache the `country_code` of `ip_addr`, keeping at most `max_size` entries.
+        """
+        with self._lock:
+            self._country_codes[ip_addr] = country_code
+            while len(self._country_codes) > max_size:
+                self._country_codes.popitem(last=False)
+
+
+_COUNTRY_CODE_CACHE = _CountryCodeCache()
+
+
 def _country_code_from_ip(ip_addr):
     """
     Return the country code associated with an IP address.
     Handles both IPv4 and IPv6 addresses.
 
+    The GeoIP databases are only read for addresses that aren't among the
+    most recently looked up.
+
     Args:
         ip_addr (str): The IP address to look up.
 
     Returns:
         str: A 2-letter country code.
 
+    """
+    cache_size = getattr(settings, 'EMBARGO_GEOIP_CACHE_SIZE', 0)
+    if cache_size <= 0:
+        return _geoip_country_code(ip_addr)
+
+    country_code = _COUNTRY_CODE_CACHE.get(ip_addr)
+    if country_code is _CountryCodeCache.MISSING:
+        country_code = _geoip_country_code(ip_addr)
+        _COUNTRY_CODE_CACHE.set(ip_addr, country_code, cache_size)
+    return country_code
+
+
+def _geoip_country_code(ip_addr):
+    """
+    Look up the country code of an IP address in the GeoIP databases.
     """
     if ip_addr.find(':') >= 0:
         return pygeoip.GeoIP(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
@@ -11,9 +11,11 @@ file and check it in at the same time as your model changes. To do that,
 3. Add the migration file created in edx-platform/common/djangoapps/embargo/migrations/
 """
 
+import bisect
 import ipaddr
 import json
 import logging
+import threading
 
 from django.db import models
 from django.utils.translation import ugettext as _, ugettext_lazy
@@ -675,11 +677,28 @@ class IPFilter(ConfigurationModel):
     class IPFilterList(object):
         """
         Represent a list of IP addresses with support of networks.
+
+        The networks are compiled into sorted, non-overlapping ranges of
+        integer addresses for each IP version, so that checking whether an
+        address is in the list is a binary search rather than a test of
+        every network.
         """
 
         def __init__(self, ips):
             self.networks = [ipaddr.IPNetwork(ip) for ip in ips]
 
+            ranges = {4: [], 6: []}
+            for network in sorted(self.networks, key=lambda network: (network.version, int(network.network))):
+                first, last = int(network.network), int(network.broadcast)
+                version_ranges = ranges[network.version]
+                if version_ranges and first <= version_ranges[-1][1] + 1:
+                    # Merge overlapping or adjacent networks
+                    version_ranges[-1][1] = max(version_ranges[-1][1], last)
+                else:
+                    version_ranges.append([first, last])
+            self._starts = {version: [r[0] for r in ranges[version]] for version in ranges}
+            self._ends = {version: [r[1] for r in ranges[version]] for version in ranges}
+
         def __iter__(self):
             for network in self.networks:
                 yield network
@@ -690,11 +709,33 @@ class IPFilter(ConfigurationModel):
             except ValueError:
                 return False
 
-            for network in self.networks:
-                if network.Contains(ip):
-                    return True
+            address = int(ip)
+            starts = self._starts[ip.version]
+            # The last range starting at or before the address is the only one that can contain it
+            index = bisect.bisect_right(starts, address) - 1
+            return index >= 0 and address <= self._ends[ip.version][index]
 
-            return False
+    # Compiled IPFilterLists, by the text they were compiled from, so that each
+    # revision of the filter is only compiled once per process
+    _ip_filter_lists = {}
+    _ip_filter_lists_lock = threading.Lock()
+    MAX_COMPILED_IP_FILTER_LISTS = 8
+
+    @classmethod
+    def _compiled_ip_filter_list(cls, ips_text):
+        """
+        Return the IPFilterList of the comma-separated addresses in `ips_text`,
+        compiling it if it hasn't been already.
+        """
+        with cls._ip_filter_lists_lock:
+            ip_filter_list = cls._ip_filter_lists.get(ips_text)
+        if ip_filter_list is None:
+            ip_filter_list = cls.IPFilterList([addr.strip() for addr in ips_text.split(',')])
+            with cls._ip_filter_lists_lock:
+                if len(cls._ip_filter_lists) >= cls.MAX_COMPILED_IP_FILTER_LISTS:
+                    cls._ip_filter_lists.clear()
+                cls._ip_filter_lists[ips_text] = ip_filter_list
+        return ip_filter_list
 
     @property
     def whitelist_ips(self):
@@ -703,7 +744,7 @@ class IPFilter(ConfigurationModel):
         """
         if self.whitelist == '':
             return []
-        return self.IPFilterList([addr.strip() for addr in self.whitelist.split(',')])  # pylint: disable=no-member
+        return self._compiled_ip_filter_list(self.whitelist)
 
     @property
     def blacklist_ips(self):
@@ -712,4 +753,4 @@ class IPFilter(ConfigurationModel):
         """
         if self.blacklist == '':
             return []
-        return self.IPFilterList([addr.strip() for addr in self.blacklist.split(',')])  # pylint: disable=no-member
+        return self._compiled_ip_filter_list(self.blacklist)
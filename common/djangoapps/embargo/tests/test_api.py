@@ -172,6 +172,20 @@ class EmbargoCheckAccessApiTests(ModuleStoreTestCase):
             with self.assertNumQueries(0):
                 embargo_api.check_course_access(self.course.id, user=self.user, ip_address='0.0.0.0')
 
+    @override_settings(EMBARGO_GEOIP_CACHE_SIZE=2)
+    def test_geoip_caching(self):
+        with mock.patch.object(pygeoip.GeoIP, 'country_code_by_addr') as mock_ip:
+            mock_ip.return_value = 'US'
+            for ip_address in ('1.0.0.1', '1.0.0.2', '1.0.0.1', '1.0.0.3', '1.0.0.2'):
+                self.assertEqual(embargo_api._country_code_from_ip(ip_address), 'US')  # pylint: disable=protected-access
+
+        # The second lookup of 1.0.0.1 was cached, but 1.0.0.2 was
+        # the least recently used address when 1.0.0.3 was looked up
+        self.assertEqual(
+            [call[0][0] for call in mock_ip.call_args_list],
+            ['1.0.0.1', '1.0.0.2', '1.0.0.3', '1.0.0.2']
+        )
+
     def test_caching_no_restricted_courses(self):
         RestrictedCourse.objects.all().delete()
         cache.clear()
@@ -101,6 +101,27 @@ class EmbargoModelsTest(TestCase):
         self.assertFalse('1.2.0.0' in cblacklist)
 
 
+    def test_ip_overlapping_networks(self):
+        whitelist = '1.0.0.0/24, 1.0.0.128/25, 1.0.1.0/24, 2001:db8::/32'
+        blacklist = '1.1.0.0/16, 1.1.5.5, 1.3.0.0/16'
+
+        IPFilter(whitelist=whitelist, blacklist=blacklist).save()
+
+        cwhitelist = IPFilter.current().whitelist_ips
+        self.assertTrue('1.0.0.200' in cwhitelist)
+        self.assertTrue('1.0.1.255' in cwhitelist)
+        self.assertFalse('1.0.2.0' in cwhitelist)
+        self.assertTrue('2001:db8::1' in cwhitelist)
+        self.assertFalse('2001:db9::1' in cwhitelist)
+        self.assertFalse('not an ip' in cwhitelist)
+        cblacklist = IPFilter.current().blacklist_ips
+        self.assertTrue('1.1.5.5' in cblacklist)
+        self.assertFalse('1.2.0.0' in cblacklist)
+        self.assertTrue('1.3.255.255' in cblacklist)
+        self.assertFalse('1.4.0.0' in cblacklist)
+        self.assertFalse('::1' in cblacklist)
+
+
 class RestrictedCourseTest(TestCase):
     """Test RestrictedCourse model. """
 
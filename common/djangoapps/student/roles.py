@@ -42,17 +42,17 @@ class RoleCache(object):
         self._roles = set(
             CourseAccessRole.objects.filter(user=user).all()
         )
+        # The (role, course_id, org) of each role, so has_role is a set lookup
+        self._role_keys = set(
+            (access_role.role, access_role.course_id, access_role.org)
+            for access_role in self._roles
+        )
 
     def has_role(self, role, course_id, org):
         """
         Return whether this RoleCache contains a role with the specified role, course_id, and org
         """
-        return any(
-            access_role.role == role and
-            access_role.course_id == course_id and
-            access_role.org == org
-            for access_role in self._roles
-        )
+        return (role, course_id, org) in self._role_keys
 
 
 class AccessRole(object):
@@ -717,6 +717,40 @@ class EnrollInCourseTest(EnrollmentEventTestMixin, TestCase):
         self.assertTrue(CourseEnrollment.is_enrolled(user, course_id))
         self.assert_enrollment_event_was_emitted(user, course_id)
 
+    @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+    def test_bulk_enrollment(self):
+        course_id = SlashSeparatedCourseKey("edX", "Test101", "2013")
+        enrolled = User.objects.create(username="jack", email="jack@fake.edx.org")
+        unenrolled = User.objects.create(username="jill", email="jill@fake.edx.org")
+        new = User.objects.create(username="joe", email="joe@fake.edx.org")
+        CourseEnrollment.enroll(enrolled, course_id, mode="verified")
+        CourseEnrollment.enroll(unenrolled, course_id)
+        CourseEnrollment.unenroll(unenrolled, course_id)
+        self.mock_tracker.reset_mock()
+
+        enrollments = CourseEnrollment.bulk_enroll([enrolled, unenrolled, new], course_id)
+        self.assertItemsEqual([enrollment.user for enrollment in enrollments], [unenrolled, new])
+        for user in (enrolled, unenrolled, new):
+            self.assertTrue(CourseEnrollment.is_enrolled(user, course_id))
+            # Enrolled students get the forum's student role, as for enroll()
+            self.assertTrue(user.roles.filter(course_id=course_id, name='Student').exists())
+        # Enrollments which were already active keep their mode
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(enrolled, course_id), ("verified", True))
+        self.assertEqual(self.mock_tracker.emit.call_count, 2)
+        self.mock_tracker.reset_mock()
+
+        enrollments = CourseEnrollment.bulk_unenroll([unenrolled, new], course_id)
+        self.assertItemsEqual([enrollment.user for enrollment in enrollments], [unenrolled, new])
+        self.assertTrue(CourseEnrollment.is_enrolled(enrolled, course_id))
+        self.assertFalse(CourseEnrollment.is_enrolled(unenrolled, course_id))
+        self.assertFalse(CourseEnrollment.is_enrolled(new, course_id))
+        self.assertEqual(self.mock_tracker.emit.call_count, 2)
+        self.mock_tracker.reset_mock()
+
+        # Unenrolling them again does nothing
+        self.assertEqual(CourseEnrollment.bulk_unenroll([unenrolled, new], course_id), [])
+        self.assert_no_events_were_emitted()
+
     def test_change_enrollment_modes(self):
         user = User.objects.create(username="justin", email="jh@fake.edx.org")
         course_id = SlashSeparatedCourseKey("edX", "Test101", "2013")
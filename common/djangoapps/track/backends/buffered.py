@@ -0,0 +1,187 @@
+"""
+Event tracker backend that queues events in memory and sends them to
+another backend in batches from a background thread, so that tracking an
+event doesn't wait on a database write.
+
+It wraps the backend that actually stores the events::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': { ... },
+              },
+              'max_queue_size': 10000,
+              'batch_size': 100,
+              'drop_policy': 'drop_newest',
+          }
+      }
+  }
+
+The queue is bounded: when events are tracked faster than the wrapped
+backend can store them, `drop_policy` decides what happens to the event
+that doesn't fit:
+
+  - `drop_newest`: the event is dropped.
+  - `drop_oldest`: the oldest queued event is dropped to make room for it.
+  - `block`: tracking waits up to `block_timeout` seconds for room, then
+    drops the event.
+
+Queued events are lost if the process is killed; they are flushed when it
+exits normally.
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+from Queue import Queue, Empty, Full
+
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+
+log = logging.getLogger(__name__)
+
+DROP_NEWEST = 'drop_newest'
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+DROP_POLICIES = (DROP_NEWEST, DROP_OLDEST, BLOCK)
+
+
+class BufferedBackend(BaseBackend):
+    """Event tracker backend sending events to another backend in batches"""
+
+    def __init__(self, backend, max_queue_size=10000, batch_size=100, drop_policy=DROP_NEWEST,
+                 block_timeout=0.1, **kwargs):
+        """
+        Queue events for a backend.
+
+        :Parameters:
+
+          - `backend`: the configuration of the backend to send the events
+            to, a dict with the `ENGINE` and `OPTIONS` of the backend, as in
+            TRACKING_BACKENDS
+          - `max_queue_size`: the largest number of events waiting to be sent
+          - `batch_size`: the largest number of events sent at once
+          - `drop_policy`: what to do with an event when the queue is full,
+            one of `DROP_POLICIES`
+          - `block_timeout`: how many seconds to wait for room in the queue
+            with the `block` drop policy
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError('Invalid drop policy {0}'.format(drop_policy))
+
+        # Imported here, as the tracker imports the backends
+        from track.tracker import _instantiate_backend_from_name
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.batch_size = batch_size
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.queue = Queue(max_queue_size)
+        self.metric_tags = [u'backend:{0}'.format(self.backend.__class__.__name__)]
+
+        self._thread = None
+        self._thread_pid = None
+        self._thread_lock = threading.Lock()
+
+        atexit.register(self.flush)
+
+    def send(self, event):
+        """Queue the event to be sent by the background thread."""
+        self._ensure_thread()
+
+        try:
+            if self.drop_policy == BLOCK:
+                self.queue.put(event, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(event)
+            return
+        except Full:
+            pass
+
+        if self.drop_policy == DROP_OLDEST:
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except Empty:
+                pass
+            try:
+                self.queue.put_nowait(event)
+            except Full:
+                pass
+
+        dog_stats_api.increment('track.buffered.dropped', tags=self.metric_tags)
+
+    def flush(self):
+        """
+        Send all the queued events, and wait for the ones the background
+        thread is sending.
+        """
+        while True:
+            events = self._get_batch(block=False)
+            if not events:
+                break
+            self._send_batch(events)
+        self.queue.join()
+
+    def _ensure_thread(self):
+        """
+        Start the background thread, if it isn't running in this process.
+        Threads don't survive forking, so a worker process forked after the
+        backend was created starts its own.
+        """
+        pid = os.getpid()
+        if self._thread_pid == pid and self._thread.is_alive():
+            return
+
+        with self._thread_lock:
+            if self._thread_pid != pid or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='track.backends.buffered')
+                self._thread.daemon = True
+                self._thread.start()
+                self._thread_pid = pid
+
+    def _run(self):
+        """Send the queued events in batches, as they arrive."""
+        while True:
+            self._send_batch(self._get_batch(block=True))
+
+    def _get_batch(self, block):
+        """
+        Take up to `batch_size` events off the queue. If `block`, wait for
+        the first one to arrive.
+        """
+        events = []
+        if block:
+            events.append(self.queue.get())
+        while len(events) < self.batch_size:
+            try:
+                events.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return events
+
+    def _send_batch(self, events):
+        """Send a batch of events to the backend."""
+        try:
+            with dog_stats_api.timer('track.buffered.flush', tags=self.metric_tags):
+                self.backend.send_many(events)
+            dog_stats_api.histogram('track.buffered.batch_size', len(events), tags=self.metric_tags)
+        except Exception:  # pylint: disable=broad-except
+            # Backends log their own errors; the background thread must not die
+            log.exception('Error sending %d events to the %s tracking backend', len(events), self.backend)
+            dog_stats_api.increment('track.buffered.failed', len(events), tags=self.metric_tags)
+        finally:
+            for __ in events:
+                self.queue.task_done()
+            dog_stats_api.gauge('track.buffered.queue_size', self.queue.qsize(), tags=self.metric_tags)
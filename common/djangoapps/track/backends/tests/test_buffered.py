@@ -0,0 +1,75 @@
+from __future__ import absolute_import
+
+from mock import patch
+
+from django.test import TestCase
+
+from track.backends import BaseBackend
+from track.backends.buffered import BufferedBackend
+
+
+class RecordingBackend(BaseBackend):
+    """Backend keeping the batches of events it is sent"""
+    def __init__(self, **kwargs):
+        super(RecordingBackend, self).__init__(**kwargs)
+        self.batches = []
+
+    def send(self, event):
+        self.batches.append([event])
+
+    def send_many(self, events):
+        self.batches.append(list(events))
+
+
+class TestBufferedBackend(TestCase):
+    def make_backend(self, **options):
+        return BufferedBackend(
+            backend={'ENGINE': 'track.backends.tests.test_buffered.RecordingBackend'},
+            **options
+        )
+
+    def sent_events(self, backend):
+        return [event for batch in backend.backend.batches for event in batch]
+
+    def test_buffered_backend(self):
+        backend = self.make_backend(batch_size=2)
+        events = [{'test': index} for index in range(5)]
+        for event in events:
+            backend.send(event)
+        backend.flush()
+
+        # the background thread and flush() may send batches in either order
+        self.assertItemsEqual(self.sent_events(backend), events)
+        self.assertTrue(all(len(batch) <= 2 for batch in backend.backend.batches))
+
+    def test_invalid_drop_policy(self):
+        with self.assertRaises(ValueError):
+            self.make_backend(drop_policy='drop_everything')
+
+    # Without the background thread, events stay queued until flushed
+    @patch.object(BufferedBackend, '_ensure_thread')
+    def test_drop_newest(self, _ensure_thread):
+        backend = self.make_backend(max_queue_size=2)
+        for index in range(3):
+            backend.send({'test': index})
+        backend.flush()
+
+        self.assertEqual(self.sent_events(backend), [{'test': 0}, {'test': 1}])
+
+    @patch.object(BufferedBackend, '_ensure_thread')
+    def test_drop_oldest(self, _ensure_thread):
+        backend = self.make_backend(max_queue_size=2, drop_policy='drop_oldest')
+        for index in range(3):
+            backend.send({'test': index})
+        backend.flush()
+
+        self.assertEqual(self.sent_events(backend), [{'test': 1}, {'test': 2}])
+
+    @patch.object(BufferedBackend, '_ensure_thread')
+    def test_block(self, _ensure_thread):
+        backend = self.make_backend(max_queue_size=2, drop_policy='block', block_timeout=0.01)
+        for index in range(3):
+            backend.send({'test': index})
+        backend.flush()
+
+        self.assertEqual(self.sent_events(backend), [{'test': 0}, {'test': 1}])
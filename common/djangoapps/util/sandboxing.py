@@ -1,5 +1,8 @@
 import re
 from django.conf import settings
+from django.core.cache import get_cache
+
+from capa.safe_exec import SafeExecCache
 
 # We'll make assets named this be importable by Python code in the sandbox.
 PYTHON_LIB_ZIP = "python_lib.zip"
@@ -38,3 +41,25 @@ def get_python_lib_zip(contentstore, course_id):
         return zip_lib.data
     else:
         return None
+
+
+_SAFE_EXEC_CACHE = None
+
+
+def get_safe_exec_cache():
+    """
+    Return the SafeExecCache shared by everything in this process that runs
+    problem code, configured by the SAFE_EXEC_CACHE setting, whose 'CACHE' is
+    the name of the Django cache to use as its shared tier.
+    """
+    global _SAFE_EXEC_CACHE  # pylint: disable=global-statement
+    if _SAFE_EXEC_CACHE is None:
+        config = getattr(settings, 'SAFE_EXEC_CACHE', {})
+        _SAFE_EXEC_CACHE = SafeExecCache(
+            shared_cache=get_cache(config.get('CACHE', 'default')),
+            max_local_entries=config.get('MAX_LOCAL_ENTRIES', 1000),
+            max_local_size=config.get('MAX_LOCAL_SIZE', 32 * 1024 * 1024),
+            max_item_size=config.get('MAX_ITEM_SIZE', 1024 * 1024),
+            timeout=config.get('TIMEOUT'),
+        )
+    return _SAFE_EXEC_CACHE
@@ -7,6 +7,9 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import operator
 import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -61,6 +64,15 @@ DEFAULT_VARIABLES = {
     'q': scipy.constants.e  # Fund. Charge: 1.602176565e-19 (Coulombs)
 }
 
+# Functions which apply elementwise to numpy arrays, so expressions using only
+# these may be evaluated for a whole batch of variable values at once.
+VECTORIZED_FUNCTIONS = frozenset(
+    func for func in DEFAULT_FUNCTIONS.itervalues() if func is not math.factorial
+)
+
+# Number of compiled expressions kept by `compile_expression`.
+COMPILED_EXPRESSION_CACHE_SIZE = 1000
+
 # We eliminated the following extreme suffixes:
 #   P (1e15), E (1e18), Z (1e21), Y (1e24),
 #   f (1e-15), a (1e-18), z (1e-21), y (1e-24)
@@ -162,6 +174,20 @@ def eval_parallel(parse_result):
     return 1. / sum(reciprocals)
 
 
+def _eval_parallel_values(values):
+    """
+    Like `eval_parallel`, for a list of values without the '||' operators,
+    which may also be numpy arrays.
+    """
+    if len(values) == 1:
+        return values[0]
+    if any(isinstance(value, numpy.ndarray) for value in values):
+        # A zero raises a FloatingPointError, making the batch be evaluated
+        # sample by sample, giving NaN for those samples.
+        return 1. / sum(1. / value for value in values)
+    return eval_parallel(values)
+
+
 def eval_sum(parse_result):
     """
     Add the inputs, keeping in mind their sign.
@@ -224,38 +250,209 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
-    # No need to go further.
-    if math_expr.strip() == "":
-        return float('nan')
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+_compiled_expressions = OrderedDict()
+_compiled_expressions_lock = threading.Lock()
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return a `CompiledExpression` for `math_expr`.
+
+    The most recently used expressions are cached, so the same expression is
+    only parsed once however many times it is evaluated. Raises the pyparsing
+    exception if `math_expr` cannot be parsed.
+    """
+    key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(key, None)
+        if compiled is not None:
+            # Re-insert to mark this entry as the most recently used
+            _compiled_expressions[key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+
+    with _compiled_expressions_lock:
+        _compiled_expressions[key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
+
+
+class CompiledExpression(object):
+    """
+    A math expression parsed once, which can then be evaluated any number of
+    times with different variables and functions.
+
+    The parse tree is turned into a tree of closures, each computing the value
+    of a node from the values of its children the same way `evaluator` always
+    has, so evaluating doesn't need to walk the pyparsing results again.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        if case_sensitive:
+            self.casify = lambda x: x
+        else:
+            self.casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        if math_expr.strip() == "":
+            self.math_interpreter = None
+            self.variables_used = frozenset()
+            self.functions_used = frozenset()
+            self.evaluate_tree = lambda variables, functions: float('nan')
+            return
+
+        self.math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+        self.math_interpreter.parse_algebra()
+        self.variables_used = frozenset(self.casify(var) for var in self.math_interpreter.variables_used)
+        self.functions_used = frozenset(self.casify(func) for func in self.math_interpreter.functions_used)
+        self.evaluate_tree = self.compile_node(self.math_interpreter.tree)
+
+    def compile_node(self, node):
+        """
+        Return a function of (variables, functions) computing the value of
+        `node`, a node of the parse tree.
+        """
+        node_name = node.getName()
+        children = [self.compile_node(k) if isinstance(k, ParseResults) else k for k in node]
+        operands = [k for k in children if callable(k)]
+
+        if node_name == 'number':
+            value = eval_number(node)
+            return lambda variables, functions: value
+
+        if node_name == 'variable':
+            name = self.casify(node[0])
+            return lambda variables, functions: variables[name]
+
+        if node_name == 'function':
+            name = self.casify(node[0])
+            argument = operands[0]
+            return lambda variables, functions: functions[name](argument(variables, functions))
+
+        if node_name == 'atom':
+            # Ignore parentheses
+            return operands[0]
+
+        if node_name == 'power':
+            # Exponentiate right to left, as `eval_power` does
+            return lambda variables, functions: reduce(
+                lambda a, b: b ** a, reversed([operand(variables, functions) for operand in operands])
+            )
+
+        if node_name == 'parallel':
+            return lambda variables, functions: _eval_parallel_values(
+                [operand(variables, functions) for operand in operands]
+            )
+
+        if node_name in ('product', 'sum'):
+            # Pair each operand with the operator preceding it, as
+            # `eval_product` and `eval_sum` do.
+            operations = {'*': operator.mul, '/': operator.truediv, '+': operator.add, '-': operator.sub}
+            current_op = operator.mul if node_name == 'product' else operator.add
+            terms = []
+            for child in children:
+                if callable(child):
+                    terms.append((current_op, child))
+                else:
+                    current_op = operations[child]
+            initial = 1.0 if node_name == 'product' else 0.0
+
+            def reduce_terms(variables, functions):
+                """
+                Apply each operator in turn to the running result and its operand.
+                """
+                result = initial
+                for term_op, term in terms:
+                    result = term_op(result, term(variables, functions))
+                return result
+            return reduce_terms
+
+        raise Exception(u"Unknown branch name '{}'".format(node_name))  # pragma: no cover
+
+    def check_variables(self, variables, functions):
+        """
+        Return the variables and functions, with their defaults, to evaluate
+        the expression with. Raise an UndefinedVariable if any it uses is
+        missing.
+        """
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        if self.math_interpreter is not None:
+            self.math_interpreter.check_variables(all_variables, all_functions)
+        return all_variables, all_functions
+
+    def evaluate(self, variables, functions=None):
+        """
+        Return the value of the expression for `variables`, as `evaluator` does.
+        """
+        all_variables, all_functions = self.check_variables(variables, functions or {})
+        return self.evaluate_tree(all_variables, all_functions)
+
+    def evaluate_batch(self, variables_list, functions=None):
+        """
+        Return a list with the value of the expression for each dictionary of
+        variables in `variables_list`.
+
+        If the expression only uses functions that apply elementwise to numpy
+        arrays and every sample defines the same float or complex variables,
+        the whole batch is evaluated at once on arrays of values. Otherwise,
+        or if doing so encounters anything that could make the results differ
+        from evaluating each sample on its own (a division by zero, an invalid
+        operation, an overflow...), each sample is evaluated on its own.
+        """
+        functions = functions or {}
+        if not variables_list:
+            return []
+
+        all_variables, all_functions = self.check_variables(variables_list[0], functions)
+        vectorized_variables = self._vectorized_variables(variables_list, all_variables, all_functions)
+        if vectorized_variables is not None:
+            try:
+                with numpy.errstate(all='raise'):
+                    results = self.evaluate_tree(vectorized_variables, all_functions)
+            except (ArithmeticError, ValueError, TypeError):
+                pass
+            else:
+                if isinstance(results, numpy.ndarray) and results.shape == (len(variables_list),):
+                    return results.tolist()
+                if isinstance(results, numbers.Number):
+                    # The expression doesn't depend on the sampled variables
+                    return [results] * len(variables_list)
+
+        return [self.evaluate(variables, functions) for variables in variables_list]
+
+    def _vectorized_variables(self, variables_list, all_variables, all_functions):
+        """
+        Return `all_variables` with the values of the variables sampled in
+        `variables_list` replaced by arrays of their values, or None if the
+        batch can't be evaluated on arrays.
+        """
+        if self.math_interpreter is None:
+            return None
+        if any(all_functions[func] not in VECTORIZED_FUNCTIONS for func in self.functions_used):
+            return None
+
+        if not self.case_sensitive:
+            variables_list = [lower_dict(variables) for variables in variables_list]
+        names = set(variables_list[0])
+        if any(set(variables) != names for variables in variables_list):
+            return None
+
+        vectorized_variables = dict(all_variables)
+        for name in self.variables_used & names:
+            values = [variables[name] for variables in variables_list]
+            if all(isinstance(value, float) for value in values):
+                dtype = float
+            elif all(isinstance(value, (float, complex)) for value in values):
+                dtype = complex
+            else:
+                return None
+            vectorized_variables[name] = numpy.array(values, dtype=dtype)
+        return vectorized_variables
 
 
 class ParseAugmenter(object):
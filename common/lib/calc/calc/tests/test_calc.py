@@ -559,3 +559,63 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and the CompiledExpression it
+    returns, in particular evaluating a batch of samples.
+    """
+
+    def test_cached(self):
+        """
+        Check that an expression is only parsed once per case sensitivity
+        """
+        compiled = calc.compile_expression('x^2 + 1')
+        self.assertIs(compiled, calc.compile_expression('x^2 + 1'))
+        self.assertIsNot(compiled, calc.compile_expression('x^2 + 1', case_sensitive=True))
+
+    def test_evaluate_batch(self):
+        """
+        Check that a batch evaluates to the same values as each sample alone
+        """
+        expressions = ['x^2 + sin(y)/x', '-x - 2*y + 3', 'x || y', 'sqrt(x)^y^2', 'sec(x) * 5k', '2 + 3']
+        samples = [{'x': 0.5 + index, 'y': 1.5 + index / 10.0} for index in range(20)]
+        for expression in expressions:
+            compiled = calc.compile_expression(expression)
+            self.assertEqual(
+                compiled.evaluate_batch(samples),
+                [calc.evaluator(sample, {}, expression) for sample in samples]
+            )
+
+    def test_evaluate_batch_complex(self):
+        samples = [{'z': complex(1, index)} for index in range(5)]
+        self.assertEqual(
+            calc.compile_expression('z*i + 1').evaluate_batch(samples),
+            [calc.evaluator(sample, {}, 'z*i + 1') for sample in samples]
+        )
+
+    def test_evaluate_batch_fallback(self):
+        """
+        Check that batches which can't be evaluated on arrays, or whose values
+        would differ, are evaluated sample by sample
+        """
+        samples = [{'x': 1.0}, {'x': 0.0}]
+        self.assertTrue(numpy.isnan(calc.compile_expression('x || 2').evaluate_batch(samples)[1]))
+        with self.assertRaises(ZeroDivisionError):
+            calc.compile_expression('1/x').evaluate_batch(samples)
+
+        self.assertEqual(calc.compile_expression('fact(x)').evaluate_batch([{'x': 3.0}, {'x': 4.0}]), [6, 24])
+        self.assertEqual(calc.compile_expression('x + 1').evaluate_batch([{'x': 3}, {'x': 4}]), [4, 5])
+        self.assertEqual(
+            calc.compile_expression('f(x)').evaluate_batch([{'x': 3.0}, {'x': 4.0}], {'f': lambda x: x + 1}),
+            [4.0, 5.0]
+        )
+
+    def test_evaluate_batch_undefined_vars(self):
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.compile_expression('x + y').evaluate_batch([{'x': 1.0}])
+
+    def test_empty_expression(self):
+        self.assertTrue(numpy.isnan(calc.compile_expression(' ').evaluate({})))
+        self.assertEqual(calc.compile_expression('x').evaluate_batch([]), [])
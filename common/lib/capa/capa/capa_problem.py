@@ -624,7 +624,7 @@ class LoncapaProblem(object):
         """
         context = {}
         context['seed'] = self.seed
-        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
+        anonymous_student_id = self.capa_system.anonymous_student_id
         all_code = ''
 
         python_path = []
@@ -647,6 +647,12 @@ class LoncapaProblem(object):
             code = unescape(script.text, XMLESC)
             all_code += code
 
+        # The student's id is only passed to code that uses it, so that the
+        # results of running code that doesn't are cached for all students.
+        uses_student_id = 'anonymous_student_id' in all_code
+        if uses_student_id:
+            context['anonymous_student_id'] = anonymous_student_id
+
         extra_files = []
         if all_code:
             # An asset named python_lib.zip can be imported by Python code.
@@ -671,6 +677,9 @@ class LoncapaProblem(object):
                 msg = "Error while executing script code: %s" % str(err).replace('<', '&lt;')
                 raise responsetypes.LoncapaProblemError(msg)
 
+        if not uses_student_id:
+            context['anonymous_student_id'] = anonymous_student_id
+
         # Store code source in context, along with the Python path needed to run it correctly.
         context['script_code'] = all_code
         context['python_path'] = python_path
@@ -0,0 +1,154 @@
+"""
+A two-tier cache for the results of `safe_exec`.
+
+Running code in codejail means starting a sandboxed subprocess, so every
+render or check of a randomized problem whose result isn't cached is slow.
+`SafeExecCache` keeps results in a bounded in-process LRU tier, in front of
+an optional shared tier (any object with the get/set interface of a Django
+cache, such as memcached) so that a result computed by one process, or by
+the warming command, is available to all of them.
+
+Results are stored as compressed JSON in both tiers, which bounds the memory
+they use, lets the size of a result decide whether it is worth caching, and
+means every hit returns a fresh copy that callers are free to modify.
+"""
+import json
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+
+class SafeExecCache(object):
+    """
+    A cache with the .get(key) and .set(key, value) interface `safe_exec`
+    expects.
+
+    `shared_cache` is the shared tier, or None to only cache in-process.
+    The in-process tier holds at most `max_local_entries` results, using at
+    most `max_local_size` bytes; the least recently used are evicted first.
+    Results whose compressed size is over `max_item_size` bytes, which
+    memcached would refuse anyway, are not cached at all.
+    """
+    # Prefix of the keys in the shared tier, whose values are compressed JSON
+    SHARED_KEY_PREFIX = 'zjson.'
+
+    def __init__(
+            self,
+            shared_cache=None,
+            max_local_entries=1000,
+            max_local_size=32 * 1024 * 1024,
+            max_item_size=1024 * 1024,
+            timeout=None
+    ):
+        self.shared_cache = shared_cache
+        self.max_local_entries = max_local_entries
+        self.max_local_size = max_local_size
+        self.max_item_size = max_item_size
+        self.timeout = timeout
+        self._local = OrderedDict()
+        self._local_size = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'local_hit': 0,
+            'shared_hit': 0,
+            'miss': 0,
+            'rejected': 0,
+        }
+
+    @property
+    def hit_ratio(self):
+        """
+        The fraction of lookups in this process that found a cached result,
+        or None if there were none.
+        """
+        hits = self.stats['local_hit'] + self.stats['shared_hit']
+        lookups = hits + self.stats['miss']
+        if not lookups:
+            return None
+        return float(hits) / lookups
+
+    def get(self, key):
+        """
+        Return the result cached for `key`, or None.
+        """
+        with self._lock:
+            encoded = self._local.pop(key, None)
+            if encoded is not None:
+                # Re-insert to mark this entry as the most recently used
+                self._local[key] = encoded
+        if encoded is not None:
+            self._record('local_hit')
+            return self._decode(encoded)
+
+        if self.shared_cache is not None:
+            encoded = self.shared_cache.get(self.SHARED_KEY_PREFIX + key)
+            if encoded is not None:
+                try:
+                    value = self._decode(encoded)
+                except (zlib.error, ValueError):
+                    log.warning("Unable to decode cached safe_exec result %s", key, exc_info=True)
+                else:
+                    self._set_local(key, encoded)
+                    self._record('shared_hit')
+                    return value
+
+        self._record('miss')
+        return None
+
+    def set(self, key, value, timeout=None):
+        """
+        Cache `value`, which must be JSON-serializable, for `key`.
+        """
+        encoded = zlib.compress(json.dumps(value))
+        if len(encoded) > self.max_item_size:
+            self._record('rejected')
+            return
+
+        self._set_local(key, encoded)
+        if self.shared_cache is not None:
+            self.shared_cache.set(
+                self.SHARED_KEY_PREFIX + key, encoded, timeout if timeout is not None else self.timeout
+            )
+
+    def clear(self):
+        """
+        Empty the in-process tier. Only intended for tests.
+        """
+        with self._lock:
+            self._local.clear()
+            self._local_size = 0
+
+    def _decode(self, encoded):
+        """
+        Return the value encoded by `set`.
+        """
+        return json.loads(zlib.decompress(encoded))
+
+    def _set_local(self, key, encoded):
+        """
+        Store `encoded` in the in-process tier, evicting the least recently
+        used entries to keep within its bounds.
+        """
+        if self.max_local_entries <= 0 or len(encoded) > self.max_local_size:
+            return
+        with self._lock:
+            previous = self._local.pop(key, None)
+            if previous is not None:
+                self._local_size -= len(previous)
+            self._local[key] = encoded
+            self._local_size += len(encoded)
+            while len(self._local) > self.max_local_entries or self._local_size > self.max_local_size:
+                __, evicted = self._local.popitem(last=False)
+                self._local_size -= len(evicted)
+
+    def _record(self, result):
+        """
+        Count a cache lookup or store with the given `result`.
+        """
+        self.stats[result] += 1
+        dog_stats_api.increment('capa.safe_exec.cache', tags=['result:{}'.format(result)])
@@ -9,7 +9,7 @@ import unittest
 
 from nose.plugins.skip import SkipTest
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import safe_exec, update_hash, SafeExecCache
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -101,7 +101,7 @@ class DictCache(object):
         assert len(key) <= 250
         return self.cache.get(key)
 
-    def set(self, key, value):
+    def set(self, key, value, timeout=None):  # pylint: disable=unused-argument
         # Actual cache implementations have limits on key length
         assert len(key) <= 250
         self.cache[key] = value
@@ -177,6 +177,67 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class TestSafeExecCache(unittest.TestCase):
+    """Test the two-tier SafeExecCache."""
+
+    def test_local_tier(self):
+        cache = SafeExecCache()
+        self.assertIsNone(cache.get('key'))
+        cache.set('key', (None, {'a': 17}))
+        self.assertEqual(cache.get('key'), [None, {'a': 17}])
+        self.assertEqual(cache.stats['local_hit'], 1)
+        self.assertEqual(cache.stats['miss'], 1)
+        self.assertEqual(cache.hit_ratio, 0.5)
+
+    def test_hits_are_copies(self):
+        cache = SafeExecCache()
+        cache.set('key', (None, {'a': [1, 2]}))
+        cache.get('key')[1]['a'].append(3)
+        self.assertEqual(cache.get('key'), [None, {'a': [1, 2]}])
+
+    def test_shared_tier(self):
+        shared = {}
+        SafeExecCache(shared_cache=DictCache(shared)).set('key', (None, {'a': 17}))
+        self.assertEqual(len(shared), 1)
+
+        # Another process's cache finds the result in the shared tier
+        cache = SafeExecCache(shared_cache=DictCache(shared))
+        self.assertEqual(cache.get('key'), [None, {'a': 17}])
+        self.assertEqual(cache.stats['shared_hit'], 1)
+        self.assertEqual(cache.get('key'), [None, {'a': 17}])
+        self.assertEqual(cache.stats['local_hit'], 1)
+
+    def test_local_eviction(self):
+        cache = SafeExecCache(max_local_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, (None, {}))
+        cache.get('b')
+        cache.set('d', (None, {}))
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('c'))
+        self.assertIsNotNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('d'))
+
+    def test_size_admission(self):
+        shared = {}
+        cache = SafeExecCache(shared_cache=DictCache(shared), max_item_size=100)
+        random_text = "".join(random.choice("abcdefghijklmnopqrstuvwxyz") for _ in xrange(1000))
+        cache.set('key', (None, {'text': random_text}))
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(shared, {})
+        self.assertEqual(cache.stats['rejected'], 1)
+
+    def test_safe_exec_with_cache(self):
+        cache = SafeExecCache()
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=cache)
+        self.assertEqual(g['a'], 3)
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=cache)
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(cache.stats['local_hit'], 1)
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
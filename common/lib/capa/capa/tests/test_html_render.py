@@ -91,6 +91,22 @@ class CapaHtmlRenderTest(unittest.TestCase):
         span_element = rendered_html.find('span')
         self.assertEqual(span_element.text, 'Welcome student')
 
+    def test_script_results_shared_between_students(self):
+        # Code that doesn't use the student's id is cached for all students
+        xml_str = textwrap.dedent("""
+            <problem>
+                <script type="loncapa/python">test = random.randint(0, 100)</script>
+            </problem>
+        """)
+        cache = {}
+        for student in ('student1', 'student2'):
+            capa_system = test_capa_system()
+            capa_system.anonymous_student_id = student
+            capa_system.cache = mock.Mock(get=cache.get, set=cache.__setitem__)
+            problem = new_loncapa_problem(xml_str, capa_system=capa_system)
+            self.assertEqual(problem.context['anonymous_student_id'], student)
+        self.assertEqual(len(cache), 1)
+
     def test_render_script(self):
         # Generate some XML with a <script> tag
         xml_str = textwrap.dedent("""
@@ -306,6 +306,12 @@ class EditInfo(object):
     """
     Encapsulates the editing info of a block.
     """
+    # Structures can hold tens of thousands of these, so avoid a __dict__ per instance
+    __slots__ = (
+        'previous_version', 'update_version', 'source_version', 'edited_on', 'edited_by',
+        'original_usage', 'original_usage_version', '_subtree_edited_on', '_subtree_edited_by',
+    )
+
     def __init__(self, **kwargs):
         self.from_storable(kwargs)
 
@@ -313,6 +319,13 @@ class EditInfo(object):
         self._subtree_edited_on = kwargs.get('_subtree_edited_on', None)
         self._subtree_edited_by = kwargs.get('_subtree_edited_by', None)
 
+    def __getstate__(self):
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+    def __setstate__(self, state):
+        for attr in self.__slots__:
+            setattr(self, attr, state.get(attr))
+
     def to_storable(self):
         """
         Serialize to a Mongo-storable format.
@@ -374,11 +387,74 @@ class BlockData(object):
     Wrap the block data in an object instead of using a straight Python dictionary.
     Allows the storing of meta-information about a structure that doesn't persist along with
     the structure itself.
+
+    Most blocks in a loaded structure are never looked at in detail, so the
+    edit info, and optionally the fields, are decoded on first access rather
+    than when the structure is loaded.
     """
-    def __init__(self, **kwargs):
+    # Structures can hold tens of thousands of these, so avoid a __dict__ per instance
+    __slots__ = (
+        'definition_loaded', 'block_type', 'definition', 'defaults',
+        '_fields', '_fields_decoder', '_edit_info',
+    )
+
+    def __init__(self, fields_decoder=None, **kwargs):
+        """
+        fields_decoder: an optional function which is applied to the stored
+            fields the first time they are accessed, to convert them from
+            their storable form.
+        """
         # Has the definition been loaded?
         self.definition_loaded = False
         self.from_storable(kwargs)
+        self._fields_decoder = fields_decoder
+
+    def __getstate__(self):
+        return {
+            'definition_loaded': self.definition_loaded,
+            'block_type': self.block_type,
+            'definition': self.definition,
+            'defaults': self.defaults,
+            'fields': self.fields,
+            'edit_info': self.edit_info,
+        }
+
+    def __setstate__(self, state):
+        self.definition_loaded = state['definition_loaded']
+        self.block_type = state['block_type']
+        self.definition = state['definition']
+        self.defaults = state['defaults']
+        self._fields = state['fields']
+        self._fields_decoder = None
+        self._edit_info = state['edit_info']
+
+    @property
+    def fields(self):
+        """
+        The Scope.settings and 'children' field values.
+        """
+        if self._fields_decoder is not None:
+            self._fields = self._fields_decoder(self._fields)
+            self._fields_decoder = None
+        return self._fields
+
+    @fields.setter
+    def fields(self, value):
+        self._fields = value
+        self._fields_decoder = None
+
+    @property
+    def edit_info(self):
+        """
+        EditInfo object containing all versioning/editing data.
+        """
+        if not isinstance(self._edit_info, EditInfo):
+            self._edit_info = EditInfo(**self._edit_info)
+        return self._edit_info
+
+    @edit_info.setter
+    def edit_info(self, value):
+        self._edit_info = value
 
     def to_storable(self):
         """
@@ -410,8 +486,8 @@ class BlockData(object):
         # blocks are copied from a library to a course)
         self.defaults = block_data.get('defaults', {})
 
-        # EditInfo object containing all versioning/editing data.
-        self.edit_info = EditInfo(**block_data.get('edit_info', {}))
+        # The storable form of the edit info, decoded into an EditInfo on first access.
+        self._edit_info = block_data.get('edit_info', {})
 
     def __repr__(self):
         # pylint: disable=bad-continuation, redundant-keyword-arg
@@ -429,6 +505,23 @@ class BlockData(object):
 new_contract('BlockData', BlockData)
 
 
+class BlockChanges(namedtuple('BlockChanges', 'version changed deleted ancestors')):
+    """
+    How the blocks of a course changed between two of its versions:
+
+    version: the newer version
+    changed: the usage keys of the blocks which were added, moved, or whose
+        own content or settings changed (not counting their list of children)
+    deleted: the usage keys of the blocks which were removed
+    ancestors: the usage keys of the ancestors of the changed and deleted
+        blocks in the newer version
+
+    changed, deleted and ancestors are None if the older version is unknown.
+    Usage keys have neither a branch nor a version.
+    """
+    pass
+
+
 class IncorrectlySortedList(Exception):
     """
     Thrown when calling find() on a SortedAssetList not sorted by filename.
@@ -790,8 +883,9 @@ class ModuleStoreRead(ModuleStoreAssetBase):
             # If an XBlock is passed-in, just match its fields.
             xblock, fields = (block, block.fields)
         elif isinstance(block, BlockData):
-            # BlockData is an object - compare its attributes in dict form.
-            xblock, fields = (None, block.__dict__)
+            # BlockData is an object - compare its attributes in dict form. It has
+            # no __dict__, so collect just the attributes being queried.
+            xblock, fields = (None, {key: getattr(block, key) for key in qualifiers if hasattr(block, key)})
         else:
             xblock, fields = (None, block)
 
@@ -1127,6 +1221,27 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
         """
         return {}
 
+    def get_course_keys(self, **kwargs):
+        """
+        Returns a list of the keys of the courses in this modulestore, accepting
+        the same arguments as get_courses, without loading the courses where the
+        modulestore can avoid it.
+
+        Default impl--the ids of the course list
+        """
+        return [course.id for course in self.get_courses(**kwargs)]
+
+    def get_block_changes(self, course_key, since_version):  # pylint: disable=unused-argument
+        """
+        Returns the BlockChanges of the course between its version
+        `since_version`, as given by the `version` of an earlier BlockChanges,
+        and its current version, or None if this modulestore doesn't version
+        courses.
+
+        Default impl--courses aren't versioned
+        """
+        return None
+
     def get_course(self, course_id, depth=0, **kwargs):
         """
         See ModuleStoreRead.get_course
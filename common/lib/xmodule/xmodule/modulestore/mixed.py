@@ -280,6 +280,17 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                     courses[course_id] = course
         return courses.values()
 
+    @strip_key
+    def get_course_keys(self, **kwargs):
+        """
+        Returns a list of the keys of the courses in this modulestore.
+        """
+        course_keys = {}
+        for store in self.modulestores:
+            for course_key in store.get_course_keys(**kwargs):
+                course_keys.setdefault(self._clean_locator_for_mapping(course_key), course_key)
+        return course_keys.values()
+
     @strip_key
     def get_libraries(self, **kwargs):
         """
@@ -346,6 +357,14 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except ItemNotFoundError:
             return None
 
+    def get_block_changes(self, course_key, since_version):
+        """
+        See xmodule.modulestore.__init__.ModuleStoreReadBase.get_block_changes
+        """
+        assert isinstance(course_key, CourseKey)
+        store = self._get_modulestore_for_courselike(course_key)
+        return store.get_block_changes(course_key, since_version)
+
     @strip_key
     def has_course(self, course_id, ignore_case=False, **kwargs):
         """
@@ -987,6 +987,23 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         )
         return [course for course in base_list if not isinstance(course, ErrorDescriptor)]
 
+    @autoretry_read()
+    def get_course_keys(self, **kwargs):
+        """
+        Returns a list of the keys of the courses in this modulestore, reading
+        only the ids of the course records. Accepts the 'org' filter of get_courses.
+        """
+        query = {'_id.category': 'course'}
+        course_org_filter = kwargs.get('org')
+        if course_org_filter:
+            query['_id.org'] = course_org_filter
+
+        return [
+            SlashSeparatedCourseKey(course['_id']['org'], course['_id']['course'], course['_id']['name'])
+            for course in self.collection.find(query, fields={'_id': True})
+            if not (course['_id']['org'] == 'edx' and course['_id']['course'] == 'templates')
+        ]
+
     def _find_one(self, location):
         '''Look for a given location in the collection. If the item is not present, raise
         ItemNotFoundError.
@@ -0,0 +1,170 @@
+"""
+Performance test for decoding split modulestore structures.
+
+Compares the current `structure_from_mongo` against the previous approach of
+eagerly building a dict-backed block object, with its edit info and children,
+for every block in the structure, and checks that the current one is no slower
+and uses well under the memory. Run with, e.g.:
+
+    paver test_lib -t common/lib/xmodule/xmodule/modulestore/perf_tests/test_structure_decoding.py
+"""
+import copy
+import sys
+import timeit
+import unittest
+
+from bson.objectid import ObjectId
+from contracts import check
+
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import structure_from_mongo
+
+# Number of blocks in the generated structure: a large course.
+BLOCK_COUNT = 20000
+
+# Children per non-leaf block in the generated structure.
+FAN_OUT = 10
+
+# Number of times each decoder is timed; the best time is compared.
+REPEAT = 3
+
+# Largest allowed ratio of the current decode time to the legacy one.
+MAX_DECODE_TIME_RATIO = 1.0
+
+# Largest allowed ratio of the current block wrapper memory to the legacy one.
+MAX_MEMORY_RATIO = 0.5
+
+
+class LegacyEditInfo(object):
+    """
+    An edit info object as the modulestore used to build it for every block.
+    """
+    def __init__(self, **kwargs):
+        for attr in (
+            'previous_version', 'update_version', 'source_version', 'edited_on', 'edited_by',
+            'original_usage', 'original_usage_version', '_subtree_edited_on', '_subtree_edited_by',
+        ):
+            setattr(self, attr, kwargs.get(attr, None))
+
+
+class LegacyBlockData(object):
+    """
+    A block data object as the modulestore used to build it for every block.
+    """
+    def __init__(self, **kwargs):
+        self.definition_loaded = False
+        self.fields = kwargs.get('fields', {})
+        self.block_type = kwargs.get('block_type', None)
+        self.definition = kwargs.get('definition', None)
+        self.defaults = kwargs.get('defaults', {})
+        self.edit_info = LegacyEditInfo(**kwargs.get('edit_info', {}))
+
+
+def legacy_structure_from_mongo(structure):
+    """
+    The previous, fully eager, implementation of structure_from_mongo.
+    """
+    check('seq[2]', structure['root'])
+    check('list(dict)', structure['blocks'])
+    for block in structure['blocks']:
+        if 'children' in block['fields']:
+            check('list(list[2])', block['fields']['children'])
+
+    structure['root'] = BlockKey(*structure['root'])
+    new_blocks = {}
+    for block in structure['blocks']:
+        if 'children' in block['fields']:
+            block['fields']['children'] = [BlockKey(*child) for child in block['fields']['children']]
+        new_blocks[BlockKey(block['block_type'], block.pop('block_id'))] = LegacyBlockData(**block)
+    structure['blocks'] = new_blocks
+    return structure
+
+
+def make_mongo_structure(block_count=BLOCK_COUNT, fan_out=FAN_OUT):
+    """
+    Return a structure document, as stored in mongo, with `block_count` blocks
+    arranged in a tree where every non-leaf block has `fan_out` children.
+    """
+    version = ObjectId()
+    blocks = []
+    for index in xrange(block_count):
+        children = [
+            ['problem', 'block_{}'.format(child)]
+            for child in xrange(index * fan_out + 1, min((index + 1) * fan_out + 1, block_count))
+        ]
+        fields = {'display_name': 'Block {}'.format(index)}
+        if children:
+            fields['children'] = children
+        blocks.append({
+            'block_type': 'course' if index == 0 else 'problem',
+            'block_id': 'course' if index == 0 else 'block_{}'.format(index),
+            'definition': ObjectId(),
+            'defaults': {},
+            'fields': fields,
+            'edit_info': {
+                'edited_on': None,
+                'edited_by': 'perf_test',
+                'previous_version': None,
+                'update_version': version,
+                'source_version': None,
+            },
+        })
+    return {'_id': version, 'root': ['course', 'course'], 'blocks': blocks}
+
+
+def block_footprint(block):
+    """
+    Return the approximate number of bytes used by the wrapper objects of a
+    decoded block, not counting the field values it shares with the document.
+    """
+    size = sys.getsizeof(block)
+    if hasattr(block, '__dict__'):
+        size += sys.getsizeof(block.__dict__)
+    edit_info = block.edit_info
+    size += sys.getsizeof(edit_info)
+    if hasattr(edit_info, '__dict__'):
+        size += sys.getsizeof(edit_info.__dict__)
+    return size
+
+
+class TestStructureDecodingPerformance(unittest.TestCase):
+    """
+    Measure the time and memory used to decode a large structure.
+    """
+    def setUp(self):
+        super(TestStructureDecodingPerformance, self).setUp()
+        self.document = make_mongo_structure()
+
+    def _best_time(self, decoder):
+        """
+        Return the best time, in seconds, taken by `decoder` to decode the document.
+        """
+        timer = timeit.Timer(lambda: decoder(copy.deepcopy(self.document)))
+        copy_time = min(timeit.Timer(lambda: copy.deepcopy(self.document)).repeat(REPEAT, 1))
+        return min(timer.repeat(REPEAT, 1)) - copy_time
+
+    def test_decode_time(self):
+        legacy_time = self._best_time(legacy_structure_from_mongo)
+        current_time = self._best_time(structure_from_mongo)
+        self.assertLessEqual(current_time, legacy_time * MAX_DECODE_TIME_RATIO)
+
+    def test_memory_footprint(self):
+        legacy = legacy_structure_from_mongo(copy.deepcopy(self.document))
+        current = structure_from_mongo(copy.deepcopy(self.document))
+
+        # Decoding the edit info of every block, as block_footprint does, is
+        # the worst case for the current implementation.
+        legacy_size = sum(block_footprint(block) for block in legacy['blocks'].itervalues())
+        current_size = sum(block_footprint(block) for block in current['blocks'].itervalues())
+        self.assertLessEqual(current_size, legacy_size * MAX_MEMORY_RATIO)
+
+    def test_decoded_structures_match(self):
+        legacy = legacy_structure_from_mongo(copy.deepcopy(self.document))
+        current = structure_from_mongo(copy.deepcopy(self.document))
+        self.assertEqual(legacy['root'], current['root'])
+        self.assertEqual(legacy['blocks'].viewkeys(), current['blocks'].viewkeys())
+        for block_key, block in legacy['blocks'].iteritems():
+            self.assertEqual(block.fields, current['blocks'][block_key].fields)
+            self.assertEqual(
+                block.edit_info.update_version, current['blocks'][block_key].edit_info.update_version
+            )
@@ -1,4 +1,5 @@
 ''' useful functions for finding content and its position '''
+from collections import defaultdict
 from logging import getLogger
 
 from .exceptions import (ItemNotFoundError, NoPathToItem)
@@ -28,56 +29,100 @@ def path_to_location(modulestore, usage_key):
     If the section is a sequential or vertical, position will be the children index
     of this location under that sequence.
     '''
+    with modulestore.bulk_operations(usage_key.course_key):
+        return _PathFinder(modulestore).path_to_location(usage_key)
 
-    def flatten(xs):
-        '''Convert lisp-style (a, (b, (c, ()))) list into a python list.
-        Not a general flatten function. '''
-        p = []
-        while xs != ():
-            p.append(xs[0])
-            xs = xs[1]
-        return p
 
-    def find_path_to_course():
-        '''Find a path up the location graph to a node with the
-        specified category.
+def paths_to_locations(modulestore, usage_keys):
+    '''
+    Find the course_id/chapter/section[/position] path to each of `usage_keys`,
+    as path_to_location does, looking up the parents and positions of the
+    ancestors locations have in common, such as the results of a search or
+    the problems of a course, only once.
 
-        If no path exists, return None.
+    Returns:
+        a dict of the tuple (course_id, chapter, section, position) of each of
+        `usage_keys` which exists and has a path; the others are left out.
+    '''
+    usage_keys_by_course = defaultdict(list)
+    for usage_key in usage_keys:
+        usage_keys_by_course[usage_key.course_key].append(usage_key)
+
+    paths = {}
+    path_finder = _PathFinder(modulestore)
+    for course_key, course_usage_keys in usage_keys_by_course.iteritems():
+        with modulestore.bulk_operations(course_key):
+            for usage_key in course_usage_keys:
+                try:
+                    paths[usage_key] = path_finder.path_to_location(usage_key)
+                except (ItemNotFoundError, NoPathToItem):
+                    continue
+    return paths
+
+
+class _PathFinder(object):
+    '''
+    Finds the paths to locations, remembering the parents and the children of
+    the locations it looks at, so that finding the paths to several locations
+    in the same part of a course doesn't look them up again.
+    '''
+    def __init__(self, modulestore):
+        self.modulestore = modulestore
+        self._parents = {}
+        self._child_locations = {}
 
-        If a path exists, return it as a list with target location first, and
-        the starting location last.
+    def _get_parent_location(self, usage_key):
         '''
-        # Standard DFS
+        get_parent_location, which raises ItemNotFoundError if usage_key isn't found
+        '''
+        if usage_key not in self._parents:
+            self._parents[usage_key] = self.modulestore.get_parent_location(usage_key)
+        return self._parents[usage_key]
 
-        # To keep track of where we came from, the work queue has
-        # tuples (location, path-so-far).  To avoid lots of
-        # copying, the path-so-far is stored as a lisp-style
-        # list--nested hd::tl tuples, and flattened at the end.
-        queue = [(usage_key, ())]
-        while len(queue) > 0:
-            (next_usage, path) = queue.pop()  # Takes from the end
+    def _get_child_locations(self, usage_key):
+        '''
+        The locations of the children of the item at usage_key
+        '''
+        if usage_key not in self._child_locations:
+            section_desc = self.modulestore.get_item(usage_key)
+            # this calls get_children rather than just children b/c old mongo includes private children
+            # in children but not in get_children
+            self._child_locations[usage_key] = [c.location for c in section_desc.get_children()]
+        return self._child_locations[usage_key]
+
+    def _find_path_to_course(self, usage_key):
+        '''
+        Find a path up the location graph to the course.
 
-            # get_parent_location raises ItemNotFoundError if location isn't found
-            parent = modulestore.get_parent_location(next_usage)
+        If no path exists, return None.
 
-            # print 'Processing loc={0}, path={1}'.format(next_usage, path)
+        If a path exists, return it as a list with the course first, and
+        usage_key last.
+        '''
+        path = []
+        next_usage = usage_key
+        while next_usage not in path:
+            parent = self._get_parent_location(next_usage)
+            path.append(next_usage)
             if next_usage.block_type == "course":
                 # Found it!
-                path = (next_usage, path)
-                return flatten(path)
+                path.reverse()
+                return path
             elif parent is None:
                 # Orphaned item.
                 return None
+            next_usage = parent
+        # The item is its own ancestor
+        return None
 
-            # otherwise, add parent locations at the end
-            newpath = (next_usage, path)
-            queue.append((parent, newpath))
-
-    with modulestore.bulk_operations(usage_key.course_key):
-        if not modulestore.has_item(usage_key):
+    def path_to_location(self, usage_key):
+        '''
+        See path_to_location
+        '''
+        if not self.modulestore.has_item(usage_key):
             raise ItemNotFoundError(usage_key)
 
-        path = find_path_to_course()
+        path = self._find_path_to_course(usage_key)
         if path is None:
             raise NoPathToItem(usage_key)
 
@@ -100,10 +145,7 @@ def path_to_location(modulestore, usage_key):
             for path_index in range(2, n - 1):
                 category = path[path_index].block_type
                 if category == 'sequential' or category == 'videosequence':
-                    section_desc = modulestore.get_item(path[path_index])
-                    # this calls get_children rather than just children b/c old mongo includes private children
-                    # in children but not in get_children
-                    child_locs = [c.location for c in section_desc.get_children()]
+                    child_locs = self._get_child_locations(path[path_index])
                     # positions are 1-indexed, and should be strings to be consistent with
                     # url parsing.
                     position_list.append(str(child_locs.index(path[path_index + 1]) + 1))
@@ -1,7 +1,12 @@
 """
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
+import cPickle as pickle
+import logging
 import re
+import threading
+import zlib
+from collections import OrderedDict
 from mongodb_proxy import autoretry_read, MongoProxy
 import pymongo
 
@@ -9,36 +14,57 @@ import pymongo
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 from contracts import check, new_contract
+from contracts.enabling import all_disabled
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
 import datetime
 import pytz
 
+try:
+    import dogstats_wrapper as dog_stats_api
+except ImportError:
+    dog_stats_api = None
+
+
+log = logging.getLogger(__name__)
 
 new_contract('BlockData', BlockData)
 
 
+def _decode_children(fields):
+    """
+    Convert the 'children' of a block's stored fields from [[block_type, block_id]] to [BlockKey].
+    """
+    if 'children' in fields:
+        fields['children'] = map(BlockKey._make, fields['children'])  # pylint: disable=protected-access
+    return fields
+
+
 def structure_from_mongo(structure):
     """
     Converts the 'blocks' key from a list [block_data] to a map
         {BlockKey: block_data}.
     Converts 'root' from [block_type, block_id] to BlockKey.
-    Converts 'blocks.*.fields.children' from [[block_type, block_id]] to [BlockKey].
+    Converts 'blocks.*.fields.children' from [[block_type, block_id]] to [BlockKey]. This is done
+        lazily, when the fields of a block are first accessed.
     N.B. Does not convert any other ReferenceFields (because we don't know which fields they are at this level).
+
+    Contract checks on the stored structure are skipped when contracts are disabled
+    (e.g. by setting DISABLE_CONTRACTS in the environment), since they require visiting every block.
     """
-    check('seq[2]', structure['root'])
-    check('list(dict)', structure['blocks'])
-    for block in structure['blocks']:
-        if 'children' in block['fields']:
-            check('list(list[2])', block['fields']['children'])
+    if not all_disabled():
+        check('seq[2]', structure['root'])
+        check('list(dict)', structure['blocks'])
+        for block in structure['blocks']:
+            if 'children' in block['fields']:
+                check('list(list[2])', block['fields']['children'])
 
     structure['root'] = BlockKey(*structure['root'])
     new_blocks = {}
     for block in structure['blocks']:
-        if 'children' in block['fields']:
-            block['fields']['children'] = [BlockKey(*child) for child in block['fields']['children']]
-        new_blocks[BlockKey(block['block_type'], block.pop('block_id'))] = BlockData(**block)
+        block_key = BlockKey(block['block_type'], block.pop('block_id'))
+        new_blocks[block_key] = BlockData(fields_decoder=_decode_children, **block)
     structure['blocks'] = new_blocks
 
     return structure
@@ -52,11 +78,12 @@ def structure_to_mongo(structure):
     Doesn't convert 'root', since namedtuple's can be inserted
         directly into mongo.
     """
-    check('BlockKey', structure['root'])
-    check('dict(BlockKey: BlockData)', structure['blocks'])
-    for block in structure['blocks'].itervalues():
-        if 'children' in block.fields:
-            check('list(BlockKey)', block.fields['children'])
+    if not all_disabled():
+        check('BlockKey', structure['root'])
+        check('dict(BlockKey: BlockData)', structure['blocks'])
+        for block in structure['blocks'].itervalues():
+            if 'children' in block.fields:
+                check('list(BlockKey)', block.fields['children'])
 
     new_structure = dict(structure)
     new_structure['blocks'] = []
@@ -70,17 +97,144 @@ def structure_to_mongo(structure):
     return new_structure
 
 
+class StructureCache(object):
+    """
+    A bounded cache of decoded structures, keyed on structure id.
+
+    Structures are immutable once written, so an entry never has to be
+    invalidated; it only has to be evicted to bound memory use. There are two
+    tiers:
+
+    * a process-local tier holding up to `max_size` decoded structures, with
+      the least recently used evicted first. Structures in it are shared
+      between callers, so it must only be enabled in processes that never
+      modify a structure they have read without copying it first.
+    * an optional shared tier, `shared_cache`, which is any object with the
+      get/set interface of a Django cache. Structures are pickled and
+      compressed before being stored there, so every read returns a fresh copy.
+    """
+    def __init__(self, max_size=0, shared_cache=None):
+        self.max_size = max_size
+        self.shared_cache = shared_cache
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        """
+        True if any tier of the cache is in use.
+        """
+        return self.max_size > 0 or self.shared_cache is not None
+
+    def get(self, key):
+        """
+        Return the structure whose id is `key`, or None if it is not cached.
+        """
+        if self.max_size > 0:
+            with self._lock:
+                structure = self._local.pop(key, None)
+                if structure is not None:
+                    # Re-insert to mark this entry as the most recently used
+                    self._local[key] = structure
+            if structure is not None:
+                self._record('local_hit')
+                return structure
+
+        if self.shared_cache is not None:
+            compressed = self.shared_cache.get(self._shared_key(key))
+            if compressed is not None:
+                try:
+                    structure = pickle.loads(zlib.decompress(compressed))
+                except (zlib.error, pickle.UnpicklingError, EOFError):
+                    log.warning("Unable to decode cached structure %s", key, exc_info=True)
+                else:
+                    self._set_local(key, structure)
+                    self._record('shared_hit')
+                    return structure
+
+        self._record('miss')
+        return None
+
+    def set(self, key, structure):
+        """
+        Cache `structure` under `key` in every enabled tier.
+        """
+        self._set_local(key, structure)
+        if self.shared_cache is not None:
+            compressed = zlib.compress(pickle.dumps(structure, pickle.HIGHEST_PROTOCOL))
+            self.shared_cache.set(self._shared_key(key), compressed)
+
+    def clear(self):
+        """
+        Empty the process-local tier. Only intended for tests.
+        """
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        """
+        Return a dict of hit and miss counts for this cache.
+        """
+        return {
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'size': len(self._local),
+        }
+
+    def _set_local(self, key, structure):
+        """
+        Add `structure` to the process-local tier, evicting the least recently
+        used entries if it is full.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._local.pop(key, None)
+            self._local[key] = structure
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def _record(self, result):
+        """
+        Count a lookup with the given result, and report it if metrics are available.
+        """
+        if result == 'local_hit':
+            self.local_hits += 1
+        elif result == 'shared_hit':
+            self.shared_hits += 1
+        else:
+            self.misses += 1
+        if dog_stats_api:
+            dog_stats_api.increment('split.structure_cache', tags=[u'result:{}'.format(result)])
+
+    @staticmethod
+    def _shared_key(key):
+        """
+        Return the key under which the structure `key` is stored in the shared tier.
+        """
+        return 'split_structure.{}'.format(key)
+
+
 class MongoConnection(object):
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, structure_cache=None, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        structure_cache: an optional StructureCache consulted before loading
+            structures from the database.
         """
+        self.structure_cache = structure_cache or StructureCache()
+
         self.database = MongoProxy(
             pymongo.database.Database(
                 pymongo.MongoClient(
@@ -120,9 +274,25 @@ class MongoConnection(object):
 
     def get_structure(self, key):
         """
-        Get the structure from the persistence mechanism whose id is the given key
+        Get the structure from the persistence mechanism whose id is the given key,
+        or None if there is no such structure
+        """
+        if not self.structure_cache.enabled:
+            return self._find_structure(key)
+
+        structure = self.structure_cache.get(key)
+        if structure is None:
+            structure = self._find_structure(key)
+            if structure is not None:
+                self.structure_cache.set(key, structure)
+        return structure
+
+    def _find_structure(self, key):
+        """
+        Read and decode the structure whose id is the given key, or return None if it isn't stored
         """
-        return structure_from_mongo(self.structures.find_one({'_id': key}))
+        structure = self.structures.find_one({'_id': key})
+        return structure_from_mongo(structure) if structure is not None else None
 
     @autoretry_read()
     def find_structures_by_id(self, ids):
@@ -132,7 +302,22 @@ class MongoConnection(object):
         Arguments:
             ids (list): A list of structure ids
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({'_id': {'$in': ids}})]
+        structures = []
+        missing_ids = []
+        for structure_id in ids:
+            structure = self.structure_cache.get(structure_id) if self.structure_cache.enabled else None
+            if structure is None:
+                missing_ids.append(structure_id)
+            else:
+                structures.append(structure)
+
+        if missing_ids:
+            for structure in self.structures.find({'_id': {'$in': missing_ids}}):
+                structure = structure_from_mongo(structure)
+                if self.structure_cache.enabled:
+                    self.structure_cache.set(structure['_id'], structure)
+                structures.append(structure)
+        return structures
 
     @autoretry_read()
     def find_structures_derived_from(self, ids):
@@ -74,12 +74,13 @@ from xmodule.modulestore.exceptions import InsufficientSpecificationError, Versi
     DuplicateCourseError
 from xmodule.modulestore import (
     inheritance, ModuleStoreWriteBase, ModuleStoreEnum,
-    BulkOpsRecord, BulkOperationsMixin, SortedAssetList, BlockData
+    BulkOpsRecord, BulkOperationsMixin, SortedAssetList, BlockData, BlockChanges
 )
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError, StructureCache
+from xmodule.modulestore.split_mongo.structure_index import StructureIndexCache
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -636,15 +637,27 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None,
+                 structure_cache_size=0, structure_cache_subsystem=None,
+                 structure_index_cache_size=20, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param structure_cache_size: the number of decoded structures to keep in this process across requests.
+            Only set this for processes which don't edit courses.
+        :param structure_cache_subsystem: an optional Django-style cache in which compressed structures are shared
+            between processes.
+        :param structure_index_cache_size: the number of structure versions whose block indexes get_items keeps
+            in this process across requests. 0 disables the indexes.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        self.db_connection = MongoConnection(
+            structure_cache=StructureCache(structure_cache_size, structure_cache_subsystem),
+            **doc_store_config
+        )
         self.db = self.db_connection.database
+        self.structure_indexes = StructureIndexCache(structure_index_cache_size)
 
         if default_class is not None:
             module_path, __, class_name = default_class.rpartition('.')
@@ -780,6 +793,11 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         Should only be used by testing or something which implements transactional boundary semantics.
         :param course_version_guid: if provided, clear only this entry
         """
+        if course_version_guid:
+            self.structure_indexes.discard(course_version_guid)
+        else:
+            self.structure_indexes.clear()
+
         if self.request_cache is None:
             return
 
@@ -924,6 +942,89 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # get the blocks for each course index (s/b the root)
         return self._get_structures_for_branch_and_locator(branch, self._create_course_locator, **kwargs)
 
+    def get_course_keys(self, branch, **kwargs):
+        """
+        Returns a list of the keys of the courses which have the given branch,
+        reading only the course indexes and not the structures. Accepts the
+        'org' filter of get_courses.
+        """
+        return [
+            self._create_course_locator(course_index, branch)
+            for course_index in self.find_matching_course_indexes(branch, org_target=kwargs.get('org'))
+        ]
+
+    def get_block_changes(self, course_key, since_version):
+        """
+        Returns the BlockChanges of the course's branch between the structure
+        with the id `since_version` and its current structure, found by
+        comparing the blocks of the two structures. Blocks whose
+        edit_info.update_version is the same in both are unchanged.
+        """
+        course = self._lookup_course(course_key)
+        structure = course.structure
+        old_structure = self.get_structure(course_key, since_version) if since_version is not None else None
+        if old_structure is None:
+            return BlockChanges(structure['_id'], None, None, None)
+
+        blocks = structure['blocks']
+        old_blocks = old_structure['blocks']
+        parents = self._get_parent_block_keys(structure)
+        old_parents = self._get_parent_block_keys(old_structure)
+
+        def _block_changed(block_key):
+            """
+            Was the block added, moved or edited?
+            """
+            block = blocks[block_key]
+            old_block = old_blocks.get(block_key)
+            if old_block is None or parents.get(block_key) != old_parents.get(block_key):
+                return True
+            if block.edit_info.update_version == old_block.edit_info.update_version:
+                return False
+            # The block was saved in a later version, but that may only have
+            # been to change its children, or to publish it as it was
+            return block.definition != old_block.definition or (
+                {name: value for name, value in block.fields.iteritems() if name != 'children'} !=
+                {name: value for name, value in old_block.fields.iteritems() if name != 'children'}
+            )
+
+        changed = set(block_key for block_key in blocks if _block_changed(block_key))
+        deleted = set(old_blocks) - set(blocks)
+
+        # The ancestors of changed blocks, and the former parents of deleted
+        # blocks which are still there, with their ancestors
+        ancestors = set()
+        starts = [parents.get(block_key) for block_key in changed]
+        starts.extend(old_parents.get(block_key) for block_key in deleted)
+        for parent in starts:
+            while parent in blocks and parent not in ancestors:
+                ancestors.add(parent)
+                parent = parents.get(parent)
+
+        course_locator = course.course_key.version_agnostic().for_branch(None)
+
+        def _usage_keys(block_keys):
+            """
+            Returns the usage keys of the blocks with block_keys.
+            """
+            return set(
+                course_locator.make_usage_key(block_key.type, block_key.id) for block_key in block_keys
+            )
+
+        return BlockChanges(structure['_id'], _usage_keys(changed), _usage_keys(deleted), _usage_keys(ancestors))
+
+    @staticmethod
+    def _get_parent_block_keys(structure):
+        """
+        Returns a dict mapping the BlockKey of each block of the structure
+        which has a parent to its parent's BlockKey.
+        """
+        return {
+            child: parent
+            for parent, block in structure['blocks'].iteritems()
+            for child in block.fields.get('children', [])
+        }
+
     def get_libraries(self, branch="library", **kwargs):
         """
         Returns a list of "library" root blocks matching any given qualifiers.
@@ -1068,8 +1169,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return []
 
         course = self._lookup_course(course_locator)
-        items = []
         qualifiers = qualifiers.copy() if qualifiers else {}  # copy the qualifiers (destructively manipulated here)
+        settings = settings.copy() if settings else {}
 
         def _block_matches_all(block_data):
             """
@@ -1086,15 +1187,18 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 else:
                     return True
 
-        if settings is None:
-            settings = {}
         if 'name' in qualifiers:
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
-            block_ids = []
-            for block_id, block in course.structure['blocks'].iteritems():
-                if block_name == block_id.id and _block_matches_all(block):
-                    block_ids.append(block_id)
+            structure_index = self._get_structure_index(course_locator, course.structure)
+            if structure_index is not None:
+                candidates = structure_index.block_keys_for_id(block_name)
+            else:
+                candidates = [block_id for block_id in course.structure['blocks'] if block_id.id == block_name]
+            block_ids = [
+                block_id for block_id in candidates
+                if _block_matches_all(course.structure['blocks'][block_id])
+            ]
 
             return self._load_items(course, block_ids, **kwargs)
 
@@ -1104,15 +1208,51 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # don't expect caller to know that children are in fields
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
-        for block_id, value in course.structure['blocks'].iteritems():
-            if _block_matches_all(value):
-                items.append(block_id)
+
+        items = [
+            block_id for block_id in self._candidate_block_keys(course_locator, course.structure, qualifiers, settings)
+            if _block_matches_all(course.structure['blocks'][block_id])
+        ]
 
         if len(items) > 0:
             return self._load_items(course, items, depth=0, **kwargs)
         else:
             return []
 
+    def _get_structure_index(self, course_key, structure):
+        """
+        Return the StructureIndex of `structure`, or None if it can't be
+        indexed because it is being edited in a bulk operation and may
+        still change.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if bulk_write_record.active and structure['_id'] not in bulk_write_record.structures_in_db:
+            return None
+        return self.structure_indexes.get(structure)
+
+    def _candidate_block_keys(self, course_key, structure, qualifiers, settings):
+        """
+        Return the keys of the blocks of `structure` which may match the
+        get_items `qualifiers` and `settings`: the smallest set the
+        structure's index gives for any one of them, or all the blocks if
+        none of them can be looked up in it. Candidates must still be
+        checked against all the criteria.
+        """
+        structure_index = self._get_structure_index(course_key, structure)
+        if structure_index is None:
+            return structure['blocks'].keys()
+
+        lookups = []
+        if 'block_type' in qualifiers:
+            lookups.append(structure_index.block_keys_for_type(qualifiers['block_type']))
+        for field_name, criteria in settings.iteritems():
+            lookups.append(structure_index.block_keys_for_field(structure['blocks'], field_name, criteria))
+
+        lookups = [block_keys for block_keys in lookups if block_keys is not None]
+        if not lookups:
+            return structure['blocks'].keys()
+        return min(lookups, key=len)
+
     def get_parent_location(self, locator, **kwargs):
         """
         Return the location (Locators w/ block_ids) for the parent of this location in this
@@ -1126,7 +1266,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        block_key = BlockKey.from_usage_key(locator)
+        structure_index = self._get_structure_index(locator.course_key, course.structure)
+        if structure_index is not None:
+            parent_ids = structure_index.parent_block_keys(course.structure['blocks'], block_key)
+        else:
+            parent_ids = self._get_parents_from_structure(block_key, course.structure)
         if len(parent_ids) == 0:
             return None
         # find alphabetically least
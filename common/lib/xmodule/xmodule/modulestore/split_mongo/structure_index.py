@@ -0,0 +1,211 @@
+"""
+Secondary indexes over the blocks of split modulestore structures.
+
+`SplitMongoModuleStore.get_items` used to test every block of a structure
+against its qualifiers. A `StructureIndex` maps block types, block ids and
+the values of a few frequently queried settings fields to the keys of the
+blocks that have them, so that only those blocks need to be tested. It also
+maps blocks to their parents, so that walking up the tree, as
+`path_to_location` does, doesn't search every block for each step.
+
+Structures are immutable once they are stored, so the index of a stored
+structure never has to be invalidated: `StructureIndexCache` keeps the
+indexes of the most recently queried structure versions, keyed on structure
+id, for reuse across requests.
+"""
+import re
+import threading
+from collections import defaultdict, OrderedDict
+
+
+class StructureIndex(object):
+    """
+    The keys of the blocks of one structure, by block type, by block id and,
+    built on first use, by the value of each of `INDEXED_FIELDS`.
+
+    Only block keys are kept, so the index doesn't keep its structure alive;
+    the structure's blocks are passed in to build the field indexes.
+    """
+    # Settings fields which get_items is frequently asked to match
+    INDEXED_FIELDS = frozenset(['discussion_id', 'group_access'])
+
+    def __init__(self, blocks):
+        self.by_type = defaultdict(list)
+        self.by_id = defaultdict(list)
+        for block_key in blocks:
+            self.by_type[block_key.type].append(block_key)
+            self.by_id[block_key.id].append(block_key)
+        self._field_indexes = {}
+        self._parents = None
+        self._lock = threading.Lock()
+
+    def block_keys_for_type(self, criteria):
+        """
+        Return the keys of the blocks whose type matches `criteria`, or None
+        if the index can't be used for it.
+        """
+        return self._lookup(self.by_type, criteria)
+
+    def block_keys_for_id(self, block_id):
+        """
+        Return the keys of the blocks with the id `block_id`.
+        """
+        return self.by_id.get(block_id, [])
+
+    def block_keys_for_field(self, blocks, field_name, criteria):
+        """
+        Return the keys of the blocks among `blocks`, the blocks of the
+        structure this indexes, whose `field_name` settings field matches
+        `criteria`, or None if the index can't be used for them.
+        """
+        if field_name not in self.INDEXED_FIELDS:
+            return None
+
+        present, by_value = self._field_index(blocks, field_name)
+
+        if isinstance(criteria, dict) and criteria.get('$exists') is True and len(criteria) == 1:
+            return present
+        return self._lookup(by_value, criteria)
+
+    def parent_block_keys(self, blocks, block_key):
+        """
+        Return the keys of the blocks among `blocks`, the blocks of the
+        structure this indexes, which have `block_key` as a child.
+        """
+        with self._lock:
+            parents = self._parents
+
+        if parents is None:
+            parents = defaultdict(list)
+            for parent_key, block in blocks.iteritems():
+                for child_key in block.fields.get('children', []):
+                    parents[child_key].append(parent_key)
+            with self._lock:
+                self._parents = parents
+
+        return list(parents.get(block_key, []))
+
+    def _field_index(self, blocks, field_name):
+        """
+        Return a pair of the keys of the blocks which set `field_name` and a
+        dict of them by the field's value, which is None if some values can't
+        be used as keys. A block with a list value is indexed under each
+        element, as get_items matches any element of a list.
+        """
+        with self._lock:
+            if field_name in self._field_indexes:
+                return self._field_indexes[field_name]
+
+        present = []
+        by_value = defaultdict(list)
+        for block_key, block in blocks.iteritems():
+            if field_name not in block.fields:
+                continue
+            present.append(block_key)
+            if by_value is None:
+                continue
+            value = block.fields[field_name]
+            elements = value if isinstance(value, list) else [value]
+            if all(_is_hashable(element) for element in elements):
+                for element in elements:
+                    by_value[element].append(block_key)
+            else:
+                # Blocks with such values, like dicts, can still be found
+                # with $exists, but not by value
+                by_value = None
+
+        field_index = (present, by_value)
+        with self._lock:
+            self._field_indexes[field_name] = field_index
+        return field_index
+
+    @staticmethod
+    def _lookup(index, criteria):
+        """
+        Return the entries of `index` for the values `criteria` matches, or
+        None if `index` is None or `criteria` isn't a value or {'$in': values}.
+        """
+        if index is None:
+            return None
+        if isinstance(criteria, dict) and criteria.keys() == ['$in']:
+            values = criteria['$in']
+            if not all(_is_plain_value(value) for value in values):
+                return None
+            block_keys = []
+            for value in set(values):
+                block_keys.extend(index.get(value, []))
+            return block_keys
+        if not _is_plain_value(criteria):
+            return None
+        return index.get(criteria, [])
+
+
+def _is_hashable(value):
+    """
+    Can `value` be used as a dict key?
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _is_plain_value(criteria):
+    """
+    Does `criteria` match by equality, rather than being a regex, a function
+    or a query operator?
+    """
+    return (
+        not isinstance(criteria, (dict, list, re._pattern_type)) and  # pylint: disable=protected-access
+        not callable(criteria) and
+        _is_hashable(criteria)
+    )
+
+
+class StructureIndexCache(object):
+    """
+    A bounded cache of StructureIndexes, keyed on structure id, evicting the
+    least recently used first. A `max_size` of 0 disables it.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, structure):
+        """
+        Return the StructureIndex of `structure`, which must be stored and so
+        immutable, building it if it isn't cached.
+        """
+        if self.max_size <= 0:
+            return None
+
+        key = structure['_id']
+        with self._lock:
+            structure_index = self._indexes.pop(key, None)
+            if structure_index is not None:
+                # Re-insert to mark this entry as the most recently used
+                self._indexes[key] = structure_index
+                return structure_index
+
+        structure_index = StructureIndex(structure['blocks'])
+        with self._lock:
+            self._indexes[key] = structure_index
+            while len(self._indexes) > self.max_size:
+                self._indexes.popitem(last=False)
+        return structure_index
+
+    def discard(self, key):
+        """
+        Drop the index of the structure whose id is `key`, if it is cached.
+        """
+        with self._lock:
+            self._indexes.pop(key, None)
+
+    def clear(self):
+        """
+        Drop all the cached indexes.
+        """
+        with self._lock:
+            self._indexes.clear()
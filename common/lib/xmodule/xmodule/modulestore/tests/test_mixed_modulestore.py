@@ -44,7 +44,7 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.draft_and_published import UnsupportedRevisionError, DIRECT_ONLY_CATEGORIES
 from xmodule.modulestore.exceptions import ItemNotFoundError, DuplicateCourseError, ReferentialIntegrityError, NoPathToItem
 from xmodule.modulestore.mixed import MixedModuleStore
-from xmodule.modulestore.search import path_to_location, navigation_index
+from xmodule.modulestore.search import path_to_location, paths_to_locations, navigation_index
 from xmodule.modulestore.tests.factories import check_mongo_calls, check_exact_number_of_calls, \
     mongo_uses_error_check
 from xmodule.modulestore.tests.utils import create_modulestore_instance, LocationMixin
@@ -857,6 +857,23 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
             published_courses = self.store.get_courses(remove_branch=True)
         self.assertEquals([c.id for c in draft_courses], [c.id for c in published_courses])
 
+    # Draft and split:
+    #   1) mongo course ids, 2) split course indexes; no structures or definitions are read
+    @ddt.data(('draft', 2, 0), ('split', 2, 0))
+    @ddt.unpack
+    def test_get_course_keys(self, default_ms, max_find, max_send):
+        self.initdb(default_ms)
+        with check_mongo_calls(max_find, max_send):
+            course_keys = self.store.get_course_keys()
+        self.assertItemsEqual(
+            course_keys,
+            [
+                self.course_locations[course_id].course_key
+                for course_id in (self.MONGO_COURSEID, self.XML_COURSEID1, self.XML_COURSEID2)
+            ]
+        )
+        self.assertItemsEqual(course_keys, [course.id for course in self.store.get_courses()])
+
     @ddt.data('draft', 'split')
     def test_create_child_detached_tabs(self, default_ms):
         """
@@ -1139,6 +1156,13 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
         with self.assertRaises(NoPathToItem):
             path_to_location(self.store, orphan)
 
+        # The paths to several locations can be found at once, leaving out those without one
+        with self.store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+            self.assertEqual(
+                paths_to_locations(self.store, [location for location, __ in should_work] + [orphan, not_found[0]]),
+                dict(should_work)
+            )
+
     def test_xml_path_to_location(self):
         """
         Make sure that path_to_location works: should be passed a modulestore
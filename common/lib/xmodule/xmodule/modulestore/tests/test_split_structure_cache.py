@@ -0,0 +1,101 @@
+"""
+Tests for the cross-request structure cache used by the split modulestore.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+from django.core.cache.backends.locmem import LocMemCache
+from mock import MagicMock, patch
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, StructureCache
+
+
+def make_structure():
+    """
+    Return a minimal decoded structure with a new id.
+    """
+    root = BlockKey('course', 'course')
+    return {
+        '_id': ObjectId(),
+        'root': root,
+        'blocks': {root: BlockData(block_type='course', fields={'children': []}, edit_info={})},
+    }
+
+
+class TestStructureCache(unittest.TestCase):
+    """
+    Tests of the StructureCache tiers.
+    """
+    def test_disabled(self):
+        cache = StructureCache()
+        self.assertFalse(cache.enabled)
+        structure = make_structure()
+        cache.set(structure['_id'], structure)
+        self.assertIsNone(cache.get(structure['_id']))
+
+    def test_local_tier_is_lru(self):
+        cache = StructureCache(max_size=2)
+        first, second, third = make_structure(), make_structure(), make_structure()
+        cache.set(first['_id'], first)
+        cache.set(second['_id'], second)
+        # Touch the first structure so that the second is the least recently used
+        self.assertIs(cache.get(first['_id']), first)
+        cache.set(third['_id'], third)
+
+        self.assertIs(cache.get(first['_id']), first)
+        self.assertIsNone(cache.get(second['_id']))
+        self.assertIs(cache.get(third['_id']), third)
+        self.assertEqual(cache.stats(), {'local_hits': 3, 'shared_hits': 0, 'misses': 1, 'size': 2})
+
+    def test_shared_tier_returns_copies(self):
+        shared = LocMemCache('test_split_structure_cache', {})
+        structure = make_structure()
+        StructureCache(shared_cache=shared).set(structure['_id'], structure)
+
+        # A different process, with an empty local tier, reads from the shared tier
+        cache = StructureCache(shared_cache=shared)
+        cached = cache.get(structure['_id'])
+        self.assertIsNot(cached, structure)
+        self.assertEqual(cached['root'], structure['root'])
+        self.assertEqual(cached['blocks'].keys(), structure['blocks'].keys())
+        self.assertEqual(cache.stats()['shared_hits'], 1)
+
+    def test_shared_tier_populates_local_tier(self):
+        shared = LocMemCache('test_split_structure_cache_local', {})
+        structure = make_structure()
+        StructureCache(shared_cache=shared).set(structure['_id'], structure)
+
+        cache = StructureCache(max_size=1, shared_cache=shared)
+        cached = cache.get(structure['_id'])
+        self.assertIs(cache.get(structure['_id']), cached)
+        self.assertEqual(cache.stats()['local_hits'], 1)
+
+
+class TestMongoConnectionStructureCache(unittest.TestCase):
+    """
+    Tests that MongoConnection only goes to the database on a cache miss.
+    """
+    def setUp(self):
+        super(TestMongoConnectionStructureCache, self).setUp()
+        for target in ('pymongo', 'MongoProxy'):
+            patcher = patch('xmodule.modulestore.split_mongo.mongo_connection.' + target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.connection = MongoConnection(
+            'db', 'collection', 'host', structure_cache=StructureCache(max_size=10)
+        )
+        self.connection.structures = MagicMock(name='structures')
+
+    def test_get_structure_cached(self):
+        structure_id = ObjectId()
+        self.connection.structures.find_one.return_value = {
+            '_id': structure_id,
+            'root': ['course', 'course'],
+            'blocks': [{'block_type': 'course', 'block_id': 'course', 'fields': {}, 'edit_info': {}}],
+        }
+        first = self.connection.get_structure(structure_id)
+        second = self.connection.get_structure(structure_id)
+        self.assertIs(first, second)
+        self.assertEqual(self.connection.structures.find_one.call_count, 1)
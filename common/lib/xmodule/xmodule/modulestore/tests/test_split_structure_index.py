@@ -0,0 +1,131 @@
+"""
+Tests for the block indexes the split modulestore's get_items uses.
+"""
+import re
+import unittest
+
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex, StructureIndexCache
+
+
+def make_block(block_type, **fields):
+    """
+    Return a BlockData of `block_type` with the given settings `fields`.
+    """
+    return BlockData(block_type=block_type, fields=fields, edit_info={})
+
+
+def make_structure():
+    """
+    Return a decoded structure with a few blocks of different types and fields.
+    """
+    blocks = {
+        BlockKey('course', 'course'): make_block('course'),
+        BlockKey('chapter', 'week1'): make_block('chapter', group_access={1: [2]}),
+        BlockKey('discussion', 'talk1'): make_block('discussion', discussion_id='d1'),
+        BlockKey('discussion', 'talk2'): make_block('discussion', discussion_id='d2'),
+        BlockKey('html', 'talk1'): make_block('html'),
+        BlockKey('problem', 'p1'): make_block('problem', discussion_id=['d1', 'd3']),
+    }
+    return {'_id': ObjectId(), 'blocks': blocks}
+
+
+class TestStructureIndex(unittest.TestCase):
+    """
+    Tests of StructureIndex lookups.
+    """
+    def setUp(self):
+        super(TestStructureIndex, self).setUp()
+        self.blocks = make_structure()['blocks']
+        self.index = StructureIndex(self.blocks)
+
+    def test_by_type(self):
+        self.assertItemsEqual(
+            self.index.block_keys_for_type('discussion'),
+            [BlockKey('discussion', 'talk1'), BlockKey('discussion', 'talk2')]
+        )
+        self.assertItemsEqual(
+            self.index.block_keys_for_type({'$in': ['html', 'problem', 'video']}),
+            [BlockKey('html', 'talk1'), BlockKey('problem', 'p1')]
+        )
+        self.assertEqual(self.index.block_keys_for_type('video'), [])
+        # Criteria which aren't plain values can't be looked up
+        self.assertIsNone(self.index.block_keys_for_type(re.compile('disc')))
+        self.assertIsNone(self.index.block_keys_for_type(lambda block_type: True))
+        self.assertIsNone(self.index.block_keys_for_type({'$nin': ['html']}))
+
+    def test_by_id(self):
+        self.assertItemsEqual(
+            self.index.block_keys_for_id('talk1'),
+            [BlockKey('discussion', 'talk1'), BlockKey('html', 'talk1')]
+        )
+        self.assertEqual(self.index.block_keys_for_id('nope'), [])
+
+    def test_by_field(self):
+        self.assertItemsEqual(
+            self.index.block_keys_for_field(self.blocks, 'discussion_id', 'd1'),
+            [BlockKey('discussion', 'talk1'), BlockKey('problem', 'p1')]
+        )
+        self.assertItemsEqual(
+            self.index.block_keys_for_field(self.blocks, 'discussion_id', {'$in': ['d2', 'd3']}),
+            [BlockKey('discussion', 'talk2'), BlockKey('problem', 'p1')]
+        )
+        self.assertItemsEqual(
+            self.index.block_keys_for_field(self.blocks, 'discussion_id', {'$exists': True}),
+            [BlockKey('discussion', 'talk1'), BlockKey('discussion', 'talk2'), BlockKey('problem', 'p1')]
+        )
+        # Fields which aren't indexed can't be looked up
+        self.assertIsNone(self.index.block_keys_for_field(self.blocks, 'display_name', 'd1'))
+
+    def test_parents(self):
+        blocks = {
+            BlockKey('course', 'course'): make_block('course', children=[BlockKey('chapter', 'week1')]),
+            BlockKey('chapter', 'week1'): make_block('chapter', children=[BlockKey('html', 'intro')]),
+            BlockKey('chapter', 'week2'): make_block('chapter', children=[BlockKey('html', 'intro')]),
+            BlockKey('html', 'intro'): make_block('html'),
+        }
+        index = StructureIndex(blocks)
+        self.assertEqual(index.parent_block_keys(blocks, BlockKey('chapter', 'week1')), [BlockKey('course', 'course')])
+        self.assertItemsEqual(
+            index.parent_block_keys(blocks, BlockKey('html', 'intro')),
+            [BlockKey('chapter', 'week1'), BlockKey('chapter', 'week2')]
+        )
+        self.assertEqual(index.parent_block_keys(blocks, BlockKey('course', 'course')), [])
+
+    def test_unhashable_field_values(self):
+        # group_access values are dicts, so blocks can only be found by whether they set it
+        self.assertEqual(
+            self.index.block_keys_for_field(self.blocks, 'group_access', {'$exists': True}),
+            [BlockKey('chapter', 'week1')]
+        )
+        self.assertIsNone(self.index.block_keys_for_field(self.blocks, 'group_access', {1: [2]}))
+
+
+class TestStructureIndexCache(unittest.TestCase):
+    """
+    Tests of StructureIndexCache.
+    """
+    def test_disabled(self):
+        self.assertIsNone(StructureIndexCache(0).get(make_structure()))
+
+    def test_cached_by_structure_id(self):
+        cache = StructureIndexCache(2)
+        structure = make_structure()
+        structure_index = cache.get(structure)
+        self.assertIs(cache.get(structure), structure_index)
+        cache.discard(structure['_id'])
+        self.assertIsNot(cache.get(structure), structure_index)
+
+    def test_lru(self):
+        cache = StructureIndexCache(2)
+        first, second, third = make_structure(), make_structure(), make_structure()
+        first_index = cache.get(first)
+        second_index = cache.get(second)
+        cache.get(first)
+        cache.get(third)
+        # The second structure was the least recently used
+        self.assertIs(cache.get(first), first_index)
+        self.assertIsNot(cache.get(second), second_index)
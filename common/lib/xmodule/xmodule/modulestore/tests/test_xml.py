@@ -3,6 +3,8 @@ Tests around our XML modulestore, including importing
 well-formed and not-well-formed XML.
 """
 import os.path
+import shutil
+import tempfile
 import unittest
 from glob import glob
 from mock import patch
@@ -119,6 +121,72 @@ class TestXMLModuleStore(unittest.TestCase):
                 # verify that the above context manager raises a ValueError
                 pass  # pragma: no cover
 
+    def _temp_dir(self):
+        """
+        Return a temporary directory, removed after the test.
+        """
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        return temp_dir
+
+    def assert_stores_equal(self, store, other_store):
+        """
+        Assert that `store` and `other_store` loaded the same courses, blocks and errors.
+        """
+        self.assertItemsEqual(store.courses.keys(), other_store.courses.keys())
+        for course in store.get_courses():
+            modules = store.modules[course.id]
+            other_modules = other_store.modules[course.id]
+            self.assertItemsEqual(modules.keys(), other_modules.keys())
+            for usage_key, block in modules.iteritems():
+                self.assertEqual(block, other_modules[usage_key])
+            self.assertEqual(store.get_course_errors(course.id), other_store.get_course_errors(course.id))
+
+    def test_snapshots(self):
+        data_dir = self._temp_dir()
+        for course_dir in ('toy', 'simple'):
+            shutil.copytree(os.path.join(DATA_DIR, course_dir), os.path.join(data_dir, course_dir))
+        snapshot_dir = self._temp_dir()
+
+        loaded = XMLModuleStore(data_dir, source_dirs=['toy', 'simple'], snapshot_dir=snapshot_dir)
+        self.assertEqual(len(os.listdir(snapshot_dir)), 2)
+
+        with patch.object(XMLModuleStore, 'load_course') as mock_load_course:
+            restored = XMLModuleStore(data_dir, source_dirs=['toy', 'simple'], snapshot_dir=snapshot_dir)
+        self.assertFalse(mock_load_course.called)
+        self.assert_stores_equal(loaded, restored)
+
+        # Changing a file of a course loads it again
+        os.utime(os.path.join(data_dir, 'toy', 'course.xml'), (0, 0))
+        with patch.object(
+            XMLModuleStore, 'load_course', autospec=True, side_effect=XMLModuleStore.load_course
+        ) as mock_load_course:
+            reloaded = XMLModuleStore(data_dir, source_dirs=['toy', 'simple'], snapshot_dir=snapshot_dir)
+        self.assertEqual(mock_load_course.call_count, 1)
+        # The course's older snapshot was replaced
+        self.assertEqual(len(os.listdir(snapshot_dir)), 2)
+        self.assert_stores_equal(loaded, reloaded)
+
+        # Stores with other mixins don't use the snapshots
+        with patch.object(
+            XMLModuleStore, 'load_course', autospec=True, side_effect=XMLModuleStore.load_course
+        ) as mock_load_course:
+            XMLModuleStore(
+                data_dir, source_dirs=['toy', 'simple'], snapshot_dir=snapshot_dir, xblock_mixins=(XModuleMixin,)
+            )
+        self.assertEqual(mock_load_course.call_count, 2)
+
+    def test_load_processes(self):
+        store = XMLModuleStore(DATA_DIR, source_dirs=['toy', 'simple'])
+        with patch.object(
+            XMLModuleStore, '_restore_course', autospec=True,
+            side_effect=XMLModuleStore._restore_course  # pylint: disable=protected-access
+        ) as mock_restore_course:
+            loaded_in_processes = XMLModuleStore(DATA_DIR, source_dirs=['toy', 'simple'], load_processes=2)
+        # Both courses were loaded by worker processes
+        self.assertEqual(mock_restore_course.call_count, 2)
+        self.assert_stores_equal(store, loaded_in_processes)
+
     @patch('xmodule.modulestore.xml.log')
     def test_dag_course(self, mock_logging):
         """
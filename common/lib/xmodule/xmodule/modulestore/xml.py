@@ -2,6 +2,7 @@ import hashlib
 import itertools
 import json
 import logging
+import multiprocessing
 import os
 import re
 import sys
@@ -37,6 +38,9 @@ import dogstats_wrapper as dog_stats_api
 
 from .exceptions import ItemNotFoundError
 from .inheritance import compute_inherited_metadata, inheriting_field_data, InheritanceKeyValueStore
+from .xml_snapshot import (
+    CourseSnapshot, SnapshotError, qualified_name, read_snapshot, snapshot_key, write_snapshot
+)
 
 
 edx_xml_parser = etree.XMLParser(dtd_validation=False, load_dtd=False,
@@ -326,6 +330,33 @@ class CourseImportLocationManager(CourseLocationManager):
         self.target_course_id = target_course_id
 
 
+# The XMLModuleStore a worker process of `XMLModuleStore._load_courses_in_processes` loads courses into
+_WORKER_STORE = None
+
+
+def _init_load_worker(store):
+    """
+    Set up a worker process forked by `XMLModuleStore._load_courses_in_processes`.
+    """
+    global _WORKER_STORE  # pylint: disable=global-statement
+    _WORKER_STORE = store
+
+
+def _load_course_in_worker(course_dir, course_ids, target_course_id):
+    """
+    Load a course in a worker process, and return its CourseSnapshot pickled,
+    or None if it didn't load. Courses which fail to load are loaded again
+    by the parent process, to record their errors.
+    """
+    try:
+        _WORKER_STORE.try_load_course(course_dir, course_ids, target_course_id)
+        snapshot = CourseSnapshot.from_store(_WORKER_STORE, course_dir)
+        return snapshot.dumps() if snapshot is not None else None
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Failed to load courselike '%s' in a worker process", course_dir)
+        return None
+
+
 class XMLModuleStore(ModuleStoreReadBase):
     """
     An XML backed ModuleStore
@@ -335,7 +366,8 @@ class XMLModuleStore(ModuleStoreReadBase):
     def __init__(
             self, data_dir, default_class=None, source_dirs=None, course_ids=None,
             load_error_modules=True, i18n_service=None, fs_service=None, user_service=None,
-            signal_handler=None, target_course_id=None, **kwargs   # pylint: disable=unused-argument
+            signal_handler=None, target_course_id=None, load_processes=1, snapshot_dir=None,
+            **kwargs   # pylint: disable=unused-argument
     ):
         """
         Initialize an XMLModuleStore from data_dir
@@ -348,6 +380,12 @@ class XMLModuleStore(ModuleStoreReadBase):
 
             source_dirs or course_ids (list of str): If specified, the list of source_dirs or course_ids to load.
                 Otherwise, load all courses. Note, providing both
+
+            load_processes (int): if more than 1, the number of processes to load courses in, in parallel
+
+            snapshot_dir (str): if specified, a directory to save a snapshot of each loaded course in, for
+                later stores to restore the course from while its directory is unchanged. See
+                `xmodule.modulestore.xml_snapshot`.
         """
         super(XMLModuleStore, self).__init__(**kwargs)
 
@@ -375,6 +413,9 @@ class XMLModuleStore(ModuleStoreReadBase):
         self.fs_service = fs_service
         self.user_service = user_service
 
+        self.load_processes = load_processes
+        self.snapshot_dir = snapshot_dir
+
         # If we are specifically asked for missing courses, that should
         # be an error.  If we are asked for "all" courses, find the ones
         # that have a course.xml. We sort the dirs in alpha order so we always
@@ -384,8 +425,101 @@ class XMLModuleStore(ModuleStoreReadBase):
         if source_dirs is None:
             source_dirs = sorted([d for d in os.listdir(self.data_dir) if
                                   os.path.exists(self.data_dir / d / self.parent_xml)])
-        for course_dir in source_dirs:
+        self._load_courses(source_dirs, course_ids, target_course_id)
+
+    def _load_courses(self, course_dirs, course_ids, target_course_id):
+        """
+        Load the courses in `course_dirs`, in order. Courses are restored from
+        their snapshots in `snapshot_dir` if they have any; the others are
+        loaded in `load_processes` worker processes when there are several.
+        """
+        snapshot_keys = {}
+        snapshots = {}
+        if self.snapshot_dir:
+            options = (
+                self.__class__.__name__, course_ids, target_course_id, self.load_error_modules,
+                qualified_name(self.default_class),
+                tuple(qualified_name(mixin) for mixin in self.xblock_mixins),
+                qualified_name(self.xblock_select),
+            )
+            for course_dir in course_dirs:
+                snapshot_keys[course_dir] = snapshot_key(self.data_dir, course_dir, options)
+                snapshots[course_dir] = read_snapshot(self.snapshot_dir, course_dir, snapshot_keys[course_dir])
+
+        unloaded_dirs = [course_dir for course_dir in course_dirs if snapshots.get(course_dir) is None]
+        # Daemonic processes, like celery workers, aren't allowed to fork their own
+        can_fork = not multiprocessing.current_process().daemon
+        if self.load_processes > 1 and len(unloaded_dirs) > 1 and can_fork:
+            for course_dir, data in self._load_courses_in_processes(unloaded_dirs, course_ids, target_course_id):
+                snapshots[course_dir] = CourseSnapshot.loads(data)
+                if self.snapshot_dir:
+                    write_snapshot(self.snapshot_dir, course_dir, snapshot_keys[course_dir], data)
+
+        for course_dir in course_dirs:
+            snapshot = snapshots.get(course_dir)
+            if snapshot is not None and self._restore_course(snapshot, target_course_id):
+                continue
+
             self.try_load_course(course_dir, course_ids, target_course_id)
+            if self.snapshot_dir and snapshot is None:
+                try:
+                    snapshot = CourseSnapshot.from_store(self, course_dir)
+                except SnapshotError:
+                    log.info("Not saving a snapshot of courselike '%s'", course_dir, exc_info=True)
+                    continue
+                if snapshot is not None:
+                    write_snapshot(self.snapshot_dir, course_dir, snapshot_keys[course_dir], snapshot.dumps())
+
+    def _load_courses_in_processes(self, course_dirs, course_ids, target_course_id):
+        """
+        Load the courses in `course_dirs` in worker processes forked from this
+        one, and return a list of (course_dir, pickled CourseSnapshot) for those
+        which loaded there.
+        """
+        pool = multiprocessing.Pool(
+            min(self.load_processes, len(course_dirs)), initializer=_init_load_worker, initargs=(self,)
+        )
+        try:
+            results = [
+                (course_dir, pool.apply_async(_load_course_in_worker, (course_dir, course_ids, target_course_id)))
+                for course_dir in course_dirs
+            ]
+            loaded = []
+            for course_dir, result in results:
+                try:
+                    data = result.get()
+                except Exception:  # pylint: disable=broad-except
+                    log.exception("Failed to get courselike '%s' from its worker process", course_dir)
+                    continue
+                if data is not None:
+                    loaded.append((course_dir, data))
+            return loaded
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _restore_course(self, snapshot, target_course_id):
+        """
+        Add the course of `snapshot` to this store, as `try_load_course` would
+        have. Returns False if the snapshot can't be restored.
+        """
+        errorlog = make_error_tracker()
+        errorlog.errors.extend(snapshot.errors)
+        system = self._import_system(
+            snapshot.course_id, snapshot.course_dir, errorlog.tracker, lambda usage_id: {}, target_course_id
+        )
+        try:
+            blocks = snapshot.restore(system)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Failed to restore courselike '%s' from its snapshot", snapshot.course_dir)
+            return False
+
+        self.modules[snapshot.course_id].update(blocks)
+        course_descriptor = blocks[snapshot.root_usage_id]
+        self.courses[snapshot.course_dir] = course_descriptor
+        course_descriptor.parent = None
+        self._course_errors[snapshot.course_id] = errorlog
+        return True
 
     def try_load_course(self, course_dir, course_ids=None, target_course_id=None):
         '''
@@ -549,30 +683,7 @@ class XMLModuleStore(ModuleStoreReadBase):
                 """
                 return policy.get(policy_key(usage_id), {})
 
-            services = {}
-            if self.i18n_service:
-                services['i18n'] = self.i18n_service
-
-            if self.fs_service:
-                services['fs'] = self.fs_service
-
-            if self.user_service:
-                services['user'] = self.user_service
-
-            system = ImportSystem(
-                xmlstore=self,
-                course_id=course_id,
-                course_dir=course_dir,
-                error_tracker=tracker,
-                load_error_modules=self.load_error_modules,
-                get_policy=get_policy,
-                mixins=self.xblock_mixins,
-                default_class=self.default_class,
-                select=self.xblock_select,
-                field_data=self.field_data,
-                services=services,
-                target_course_id=target_course_id,
-            )
+            system = self._import_system(course_id, course_dir, tracker, get_policy, target_course_id)
             course_descriptor = system.process_xml(etree.tostring(course_data, encoding='unicode'))
             # If we fail to load the course, then skip the rest of the loading steps
             if isinstance(course_descriptor, ErrorDescriptor):
@@ -583,6 +694,35 @@ class XMLModuleStore(ModuleStoreReadBase):
             log.debug('========> Done with courselike import from %s', course_dir)
             return course_descriptor
 
+    def _import_system(self, course_id, course_dir, tracker, get_policy, target_course_id):
+        """
+        Return the ImportSystem which loads the blocks of the course `course_id` from `course_dir`.
+        """
+        services = {}
+        if self.i18n_service:
+            services['i18n'] = self.i18n_service
+
+        if self.fs_service:
+            services['fs'] = self.fs_service
+
+        if self.user_service:
+            services['user'] = self.user_service
+
+        return ImportSystem(
+            xmlstore=self,
+            course_id=course_id,
+            course_dir=course_dir,
+            error_tracker=tracker,
+            load_error_modules=self.load_error_modules,
+            get_policy=get_policy,
+            mixins=self.xblock_mixins,
+            default_class=self.default_class,
+            select=self.xblock_select,
+            field_data=self.field_data,
+            services=services,
+            target_course_id=target_course_id,
+        )
+
     def content_importers(self, system, course_descriptor, course_dir, url_name):
         """
         Load all extra non-course content, and calculate metadata inheritance.
@@ -0,0 +1,269 @@
+"""
+Snapshots of the courses an XMLModuleStore has loaded.
+
+Loading a course from XML reads and parses every file of its directory, and
+every process using an XMLModuleStore repeats that work. A `CourseSnapshot`
+holds what loading a course produced: the class, scope ids and field data of
+each of its blocks, and the errors found along the way. Snapshots can be
+pickled, so a course can be loaded in another process, and saved to disk for
+later processes to reuse. Restoring a snapshot only constructs the blocks.
+
+Saved snapshots are keyed on the path, size and modification time of every
+file in the course directory, on the options of the store which loaded it,
+and on the versions of the XModule and XBlock packages. Saving a snapshot of
+a course removes its older ones, so a directory of snapshots should only be
+shared by stores with the same options.
+"""
+import cPickle as pickle
+import hashlib
+import logging
+import os
+import tempfile
+from importlib import import_module
+
+import pkg_resources
+
+from xblock.field_data import DictFieldData
+from xblock.runtime import KvsFieldData
+
+from xmodule.modulestore.inheritance import InheritanceKeyValueStore, InheritingFieldData, inheriting_field_data
+
+
+log = logging.getLogger(__name__)
+
+# Change whenever what snapshots hold, or how courses are loaded from XML,
+# changes, so that older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+# How the field data of a block is restored:
+# - KVS: its own KvsFieldData over an InheritanceKeyValueStore, as XML descriptors have
+# - INHERITING: its own InheritingFieldData over an InheritanceKeyValueStore
+# - DICT: a DictFieldData, as error descriptors have
+# - RUNTIME: the field data shared by the blocks of the store, as pure XBlocks have
+KVS = 'kvs'
+INHERITING = 'inheriting'
+DICT = 'dict'
+RUNTIME = 'runtime'
+
+
+class SnapshotError(Exception):
+    """
+    A course can't be snapshotted, as one of its blocks has field data of a
+    kind snapshots don't know how to restore.
+    """
+    pass
+
+
+class CourseSnapshot(object):
+    """
+    The blocks and errors of a course an XMLModuleStore loaded from a course
+    directory.
+    """
+    def __init__(self, course_dir, course_id, root_usage_id, blocks, errors):
+        self.version = SNAPSHOT_VERSION
+        self.course_dir = course_dir
+        self.course_id = course_id
+        self.root_usage_id = root_usage_id
+        # A dict of the state of each block; see `_block_state`
+        self.blocks = blocks
+        # The (message, exception string) pairs of the course's error log
+        self.errors = errors
+
+    @classmethod
+    def from_store(cls, store, course_dir):
+        """
+        Snapshot the course the XMLModuleStore `store` loaded from
+        `course_dir`, or return None if it didn't load one from it.
+
+        Raises SnapshotError if a block of the course can't be snapshotted.
+        """
+        course = store.courses.get(course_dir)
+        if course is None:
+            return None
+
+        course_id = store.id_from_descriptor(course)
+        blocks = [_block_state(block, store.field_data) for block in store.modules[course_id].itervalues()]
+        return cls(course_dir, course_id, course.scope_ids.usage_id, blocks, list(store.get_course_errors(course_id)))
+
+    def restore(self, system):
+        """
+        Construct the blocks of the course with the runtime `system`, and
+        return them as a dict of usage id -> XBlock.
+        """
+        blocks = {}
+        for state in self.blocks:
+            module_name, class_name = state['class']
+            block_class = getattr(import_module(module_name), class_name)
+            values = dict(state['values'])
+
+            kind = state['kind']
+            if kind == RUNTIME:
+                field_data = None
+            elif kind == DICT:
+                field_data = DictFieldData(values)
+            else:
+                kvs = InheritanceKeyValueStore(initial_values=values, inherited_settings=dict(state['inherited']))
+                field_data = inheriting_field_data(kvs) if kind == INHERITING else KvsFieldData(kvs)
+
+            block = system.construct_xblock_from_class(block_class, state['scope_ids'], field_data)
+            if kind == RUNTIME:
+                block._field_data.set_many(block, values)  # pylint: disable=protected-access
+            if state['data_dir'] is not None:
+                block.data_dir = state['data_dir']
+            blocks[block.scope_ids.usage_id] = block
+        return blocks
+
+    def dumps(self):
+        """
+        Return the snapshot pickled.
+        """
+        return pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def loads(data):
+        """
+        Return the snapshot pickled in `data`, or None if it is of another
+        SNAPSHOT_VERSION.
+        """
+        snapshot = pickle.loads(data)
+        if getattr(snapshot, 'version', None) != SNAPSHOT_VERSION:
+            return None
+        return snapshot
+
+
+def _block_state(block, runtime_field_data):
+    """
+    Return a picklable dict of what it takes to construct `block` again,
+    given the field data `runtime_field_data` its runtime shares between
+    blocks. Raises SnapshotError if its field data is of another kind.
+    """
+    # pylint: disable=protected-access
+    block.save()
+    field_data = block._field_data
+    inherited = None
+
+    if field_data is runtime_field_data:
+        kind = RUNTIME
+        values = {name: field.read_json(block) for name, field in block.fields.iteritems() if field.is_set_on(block)}
+    elif isinstance(field_data, KvsFieldData) and isinstance(field_data._kvs, InheritanceKeyValueStore):
+        kind = INHERITING if isinstance(field_data, InheritingFieldData) else KVS
+        values = dict(field_data._kvs._fields)
+        inherited = dict(field_data._kvs.inherited_settings)
+    elif isinstance(field_data, DictFieldData):
+        kind = DICT
+        values = dict(field_data._data)
+    else:
+        raise SnapshotError(u"Can't snapshot {} with field data {!r}".format(block.scope_ids.usage_id, field_data))
+
+    block_class = getattr(block, 'unmixed_class', block.__class__)
+    return {
+        'class': (block_class.__module__, block_class.__name__),
+        'scope_ids': block.scope_ids,
+        'kind': kind,
+        'values': values,
+        'inherited': inherited,
+        'data_dir': getattr(block, 'data_dir', None),
+    }
+
+
+def code_versions():
+    """
+    Return the versions of the packages whose code loads courses from XML.
+    """
+    versions = []
+    for package in ('XModule', 'XBlock'):
+        try:
+            versions.append((package, pkg_resources.get_distribution(package).version))
+        except pkg_resources.DistributionNotFound:
+            versions.append((package, None))
+    return tuple(versions)
+
+
+def qualified_name(obj):
+    """
+    Return the dotted name of the class or function `obj`, which, unlike its
+    repr, is the same in every process.
+    """
+    if obj is None:
+        return None
+    try:
+        return u'{}.{}'.format(obj.__module__, obj.__name__)
+    except AttributeError:
+        return repr(obj)
+
+
+def snapshot_key(data_dir, course_dir, options):
+    """
+    Return the key of the snapshot of the course in `course_dir`, loaded by
+    a store with `options`: a hash of them, of the `code_versions` and of the
+    path, size and modification time of every file in the directory.
+    """
+    key = hashlib.sha1(repr((SNAPSHOT_VERSION, code_versions(), course_dir, options)))
+    root = os.path.join(data_dir, course_dir)
+    for dir_path, dir_names, file_names in os.walk(root):
+        # Walk in the same order every time
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                # e.g. a broken symlink, which loading the course ignores too
+                continue
+            key.update(repr((os.path.relpath(file_path, root), stat.st_size, stat.st_mtime)))
+    return key.hexdigest()
+
+
+def _snapshot_filename(course_dir, key):
+    """
+    Return the name of the file of the snapshot of `course_dir` with `key`.
+    """
+    return u'{}.{}.pickle'.format(course_dir, key)
+
+
+def read_snapshot(snapshot_dir, course_dir, key):
+    """
+    Return the CourseSnapshot of `course_dir` saved in `snapshot_dir` with
+    `key`, or None if there's none that can be used.
+    """
+    snapshot_path = os.path.join(snapshot_dir, _snapshot_filename(course_dir, key))
+    if not os.path.exists(snapshot_path):
+        return None
+
+    try:
+        with open(snapshot_path, 'rb') as snapshot_file:
+            return CourseSnapshot.loads(snapshot_file.read())
+    except Exception:  # pylint: disable=broad-except
+        log.warning('Ignoring unreadable course snapshot %s', snapshot_path, exc_info=True)
+        return None
+
+
+def write_snapshot(snapshot_dir, course_dir, key, data):
+    """
+    Save `data`, a pickled CourseSnapshot of `course_dir`, in `snapshot_dir`
+    with `key`, and remove the other snapshots of `course_dir`. Processes
+    reading it meanwhile either find the whole snapshot or none.
+    """
+    snapshot_filename = _snapshot_filename(course_dir, key)
+    try:
+        if not os.path.isdir(snapshot_dir):
+            os.makedirs(snapshot_dir)
+        temp_fd, temp_path = tempfile.mkstemp(dir=snapshot_dir, suffix='.tmp')
+        with os.fdopen(temp_fd, 'wb') as temp_file:
+            temp_file.write(data)
+        os.rename(temp_path, os.path.join(snapshot_dir, snapshot_filename))
+    except (IOError, OSError):
+        # Concurrent processes may be creating the directory as well; courses
+        # still load without a snapshot
+        log.warning('Unable to save course snapshot %s in %s', snapshot_filename, snapshot_dir, exc_info=True)
+        return
+
+    for filename in os.listdir(snapshot_dir):
+        if filename == snapshot_filename or not filename.endswith('.pickle'):
+            continue
+        if filename.rsplit('.', 2)[0] == course_dir:
+            try:
+                os.remove(os.path.join(snapshot_dir, filename))
+            except OSError:
+                # Another process may have removed it already
+                pass
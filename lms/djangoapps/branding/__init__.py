@@ -1,22 +1,22 @@
 from xmodule.modulestore.django import modulestore
-from xmodule.course_module import CourseDescriptor
 from django.conf import settings
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from microsite_configuration import microsite
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 
 def get_visible_courses():
     """
-    Return the set of CourseDescriptors that should be visible in this branded instance
+    Return the set of CourseOverviews of the courses that should be visible in this branded instance
     """
 
     filtered_by_org = microsite.get_value('course_org_filter')
 
-    _courses = modulestore().get_courses(org=filtered_by_org)
+    course_keys = modulestore().get_course_keys(org=filtered_by_org)
 
-    courses = [c for c in _courses
-               if isinstance(c, CourseDescriptor)]
+    # Courses that don't exist or fail to load have no overview
+    courses = CourseOverview.get_from_ids(course_keys).values()
     courses = sorted(courses, key=lambda course: course.number)
 
     subdomain = microsite.get_value('subdomain', 'default')
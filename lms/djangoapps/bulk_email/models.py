@@ -12,6 +12,9 @@ file and check it in at the same time as your model changes. To do that,
 
 """
 import logging
+import re
+from string import Formatter
+
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models, transaction
@@ -20,7 +23,9 @@ from openedx.core.lib.html_to_text import html_to_text
 from openedx.core.lib.mail_utils import wrap_message
 
 from xmodule_django.models import CourseKeyField
-from util.keyword_substitution import substitute_keywords_with_data
+from util.keyword_substitution import (
+    anonymous_id_from_user_id, substitute_keywords, substitute_keywords_with_data
+)
 
 log = logging.getLogger(__name__)
 
@@ -228,6 +233,139 @@ class CourseEmailTemplate(models.Model):
         """
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Prepare to create the plain text message for many recipients.
+
+        Returns a CompiledCourseEmailMessage which renders, for the context of
+        each recipient, the same message as render_plaintext.  `context` holds
+        the values that are the same for all recipients.
+        """
+        return CompiledCourseEmailMessage(self.plain_template, plaintext, context)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Prepare to create the HTML message for many recipients.
+
+        Returns a CompiledCourseEmailMessage which renders, for the context of
+        each recipient, the same message as render_htmltext.  `context` holds
+        the values that are the same for all recipients.
+        """
+        return CompiledCourseEmailMessage(self.html_template, htmltext, context)
+
+
+class CompiledCourseEmailMessage(object):
+    """
+    An email message template with its message body, formatted and wrapped
+    for all recipients at once.
+
+    Rendering a message for each recipient with CourseEmailTemplate formats
+    the whole template, substitutes keywords in the whole message body and
+    wraps every line of the result.  Only a few values differ between
+    recipients, though, so this does that once, with markers in place of
+    those values, and keeps the lines without markers as they are.  Each
+    recipient's message then only needs the values put into the few lines
+    that have markers, and those lines wrapped.
+
+    Templates which format the recipient's values in some other way than
+    inserting them as they are, for instance '{name:>20}', are rendered
+    as CourseEmailTemplate renders them.
+    """
+    # The context values that differ between recipients
+    RECIPIENT_KEYS = ('name', 'email', 'user_id')
+    # Marks where a recipient value is, in text that isn't expected to contain private use characters
+    MARKER_FORMAT = u'\ue000{}\ue000'
+    MARKER_PATTERN = re.compile(u'(\ue000[a-z_]+\ue000)')
+    # The recipient value of the %%USER_ID%% keyword, which is looked up
+    ANONYMOUS_USER_ID = 'anonymous_user_id'
+
+    def __init__(self, format_string, message_body, context):
+        self.format_string = format_string
+        self.message_body = message_body
+        self.lines = None
+        self.markers = {}
+
+        if not self._can_compile(format_string, message_body):
+            return
+
+        compile_context = dict(context)
+        for key in self.RECIPIENT_KEYS + (self.ANONYMOUS_USER_ID,):
+            self.markers[self.MARKER_FORMAT.format(key)] = key
+            compile_context[key] = self.MARKER_FORMAT.format(key)
+
+        # Substitute the %%-encoded keywords as CourseEmailTemplate._render
+        # does, leaving markers for the values looked up for each recipient
+        if 'course_id' in context and context.get('course_title') is not None:
+            message_body = message_body.replace('%%USER_ID%%', compile_context[self.ANONYMOUS_USER_ID])
+            message_body = substitute_keywords(message_body, None, compile_context)
+
+        result = format_string.format(**compile_context)
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        result = result.replace(message_body_tag, message_body, 1)
+
+        # Lines are wrapped independently of each other, so the lines
+        # without markers can be wrapped once for all recipients
+        self.lines = []
+        for line in result.split('\n'):
+            if self.MARKER_PATTERN.search(line):
+                self.lines.append(self.MARKER_PATTERN.split(line))
+            else:
+                self.lines.append(wrap_message(line))
+
+    def _can_compile(self, format_string, message_body):
+        """
+        Can `format_string` and `message_body` be compiled, rather than
+        rendered for each recipient?
+        """
+        if self.MARKER_PATTERN.search(format_string) or self.MARKER_PATTERN.search(message_body):
+            return False
+        try:
+            fields = list(Formatter().parse(format_string))
+        except ValueError:
+            # Rendering reports the malformed template
+            return False
+        for __, field_name, format_spec, conversion in fields:
+            if field_name is None:
+                continue
+            key = re.split(r'[.\[]', field_name, 1)[0]
+            if '{' in (format_spec or ''):
+                # The spec has nested fields, which could be anything
+                return False
+            if key in self.RECIPIENT_KEYS and (key != field_name or format_spec or conversion):
+                return False
+        return True
+
+    def render(self, context):
+        """
+        Create the message of the recipient whose values are in `context`,
+        which must also hold the values that are the same for all recipients.
+        """
+        if self.lines is None:
+            return CourseEmailTemplate._render(self.format_string, self.message_body, context)  # pylint: disable=protected-access
+
+        values = {}
+        for key in self.RECIPIENT_KEYS:
+            if key in context:
+                values[self.MARKER_FORMAT.format(key)] = u'{}'.format(context[key])
+        anonymous_id_marker = self.MARKER_FORMAT.format(self.ANONYMOUS_USER_ID)
+
+        lines = []
+        for line in self.lines:
+            if not isinstance(line, list):
+                lines.append(line)
+                continue
+            # The split line alternates between text and markers
+            parts = []
+            for index, part in enumerate(line):
+                if index % 2 == 0:
+                    parts.append(part)
+                    continue
+                if part == anonymous_id_marker and part not in values:
+                    values[part] = anonymous_id_from_user_id(context['user_id'])
+                parts.append(values[part])
+            lines.append(wrap_message(u''.join(parts)))
+        return u'\n'.join(lines)
+
 
 class CourseAuthorization(models.Model):
     """
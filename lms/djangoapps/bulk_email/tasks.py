@@ -6,7 +6,8 @@ to a course.
 import re
 import random
 import json
-from time import sleep
+import threading
+from time import sleep, time
 from collections import Counter
 import logging
 
@@ -95,6 +96,104 @@ BULK_EMAIL_FAILURE_ERRORS = (
 )
 
 
+class _PooledConnection(object):
+    """
+    An open email connection, which can be kept open to be reused by later
+    subtasks, and which paces the messages sent over it.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time()
+        self.last_send = None
+
+    def send_messages(self, email_messages):
+        """
+        Send `email_messages`, waiting first if that is needed to keep to
+        BULK_EMAIL_CONNECTION_MAX_SEND_RATE.
+        """
+        max_send_rate = getattr(settings, 'BULK_EMAIL_CONNECTION_MAX_SEND_RATE', None)
+        if max_send_rate and self.last_send is not None:
+            delay = self.last_send + 1.0 / max_send_rate - time()
+            if delay > 0:
+                sleep(delay)
+        self.last_send = time()
+        return self.connection.send_messages(email_messages)
+
+    def is_usable(self):
+        """
+        Is the connection still open, as far as can be told without sending?
+        """
+        max_age = getattr(settings, 'BULK_EMAIL_CONNECTION_MAX_AGE', 0)
+        if time() - self.last_used > max_age:
+            return False
+        # The SMTP backend's connection can be checked, as the server may
+        # have closed it while it wasn't in use.
+        smtp_connection = getattr(self.connection, 'connection', None)
+        if smtp_connection is not None:
+            try:
+                return smtp_connection.noop()[0] == 250
+            except Exception:  # pylint: disable=broad-except
+                return False
+        return True
+
+
+class _EmailConnectionPool(object):
+    """
+    The email connections of this process that are open but not in use.
+
+    Opening a connection to the mail server can take as long as sending many
+    messages over it, so connections are kept open between subtasks for up
+    to BULK_EMAIL_CONNECTION_MAX_AGE seconds.  If that is 0, each subtask
+    opens its own connection and closes it when it is done.
+    """
+    def __init__(self):
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Return an open connection, reusing a pooled one if one is still usable.
+        """
+        while True:
+            with self._lock:
+                if not self._connections:
+                    break
+                pooled_connection = self._connections.pop()
+            if pooled_connection.is_usable():
+                dog_stats_api.increment('course_email.connection.reused')
+                return pooled_connection
+            self._close(pooled_connection)
+
+        connection = get_connection()
+        connection.open()
+        dog_stats_api.increment('course_email.connection.opened')
+        return _PooledConnection(connection)
+
+    def release(self, pooled_connection, reusable=True):
+        """
+        Return a connection that is no longer in use, to be pooled if it is
+        `reusable` and connections are reused, and closed otherwise.
+        """
+        if reusable and getattr(settings, 'BULK_EMAIL_CONNECTION_MAX_AGE', 0) > 0:
+            pooled_connection.last_used = time()
+            with self._lock:
+                self._connections.append(pooled_connection)
+        else:
+            self._close(pooled_connection)
+
+    def _close(self, pooled_connection):
+        """
+        Close a connection, which may already have been closed by the server.
+        """
+        try:
+            pooled_connection.connection.close()
+        except Exception:  # pylint: disable=broad-except
+            log.warning("Failed to close email connection", exc_info=True)
+
+
+_CONNECTION_POOL = _EmailConnectionPool()
+
+
 def _get_recipient_querysets(user_id, to_option, course_id):
     """
     Returns a list of query sets of email recipients corresponding to the
@@ -483,13 +582,19 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+    connection = None
+    connection_reusable = False
     try:
-        connection = get_connection()
-        connection.open()
+        connection = _CONNECTION_POOL.acquire()
 
         # Define context values to use in all course emails:
         email_context = {'name': '', 'email': ''}
         email_context.update(global_email_context)
+        email_context['course_id'] = course_email.course_id
+
+        # Prepare the messages once, for all the recipients of this subtask:
+        plaintext_template = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_template = course_email_template.compile_htmltext(course_email.html_message, email_context)
 
         while to_list:
             # Update context with user-specific values from the user at the end of the list.
@@ -503,11 +608,10 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             email_context['email'] = email
             email_context['name'] = current_recipient['profile__name']
             email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
 
             # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
+            plaintext_msg = plaintext_template.render(email_context)
+            html_msg = html_template.render(email_context)
 
             # Create email:
             email_msg = EmailMultiAlternatives(
@@ -515,7 +619,7 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                 plaintext_msg,
                 from_addr,
                 [email],
-                connection=connection
+                connection=connection.connection
             )
             email_msg.attach_alternative(html_msg, 'text/html')
 
@@ -689,11 +793,14 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         # All went well.  Update counters with progress to date,
         # and set the state to SUCCESS:
         subtask_status.increment(state=SUCCESS)
+        connection_reusable = True
         # Successful completion is marked by an exception value of None.
         return subtask_status, None
     finally:
-        # Clean up at the end.
-        connection.close()
+        # Clean up at the end, keeping the connection open for reuse only
+        # if nothing went wrong with it.
+        if connection is not None:
+            _CONNECTION_POOL.release(connection, reusable=connection_reusable)
 
 
 def _get_current_task():
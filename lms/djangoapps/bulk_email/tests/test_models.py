@@ -137,6 +137,28 @@ class CourseEmailTemplateTest(TestCase):
         context = self._get_sample_plain_context()
         template.render_plaintext("My new plain text.", context)
 
+    def test_compiled_matches_rendered(self):
+        user = UserFactory.create(first_name="Robot", last_name="Test")
+        body = u"Dear %%USER_FULLNAME%%, your id is %%USER_ID%%.\n" + u"A long line of text. " * 20
+        for template_name in (None, "branded.template"):
+            template = CourseEmailTemplate.get_template(name=template_name)
+            base_context = self._get_sample_html_context()
+            base_context['course_id'] = SlashSeparatedCourseKey("edx", "testcourse", "test_course")
+            plaintext = template.compile_plaintext(body, base_context)
+            htmltext = template.compile_htmltext(body, base_context)
+            for email, name in (('robot@example.com', u"Robot Test"), ('other@example.com', u"\u00e9 " * 40)):
+                context = dict(base_context, email=email, name=name, user_id=user.id)
+                self.assertEqual(plaintext.render(context), template.render_plaintext(body, context))
+                self.assertEqual(htmltext.render(context), template.render_htmltext(body, context))
+
+    def test_compiled_with_formatted_recipient_value(self):
+        # Recipient values which aren't inserted as they are can't be compiled
+        template = CourseEmailTemplate(plain_template=u"{email:>30} {{message_body}}")
+        context = self._get_sample_plain_context()
+        compiled = template.compile_plaintext(u"Hello", context)
+        self.assertIsNone(compiled.lines)
+        self.assertEqual(compiled.render(context), template.render_plaintext(u"Hello", context))
+
 
 @attr('shard_1')
 class CourseAuthorizationTest(TestCase):
@@ -6,7 +6,11 @@ Runs tasks on answers to course problems to validate that code
 paths actually work.
 
 """
+import asyncore
 import json
+import smtpd
+import threading
+import time
 from uuid import uuid4
 from itertools import cycle, chain, repeat
 from mock import patch, Mock
@@ -29,14 +33,16 @@ from celery.states import SUCCESS, FAILURE
 
 from django.conf import settings
 from django.core.management import call_command
+from django.test.utils import override_settings
 
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from bulk_email.models import CourseEmail, Optout, SEND_TO_ALL
+from bulk_email.tasks import _EmailConnectionPool
 
 from instructor_task.tasks import send_bulk_course_email
 from instructor_task.subtasks import update_subtask_status, SubtaskStatus
-from instructor_task.models import InstructorTask
+from instructor_task.models import InstructorTask, InstructorSubtask
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase
 from instructor_task.tests.factories import InstructorTaskFactory
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
@@ -47,6 +53,25 @@ class TestTaskFailure(Exception):
     pass
 
 
+class RecordingSMTPServer(smtpd.SMTPServer):
+    """
+    An SMTP server on a free local port, which counts the connections made to
+    it and records when it receives each message.
+    """
+    def __init__(self):
+        smtpd.SMTPServer.__init__(self, ('localhost', 0), None)
+        self.port = self.socket.getsockname()[1]
+        self.connection_count = 0
+        self.receive_times = []
+
+    def handle_accept(self):
+        self.connection_count += 1
+        smtpd.SMTPServer.handle_accept(self)
+
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        self.receive_times.append(time.time())
+
+
 def my_update_subtask_status(entry_id, current_task_id, new_subtask_status):
     """
     Check whether a subtask has been updated before really updating.
@@ -65,10 +90,8 @@ def my_update_subtask_status(entry_id, current_task_id, new_subtask_status):
     This should not be an issue in production, where status is updated before
     a task is retried, and is then updated afterwards if the retry fails.
     """
-    entry = InstructorTask.objects.get(pk=entry_id)
-    subtask_dict = json.loads(entry.subtasks)
-    subtask_status_info = subtask_dict['status']
-    current_subtask_status = SubtaskStatus.from_dict(subtask_status_info[current_task_id])
+    subtask = InstructorSubtask.objects.get(instructor_task_id=entry_id, subtask_id=current_task_id)
+    current_subtask_status = SubtaskStatus.from_model(subtask)
     current_retry_count = current_subtask_status.get_retry_count()
     new_retry_count = new_subtask_status.get_retry_count()
     if current_retry_count <= new_retry_count:
@@ -148,11 +171,10 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         self.assertEquals(subtask_info.get('succeeded'), 1 if succeeded > 0 else 0)
         self.assertEquals(subtask_info.get('failed'), 0 if succeeded > 0 else 1)
         # verify individual subtask status:
-        subtask_status_info = subtask_info.get('status')
-        task_id_list = subtask_status_info.keys()
-        self.assertEquals(len(task_id_list), 1)
-        task_id = task_id_list[0]
-        subtask_status = subtask_status_info.get(task_id)
+        subtasks = InstructorSubtask.objects.filter(instructor_task=entry)
+        self.assertEquals(len(subtasks), 1)
+        task_id = subtasks[0].subtask_id
+        subtask_status = SubtaskStatus.from_model(subtasks[0]).to_dict()
         print("Testing subtask status: {}".format(subtask_status))
         self.assertEquals(subtask_status.get('task_id'), task_id)
         self.assertEquals(subtask_status.get('attempted'), succeeded + failed)
@@ -212,6 +234,67 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         self.assertEquals(parent_status.get('succeeded'), num_emails)
         self.assertEquals(parent_status.get('failed'), 0)
 
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_AGE=60)
+    def test_connection_reused_by_later_task(self):
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks._CONNECTION_POOL', _EmailConnectionPool()):
+            with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+                get_conn.return_value.send_messages.side_effect = cycle([None])
+                # The mock isn't an SMTP backend, whose server would be checked
+                get_conn.return_value.connection = None
+                self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+                self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEquals(get_conn.call_count, 1)
+        self.assertEquals(get_conn.return_value.send_messages.call_count, 2 * num_emails)
+
+    def _start_smtp_server(self):
+        """
+        Serve a RecordingSMTPServer on a thread until the end of the test.
+        """
+        server = RecordingSMTPServer()
+        stopped = threading.Event()
+
+        def serve():  # pylint: disable=missing-docstring
+            while not stopped.is_set():
+                asyncore.loop(timeout=0.01, count=1)
+
+        def stop():  # pylint: disable=missing-docstring
+            stopped.set()
+            thread.join()
+            asyncore.close_all()
+
+        thread = threading.Thread(target=serve)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(stop)
+        return server
+
+    def test_smtp_connection_reused_and_paced(self):
+        num_emails = 10
+        max_send_rate = 50
+        self._create_students(num_emails - 1)
+        server = self._start_smtp_server()
+        pool = _EmailConnectionPool()
+        with self.settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='localhost',
+            EMAIL_PORT=server.port,
+            BULK_EMAIL_CONNECTION_MAX_AGE=60,
+            BULK_EMAIL_CONNECTION_MAX_SEND_RATE=max_send_rate,
+        ):
+            with patch('bulk_email.tasks._CONNECTION_POOL', pool):
+                self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+                self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+            # Close the pooled connection while the server is still running
+            pool.release(pool.acquire(), reusable=False)
+
+        self.assertEquals(server.connection_count, 1)
+        self.assertEquals(len(server.receive_times), 2 * num_emails)
+        # Allow for the server receiving the first message a little late
+        elapsed = server.receive_times[-1] - server.receive_times[0]
+        self.assertGreaterEqual(elapsed, 0.9 * (2 * num_emails - 1) / max_send_rate)
+
     def test_unactivated_user(self):
         # Select number of emails to fit into a single subtask.
         num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
@@ -5,10 +5,12 @@ by the individual custom courses feature.
 import json
 import threading
 
+from collections import defaultdict
 from contextlib import contextmanager
 
 from django.db import transaction, IntegrityError
 
+from request_cache.middleware import RequestCache  # pylint: disable=import-error
 from courseware.field_overrides import FieldOverrideProvider  # pylint: disable=import-error
 from ccx import ACTIVE_CCX_KEY  # pylint: disable=import-error
 
@@ -30,6 +32,15 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
             return get_override_for_ccx(ccx, block, name, default)
         return default
 
+    def prefetch(self, course_key):
+        """
+        Load the overrides of the current ccx, if there is one, which are all
+        for its course.
+        """
+        ccx = get_current_ccx()
+        if ccx:
+            prefetch_overrides_for_ccx(ccx)
+
 
 class _CcxContext(threading.local):
     """
@@ -94,17 +105,35 @@ def _get_overrides_for_ccx(ccx, block):
     overrides set on this block for this CCX.
     """
     overrides = {}
-    query = CcxFieldOverride.objects.filter(
-        ccx=ccx,
-        location=block.location
-    )
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    for field_name, value in prefetch_overrides_for_ccx(ccx).get(unicode(block.location), {}).iteritems():
+        field = block.fields[field_name]
+        overrides[field_name] = field.from_json(json.loads(value))
     return overrides
 
 
+def _overrides_cache_key(ccx):
+    """
+    Request cache key of the overrides of the `ccx`.
+    """
+    return u"ccx.overrides.{}".format(ccx.id)
+
+
+def prefetch_overrides_for_ccx(ccx):
+    """
+    Gets all of the overrides set for the `ccx` in one query, and keeps them
+    for the rest of the request.  Returns a dictionary of JSON encoded field
+    override values keyed by serialized block location, then by field name.
+    """
+    request_cache = RequestCache.get_request_cache()
+    cache_key = _overrides_cache_key(ccx)
+    if cache_key not in request_cache.data:
+        overrides = defaultdict(dict)
+        for override in CcxFieldOverride.objects.filter(ccx=ccx):
+            overrides[unicode(override.location)][override.field] = override.value
+        request_cache.data[cache_key] = dict(overrides)
+    return request_cache.data[cache_key]
+
+
 @transaction.commit_on_success
 def override_field_for_ccx(ccx, block, name, value):
     """
@@ -128,6 +157,7 @@ def override_field_for_ccx(ccx, block, name, value):
             field=name)
         override.value = value
     override.save()
+    RequestCache.get_request_cache().data.pop(_overrides_cache_key(ccx), None)
     if hasattr(block, '_ccx_overrides'):
         del block._ccx_overrides[ccx.id]  # pylint: disable=protected-access
 
@@ -145,6 +175,7 @@ def clear_override_for_ccx(ccx, block, name):
             location=block.location,
             field=name).delete()
 
+        RequestCache.get_request_cache().data.pop(_overrides_cache_key(ccx), None)
         if hasattr(block, '_ccx_overrides'):
             del block._ccx_overrides[ccx.id]  # pylint: disable=protected-access
 
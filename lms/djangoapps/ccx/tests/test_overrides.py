@@ -107,6 +107,19 @@ class TestFieldOverrides(ModuleStoreTestCase):
             dummy2 = chapter.start
             dummy3 = chapter.start
 
+    def test_overrides_of_all_blocks_read_in_one_query(self):
+        """
+        Test that reading the overrides of every block in the course only
+        queries the overrides of the ccx once.
+        """
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        for chapter in self.course.get_children():
+            override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        blocks = list(iter_blocks(self.course))[1:]
+        with self.assertNumQueries(1):
+            for block in blocks:
+                self.assertEquals(block.start, ccx_start)
+
     def test_override_is_inherited(self):
         """
         Test that sequentials inherit overridden start date from chapter.
@@ -36,6 +36,7 @@ from util.milestones_helpers import (
     get_pre_requisite_courses_not_completed,
     any_unfulfilled_milestones,
 )
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 import dogstats_wrapper as dog_stats_api
 
@@ -86,7 +87,7 @@ def has_access(user, action, obj, course_key=None):
 
     # delegate the work to type-specific functions.
     # (start with more specific types, then get more general)
-    if isinstance(obj, CourseDescriptor):
+    if isinstance(obj, (CourseDescriptor, CourseOverview)):
         return _has_access_course_desc(user, action, obj)
 
     if isinstance(obj, ErrorDescriptor):
@@ -117,7 +118,8 @@ def has_access(user, action, obj, course_key=None):
 # ================ Implementation helpers ================================
 def _has_access_course_desc(user, action, course):
     """
-    Check if user has access to a course descriptor.
+    Check if user has access to a course descriptor, or to the course of a
+    CourseOverview.
 
     Valid actions:
 
@@ -138,6 +140,8 @@ def _has_access_course_desc(user, action, course):
 
         NOTE: this is not checking whether user is actually enrolled in the course.
         """
+        if isinstance(course, CourseOverview):
+            return _can_load_course_overview(user, course)
         # delegate to generic descriptor check to check start dates
         return _has_access_descriptor(user, 'load', course, course.id)
 
@@ -339,10 +343,13 @@ def _has_access_error_desc(user, action, descriptor, course_key):
     return _dispatch(checkers, action, user, descriptor)
 
 
-def _has_group_access(descriptor, user, course_key):
+def _has_group_access(descriptor, user, course_key, user_groups=None):
     """
     This function returns a boolean indicating whether or not `user` has
     sufficient group memberships to "load" a block (the `descriptor`)
+
+    `user_groups`, if given, is a dict of the user's groups by partition id
+    which is both read and filled in, to share the lookups between calls.
     """
     if len(descriptor.user_partitions) == len(get_split_user_partitions(descriptor.user_partitions)):
         # Short-circuit the process, since there are no defined user partitions that are not
@@ -387,13 +394,15 @@ def _has_group_access(descriptor, user, course_key):
         return False
 
     # look up the user's group for each partition
-    user_groups = {}
+    if user_groups is None:
+        user_groups = {}
     for partition, groups in partition_groups:
-        user_groups[partition.id] = partition.scheme.get_group_for_user(
-            course_key,
-            user,
-            partition,
-        )
+        if partition.id not in user_groups:
+            user_groups[partition.id] = partition.scheme.get_group_for_user(
+                course_key,
+                user,
+                partition,
+            )
 
     # finally: check that the user has a satisfactory group assignment
     # for each partition.
@@ -404,6 +413,33 @@ def _has_group_access(descriptor, user, course_key):
     return True
 
 
+def _can_load_course_overview(user, course_overview):
+    """
+    Can this user load the course of `course_overview`? This makes the checks
+    of _has_access_descriptor's 'load' action that apply to a course root:
+    group access is never set on one, so it is not checked.
+    """
+    course_key = course_overview.id
+    if course_overview.visible_to_staff_only and not _has_staff_access_to_descriptor(user, course_overview, course_key):
+        return False
+
+    # If start dates are off, can always load
+    if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
+        debug("Allow: DISABLE_START_DATES")
+        return True
+
+    if course_overview.start is not None:
+        effective_start = _adjust_start_date_for_beta_testers(user, course_overview, course_key=course_key)
+        if in_preview_mode() or datetime.now(UTC()) > effective_start:
+            debug("Allow: now > effective start date")
+            return True
+        return _has_staff_access_to_descriptor(user, course_overview, course_key)
+
+    # No start date, so can always load.
+    debug("Allow: no start date")
+    return True
+
+
 def _has_access_descriptor(user, action, descriptor, course_key=None):
     """
     Check if user has access to this descriptor.
@@ -423,38 +459,7 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
         students to see modules.  If not, views should check the course, so we
         don't have to hit the enrollments table on every module load.
         """
-        if descriptor.visible_to_staff_only and not _has_staff_access_to_descriptor(user, descriptor, course_key):
-            return False
-
-        # enforce group access
-        if not _has_group_access(descriptor, user, course_key):
-            # if group_access check failed, deny access unless the requestor is staff,
-            # in which case immediately grant access.
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # If start dates are off, can always load
-        if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
-            debug("Allow: DISABLE_START_DATES")
-            return True
-
-        # Check start date
-        if 'detached' not in descriptor._class_tags and descriptor.start is not None:
-            now = datetime.now(UTC())
-            effective_start = _adjust_start_date_for_beta_testers(
-                user,
-                descriptor,
-                course_key=course_key
-            )
-            if in_preview_mode() or now > effective_start:
-                # after start date, everyone can see it
-                debug("Allow: now > effective start date")
-                return True
-            # otherwise, need staff access
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # No start date, so can always load.
-        debug("Allow: no start date")
-        return True
+        return _can_load_descriptor(descriptor, _DescriptorAccessContext(user, course_key))
 
     checkers = {
         'load': can_load,
@@ -465,6 +470,142 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
     return _dispatch(checkers, action, user, descriptor)
 
 
+def _can_load_descriptor(descriptor, context):
+    """
+    Can the user of `context`, a _DescriptorAccessContext, load `descriptor`?
+    """
+    if descriptor.visible_to_staff_only and not context.has_staff_access(descriptor):
+        return False
+
+    # enforce group access
+    if not _has_group_access(descriptor, context.user, context.course_key, context.user_groups):
+        # if group_access check failed, deny access unless the requestor is staff,
+        # in which case immediately grant access.
+        return context.has_staff_access(descriptor)
+
+    # If start dates are off, can always load
+    if context.start_dates_disabled:
+        debug("Allow: DISABLE_START_DATES")
+        return True
+
+    # Check start date
+    if 'detached' not in descriptor._class_tags and descriptor.start is not None:  # pylint: disable=protected-access
+        effective_start = descriptor.start
+        if descriptor.days_early_for_beta is not None and context.is_beta_tester:
+            debug("Adjust start time: user in beta role for %s", descriptor)
+            effective_start = descriptor.start - timedelta(descriptor.days_early_for_beta)
+        if context.in_preview_mode or context.now > effective_start:
+            # after start date, everyone can see it
+            debug("Allow: now > effective start date")
+            return True
+        # otherwise, need staff access
+        return context.has_staff_access(descriptor)
+
+    # No start date, so can always load.
+    debug("Allow: no start date")
+    return True
+
+
+class _DescriptorAccessContext(object):
+    """
+    The facts about a user and a course run that loading the course's
+    descriptors depends on. Each is looked up the first time it is needed
+    and then reused, so checking many descriptors with one context looks
+    up each fact once rather than once per descriptor.
+    """
+    def __init__(self, user, course_key):
+        self.user = user
+        self.course_key = course_key
+        # The user's group in each user partition, by partition id
+        self.user_groups = {}
+        self._staff_access = None
+        self._is_beta_tester = None
+        self._start_dates_disabled = None
+        self._in_preview_mode = None
+        self._now = None
+
+    def has_staff_access(self, descriptor):
+        """
+        Does the user have staff access to `descriptor`? All the descriptors
+        checked with one context must be in the same course run.
+        """
+        if self._staff_access is None:
+            self._staff_access = _has_staff_access_to_descriptor(self.user, descriptor, self.course_key)
+        return self._staff_access
+
+    @property
+    def is_beta_tester(self):
+        """
+        Is the user a beta tester of the course run?
+        """
+        if self._is_beta_tester is None:
+            self._is_beta_tester = CourseBetaTesterRole(self.course_key).has_user(self.user)
+        return self._is_beta_tester
+
+    @property
+    def start_dates_disabled(self):
+        """
+        Are start dates ignored for the user?
+        """
+        if self._start_dates_disabled is None:
+            self._start_dates_disabled = (
+                settings.FEATURES['DISABLE_START_DATES'] and
+                not is_masquerading_as_student(self.user, self.course_key)
+            )
+        return self._start_dates_disabled
+
+    @property
+    def in_preview_mode(self):
+        """
+        Is the request being served in preview mode?
+        """
+        if self._in_preview_mode is None:
+            self._in_preview_mode = bool(in_preview_mode())
+        return self._in_preview_mode
+
+    @property
+    def now(self):
+        """
+        The time start dates are compared to.
+        """
+        if self._now is None:
+            self._now = datetime.now(UTC())
+        return self._now
+
+
+def has_access_to_descriptors(user, action, descriptors, course_key):
+    """
+    Check whether `user` has the access to do `action` on each of
+    `descriptors`, all of which are in the course run with `course_key`.
+
+    This gives the same answers as calling has_access on each descriptor,
+    but looks up the user's roles, beta tester status and group in each user
+    partition only once for all of them, rather than once per descriptor.
+
+    Returns a dict mapping the location of each descriptor to a bool.
+    """
+    if not user:
+        user = AnonymousUser()
+
+    context = _DescriptorAccessContext(user, course_key)
+    access = {}
+    for descriptor in descriptors:
+        is_plain_descriptor = (
+            isinstance(descriptor, XBlock) and
+            not isinstance(descriptor, (CourseDescriptor, ErrorDescriptor, XModule))
+        )
+        if action == 'load' and is_plain_descriptor:
+            result = _can_load_descriptor(descriptor, context)
+            debug("%s user %s, object %s, action %s",
+                  'ALLOWED' if result else 'DENIED', user, descriptor.location.to_deprecated_string(), action)
+        else:
+            # Other actions and objects don't depend on enough per-user
+            # lookups to be worth special handling
+            result = has_access(user, action, descriptor, course_key)
+        access[descriptor.location] = result
+    return access
+
+
 def _has_access_xmodule(user, action, xmodule, course_key):
     """
     Check if user has access to this xmodule.
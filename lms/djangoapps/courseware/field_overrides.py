@@ -61,7 +61,7 @@ class OverrideFieldData(FieldData):
     provider_classes = None
 
     @classmethod
-    def wrap(cls, user, wrapped):
+    def wrap(cls, user, wrapped, course_key=None):
         """
         Will return a :class:`OverrideFieldData` which wraps the field data
         given in `wrapped` for the given `user`, if override providers are
@@ -69,6 +69,10 @@ class OverrideFieldData(FieldData):
         setting, `FIELD_OVERRIDE_PROVIDERS`, returns `wrapped`, eliminating
         any performance impact of this feature if no override providers are
         configured.
+
+        If `course_key` is given, the overrides of the user in that course are
+        prefetched, so that reading the fields of its blocks doesn't query
+        the database once per block.
         """
         if cls.provider_classes is None:
             cls.provider_classes = tuple(
@@ -76,7 +80,10 @@ class OverrideFieldData(FieldData):
                  settings.FIELD_OVERRIDE_PROVIDERS))
 
         if cls.provider_classes:
-            return cls(user, wrapped)
+            field_data = cls(user, wrapped)
+            if course_key is not None:
+                field_data.prefetch(course_key)
+            return field_data
 
         return wrapped
 
@@ -84,6 +91,15 @@ class OverrideFieldData(FieldData):
         self.fallback = fallback
         self.providers = tuple((cls(user) for cls in self.provider_classes))
 
+    def prefetch(self, course_key):
+        """
+        Asks each of the providers to load all of its overrides for the
+        course identified by `course_key` at once, rather than one block at a
+        time as fields are read.
+        """
+        for provider in self.providers:
+            provider.prefetch(course_key)
+
     def get_override(self, block, name):
         """
         Checks for an override for the field identified by `name` in `block`.
@@ -192,6 +208,15 @@ class FieldOverrideProvider(object):
         """
         raise NotImplementedError
 
+    def prefetch(self, course_key):  # pylint: disable=unused-argument
+        """
+        Load all of the overrides this provider has for the course identified
+        by `course_key`, so that looking up the overrides of each of its blocks
+        afterwards doesn't query the database.  Providers which don't store
+        overrides per block needn't implement this.
+        """
+        pass
+
 
 def _lineage(block):
     """
@@ -12,8 +12,8 @@ from django.test.client import RequestFactory
 
 import dogstats_wrapper as dog_stats_api
 
-from courseware import courses
-from courseware.model_data import FieldDataCache
+from courseware import courses, persistent_grades
+from courseware.model_data import FieldDataCache, ScoresClient
 from student.models import anonymous_id_for_user
 from util.module_utils import yield_dynamic_descriptor_descendents
 from xmodule import graders
@@ -29,6 +29,9 @@ from opaque_keys.edx.keys import CourseKey
 
 log = logging.getLogger("edx.courseware")
 
+# Number of students whose scores are prefetched together by iterate_grades_for
+GRADE_PREFETCH_CHUNK_SIZE = 100
+
 
 def answer_distributions(course_key):
     """
@@ -121,17 +124,40 @@ def answer_distributions(course_key):
     return answer_counts
 
 
+def scorable_locations(course):
+    """
+    Return the locations of every block in `course` that can affect grading,
+    i.e. the set of StudentModule rows that grading a student may need.
+    """
+    return [descriptor.location for descriptor in course.grading_context['all_descriptors']]
+
+
+def _all_scorable_locations(course):
+    """
+    Return the locations of every block in `course` that has a score, in
+    graded and ungraded sections alike, as the progress page shows both.
+    """
+    locations = []
+    descriptors = [course]
+    while descriptors:
+        for child in descriptors.pop().get_children():
+            if child.has_score:
+                locations.append(child.location)
+            descriptors.append(child)
+    return locations
+
+
 @transaction.commit_manually
-def grade(student, request, course, keep_raw_scores=False):
+def grade(student, request, course, keep_raw_scores=False, scores_client=None):
     """
     Wraps "_grade" with the manual_transaction context manager just in case
     there are unanticipated errors.
     """
     with manual_transaction():
-        return _grade(student, request, course, keep_raw_scores)
+        return _grade(student, request, course, keep_raw_scores, scores_client)
 
 
-def _grade(student, request, course, keep_raw_scores):
+def _grade(student, request, course, keep_raw_scores, scores_client=None):
     """
     Unwrapped version of "grade"
 
@@ -149,12 +175,42 @@ def _grade(student, request, course, keep_raw_scores):
       make up the final grade. (For display)
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
+    - scores_client : an optional ScoresClient with this student's scores
+      already fetched. If omitted, one is created with a single query.
 
     More information on the format is in the docstring for CourseGrader.
     """
     grading_context = course.grading_context
     raw_scores = []
 
+    # When persistent grades are enabled, reuse any subsection (or whole
+    # course) grades that were saved for the current grading version of the
+    # course, and save whatever had to be recomputed.
+    use_persistent_grades = (
+        persistent_grades.persistent_grades_enabled() and
+        not keep_raw_scores and
+        not settings.GENERATE_PROFILE_SCORES and
+        student.is_authenticated()
+    )
+    persisted_sections = {}
+    computed_sections = {}
+    if use_persistent_grades:
+        # The course grade can't be reused if any of its sections has blocks
+        # that always need to be scored again; the other sections still can.
+        use_persistent_course_grade = not any(
+            descriptor.always_recalculate_grades
+            for sections in grading_context['graded_sections'].itervalues()
+            for section in sections
+            for descriptor in section['xmoduledescriptors']
+        )
+        version = persistent_grades.grading_version(course)
+        with manual_transaction():
+            if use_persistent_course_grade:
+                grade_summary = persistent_grades.get_course_grade(student, course.id, version)
+                if grade_summary is not None:
+                    return grade_summary
+            persisted_sections = persistent_grades.get_subsection_grades(student, course.id, version)
+
     # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
     # scores that were registered with the submissions API, which for the moment
     # means only openassessment (edx-ora2)
@@ -162,6 +218,12 @@ def _grade(student, request, course, keep_raw_scores):
         course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
     )
 
+    if scores_client is None:
+        with manual_transaction():
+            scores_client = ScoresClient.create_for_locations(
+                course.id, student.id, scorable_locations(course)
+            )
+
     totaled_scores = {}
     # This next complicated loop is just to collect the totaled_scores, which is
     # passed to the grader
@@ -170,79 +232,26 @@ def _grade(student, request, course, keep_raw_scores):
         for section in sections:
             section_descriptor = section['section_descriptor']
             section_name = section_descriptor.display_name_with_default
+            section_key = persistent_grades.normalize_location(section_descriptor.location)
 
             # some problems have state that is updated independently of interaction
             # with the LMS, so they need to always be scored. (E.g. foldit.,
             # combinedopenended)
-            should_grade_section = any(
+            always_recalculate = any(
                 descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
             )
 
-            # If there are no problems that always have to be regraded, check to
-            # see if any of our locations are in the scores from the submissions
-            # API. If scores exist, we have to calculate grades for this section.
-            if not should_grade_section:
-                should_grade_section = any(
-                    descriptor.location.to_deprecated_string() in submissions_scores
-                    for descriptor in section['xmoduledescriptors']
+            if section_key in persisted_sections and not always_recalculate:
+                earned, possible = persisted_sections[section_key]
+                graded_total = Score(earned, possible, True, section_name, None)
+            else:
+                graded_total, scores = _grade_section(
+                    student, request, course, section, always_recalculate, submissions_scores, scores_client
                 )
-
-            if not should_grade_section:
-                with manual_transaction():
-                    should_grade_section = StudentModule.objects.filter(
-                        student=student,
-                        module_state_key__in=[
-                            descriptor.location for descriptor in section['xmoduledescriptors']
-                        ]
-                    ).exists()
-
-            # If we haven't seen a single problem in the section, we don't have
-            # to grade it at all! We can assume 0%
-            if should_grade_section:
-                scores = []
-
-                def create_module(descriptor):
-                    '''creates an XModule instance given a descriptor'''
-                    # TODO: We need the request to pass into here. If we could forego that, our arguments
-                    # would be simpler
-                    with manual_transaction():
-                        field_data_cache = FieldDataCache([descriptor], course.id, student)
-                    return get_module_for_descriptor(student, request, descriptor, field_data_cache, course.id)
-
-                for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, create_module):
-
-                    (correct, total) = get_score(
-                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores
-                    )
-                    if correct is None and total is None:
-                        continue
-
-                    if settings.GENERATE_PROFILE_SCORES:  	# for debugging!
-                        if total > 1:
-                            correct = random.randrange(max(total - 2, 1), total + 1)
-                        else:
-                            correct = total
-
-                    graded = module_descriptor.graded
-                    if not total > 0:
-                        # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
-                        graded = False
-
-                    scores.append(
-                        Score(
-                            correct,
-                            total,
-                            graded,
-                            module_descriptor.display_name_with_default,
-                            module_descriptor.location
-                        )
-                    )
-
-                _, graded_total = graders.aggregate_scores(scores, section_name)
                 if keep_raw_scores:
                     raw_scores += scores
-            else:
-                graded_total = Score(0.0, 1.0, True, section_name, None)
+                if use_persistent_grades and not always_recalculate:
+                    computed_sections[section_key] = (graded_total.earned, graded_total.possible)
 
             #Add the graded total to totaled_scores
             if graded_total.possible > 0:
@@ -270,9 +279,96 @@ def _grade(student, request, course, keep_raw_scores):
         # way to get all RAW scores out to instructor
         # so grader can be double-checked
         grade_summary['raw_scores'] = raw_scores
+    if use_persistent_grades:
+        with manual_transaction():
+            persistent_grades.save_subsection_grades(student, course.id, version, computed_sections)
+            if use_persistent_course_grade:
+                persistent_grades.save_course_grade(student, course.id, version, grade_summary)
     return grade_summary
 
 
+def _grade_section(student, request, course, section, should_grade_section, submissions_scores, scores_client):
+    """
+    Grade a single graded section from the course's grading context, returning
+    a tuple of (graded_total, scores) where graded_total is the aggregate Score
+    for the section and scores is the list of Scores for its problems.
+
+    should_grade_section is True if the section must be graded even if the
+    student has no state for any of its problems.
+    """
+    section_descriptor = section['section_descriptor']
+    section_name = section_descriptor.display_name_with_default
+    scores = []
+
+    # If there are no problems that always have to be regraded, check to
+    # see if any of our locations are in the scores from the submissions
+    # API. If scores exist, we have to calculate grades for this section.
+    if not should_grade_section:
+        should_grade_section = any(
+            descriptor.location.to_deprecated_string() in submissions_scores
+            for descriptor in section['xmoduledescriptors']
+        )
+
+    # Otherwise, only grade the section if the student has state for
+    # any of its problems.
+    if not should_grade_section:
+        should_grade_section = any(
+            descriptor.location in scores_client
+            for descriptor in section['xmoduledescriptors']
+        )
+
+    # If we haven't seen a single problem in the section, we don't have
+    # to grade it at all! We can assume 0%
+    if should_grade_section:
+        def create_module(descriptor):
+            '''creates an XModule instance given a descriptor'''
+            # TODO: We need the request to pass into here. If we could forego that, our arguments
+            # would be simpler
+            with manual_transaction():
+                field_data_cache = FieldDataCache([descriptor], course.id, student)
+            return get_module_for_descriptor(student, request, descriptor, field_data_cache, course.id)
+
+        for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, create_module):
+
+            (correct, total) = get_score(
+                course.id,
+                student,
+                module_descriptor,
+                create_module,
+                scores_cache=submissions_scores,
+                scores_client=scores_client,
+            )
+            if correct is None and total is None:
+                continue
+
+            if settings.GENERATE_PROFILE_SCORES:  	# for debugging!
+                if total > 1:
+                    correct = random.randrange(max(total - 2, 1), total + 1)
+                else:
+                    correct = total
+
+            graded = module_descriptor.graded
+            if not total > 0:
+                # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
+                graded = False
+
+            scores.append(
+                Score(
+                    correct,
+                    total,
+                    graded,
+                    module_descriptor.display_name_with_default,
+                    module_descriptor.location
+                )
+            )
+
+        _, graded_total = graders.aggregate_scores(scores, section_name)
+    else:
+        graded_total = Score(0.0, 1.0, True, section_name, None)
+
+    return graded_total, scores
+
+
 def grade_for_percentage(grade_cutoffs, percentage):
     """
     Returns a letter grade as defined in grading_policy (e.g. 'A' 'B' 'C' for 6.002x) or None.
@@ -343,6 +439,8 @@ def _progress_summary(student, request, course):
         course_module = getattr(course_module, '_x_module', course_module)
 
     submissions_scores = sub_api.get_scores(course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id))
+    with manual_transaction():
+        scores_client = ScoresClient.create_for_locations(course.id, student.id, _all_scorable_locations(course))
 
     chapters = []
     # Don't include chapters that aren't displayable (e.g. due to error)
@@ -367,7 +465,12 @@ def _progress_summary(student, request, course):
                 for module_descriptor in yield_dynamic_descriptor_descendents(section_module, module_creator):
                     course_id = course.id
                     (correct, total) = get_score(
-                        course_id, student, module_descriptor, module_creator, scores_cache=submissions_scores
+                        course_id,
+                        student,
+                        module_descriptor,
+                        module_creator,
+                        scores_cache=submissions_scores,
+                        scores_client=scores_client,
                     )
                     if correct is None and total is None:
                         continue
@@ -407,7 +510,7 @@ def _progress_summary(student, request, course):
     return chapters
 
 
-def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None):
+def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None, scores_client=None):
     """
     Return the score for a user on a problem, as a tuple (correct, total).
     e.g. (5,7) if you got 5 out of 7 points.
@@ -421,6 +524,8 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
            Can return None if user doesn't have access, or if something else went wrong.
     scores_cache: A dict of location names to (earned, possible) point tuples.
            If an entry is found in this cache, it takes precedence.
+    scores_client: A ScoresClient with the user's StudentModule scores already
+           fetched. If None, the score for this problem alone is queried.
     """
     scores_cache = scores_cache or {}
 
@@ -447,18 +552,13 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
         # These are not problems, and do not have a score
         return (None, None)
 
-    try:
-        student_module = StudentModule.objects.get(
-            student=user,
-            course_id=course_id,
-            module_state_key=problem_descriptor.location
-        )
-    except StudentModule.DoesNotExist:
-        student_module = None
+    if scores_client is None:
+        scores_client = ScoresClient.create_for_locations(course_id, user.id, [problem_descriptor.location])
+    score = scores_client.get(problem_descriptor.location)
 
-    if student_module is not None and student_module.max_grade is not None:
-        correct = student_module.grade if student_module.grade is not None else 0
-        total = student_module.max_grade
+    if score is not None and score.total is not None:
+        correct = score.correct if score.correct is not None else 0
+        total = score.total
     else:
         # If the problem was not in the cache, or hasn't been graded yet,
         # we need to instantiate the problem.
@@ -479,7 +579,7 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
     weight = problem_descriptor.weight
     if weight is not None:
         if total == 0:
-            log.exception("Cannot reweight a problem with zero total points. Problem: " + str(student_module))
+            log.exception("Cannot reweight a problem with zero total points. Problem: " + str(problem_descriptor.location))
             return (correct, total)
         correct = correct * weight / total
         total = weight
@@ -528,25 +628,52 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
     # grading that student.
     request = RequestFactory().get('/')
 
+    # Scores are prefetched for a chunk of students at a time, so grading a
+    # whole course costs one StudentModule query per chunk rather than one
+    # per student per problem.
+    locations = scorable_locations(course)
+
+    for student_chunk in _chunk_students(students, GRADE_PREFETCH_CHUNK_SIZE):
+        with manual_transaction():
+            scores_clients = ScoresClient.create_for_users(
+                course.id, [student.id for student in student_chunk], locations
+            )
+        for student in student_chunk:
+            with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
+                try:
+                    request.user = student
+                    # Grading calls problem rendering, which calls masquerading,
+                    # which checks session vars -- thus the empty session dict below.
+                    # It's not pretty, but untangling that is currently beyond the
+                    # scope of this feature.
+                    request.session = {}
+                    gradeset = grade(
+                        student, request, course, keep_raw_scores, scores_client=scores_clients[student.id]
+                    )
+                    yield student, gradeset, ""
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Keep marching on even if this student couldn't be graded for
+                    # some reason, but log it for future reference.
+                    log.exception(
+                        'Cannot grade student %s (%s) in course %s because of exception: %s',
+                        student.username,
+                        student.id,
+                        course.id,
+                        exc.message
+                    )
+                    yield student, {}, exc.message
+
+
+def _chunk_students(students, chunk_size):
+    """
+    Yield lists of up to `chunk_size` students from the iterable `students`,
+    without materializing the whole iterable.
+    """
+    chunk = []
     for student in students:
-        with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
-            try:
-                request.user = student
-                # Grading calls problem rendering, which calls masquerading,
-                # which checks session vars -- thus the empty session dict below.
-                # It's not pretty, but untangling that is currently beyond the
-                # scope of this feature.
-                request.session = {}
-                gradeset = grade(student, request, course, keep_raw_scores)
-                yield student, gradeset, ""
-            except Exception as exc:  # pylint: disable=broad-except
-                # Keep marching on even if this student couldn't be graded for
-                # some reason, but log it for future reference.
-                log.exception(
-                    'Cannot grade student %s (%s) in course %s because of exception: %s',
-                    student.username,
-                    student.id,
-                    course.id,
-                    exc.message
-                )
-                yield student, {}, exc.message
+        chunk.append(student)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,120 @@
+"""
+A Django command that runs the <script> code of every problem in a course for
+each random seed students can be given, so that the results are in the shared
+safe_exec cache before students load the problems.
+
+Run it after publishing a course with randomized problems, before a large
+number of students are expected to open them at once, such as an exam.
+"""
+
+from optparse import make_option
+from textwrap import dedent
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from capa.capa_problem import LoncapaProblem, LoncapaSystem
+from edxmako.shortcuts import render_to_string
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip, get_safe_exec_cache
+from xmodule.capa_base import MAX_RANDOMIZATION_BINS, NUM_RANDOMIZATION_BINS
+from xmodule.capa_base_constants import RANDOMIZATION
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore.django import modulestore, ModuleI18nService
+
+
+def problem_seeds(problem):
+    """
+    Return the random seeds that students can be given for `problem`, a
+    capa problem descriptor, as chosen by `CapaMixin.choose_new_seed`.
+    """
+    if problem.rerandomize == RANDOMIZATION.NEVER:
+        return [1]
+    elif problem.rerandomize == RANDOMIZATION.PER_STUDENT:
+        return range(NUM_RANDOMIZATION_BINS)
+    else:
+        return range(MAX_RANDOMIZATION_BINS)
+
+
+class Command(BaseCommand):
+    """
+    Fill the safe_exec cache with the results of running the problem code
+    of a course for all random seeds.
+    """
+    args = "<course_id>"
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--max-seeds',
+                    action='store',
+                    type='int',
+                    default=None,
+                    help='Only run each problem for up to this many seeds'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("course_id not specified")
+
+        try:
+            course_key = CourseKey.from_string(args[0])
+        except InvalidKeyError:
+            raise CommandError("Invalid course_id")
+
+        store = modulestore()
+        if store.get_course(course_key) is None:
+            raise CommandError("Invalid course_id")
+
+        cache = get_safe_exec_cache()
+        python_lib_zip = get_python_lib_zip(contentstore, course_key)
+        executions = skipped = errors = 0
+
+        for problem in store.get_items(course_key, qualifiers={'category': 'problem'}):
+            if 'anonymous_student_id' in problem.data:
+                # The results of code using the student's id are cached per student
+                skipped += 1
+                continue
+
+            seeds = problem_seeds(problem)
+            if options['max_seeds'] is not None:
+                seeds = seeds[:options['max_seeds']]
+
+            for seed in seeds:
+                capa_system = LoncapaSystem(
+                    ajax_url=None,
+                    anonymous_student_id=None,
+                    cache=cache,
+                    can_execute_unsafe_code=lambda: can_execute_unsafe_code(course_key),
+                    get_python_lib_zip=lambda: python_lib_zip,
+                    DEBUG=settings.DEBUG,
+                    filestore=problem.runtime.resources_fs,
+                    i18n=ModuleI18nService(),
+                    node_path=settings.NODE_PATH,
+                    render_template=render_to_string,
+                    seed=seed,
+                    STATIC_URL=settings.STATIC_URL,
+                    xqueue=None,
+                    matlab_api_key=problem.matlab_api_key,
+                )
+                try:
+                    # Constructing the problem runs its <script> code
+                    LoncapaProblem(
+                        problem_text=problem.data,
+                        id=problem.location.html_id(),
+                        capa_system=capa_system,
+                        seed=seed,
+                    )
+                except Exception as exception:  # pylint: disable=broad-except
+                    errors += 1
+                    self.stderr.write(u"Error running {} with seed {}: {}\n".format(
+                        problem.location, seed, exception
+                    ))
+                    break
+                executions += 1
+
+        self.stdout.write(
+            u"Ran {executions} problem variants ({skipped} problems skipped, {errors} errors); "
+            u"cache hit ratio {hit_ratio}\n".format(
+                executions=executions, skipped=skipped, errors=errors, hit_ratio=cache.hit_ratio,
+            )
+        )
@@ -3,8 +3,8 @@ Classes to provide the LMS runtime data storage to XBlocks
 """
 
 import json
-from collections import defaultdict
-from itertools import chain
+from collections import defaultdict, namedtuple
+from itertools import chain, islice
 from .models import (
     StudentModule,
     XModuleUserStateSummaryField,
@@ -12,7 +12,7 @@ from .models import (
     XModuleStudentInfoField
 )
 import logging
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.asides import AsideUsageKeyV1
 
@@ -36,10 +36,17 @@ class InvalidWriteError(Exception):
 
 def chunks(items, chunk_size):
     """
-    Yields the values from items in chunks of size chunk_size
+    Yields the values from items in chunks of size chunk_size. Querysets are
+    read with `iterator()`, so that they are never loaded whole.
     """
-    items = list(items)
-    return (items[i:i + chunk_size] for i in xrange(0, len(items), chunk_size))
+    if hasattr(items, 'iterator'):
+        items = items.iterator()
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
 
 
 class FieldDataCache(object):
@@ -324,6 +331,137 @@ class FieldDataCache(object):
         return field_object
 
 
+class MultiUserFieldDataCache(FieldDataCache):
+    """
+    A FieldDataCache holding the state of the same descriptors for a batch of
+    users, loaded with chunked queries over the whole batch rather than with
+    separate queries for each user.
+
+    User state summary rows are shared by every user in the batch. Use
+    `for_user` to get the FieldDataCache of a single user in the batch.
+    """
+    def __init__(self, descriptors, course_id, users, asides=None, user_chunk_size=100):
+        '''
+        Arguments
+        descriptors: A list of XModuleDescriptors.
+        course_id: The id of the current course
+        users: The django users for which to cache data
+        asides: The list of aside types to load, or None to prefetch no asides.
+        user_chunk_size: The number of users to query for at once
+        '''
+        self.user_chunk_size = user_chunk_size
+        self.user_caches = dict(
+            (user.id, FieldDataCache([], course_id, user, asides=asides))
+            for user in users
+        )
+        super(MultiUserFieldDataCache, self).__init__(descriptors, course_id, None, asides=asides)
+
+    def for_user(self, user):
+        """
+        Return the FieldDataCache of `user`, who must be part of the batch.
+        """
+        return self.user_caches[user.id]
+
+    def add_descriptors_to_cache(self, descriptors):
+        """
+        Add all `descriptors` to this FieldDataCache, for every user in the batch.
+        """
+        if not self._user_ids():
+            return
+
+        for scope, fields in self._fields_to_cache(descriptors).items():
+            for field_object in self._retrieve_fields(scope, fields, descriptors):
+                cache_key = self._cache_key_from_field_object(scope, field_object)
+                if scope == Scope.user_state_summary:
+                    self.cache[cache_key] = field_object
+                    for user_cache in self.user_caches.itervalues():
+                        user_cache.cache[cache_key] = field_object
+                else:
+                    self.user_caches[field_object.student_id].cache[cache_key] = field_object
+
+    def _user_ids(self):
+        """
+        Return the ids of the authenticated users in the batch.
+        """
+        return [
+            user_id for user_id, user_cache in self.user_caches.iteritems()
+            if user_cache.user.is_authenticated()
+        ]
+
+    def _chunked_user_query(self, model_class, chunk_field=None, items=None, **kwargs):
+        """
+        Queries model_class for chunks of `user_chunk_size` users at a time,
+        and, if `chunk_field` is given, with it set to chunks of `items`.
+        """
+        user_chunks = chunks(self._user_ids(), self.user_chunk_size)
+        if chunk_field is None:
+            return chain.from_iterable(
+                self._query(model_class, student__in=user_chunk, **kwargs)
+                for user_chunk in user_chunks
+            )
+        return chain.from_iterable(
+            self._chunked_query(model_class, chunk_field, items, student__in=user_chunk, **kwargs)
+            for user_chunk in user_chunks
+        )
+
+    def _retrieve_fields(self, scope, fields, descriptors):
+        """
+        Queries the database for all of the fields in the specified scope,
+        for every user in the batch
+        """
+        if scope == Scope.user_state:
+            return self._chunked_user_query(
+                StudentModule,
+                'module_state_key__in',
+                self._all_usage_ids(descriptors),
+                course_id=self.course_id,
+            )
+        elif scope == Scope.preferences:
+            return self._chunked_user_query(
+                XModuleStudentPrefsField,
+                'module_type__in',
+                self._all_block_types(descriptors),
+                field_name__in=set(field.name for field in fields),
+            )
+        elif scope == Scope.user_info:
+            return self._chunked_user_query(
+                XModuleStudentInfoField,
+                field_name__in=set(field.name for field in fields),
+            )
+        else:
+            return super(MultiUserFieldDataCache, self)._retrieve_fields(scope, fields, descriptors)
+
+    def _user_cache_for_key(self, key):
+        """
+        Return the FieldDataCache of the user `key` belongs to, or None if
+        the key isn't bound to a single user.
+        """
+        if key.scope.user == UserScope.ONE:
+            assert key.user_id in self.user_caches
+            return self.user_caches[key.user_id]
+        return None
+
+    def find(self, key):
+        '''
+        Look for a model data object using an DjangoKeyValueStore.Key object,
+        in the cache of the user it belongs to
+        '''
+        user_cache = self._user_cache_for_key(key)
+        if user_cache is not None:
+            return user_cache.find(key)
+        return self.cache.get(self._cache_key_from_kvs_key(key))
+
+    def find_or_create(self, key):
+        '''
+        Find a model data object in this cache, or create it if it doesn't
+        exist
+        '''
+        user_cache = self._user_cache_for_key(key)
+        if user_cache is not None:
+            return user_cache.find_or_create(key)
+        return super(MultiUserFieldDataCache, self).find_or_create(key)
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -443,3 +581,118 @@ class DjangoKeyValueStore(KeyValueStore):
             return key.field_name in json.loads(field_object.state)
         else:
             return True
+
+
+class ScoresClient(object):
+    """
+    Read-only client for the grade information stored in StudentModule.
+
+    Rather than issuing one StudentModule query per scored block, a
+    ScoresClient loads the grade/max_grade columns for every block of interest
+    in bulk, and then answers lookups for individual locations from memory.
+    """
+    Score = namedtuple('Score', 'correct total')
+
+    def __init__(self, course_key, user_id):
+        self.course_key = course_key
+        self.user_id = user_id
+        self._locations_to_scores = {}
+        self._has_fetched = False
+
+    def __contains__(self, location):
+        """
+        Return True if the user has any StudentModule row for `location`,
+        whether or not it has been graded yet.
+        """
+        return self._normalize_location(location) in self._locations_to_scores
+
+    def fetch_scores(self, locations):
+        """
+        Load the scores for all of `locations` with a single (chunked) query.
+        """
+        self._add_rows(self._query_rows(self.course_key, [self.user_id], locations))
+        self._has_fetched = True
+
+    def get(self, location):
+        """
+        Return a Score for `location`, or None if the user has no StudentModule
+        for it. Raises ValueError if `fetch_scores` has not been called.
+        """
+        if not self._has_fetched:
+            raise ValueError(
+                u"Tried to fetch location {} from ScoresClient before fetch_scores() has run."
+                .format(location)
+            )
+        return self._locations_to_scores.get(self._normalize_location(location))
+
+    @classmethod
+    def create_for_locations(cls, course_key, user_id, locations):
+        """
+        Create a ScoresClient for a single user with scores already fetched.
+        """
+        client = cls(course_key, user_id)
+        client.fetch_scores(locations)
+        return client
+
+    @classmethod
+    def create_for_users(cls, course_key, user_ids, locations, chunk_size=500):
+        """
+        Return a dict mapping each of `user_ids` to a ScoresClient whose scores
+        have already been fetched for `locations`.
+
+        All users are loaded together, so the number of queries depends only on
+        the number of users and locations, in chunks of `chunk_size`.
+        """
+        clients = {}
+        for user_id in user_ids:
+            client = cls(course_key, user_id)
+            client._has_fetched = True  # pylint: disable=protected-access
+            clients[user_id] = client
+
+        for user_id_chunk in chunks(clients.keys(), chunk_size):
+            rows = cls._query_rows(course_key, user_id_chunk, locations, chunk_size)
+            for user_id, location, correct, total in rows:
+                clients[user_id]._add_row(location, correct, total)  # pylint: disable=protected-access
+        return clients
+
+    def _normalize_location(self, location):
+        """
+        Return the lookup key for `location`.
+
+        Locations in StudentModule don't necessarily have course key info
+        attached to them (since old mongo identifiers don't include runs), and
+        locations from the modulestore may carry version and branch info, so
+        both are reduced to a common form.
+        """
+        if isinstance(location, basestring):
+            location = UsageKey.from_string(location)
+        return location.map_into_course(self.course_key).replace(version=None, branch=None)
+
+    def _add_row(self, location, correct, total):
+        """
+        Record a single StudentModule score.
+        """
+        self._locations_to_scores[self._normalize_location(location)] = self.Score(correct, total)
+
+    def _add_rows(self, rows):
+        """
+        Record the scores from (user_id, location, correct, total) rows.
+        """
+        for __, location, correct, total in rows:
+            self._add_row(location, correct, total)
+
+    @staticmethod
+    def _query_rows(course_key, user_ids, locations, chunk_size=500):
+        """
+        Yield (student_id, module_state_key, grade, max_grade) tuples for
+        `user_ids` and `locations`, querying in chunks of `chunk_size` locations
+        to stay within database parameter limits.
+        """
+        for location_chunk in chunks(set(locations), chunk_size):
+            query = StudentModule.objects.filter(
+                student_id__in=list(user_ids),
+                course_id=course_key,
+                module_state_key__in=location_chunk,
+            ).values_list('student_id', 'module_state_key', 'grade', 'max_grade')
+            for row in query:
+                yield row
@@ -21,6 +21,8 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver, Signal
 
 from model_utils.models import TimeStampedModel
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
 
@@ -213,6 +215,9 @@ class OfflineComputedGrade(models.Model):
     updated = models.DateTimeField(auto_now=True, db_index=True)
 
     gradeset = models.TextField(null=True, blank=True)		# grades, stored as JSON
+    # The final grade, out of the gradeset, so the gradebook can sort and filter on it
+    percent_grade = models.FloatField(default=0, db_index=True)
+    letter_grade = models.CharField(max_length=255, blank=True, db_index=True)
 
     class Meta(object):  # pylint: disable=missing-docstring
         unique_together = (('user', 'course_id'), )
@@ -256,6 +261,53 @@ class StudentFieldOverride(TimeStampedModel):
     value = models.TextField(default='null')
 
 
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    The graded score a user has earned on a single graded subsection, as
+    computed by `courseware.grades`. Rows are only valid for the
+    `grading_version` of the course they were computed against; see
+    `courseware.persistent_grades`.
+    """
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    usage_key = LocationKeyField(max_length=255)
+    grading_version = models.CharField(max_length=40)
+
+    earned_graded = models.FloatField()
+    possible_graded = models.FloatField()
+
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = (('course_id', 'user', 'usage_key'),)
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {} {} = {}/{}".format(
+            self.user_id, self.course_id, self.usage_key, self.earned_graded, self.possible_graded
+        )
+
+
+class PersistentCourseGrade(TimeStampedModel):
+    """
+    The rolled up course grade for a user, as returned by
+    `courseware.grades.grade`. Rows are only valid for the `grading_version`
+    of the course they were computed against.
+    """
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    grading_version = models.CharField(max_length=40)
+
+    percent_grade = models.FloatField()
+    letter_grade = models.CharField(max_length=255, blank=True)
+    gradeset = models.TextField()  # the full grade summary, stored as JSON
+
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = (('course_id', 'user'),)
+
+    def __unicode__(self):
+        return u"[PersistentCourseGrade] {}: {} = {} ({})".format(
+            self.user_id, self.course_id, self.percent_grade, self.letter_grade
+        )
+
+
 # Signal that indicates that a user's score for a problem has been updated.
 # This signal is generated when a scoring event occurs either within the core
 # platform or in the Submissions module. Note that this signal will be triggered
@@ -352,3 +404,27 @@ def submissions_score_reset_handler(sender, **kwargs):  # pylint: disable=unused
             u"Failed to process score_reset signal from Submissions API. "
             "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
         )
+
+
+@receiver(SCORE_CHANGED)
+def invalidate_persistent_grades_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Consume the SCORE_CHANGED signal and delete the persisted grades that
+    depend on the changed score, so they are recomputed on the next read.
+    """
+    # Import here to avoid a circular import.
+    from courseware import persistent_grades
+
+    if not persistent_grades.persistent_grades_enabled():
+        return
+
+    try:
+        course_key = CourseKey.from_string(kwargs['course_id'])
+        usage_key = UsageKey.from_string(kwargs['usage_id']).map_into_course(course_key)
+    except (KeyError, InvalidKeyError):
+        log.exception(
+            u"Failed to invalidate persistent grades for SCORE_CHANGED signal. "
+            "course_id: %s, usage_id: %s", kwargs.get('course_id'), kwargs.get('usage_id')
+        )
+        return
+    persistent_grades.invalidate_block_grade(kwargs.get('user_id'), course_key, usage_key)
@@ -18,7 +18,6 @@ from opaque_keys import InvalidKeyError
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.cache import cache
 from django.core.context_processors import csrf
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
@@ -70,7 +69,7 @@ from xmodule.x_module import XModuleDescriptor
 from xmodule.mixin import wrap_with_license
 from xblock_django.user_service import DjangoXBlockUserService
 from util.json_request import JsonResponse
-from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip
+from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip, get_safe_exec_cache
 from util import milestones_helpers
 from util.module_utils import yield_dynamic_descriptor_descendents
 from verify_student.services import ReverificationService
@@ -517,7 +516,7 @@ def get_module_system_for_user(user, field_data_cache,
             inner_system,
             real_user.id,
             [
-                partial(OverrideFieldData.wrap, real_user),
+                partial(OverrideFieldData.wrap, real_user, course_key=course_id),
                 partial(LmsFieldData, student_data=inner_student_data),
             ],
         )
@@ -633,7 +632,7 @@ def get_module_system_for_user(user, field_data_cache,
         course_id=course_id,
         open_ended_grading_interface=open_ended_grading_interface,
         s3_interface=s3_interface,
-        cache=cache,
+        cache=get_safe_exec_cache(),
         can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_id)),
         get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, course_id)),
         # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
@@ -715,7 +714,7 @@ def get_module_for_descriptor_internal(user, descriptor, field_data_cache, cours
         system,
         user.id,
         [
-            partial(OverrideFieldData.wrap, user),
+            partial(OverrideFieldData.wrap, user, course_key=course_id),
             partial(LmsFieldData, student_data=student_data),
         ],
     )
@@ -0,0 +1,237 @@
+"""
+Storage for precomputed subsection and course grades.
+
+Grading a student with `courseware.grades` means walking every graded
+subsection of the course and, often, instantiating XModules. When the
+ENABLE_PERSISTENT_GRADES feature is on, the per-subsection totals and the
+rolled up course grade are saved in `PersistentSubsectionGrade` and
+`PersistentCourseGrade`, so later requests for the same grade only have to
+recompute what changed.
+
+Every row records the `grading_version` of the course it was computed for: a
+hash of the grading policy and of the graded structure of the course, so
+publishing a change to either implicitly invalidates them. Rows whose version
+does not match the current course are ignored, and are deleted the next time
+the user's course grade is saved. A score change for a single problem deletes
+the rows for the subsection containing it and for the course grade, so only
+that subsection is recomputed.
+"""
+import hashlib
+import json
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+
+from opaque_keys.edx.keys import UsageKey
+from xmodule.graders import Score
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.edit_info import EditInfoRuntimeMixin
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
+from .models import PersistentCourseGrade, PersistentSubsectionGrade
+
+
+# Grading versions already computed for course descriptors in this process
+_GRADING_VERSIONS = WeakKeyDictionary()
+
+
+def persistent_grades_enabled():
+    """
+    Return True if grades should be read from and written to the database.
+    """
+    return settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False)
+
+
+def grading_version(course):
+    """
+    Return a hash identifying everything about `course` that affects a
+    persisted grade: the grading policy, the published content of the course,
+    the graded subsections and the scored blocks in each of them.
+    """
+    if course in _GRADING_VERSIONS:
+        return _GRADING_VERSIONS[course]
+
+    hasher = hashlib.sha1()
+    hasher.update(repr(_course_content_version(course)))
+    hasher.update(json.dumps(course.grading_policy, sort_keys=True))
+    hasher.update(json.dumps(course.grade_cutoffs, sort_keys=True))
+    for section_format, sections in sorted(course.grading_context['graded_sections'].iteritems()):
+        hasher.update(section_format.encode('utf-8'))
+        for section in sections:
+            hasher.update(unicode(section['section_descriptor'].location).encode('utf-8'))
+            for descriptor in section['xmoduledescriptors']:
+                hasher.update(unicode(descriptor.location).encode('utf-8'))
+                hasher.update(repr((descriptor.weight, descriptor.graded)))
+
+    version = hasher.hexdigest()
+    _GRADING_VERSIONS[course] = version
+    return version
+
+
+def _course_content_version(course):
+    """
+    Return what identifies the published content of `course` in its
+    modulestore, or None for stores without one (XML courses only change
+    when the process restarts).
+
+    The LMS runtime doesn't mix EditInfoMixin into blocks, so this asks the
+    runtime rather than reading `edited_on` from each block.
+    """
+    course_entry = getattr(course.runtime, 'course_entry', None)
+    if course_entry is not None:
+        # Split: every publish creates a new structure
+        return unicode(course_entry.structure['_id'])
+    if isinstance(course.runtime, EditInfoRuntimeMixin):
+        return course.runtime.get_subtree_edited_on(course)
+    return None
+
+
+def normalize_location(location):
+    """
+    Return `location` without the version and branch information that
+    modulestore locations may carry, for use as a persisted grade key.
+    """
+    return location.replace(version=None, branch=None)
+
+
+def get_course_grade(user, course_key, version):
+    """
+    Return the persisted grade summary for `user` in the course, or None if
+    there isn't one for `version`.
+    """
+    try:
+        course_grade = PersistentCourseGrade.objects.get(
+            user=user, course_id=course_key, grading_version=version
+        )
+    except PersistentCourseGrade.DoesNotExist:
+        return None
+    return _deserialize_grade_summary(course_grade.gradeset)
+
+
+def save_course_grade(user, course_key, version, grade_summary):
+    """
+    Persist `grade_summary`, as returned by `courseware.grades.grade`, and
+    delete any of the user's subsection grades left over from other versions
+    of the course.
+    """
+    PersistentCourseGrade.objects.filter(user=user, course_id=course_key).delete()
+    PersistentSubsectionGrade.objects.filter(
+        user=user, course_id=course_key
+    ).exclude(grading_version=version).delete()
+    PersistentCourseGrade.objects.create(
+        user=user,
+        course_id=course_key,
+        grading_version=version,
+        percent_grade=grade_summary['percent'],
+        letter_grade=grade_summary['grade'] or u'',
+        gradeset=_serialize_grade_summary(grade_summary),
+    )
+
+
+def get_subsection_grades(user, course_key, version):
+    """
+    Return a dict mapping subsection locations to (earned, possible) graded
+    totals for every subsection persisted for `user` at `version`.
+    """
+    rows = PersistentSubsectionGrade.objects.filter(
+        user=user, course_id=course_key, grading_version=version
+    ).values_list('usage_key', 'earned_graded', 'possible_graded')
+    return {
+        normalize_location(_usage_key(usage_key).map_into_course(course_key)): (earned, possible)
+        for usage_key, earned, possible in rows
+    }
+
+
+def save_subsection_grades(user, course_key, version, subsection_grades):
+    """
+    Persist `subsection_grades`, a dict mapping subsection locations to
+    (earned, possible) graded totals, replacing any existing rows for them.
+    """
+    if not subsection_grades:
+        return
+    PersistentSubsectionGrade.objects.filter(
+        user=user, course_id=course_key, usage_key__in=subsection_grades.keys()
+    ).delete()
+    PersistentSubsectionGrade.objects.bulk_create([
+        PersistentSubsectionGrade(
+            user=user,
+            course_id=course_key,
+            usage_key=usage_key,
+            grading_version=version,
+            earned_graded=earned,
+            possible_graded=possible,
+        )
+        for usage_key, (earned, possible) in subsection_grades.iteritems()
+    ])
+
+
+def invalidate_block_grade(user_id, course_key, usage_key):
+    """
+    Delete the persisted grades that depend on the score of `usage_key`: the
+    grade of the subsection containing it and the user's course grade.
+    """
+    subsection_key = _subsection_for_block(usage_key)
+    if subsection_key is not None:
+        PersistentSubsectionGrade.objects.filter(
+            user_id=user_id, course_id=course_key, usage_key=normalize_location(subsection_key)
+        ).delete()
+    else:
+        PersistentSubsectionGrade.objects.filter(user_id=user_id, course_id=course_key).delete()
+    PersistentCourseGrade.objects.filter(user_id=user_id, course_id=course_key).delete()
+
+
+def invalidate_user_grades(user_id, course_key):
+    """
+    Delete every persisted grade for `user_id` in the course.
+    """
+    PersistentSubsectionGrade.objects.filter(user_id=user_id, course_id=course_key).delete()
+    PersistentCourseGrade.objects.filter(user_id=user_id, course_id=course_key).delete()
+
+
+def _usage_key(value):
+    """
+    Return `value` as a UsageKey; values_list() returns the raw column value.
+    """
+    if isinstance(value, basestring):
+        return UsageKey.from_string(value)
+    return value
+
+
+def _subsection_for_block(usage_key):
+    """
+    Return the location of the subsection (sequential) containing
+    `usage_key`, or None if it cannot be found.
+    """
+    store = modulestore()
+    location = usage_key
+    try:
+        while location is not None and location.block_type != 'sequential':
+            location = store.get_parent_location(location)
+    except ItemNotFoundError:
+        return None
+    return location
+
+
+def _serialize_grade_summary(grade_summary):
+    """
+    Return `grade_summary` as a JSON string. The section totals in
+    'totaled_scores' carry no module_id, so they are stored as plain lists.
+    """
+    summary = dict(grade_summary)
+    summary['totaled_scores'] = {
+        section_format: [list(score[:4]) for score in scores]
+        for section_format, scores in grade_summary.get('totaled_scores', {}).iteritems()
+    }
+    return json.dumps(summary)
+
+
+def _deserialize_grade_summary(gradeset):
+    """
+    Inverse of `_serialize_grade_summary`.
+    """
+    summary = json.loads(gradeset)
+    summary['totaled_scores'] = {
+        section_format: [Score(*(score + [None])) for score in scores]
+        for section_format, scores in summary.get('totaled_scores', {}).iteritems()
+    }
+    return summary
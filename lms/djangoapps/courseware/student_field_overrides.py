@@ -3,6 +3,9 @@ API related to providing field overrides for individual students.  This is used
 by the individual due dates feature.
 """
 import json
+from collections import defaultdict
+
+from request_cache.middleware import RequestCache
 
 from .field_overrides import FieldOverrideProvider
 from .models import StudentFieldOverride
@@ -17,6 +20,9 @@ class IndividualStudentOverrideProvider(FieldOverrideProvider):
     def get(self, block, name, default):
         return get_override_for_user(self.user, block, name, default)
 
+    def prefetch(self, course_key):
+        prefetch_overrides_for_user(self.user, course_key)
+
 
 def get_override_for_user(user, block, name, default=None):
     """
@@ -38,19 +44,42 @@ def _get_overrides_for_user(user, block):
     Gets all of the individual student overrides for given user and block.
     Returns a dictionary of field override values keyed by field name.
     """
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=block.location,
-        student_id=user.id,
-    )
+    course_overrides = prefetch_overrides_for_user(user, block.runtime.course_id)
     overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    for field_name, value in course_overrides.get(unicode(block.location), {}).iteritems():
+        field = block.fields[field_name]
+        overrides[field_name] = field.from_json(json.loads(value))
     return overrides
 
 
+def _overrides_cache_key(user, course_key):
+    """
+    Request cache key of the individual student overrides of `user` in the course.
+    """
+    return u"student_field_overrides.{}.{}".format(user.id, course_key)
+
+
+def prefetch_overrides_for_user(user, course_key):
+    """
+    Gets all of the individual student overrides for given user in the course
+    identified by `course_key` in one query, and keeps them for the rest of the
+    request.  Returns a dictionary of JSON encoded field override values keyed
+    by serialized block location, then by field name.
+    """
+    request_cache = RequestCache.get_request_cache()
+    cache_key = _overrides_cache_key(user, course_key)
+    if cache_key not in request_cache.data:
+        overrides = defaultdict(dict)
+        query = StudentFieldOverride.objects.filter(
+            course_id=course_key,
+            student_id=user.id,
+        )
+        for override in query:
+            overrides[unicode(override.location)][override.field] = override.value
+        request_cache.data[cache_key] = dict(overrides)
+    return request_cache.data[cache_key]
+
+
 def override_field_for_user(user, block, name, value):
     """
     Overrides a field for the `user`.  `block` and `name` specify the block
@@ -65,6 +94,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    _clear_cached_overrides(user, block)
 
 
 def clear_override_for_user(user, block, name):
@@ -80,5 +110,16 @@ def clear_override_for_user(user, block, name):
             student_id=user.id,
             location=block.location,
             field=name).delete()
+        _clear_cached_overrides(user, block)
     except StudentFieldOverride.DoesNotExist:
         pass
+
+
+def _clear_cached_overrides(user, block):
+    """
+    Forgets the overrides read for `user` in the course of `block`, and on `block`,
+    after they have changed.
+    """
+    RequestCache.get_request_cache().data.pop(_overrides_cache_key(user, block.runtime.course_id), None)
+    if hasattr(block, '_student_overrides'):
+        block._student_overrides.pop(user.id, None)  # pylint: disable=protected-access
@@ -9,14 +9,14 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 import courseware.access as access
 from courseware.masquerade import CourseMasquerade
-from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory
+from courseware.tests.factories import UserFactory, StaffFactory, InstructorFactory, BetaTesterFactory
 from courseware.tests.helpers import LoginEnrollmentTestCase
 from student.tests.factories import AnonymousUserFactory, CourseEnrollmentAllowedFactory, CourseEnrollmentFactory
 from xmodule.course_module import (
     CATALOG_VISIBILITY_CATALOG_AND_ABOUT, CATALOG_VISIBILITY_ABOUT,
     CATALOG_VISIBILITY_NONE
 )
-from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
 from util.milestones_helpers import (
@@ -212,6 +212,42 @@ class AccessTestCase(LoginEnrollmentTestCase, ModuleStoreTestCase):
         mock_unit.start = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)  # release date in the future
         self.verify_access(mock_unit, False)
 
+    @patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test_has_access_to_descriptors(self):
+        """
+        Tests that checking many descriptors at once gives the same answers
+        as checking each of them.
+        """
+        course = CourseFactory.create()
+        yesterday = datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
+        tomorrow = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
+        descriptors = [
+            ItemFactory.create(parent=course, category='chapter', start=yesterday),
+            ItemFactory.create(parent=course, category='chapter', start=tomorrow),
+            ItemFactory.create(parent=course, category='chapter', start=tomorrow, days_early_for_beta=2),
+            ItemFactory.create(parent=course, category='chapter', start=yesterday, visible_to_staff_only=True),
+        ]
+        users = [
+            self.anonymous_user,
+            UserFactory(),
+            BetaTesterFactory(course_key=course.id),
+            StaffFactory(course_key=course.id),
+        ]
+        for user in users:
+            self.assertEqual(
+                access.has_access_to_descriptors(user, 'load', descriptors + [course], course.id),
+                {
+                    descriptor.location: access.has_access(user, 'load', descriptor, course.id)
+                    for descriptor in descriptors + [course]
+                }
+            )
+
+        beta_tester_access = access.has_access_to_descriptors(users[2], 'load', descriptors, course.id)
+        self.assertEqual(
+            [beta_tester_access[descriptor.location] for descriptor in descriptors],
+            [True, False, True, False]
+        )
+
     def test__has_access_course_desc_can_enroll(self):
         yesterday = datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
         tomorrow = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
@@ -85,6 +85,10 @@ class OverrideFieldDataTests(TestCase):
         with disable_overrides():
             self.assertEqual(data.get('block', 'foo'), 'baz')
 
+    def test_prefetch(self):
+        data = OverrideFieldData.wrap(TESTUSER, DictFieldData({}), course_key='course')
+        self.assertEqual(data.providers[0].prefetched, ['course'])
+
     @override_settings(FIELD_OVERRIDE_PROVIDERS=())
     def test_no_overrides_configured(self):
         data = self.make_one()
@@ -116,6 +120,10 @@ class TestOverrideProvider(FieldOverrideProvider):
     """
     A concrete implementation of `FieldOverrideProvider` for testing.
     """
+    def __init__(self, user):
+        super(TestOverrideProvider, self).__init__(user)
+        self.prefetched = []
+
     def get(self, block, name, default):
         assert self.user is TESTUSER
         assert block == 'block'
@@ -124,3 +132,6 @@ class TestOverrideProvider(FieldOverrideProvider):
         if name == 'oh':
             return 'man'
         return default
+
+    def prefetch(self, course_key):
+        self.prefetched.append(course_key)
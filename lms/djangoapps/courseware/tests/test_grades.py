@@ -1,18 +1,24 @@
 """
 Test grade calculation.
 """
+from django.conf import settings
 from django.http import Http404
+from django.test.client import RequestFactory
 from mock import patch
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
-from courseware.grades import grade, iterate_grades_for
+from courseware.grades import grade, iterate_grades_for, progress_summary
+from courseware.model_data import ScoresClient
+from courseware.persistent_grades import grading_version
+from courseware.models import PersistentCourseGrade, PersistentSubsectionGrade, SCORE_CHANGED
+from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import UserFactory
-from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
 
-def _grade_with_errors(student, request, course, keep_raw_scores=False):
+def _grade_with_errors(student, request, course, keep_raw_scores=False, scores_client=None):
     """This fake grade method will throw exceptions for student3 and
     student4, but allow any other students to go through normal grading.
 
@@ -23,7 +29,7 @@ def _grade_with_errors(student, request, course, keep_raw_scores=False):
     if student.username in ['student3', 'student4']:
         raise Exception("I don't like {}".format(student.username))
 
-    return grade(student, request, course, keep_raw_scores=keep_raw_scores)
+    return grade(student, request, course, keep_raw_scores=keep_raw_scores, scores_client=scores_client)
 
 
 @attr('shard_1')
@@ -106,6 +112,18 @@ class TestGradeIteration(ModuleStoreTestCase):
         self.assertTrue(all_gradesets[student2])
         self.assertTrue(all_gradesets[student5])
 
+    @patch('courseware.grades.GRADE_PREFETCH_CHUNK_SIZE', 2)
+    @patch('courseware.grades.ScoresClient.create_for_users')
+    def test_scores_prefetched_per_chunk(self, mock_create_for_users):
+        """Scores should be fetched once per chunk of students, not per student."""
+        mock_create_for_users.side_effect = lambda course_key, user_ids, locations: {
+            user_id: ScoresClient.create_for_locations(course_key, user_id, locations) for user_id in user_ids
+        }
+        all_gradesets, all_errors = self._gradesets_and_errors_for(self.course.id, self.students)
+        self.assertEqual(len(all_errors), 0)
+        self.assertEqual(len(all_gradesets), 5)
+        self.assertEqual(mock_create_for_users.call_count, 3)
+
     ################################# Helpers #################################
     def _gradesets_and_errors_for(self, course_id, students):
         """Simple helper method to iterate through student grades and give us
@@ -121,3 +139,115 @@ class TestGradeIteration(ModuleStoreTestCase):
                 students_to_errors[student] = err_msg
 
         return students_to_gradesets, students_to_errors
+
+
+@attr('shard_1')
+class TestProgressSummary(ModuleStoreTestCase):
+    """
+    Test the scores shown on the progress page.
+    """
+    def test_ungraded_section_scores(self):
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=course, category='chapter')
+        sequence = ItemFactory.create(parent=chapter, category='sequential', graded=False)
+        vertical = ItemFactory.create(parent=sequence, category='vertical')
+        problem = ItemFactory.create(parent=vertical, category='problem')
+        course = self.store.get_course(course.id)
+        student = UserFactory.create()
+        StudentModuleFactory.create(
+            student=student, course_id=course.id, module_state_key=problem.location, grade=1, max_grade=1
+        )
+        request = RequestFactory().get('/')
+        request.user = student
+        request.session = {}
+
+        # Problems outside of graded sections are scored from the prefetched scores too
+        chapters = progress_summary(student, request, course)
+        scores = chapters[0]['sections'][0]['scores']
+        self.assertEqual([(score.earned, score.possible) for score in scores], [(1, 1)])
+
+
+@attr('shard_1')
+@patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_GRADES': True})
+class TestPersistentGrades(ModuleStoreTestCase):
+    """
+    Test that grades are saved to and served from the persistent grade tables.
+    """
+    def setUp(self):
+        super(TestPersistentGrades, self).setUp()
+        self.course = CourseFactory.create(
+            grading_policy={
+                "GRADER": [{"type": "Homework", "min_count": 1, "drop_count": 0, "short_label": "HW", "weight": 1.0}],
+                "GRADE_CUTOFFS": {"Pass": 0.5},
+            }
+        )
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.sequence = ItemFactory.create(parent=chapter, category='sequential', graded=True, format='Homework')
+        vertical = ItemFactory.create(parent=self.sequence, category='vertical')
+        self.problem = ItemFactory.create(parent=vertical, category='problem')
+        self.course = self.store.get_course(self.course.id)
+        self.student = UserFactory.create()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.student
+        self.request.session = {}
+
+    def _set_score(self, earned, possible):
+        """Record a score for the problem and announce it as the LMS would."""
+        StudentModuleFactory.create(
+            student=self.student,
+            course_id=self.course.id,
+            module_state_key=self.problem.location,
+            grade=earned,
+            max_grade=possible,
+        )
+        SCORE_CHANGED.send(
+            sender=None,
+            points_possible=possible,
+            points_earned=earned,
+            user_id=self.student.id,
+            course_id=unicode(self.course.id),
+            usage_id=unicode(self.problem.location),
+        )
+
+    def test_grades_persisted(self):
+        self._set_score(1, 1)
+        gradeset = grade(self.student, self.request, self.course)
+        self.assertEqual(gradeset['grade'], 'Pass')
+        self.assertTrue(PersistentCourseGrade.objects.filter(user=self.student).exists())
+        subsection_grade = PersistentSubsectionGrade.objects.get(user=self.student)
+        self.assertEqual((subsection_grade.earned_graded, subsection_grade.possible_graded), (1, 1))
+
+        # The second read is served from the course grade row alone
+        with self.assertNumQueries(1):
+            cached_gradeset = grade(self.student, self.request, self.course)
+        self.assertEqual(cached_gradeset['percent'], gradeset['percent'])
+        self.assertEqual(cached_gradeset['grade'], gradeset['grade'])
+        self.assertEqual(cached_gradeset['totaled_scores'], gradeset['totaled_scores'])
+
+    def test_score_change_invalidates(self):
+        gradeset = grade(self.student, self.request, self.course)
+        self.assertIsNone(gradeset['grade'])
+        self.assertTrue(PersistentCourseGrade.objects.filter(user=self.student).exists())
+
+        self._set_score(1, 1)
+        self.assertFalse(PersistentCourseGrade.objects.filter(user=self.student).exists())
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user=self.student).exists())
+        self.assertEqual(grade(self.student, self.request, self.course)['grade'], 'Pass')
+
+    def test_grading_version_follows_published_content(self):
+        version = grading_version(self.course)
+        self.assertEqual(grading_version(self.store.get_course(self.course.id)), version)
+
+        self.problem.weight = 2
+        self.store.update_item(self.problem, self.user.id)
+        self.assertNotEqual(grading_version(self.store.get_course(self.course.id)), version)
+
+    @patch('xmodule.x_module.XModuleMixin.always_recalculate_grades', True)
+    def test_always_recalculated_course_grade_not_persisted(self):
+        grade(self.student, self.request, self.course)
+        self.assertFalse(PersistentCourseGrade.objects.filter(user=self.student).exists())
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(user=self.student).exists())
+
+    def test_raw_scores_not_persisted(self):
+        grade(self.student, self.request, self.course, keep_raw_scores=True)
+        self.assertFalse(PersistentCourseGrade.objects.filter(user=self.student).exists())
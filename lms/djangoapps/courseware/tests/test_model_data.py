@@ -6,8 +6,8 @@ from mock import Mock, patch
 from nose.plugins.attrib import attr
 from functools import partial
 
-from courseware.model_data import DjangoKeyValueStore
-from courseware.model_data import InvalidScopeError, FieldDataCache
+from courseware.model_data import DjangoKeyValueStore, chunks
+from courseware.model_data import InvalidScopeError, FieldDataCache, MultiUserFieldDataCache, ScoresClient
 from courseware.models import StudentModule
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
@@ -402,3 +402,119 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr('shard_1')
+class TestScoresClient(TestCase):
+    """
+    Tests for bulk loading of StudentModule scores.
+    """
+    def setUp(self):
+        super(TestScoresClient, self).setUp()
+        self.user = UserFactory.create(username='user')
+        self.other_user = UserFactory.create(username='other_user')
+
+    def test_get_before_fetch(self):
+        client = ScoresClient(course_id, self.user.id)
+        with self.assertRaises(ValueError):
+            client.get(location('usage_id'))
+
+    def test_fetch_scores(self):
+        StudentModuleFactory.create(student=self.user, grade=2, max_grade=4)
+        StudentModuleFactory.create(
+            student=self.user, module_state_key=location('ungraded'), grade=None, max_grade=None
+        )
+        with self.assertNumQueries(1):
+            client = ScoresClient.create_for_locations(
+                course_id, self.user.id, [location('usage_id'), location('ungraded'), location('missing')]
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get(location('usage_id')), ScoresClient.Score(2, 4))
+            self.assertEqual(client.get(location('ungraded')), ScoresClient.Score(None, None))
+            self.assertIsNone(client.get(location('missing')))
+            self.assertIn(location('ungraded'), client)
+            self.assertNotIn(location('missing'), client)
+
+    def test_create_for_users(self):
+        StudentModuleFactory.create(student=self.user, grade=1, max_grade=2)
+        StudentModuleFactory.create(student=self.other_user, grade=2, max_grade=2)
+        with self.assertNumQueries(1):
+            clients = ScoresClient.create_for_users(
+                course_id, [self.user.id, self.other_user.id], [location('usage_id')]
+            )
+        self.assertEqual(clients[self.user.id].get(location('usage_id')), ScoresClient.Score(1, 2))
+        self.assertEqual(clients[self.other_user.id].get(location('usage_id')), ScoresClient.Score(2, 2))
+
+
+class TestChunks(TestCase):
+    """
+    Tests for splitting items into chunks.
+    """
+    def test_chunks(self):
+        self.assertEqual(list(chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunks([], 2)), [])
+
+    def test_chunks_are_read_lazily(self):
+        items = iter(xrange(10))
+        self.assertEqual(next(chunks(items, 3)), [0, 1, 2])
+        self.assertEqual(next(items), 3)
+
+    def test_queryset_is_iterated(self):
+        StudentModuleFactory.create_batch(3)
+        queryset = StudentModule.objects.order_by('id')
+        self.assertEqual([len(chunk) for chunk in chunks(queryset, 2)], [2, 1])
+        # Iterating did not fill the queryset's result cache
+        self.assertIsNone(queryset._result_cache)  # pylint: disable=protected-access
+
+
+@attr('shard_1')
+class TestMultiUserFieldDataCache(TestCase):
+    """
+    Tests for loading field data for a batch of users at once.
+    """
+    def setUp(self):
+        super(TestMultiUserFieldDataCache, self).setUp()
+        self.user = UserFactory.create(username='user')
+        self.other_user = UserFactory.create(username='other_user')
+        self.descriptor = mock_descriptor([
+            mock_field(Scope.user_state, 'a_field'),
+            mock_field(Scope.user_state_summary, 'summary_field'),
+        ])
+
+    def _user_state_key(self, user):
+        """
+        Return the key of `a_field` in the user state of `user`.
+        """
+        return DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field')
+
+    def test_one_query_per_scope(self):
+        StudentModuleFactory.create(student=self.user, state=json.dumps({'a_field': 'user_value'}))
+        StudentModuleFactory.create(student=self.other_user, state=json.dumps({'a_field': 'other_value'}))
+        UserStateSummaryFactory.create(
+            usage_id=location('usage_id'), field_name='summary_field', value=json.dumps('shared_value')
+        )
+        with self.assertNumQueries(2):
+            field_data_cache = MultiUserFieldDataCache(
+                [self.descriptor], course_id, [self.user, self.other_user]
+            )
+
+        with self.assertNumQueries(0):
+            user_kvs = DjangoKeyValueStore(field_data_cache.for_user(self.user))
+            other_kvs = DjangoKeyValueStore(field_data_cache.for_user(self.other_user))
+            self.assertEquals('user_value', user_kvs.get(self._user_state_key(self.user)))
+            self.assertEquals('other_value', other_kvs.get(self._user_state_key(self.other_user)))
+            self.assertEquals('shared_value', user_kvs.get(user_state_summary_key('summary_field')))
+            self.assertEquals('shared_value', other_kvs.get(user_state_summary_key('summary_field')))
+
+    def test_user_without_state(self):
+        StudentModuleFactory.create(student=self.user, state=json.dumps({'a_field': 'user_value'}))
+        field_data_cache = MultiUserFieldDataCache([self.descriptor], course_id, [self.user, self.other_user])
+        other_user_key = self._user_state_key(self.other_user)
+        with self.assertNumQueries(0):
+            self.assertIsNone(field_data_cache.for_user(self.other_user).find(other_user_key))
+            self.assertIsNone(field_data_cache.find(other_user_key))
+
+    def test_find_user_outside_batch(self):
+        field_data_cache = MultiUserFieldDataCache([self.descriptor], course_id, [self.other_user])
+        with self.assertRaises(AssertionError):
+            field_data_cache.find(self._user_state_key(self.user))
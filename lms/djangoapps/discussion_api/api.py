@@ -10,6 +10,8 @@ from discussion_api.pagination import get_paginated_data
 from discussion_api.serializers import ThreadSerializer, get_context
 from django_comment_client.utils import get_accessible_discussion_modules
 from lms.lib.comment_client.thread import Thread
+from lms.lib.comment_client.user import User
+from lms.lib.comment_client.utils import perform_concurrently
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort_id
 from xmodule.tabs import DiscussionTab
 
@@ -103,8 +105,9 @@ def get_thread_list(request, course_key, page, page_size):
     discussion_api.views.ThreadViewSet for more detail.
     """
     course = _get_course_or_404(course_key, request.user)
-    context = get_context(course, request.user)
-    threads, result_page, num_pages, _ = Thread.search({
+    cc_requester = User.from_django_user(request.user)
+    context = get_context(course, request.user, cc_requester)
+    query_params = {
         "course_id": unicode(course.id),
         "group_id": (
             None if context["is_requester_privileged"] else
@@ -114,7 +117,12 @@ def get_thread_list(request, course_key, page, page_size):
         "sort_order": "desc",
         "page": page,
         "per_page": page_size,
-    })
+    }
+    # The requester and the threads are independent, so fetch them together
+    __, (threads, result_page, num_pages, _) = perform_concurrently(
+        cc_requester.retrieve,
+        lambda: Thread.search(query_params),
+    )
     # The comments service returns the last page of results if the requested
     # page is beyond the last page, but we want be consistent with DRF's general
     # behavior and return a 404 in that case
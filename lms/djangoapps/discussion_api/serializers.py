@@ -13,8 +13,14 @@ from lms.lib.comment_client.user import User
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort_names
 
 
-def get_context(course, requester):
-    """Returns a context appropriate for use with ThreadSerializer."""
+def get_context(course, requester, cc_requester=None):
+    """
+    Returns a context appropriate for use with ThreadSerializer.
+
+    If `cc_requester`, the comments service User of `requester`, is given,
+    it is used as is; the caller is responsible for retrieving it before
+    the context is used.
+    """
     # TODO: cache staff_user_ids and ta_user_ids if we need to improve perf
     staff_user_ids = {
         user.id
@@ -35,7 +41,7 @@ def get_context(course, requester):
         "is_requester_privileged": requester.id in staff_user_ids or requester.id in ta_user_ids,
         "staff_user_ids": staff_user_ids,
         "ta_user_ids": ta_user_ids,
-        "cc_requester": User.from_django_user(requester).retrieve(),
+        "cc_requester": cc_requester or User.from_django_user(requester).retrieve(),
     }
 
 
@@ -2,6 +2,7 @@
 import datetime
 import json
 import mock
+import threading
 from nose.plugins.attrib import attr
 from pytz import UTC
 from django.utils.timezone import UTC as django_utc
@@ -11,6 +12,8 @@ from django_comment_client.tests.unicode import UnicodeTestMixin
 import django_comment_client.utils as utils
 from django.core.urlresolvers import reverse
 from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import translation
 from edxmako import add_lookup
 
 from django_comment_client.tests.factories import RoleFactory
@@ -18,6 +21,7 @@ from django_comment_client.tests.unicode import UnicodeTestMixin
 import django_comment_client.utils as utils
 
 from courseware.tests.factories import InstructorFactory
+from lms.lib.comment_client.utils import CommentClientRequestError, perform_concurrently
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohort_settings
 from student.tests.factories import UserFactory, CourseEnrollmentFactory
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase
@@ -951,3 +955,46 @@ class RenderMustacheTests(TestCase):
         """
         add_lookup('main', '', package=__name__)
         self.assertEqual(utils.render_mustache('test.mustache', {}), 'Testing 1 2 3.\n')
+
+
+@attr('shard_1')
+@override_settings(COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS=4)
+class PerformConcurrentlyTestCase(TestCase):
+    """
+    Test the `perform_concurrently` comments service utility function.
+    """
+    def test_results_in_order(self):
+        self.assertEqual(perform_concurrently(lambda: 1, lambda: 2, lambda: 3), [1, 2, 3])
+
+    def test_runs_in_other_threads(self):
+        calling_thread = threading.current_thread()
+        threads = perform_concurrently(threading.current_thread, threading.current_thread)
+        self.assertNotIn(calling_thread, threads)
+
+    @override_settings(COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS=1)
+    def test_serial(self):
+        calling_thread = threading.current_thread()
+        threads = perform_concurrently(threading.current_thread, threading.current_thread)
+        self.assertEqual(threads, [calling_thread, calling_thread])
+
+    def test_first_exception_raised(self):
+        calls = []
+
+        def fail(status_code):
+            """
+            Raise a CommentClientRequestError with `status_code`.
+            """
+            calls.append(status_code)
+            raise CommentClientRequestError("error", status_code)
+
+        with self.assertRaises(CommentClientRequestError) as context:
+            perform_concurrently(lambda: fail(404), lambda: fail(403), lambda: calls.append(None))
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertItemsEqual(calls, [404, 403, None])
+
+    def test_language(self):
+        translation.activate('eo')
+        try:
+            self.assertEqual(perform_concurrently(translation.get_language, translation.get_language), ['eo', 'eo'])
+        finally:
+            translation.deactivate()
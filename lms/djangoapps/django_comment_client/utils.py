@@ -18,7 +18,7 @@ from django_comment_common.models import Role, FORUM_ROLE_STUDENT
 from django_comment_client.permissions import check_permissions_by_view, cached_has_permission
 from edxmako import lookup_template
 
-from courseware.access import has_access
+from courseware.access import has_access_to_descriptors
 from openedx.core.djangoapps.course_groups.cohorts import (
     get_course_cohort_settings, get_cohort_by_id, get_cohort_id, is_commentable_cohorted, is_course_cohorted
 )
@@ -75,10 +75,12 @@ def get_accessible_discussion_modules(course, user, include_all=False):  # pylin
                 return False
         return True
 
-    return [
-        module for module in all_modules
-        if has_required_keys(module) and (include_all or has_access(user, 'load', module, course.id))
-    ]
+    modules = [module for module in all_modules if has_required_keys(module)]
+    if include_all:
+        return modules
+
+    access = has_access_to_descriptors(user, 'load', modules, course.id)
+    return [module for module in modules if access[module.location]]
 
 
 def get_discussion_id_map(course, user):
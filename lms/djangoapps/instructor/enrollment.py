@@ -5,13 +5,18 @@ Does not include any access control, be sure to check access before calling.
 """
 
 import json
+import logging
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.urlresolvers import reverse
-from django.core.mail import send_mail
+from django.core.mail import send_mail, get_connection
+from django.core.validators import validate_email
 from django.utils.translation import override as override_language
 
-from student.models import CourseEnrollment, CourseEnrollmentAllowed
+from student.models import CourseEnrollment, CourseEnrollmentAllowed, UserProfile
+from courseware import persistent_grades
+from courseware.model_data import chunks
 from courseware.models import StudentModule
 from edxmako.shortcuts import render_to_string
 from lang_pref import LANGUAGE_KEY
@@ -21,6 +26,12 @@ from student.models import anonymous_id_for_user
 from openedx.core.djangoapps.user_api.models import UserPreference
 
 from microsite_configuration import microsite
+from instructor.views.tools import get_students_from_identifiers
+
+log = logging.getLogger(__name__)
+
+# The number of emails whose enrollment is changed at once by the bulk operations
+BULK_ENROLLMENT_BATCH_SIZE = 1000
 
 
 class EmailEnrollmentState(object):
@@ -48,6 +59,45 @@ class EmailEnrollmentState(object):
         self.full_name = full_name
         self.mode = mode
 
+    @classmethod
+    def for_emails(cls, course_id, emails):
+        """
+        Return a dict of the EmailEnrollmentState of each of `emails`, read
+        with a few queries for all of them.
+
+        Emails are matched regardless of case, as the database matches them.
+        The users whose emails match are in the returned states' `user_object`.
+        """
+        users = dict(
+            (user.email.lower(), user) for user in User.objects.filter(email__in=emails)
+        )
+        user_ids = [user.id for user in users.itervalues()]
+        full_names = dict(UserProfile.objects.filter(user__in=user_ids).values_list('user_id', 'name'))
+        enrollments = dict(
+            (enrollment.user_id, enrollment)
+            for enrollment in CourseEnrollment.objects.filter(course_id=course_id, user__in=user_ids)
+        )
+        allowed = dict(
+            (cea.email.lower(), cea)
+            for cea in CourseEnrollmentAllowed.objects.filter(course_id=course_id, email__in=emails)
+        )
+
+        states = {}
+        for email in emails:
+            state = cls.__new__(cls)
+            user = users.get(email.lower())
+            enrollment = enrollments.get(user.id) if user is not None else None
+            cea = allowed.get(email.lower())
+            state.user = user is not None
+            state.user_object = user
+            state.enrollment = enrollment is not None and enrollment.is_active
+            state.allowed = cea is not None
+            state.auto_enroll = cea is not None and bool(cea.auto_enroll)
+            state.full_name = full_names.get(user.id) if user is not None else None
+            state.mode = enrollment.mode if enrollment is not None else None
+            states[email] = state
+        return states
+
     def __repr__(self):
         return "{}(user={}, enrollment={}, allowed={}, auto_enroll={})".format(
             self.__class__.__name__,
@@ -163,6 +213,207 @@ def unenroll_email(course_id, student_email, email_students=False, email_params=
     return previous_state, after_state
 
 
+def bulk_enroll_email(course_id, student_emails, auto_enroll=False, email_students=False, email_params=None):
+    """
+    Enroll many students by email at once, as `enroll_email` enrolls each
+    of them, with a few queries for all of them.
+
+    `student_emails` is a list of the students' emails, which should not
+    hold more than BULK_ENROLLMENT_BATCH_SIZE of them.
+    `auto_enroll`, `email_students` and `email_params` are as for `enroll_email`.
+    Emails are written in each student's preferred language.
+
+    returns a dict of the pair of EmailEnrollmentState's of each email,
+        representing state before and after the action.
+    """
+    previous_states = EmailEnrollmentState.for_emails(course_id, student_emails)
+
+    users = []
+    allowed_emails = []
+    existing_allowed_emails = []
+    for email, state in previous_states.iteritems():
+        if state.user:
+            users.append(state.user_object)
+        elif state.allowed:
+            existing_allowed_emails.append(email)
+        else:
+            allowed_emails.append(email)
+
+    CourseEnrollment.bulk_enroll(users, course_id)
+    if existing_allowed_emails:
+        CourseEnrollmentAllowed.objects.filter(
+            course_id=course_id, email__in=existing_allowed_emails
+        ).update(auto_enroll=auto_enroll)
+    # The same email may be listed more than once, in different cases
+    new_allowed_emails = {}
+    for email in allowed_emails:
+        new_allowed_emails.setdefault(email.lower(), email)
+    CourseEnrollmentAllowed.objects.bulk_create([
+        CourseEnrollmentAllowed(course_id=course_id, email=email, auto_enroll=auto_enroll)
+        for email in new_allowed_emails.itervalues()
+    ])
+
+    if email_students:
+        messages = []
+        for email, state in previous_states.iteritems():
+            if state.user:
+                messages.append((email, 'enrolled_enroll', state))
+            else:
+                messages.append((email, 'allowed_enroll', state))
+        _send_mail_to_students(messages, email_params)
+
+    after_states = EmailEnrollmentState.for_emails(course_id, student_emails)
+
+    return dict((email, (previous_states[email], after_states[email])) for email in previous_states)
+
+
+def bulk_unenroll_email(course_id, student_emails, email_students=False, email_params=None):
+    """
+    Unenroll many students by email at once, as `unenroll_email` unenrolls
+    each of them, with a few queries for all of them.
+
+    `student_emails` is a list of the students' emails, which should not
+    hold more than BULK_ENROLLMENT_BATCH_SIZE of them.
+    `email_students` and `email_params` are as for `unenroll_email`.
+    Emails are written in each student's preferred language.
+
+    returns a dict of the pair of EmailEnrollmentState's of each email,
+        representing state before and after the action.
+    """
+    previous_states = EmailEnrollmentState.for_emails(course_id, student_emails)
+
+    CourseEnrollment.bulk_unenroll(
+        [state.user_object for state in previous_states.itervalues() if state.enrollment],
+        course_id
+    )
+    allowed_emails = [email for email, state in previous_states.iteritems() if state.allowed]
+    if allowed_emails:
+        CourseEnrollmentAllowed.objects.filter(course_id=course_id, email__in=allowed_emails).delete()
+
+    if email_students:
+        messages = []
+        for email, state in previous_states.iteritems():
+            if state.enrollment:
+                messages.append((email, 'enrolled_unenroll', state))
+            if state.allowed:
+                messages.append((email, 'allowed_unenroll', state))
+        _send_mail_to_students(messages, email_params)
+
+    after_states = EmailEnrollmentState.for_emails(course_id, student_emails)
+
+    return dict((email, (previous_states[email], after_states[email])) for email in previous_states)
+
+
+def update_enrollments_by_identifier(course_id, identifiers, action, auto_enroll=False, email_students=False,
+                                     email_params=None):
+    """
+    Enroll or unenroll students, identified by their emails or usernames,
+    in batches of BULK_ENROLLMENT_BATCH_SIZE.
+
+    `action` is 'enroll' or 'unenroll'.
+    `auto_enroll`, `email_students` and `email_params` are as for `enroll_email`.
+
+    Returns a list of the result of the action for each identifier, in order:
+        {'identifier': ..., 'before': {...}, 'after': {...}} with the
+        EmailEnrollmentState's before and after the action as dicts,
+        {'identifier': ..., 'invalidIdentifier': True} if the identifier
+        is neither a user nor a valid email, or
+        {'identifier': ..., 'error': True} if the action failed.
+    """
+    results = []
+    for batch in chunks(identifiers, BULK_ENROLLMENT_BATCH_SIZE):
+        results.extend(_update_enrollments_batch(
+            course_id, batch, action, auto_enroll, email_students, email_params
+        ))
+    return results
+
+
+def _update_enrollments_batch(course_id, identifiers, action, auto_enroll, email_students, email_params):
+    """
+    Enroll or unenroll one batch of students for update_enrollments_by_identifier.
+    """
+    students = get_students_from_identifiers(identifiers)
+    emails = {}
+    for identifier in identifiers:
+        email = students[identifier].email if identifier in students else identifier
+        try:
+            # Use django.core.validators.validate_email to check email address
+            # validity (obviously, cannot check if email actually /exists/,
+            # simply that it is plausibly valid)
+            validate_email(email)  # Raises ValidationError if invalid
+        except ValidationError:
+            continue
+        emails[identifier] = email
+
+    states = None
+    try:
+        if action == 'enroll':
+            states = bulk_enroll_email(
+                course_id, list(set(emails.itervalues())), auto_enroll, email_students, email_params
+            )
+        else:
+            states = bulk_unenroll_email(course_id, list(set(emails.itervalues())), email_students, email_params)
+    except Exception:  # pylint: disable=broad-except
+        # catch and log any exceptions
+        # so that one error doesn't cause a 500.
+        log.exception(u"Error while %sing %d students", action, len(emails))
+
+    results = []
+    for identifier in identifiers:
+        if identifier not in emails:
+            # Flag this email as an error if invalid, but continue checking
+            # the remaining in the list
+            results.append({
+                'identifier': identifier,
+                'invalidIdentifier': True,
+            })
+        elif states is None:
+            results.append({
+                'identifier': identifier,
+                'error': True,
+            })
+        else:
+            before, after = states[emails[identifier]]
+            results.append({
+                'identifier': identifier,
+                'before': before.to_dict(),
+                'after': after.to_dict(),
+            })
+    return results
+
+
+def _send_mail_to_students(messages, email_params):
+    """
+    Send the emails about a bulk enrollment action over one connection.
+
+    `messages` is a list of (email, message, EmailEnrollmentState) tuples,
+    where `message` is the type of email to send, as for
+    `send_mail_to_student`, and the state is the student's state before the
+    action. Each student is sent each type of email once, in their
+    preferred language.
+    """
+    user_ids = [state.user_object.id for __, __, state in messages if state.user]
+    languages = dict(
+        UserPreference.objects.filter(user__in=user_ids, key=LANGUAGE_KEY).values_list('user_id', 'value')
+    )
+
+    connection = get_connection()
+    sent = set()
+    for email, message, state in messages:
+        if (email.lower(), message) in sent:
+            continue
+        sent.add((email.lower(), message))
+
+        params = dict(email_params)
+        params['message'] = message
+        params['email_address'] = email
+        language = None
+        if state.user:
+            params['full_name'] = state.full_name
+            language = languages.get(state.user_object.id)
+        send_mail_to_student(email, params, language=language, connection=connection)
+
+
 def send_beta_role_email(action, user, email_params):
     """
     Send an email to a user added or removed as a beta tester.
@@ -223,6 +474,8 @@ def reset_student_attempts(course_id, student, module_state_key, delete_module=F
 
     if delete_module:
         module_to_reset.delete()
+        if persistent_grades.persistent_grades_enabled():
+            persistent_grades.invalidate_block_grade(student.id, course_id, module_state_key)
     else:
         _reset_module_attempts(module_to_reset)
 
@@ -294,7 +547,7 @@ def get_email_params(course, auto_enroll, secure=True):
     return email_params
 
 
-def send_mail_to_student(student, param_dict, language=None):
+def send_mail_to_student(student, param_dict, language=None, connection=None):
     """
     Construct the email using templates and then send it.
     `student` is the student's email address (a `str`),
@@ -316,6 +569,9 @@ def send_mail_to_student(student, param_dict, language=None):
     of the currently-logged in user (that is, the user sending the email) will
     be used.
 
+    `connection` is the email connection to send it over, to send many emails
+    over one connection. If None a new connection is opened.
+
     Returns a boolean indicating whether the email was sent successfully.
     """
 
@@ -383,7 +639,7 @@ def send_mail_to_student(student, param_dict, language=None):
             settings.DEFAULT_FROM_EMAIL
         )
 
-        send_mail(subject, message, from_address, [student], fail_silently=False)
+        send_mail(subject, message, from_address, [student], fail_silently=False, connection=connection)
 
 
 def render_message_to_string(subject_template, message_template, param_dict, language=None):
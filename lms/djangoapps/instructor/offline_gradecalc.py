@@ -4,17 +4,35 @@
 Computing grades of a large number of students can take a long time.  These routines allow grades to
 be computed offline, by a batch process (eg cronjob).
 
-The grades are stored in the OfflineComputedGrade table of the courseware model.
+The grades are stored in the OfflineComputedGrade table of the courseware model. The gradebook
+of the instructor dashboard pages through them, sorted and filtered on the final grade.
 """
+import base64
 import json
 import time
+from datetime import timedelta
+from itertools import islice
 
 from json import JSONEncoder
 from courseware import grades, models
-from courseware.courses import get_course_by_id
 from django.contrib.auth.models import User
+from django.db.models import Q
+from django.utils import timezone
 
-from instructor.utils import DummyRequest
+# Number of students shown on a page of the gradebook
+GRADEBOOK_PAGE_SIZE = 100
+
+# Age after which the gradebook of a small course is recomputed when viewed, so
+# that it stays current while the pages of one visit show the same snapshot
+SMALL_COURSE_GRADES_MAX_AGE = timedelta(minutes=1)
+
+# Orderings of the gradebook, by sort name. Each ends with a unique field, so
+# that a page can start right after the last row of the one before it.
+GRADEBOOK_SORTS = {
+    'username': ('user__username',),
+    'percent': ('percent_grade', 'id'),
+    '-percent': ('-percent_grade', 'id'),
+}
 
 
 class MyEncoder(JSONEncoder):
@@ -33,36 +51,91 @@ def offline_grade_calculation(course_key):
     Compute grades for all students for a specified course, and save results to the DB.
     '''
 
-    tstart = time.time()
     enrolled_students = User.objects.filter(
         courseenrollment__course_id=course_key,
         courseenrollment__is_active=1
     ).prefetch_related("groups").order_by('username')
 
-    enc = MyEncoder()
-
     print "{} enrolled students".format(len(enrolled_students))
-    course = get_course_by_id(course_key)
 
-    for student in enrolled_students:
-        request = DummyRequest()
-        request.user = student
-        request.session = {}
+    def print_progress(succeeded, failed):  # pylint: disable=missing-docstring
+        # print statement used because this is run by a management command
+        print "{} done, {} failed".format(succeeded, failed)
 
-        gradeset = grades.grade(student, request, course, keep_raw_scores=True)
-        gs = enc.encode(gradeset)
-        ocg, _created = models.OfflineComputedGrade.objects.get_or_create(user=student, course_id=course_key)
-        ocg.gradeset = gs
-        ocg.save()
-        print "%s done" % student  	# print statement used because this is run by a management command
+    ocgl = calculate_offline_grades(course_key, enrolled_students, print_progress)
+    print ocgl
+    print "All Done!"
+
+
+def calculate_offline_grades(course_key, students, update_progress=None):
+    '''
+    Compute the grades of `students` in a course and save them to the DB, in place of those computed
+    before. Grades of anyone else, such as students who have since unenrolled, are deleted; students
+    who fail to be graded keep their previous grades.
+
+    If given, `update_progress` is called with the numbers of students graded and of students who
+    failed to be graded so far, after each chunk of students.
+
+    Returns the OfflineComputedGradeLog of the calculation.
+    '''
+    tstart = time.time()
+    # Every grade saved from now on was updated after this; the DB may not keep fractions of seconds
+    calculation_start = timezone.now().replace(microsecond=0)
+    enc = MyEncoder()
+    succeeded = failed = 0
+
+    graded = grades.iterate_grades_for(course_key, students, keep_raw_scores=True)
+    while True:
+        chunk = list(islice(graded, grades.GRADE_PREFETCH_CHUNK_SIZE))
+        if not chunk:
+            break
+        gradesets = [(student, gradeset) for student, gradeset, err_msg in chunk if not err_msg]
+        failed_ids = [student.id for student, __, err_msg in chunk if err_msg]
+        _save_offline_grades(course_key, gradesets, enc)
+        if failed_ids:
+            models.OfflineComputedGrade.objects.filter(
+                course_id=course_key, user__in=failed_ids
+            ).update(updated=timezone.now())
+        succeeded += len(gradesets)
+        failed += len(failed_ids)
+        if update_progress is not None:
+            update_progress(succeeded, failed)
+
+    models.OfflineComputedGrade.objects.filter(course_id=course_key, updated__lt=calculation_start).delete()
 
     tend = time.time()
     dt = tend - tstart
 
-    ocgl = models.OfflineComputedGradeLog(course_id=course_key, seconds=dt, nstudents=len(enrolled_students))
+    ocgl = models.OfflineComputedGradeLog(course_id=course_key, seconds=dt, nstudents=succeeded + failed)
     ocgl.save()
-    print ocgl
-    print "All Done!"
+    return ocgl
+
+
+def _save_offline_grades(course_key, gradesets, enc):
+    '''
+    Save `gradesets`, a list of (student, gradeset) pairs, as the offline computed grades of the
+    students, reading the grades already saved for them in one query and creating the rest in another.
+    '''
+    existing = {
+        ocg.user_id: ocg
+        for ocg in models.OfflineComputedGrade.objects.filter(
+            course_id=course_key, user__in=[student.id for student, __ in gradesets]
+        )
+    }
+
+    new_grades = []
+    for student, gradeset in gradesets:
+        ocg = existing.get(student.id)
+        if ocg is None:
+            ocg = models.OfflineComputedGrade(user=student, course_id=course_key)
+            new_grades.append(ocg)
+        ocg.gradeset = enc.encode(gradeset)
+        ocg.percent_grade = gradeset['percent']
+        ocg.letter_grade = gradeset['grade'] or ''
+        if ocg.pk is not None:
+            ocg.save()
+
+    models.OfflineComputedGrade.objects.bulk_create(new_grades)
 
 
 def offline_grades_available(course_key):
@@ -76,6 +149,62 @@ def offline_grades_available(course_key):
     return ocgl.latest('created')
 
 
+def offline_grades_page(course_key, sort='username', letter_grade=None, min_percent=None, max_percent=None,
+                        cursor=None, page_size=None):
+    '''
+    Returns a page of the offline computed grades of a course, as a pair of the list of its
+    OfflineComputedGrades, with their users, and the cursor of the next page, or None if it's the last.
+
+    Grades are ordered by `sort`, one of GRADEBOOK_SORTS. They can be filtered to a `letter_grade`,
+    '' meaning no letter grade, and to percent grades between `min_percent` and `max_percent`, from
+    0 to 1. The page after another is found from its `cursor`, given the same sort and filters,
+    without counting the rows before it, so that any page takes as long as the first. Pages have
+    `page_size` grades, GRADEBOOK_PAGE_SIZE by default.
+
+    Raises ValueError if `sort` or `cursor` isn't valid.
+    '''
+    if sort not in GRADEBOOK_SORTS:
+        raise ValueError(u"Invalid gradebook sort: {}".format(sort))
+    if page_size is None:
+        page_size = GRADEBOOK_PAGE_SIZE
+
+    ocgs = models.OfflineComputedGrade.objects.filter(course_id=course_key)
+    if letter_grade is not None:
+        ocgs = ocgs.filter(letter_grade=letter_grade)
+    if min_percent is not None:
+        ocgs = ocgs.filter(percent_grade__gte=min_percent)
+    if max_percent is not None:
+        ocgs = ocgs.filter(percent_grade__lte=max_percent)
+    if cursor is not None:
+        ocgs = ocgs.filter(_after_cursor(sort, cursor))
+
+    page = list(ocgs.select_related('user__profile').order_by(*GRADEBOOK_SORTS[sort])[:page_size + 1])
+    if len(page) <= page_size:
+        return page, None
+
+    page = page[:page_size]
+    last = page[-1]
+    value = last.user.username if sort == 'username' else last.percent_grade
+    return page, base64.urlsafe_b64encode(json.dumps([value, last.id]))
+
+
+def _after_cursor(sort, cursor):
+    '''
+    Returns the filter on offline computed grades which follow the row `cursor` points to in the
+    ordering `sort`. Raises ValueError if `cursor` isn't valid.
+    '''
+    try:
+        value, last_id = json.loads(base64.urlsafe_b64decode(str(cursor)))
+    except (TypeError, ValueError, UnicodeEncodeError):
+        raise ValueError(u"Invalid gradebook cursor: {}".format(cursor))
+
+    if sort == 'username':
+        return Q(user__username__gt=value)
+    if sort == 'percent':
+        return Q(percent_grade__gt=value) | Q(percent_grade=value, id__gt=last_id)
+    return Q(percent_grade__lt=value) | Q(percent_grade=value, id__gt=last_id)
+
+
 def student_grades(student, request, course, keep_raw_scores=False, use_offline=False):
     '''
     This is the main interface to get grades.  It has the same parameters as grades.grade, as well
@@ -1083,6 +1083,21 @@ class TestInstructorAPIEnrollment(ModuleStoreTestCase, LoginEnrollmentTestCase):
             )
         )
 
+    @override_settings(BULK_ENROLLMENT_TASK_THRESHOLD=1)
+    def test_enroll_in_background_task(self):
+        url = reverse('students_update_enrollment', kwargs={'course_id': self.course.id.to_deprecated_string()})
+        params = {
+            'identifiers': u'{}, {}'.format(self.notenrolled_student.email, self.notregistered_email),
+            'action': 'enroll',
+        }
+        with patch('instructor_task.api.submit_update_enrollments') as submit:
+            response = self.client.post(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(json.loads(response.content)['task_submitted'])
+        self.assertTrue(submit.called)
+        # The students are enrolled by the task
+        self.assertFalse(CourseEnrollment.is_enrolled(self.notenrolled_student, self.course.id))
+
     def test_enroll_already_enrolled_student(self):
         """
         Ensure that already enrolled "verified" students cannot be downgraded
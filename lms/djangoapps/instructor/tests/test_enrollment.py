@@ -18,6 +18,8 @@ from xmodule.modulestore.tests.factories import CourseFactory
 from student.models import CourseEnrollment, CourseEnrollmentAllowed
 from instructor.enrollment import (
     EmailEnrollmentState,
+    bulk_enroll_email,
+    bulk_unenroll_email,
     enroll_email,
     get_email_params,
     reset_student_attempts,
@@ -294,6 +296,67 @@ class TestInstructorUnenrollDB(TestEnrollmentChangeBase):
         return self._run_state_change_test(before_ideal, after_ideal, action)
 
 
+@attr('shard_1')
+class TestInstructorBulkEnrollDB(TestCase):
+    """
+    Test instructor.enrollment.bulk_enroll_email and bulk_unenroll_email
+    against enroll_email and unenroll_email.
+    """
+    def setUp(self):
+        super(TestInstructorBulkEnrollDB, self).setUp()
+        self.course_key = SlashSeparatedCourseKey('Robot', 'fAKE', 'C-%-se-%-ID')
+        # The same students are changed one by one in this course
+        self.other_course_key = SlashSeparatedCourseKey('Robot', 'fAKE', 'Other')
+
+        enrolled = UserFactory()
+        unenrolled = UserFactory()
+        self.emails = [
+            enrolled.email,
+            unenrolled.email,
+            'robot-allowed@robot.org',
+            'robot-allowed-auto@robot.org',
+            'robot-not-an-email-yet@robot.org',
+        ]
+        for course_key in (self.course_key, self.other_course_key):
+            CourseEnrollment.enroll(enrolled, course_key)
+            CourseEnrollment.enroll(unenrolled, course_key)
+            CourseEnrollment.unenroll(unenrolled, course_key)
+            CourseEnrollmentAllowed.objects.create(email='robot-allowed@robot.org', course_id=course_key)
+            CourseEnrollmentAllowed.objects.create(
+                email='robot-allowed-auto@robot.org', course_id=course_key, auto_enroll=True
+            )
+
+    def _assert_same_states(self, bulk_states, states):
+        """
+        Assert that the (before, after) pairs of EmailEnrollmentState's of
+        each email are the same.
+        """
+        self.assertItemsEqual(bulk_states.keys(), self.emails)
+        for email in self.emails:
+            self.assertEqual(
+                [state.to_dict() for state in bulk_states[email]],
+                [state.to_dict() for state in states[email]],
+                email
+            )
+
+    def test_bulk_enroll(self):
+        states = dict(
+            (email, enroll_email(self.other_course_key, email, auto_enroll=True)) for email in self.emails
+        )
+        bulk_states = bulk_enroll_email(self.course_key, self.emails, auto_enroll=True)
+        self._assert_same_states(bulk_states, states)
+
+    def test_bulk_unenroll(self):
+        states = dict((email, unenroll_email(self.other_course_key, email)) for email in self.emails)
+        bulk_states = bulk_unenroll_email(self.course_key, self.emails)
+        self._assert_same_states(bulk_states, states)
+
+    def test_for_emails(self):
+        states = EmailEnrollmentState.for_emails(self.course_key, self.emails)
+        for email in self.emails:
+            self.assertEqual(states[email].to_dict(), EmailEnrollmentState(self.course_key, email).to_dict())
+
+
 @attr('shard_1')
 class TestInstructorEnrollmentStudentModule(TestCase):
     """ Test student module manipulations. """
@@ -1,14 +1,21 @@
 """
 Tests of the instructor dashboard spoc gradebook
 """
+import re
+from datetime import timedelta
 
+from django.conf import settings
 from django.core.urlresolvers import reverse
+from django.utils import timezone
+from mock import patch
 from nose.plugins.attrib import attr
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from student.tests.factories import UserFactory, CourseEnrollmentFactory, AdminFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from capa.tests.response_xml_factory import StringResponseXMLFactory
+from courseware.models import OfflineComputedGradeLog
 from courseware.tests.factories import StudentModuleFactory
+from instructor.offline_gradecalc import SMALL_COURSE_GRADES_MAX_AGE, offline_grades_page
 from xmodule.modulestore.django import modulestore
 
 
@@ -169,3 +176,88 @@ class TestLetterCutoffPolicy(TestGradebook):
         # User 0 has 0 on the class [1]
         # One use at the top of the page [1]
         self.assertEquals(3, self.response.content.count('grade_None'))
+
+
+@attr('shard_1')
+class TestGradebookPages(TestGradebook):
+    """
+    Tests sorting, filtering and paging through the gradebook, which shows
+    grades computed before the request. User N has a grade of N * 10%.
+    """
+    def _user_ids(self, sort='username', page_size=4, **filters):
+        """
+        Return the ids of the users of all the gradebook pages, in order.
+        """
+        user_ids = []
+        cursor = None
+        while True:
+            ocgs, cursor = offline_grades_page(self.course.id, sort, cursor=cursor, page_size=page_size, **filters)
+            self.assertLessEqual(len(ocgs), page_size)
+            user_ids.extend(ocg.user_id for ocg in ocgs)
+            if cursor is None:
+                return user_ids
+
+    def test_sorts(self):
+        users_by_grade = [user.id for user in self.users]
+        self.assertEqual(self._user_ids('username'), [user.id for user in sorted(self.users, key=lambda u: u.username)])
+        self.assertEqual(self._user_ids('percent'), users_by_grade)
+        self.assertEqual(self._user_ids('-percent'), users_by_grade[::-1])
+
+    def test_filters(self):
+        users_by_grade = [user.id for user in self.users]
+        # Default >= 50% passes
+        self.assertEqual(self._user_ids('percent', letter_grade='Pass'), users_by_grade[5:])
+        self.assertEqual(self._user_ids('percent', letter_grade=''), users_by_grade[:5])
+        self.assertEqual(self._user_ids('percent', min_percent=0.3, max_percent=0.6), users_by_grade[3:7])
+
+    def test_grades_are_not_recomputed(self):
+        self.assertEqual(OfflineComputedGradeLog.objects.filter(course_id=self.course.id).count(), 1)
+        response = self.client.get(reverse('spoc_gradebook', args=(self.course.id.to_deprecated_string(),)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OfflineComputedGradeLog.objects.filter(course_id=self.course.id).count(), 1)
+        self.assertIn('gradebook-computed', response.content)
+
+    def test_stale_grades_of_small_course_are_recomputed(self):
+        OfflineComputedGradeLog.objects.filter(course_id=self.course.id).update(
+            created=timezone.now() - SMALL_COURSE_GRADES_MAX_AGE - timedelta(seconds=1)
+        )
+        response = self.client.get(reverse('spoc_gradebook', args=(self.course.id.to_deprecated_string(),)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OfflineComputedGradeLog.objects.filter(course_id=self.course.id).count(), 2)
+
+    @patch.dict(settings.FEATURES, {'MAX_ENROLLMENT_INSTR_BUTTONS': USER_COUNT - 1})
+    def test_stale_grades_of_large_course_are_not_recomputed(self):
+        OfflineComputedGradeLog.objects.filter(course_id=self.course.id).update(
+            created=timezone.now() - SMALL_COURSE_GRADES_MAX_AGE - timedelta(seconds=1)
+        )
+        response = self.client.get(reverse('spoc_gradebook', args=(self.course.id.to_deprecated_string(),)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OfflineComputedGradeLog.objects.filter(course_id=self.course.id).count(), 1)
+
+    @patch('instructor.offline_gradecalc.GRADEBOOK_PAGE_SIZE', 4)
+    def test_next_page(self):
+        url = reverse('spoc_gradebook', args=(self.course.id.to_deprecated_string(),))
+        response = self.client.get(url, {'sort': '-percent'})
+        pages = 1
+        while 'gradebook-next-page' in response.content:
+            url = re.search(r'class="gradebook-next-page" href="([^"]+)"', response.content).group(1)
+            self.assertIn('sort=-percent', url)
+            response = self.client.get(url.replace('&amp;', '&'))
+            self.assertEqual(response.status_code, 200)
+            pages += 1
+        # 11 students, 4 to a page
+        self.assertEqual(pages, 3)
+
+    def test_invalid_parameters(self):
+        url = reverse('spoc_gradebook', args=(self.course.id.to_deprecated_string(),))
+        for params in ({'sort': 'email'}, {'cursor': 'not a cursor'}, {'min_percent': 'lots'}):
+            self.assertEqual(self.client.get(url, params).status_code, 400)
+
+    @patch('instructor_task.api.submit_refresh_gradebook')
+    def test_refresh(self, mock_submit):
+        url = reverse('refresh_spoc_gradebook', args=(self.course.id.to_deprecated_string(),))
+        response = self.client.post(url)
+        self.assertRedirects(
+            response, reverse('spoc_gradebook', args=(self.course.id.to_deprecated_string(),))
+        )
+        self.assertTrue(mock_submit.called)
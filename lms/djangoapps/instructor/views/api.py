@@ -16,6 +16,8 @@ from django_future.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_POST
 from django.views.decorators.cache import cache_control
 from django.core.exceptions import ValidationError, PermissionDenied
+from django.core.files.base import ContentFile
+from django.core.files.storage import DefaultStorage
 from django.core.mail.message import EmailMessage
 from django.db import IntegrityError
 from django.core.urlresolvers import reverse
@@ -23,6 +25,7 @@ from django.core.validators import validate_email
 from django.utils.translation import ugettext as _
 from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseNotFound
 from django.utils.html import strip_tags
+from django.utils import timezone
 from django.shortcuts import redirect
 import string  # pylint: disable=deprecated-module
 import random
@@ -66,15 +69,17 @@ from instructor_task.api_helper import AlreadyRunningError
 from instructor_task.models import ReportStore
 import instructor.enrollment as enrollment
 from instructor.enrollment import (
-    get_user_email_language,
-    enroll_email,
     send_mail_to_student,
     get_email_params,
     send_beta_role_email,
-    unenroll_email,
 )
 from instructor.access import list_with_level, allow_access, revoke_access, ROLES, update_forum_role
-from instructor.offline_gradecalc import student_grades
+from instructor.offline_gradecalc import (
+    SMALL_COURSE_GRADES_MAX_AGE,
+    calculate_offline_grades,
+    offline_grades_available,
+    offline_grades_page,
+)
 import instructor_analytics.basic
 import instructor_analytics.distributions
 import instructor_analytics.csvs
@@ -334,6 +339,17 @@ def register_and_enroll_students(request, course_id):  # pylint: disable=too-man
         finally:
             upload_file.close()
 
+        # Look up the accounts of all the rows at once, rather than row by row
+        emails = [student[EMAIL_INDEX] for student in students if len(student) == 4]
+        existing_users = dict(
+            (user.email.lower(), user) for user in User.objects.filter(email__in=emails)
+        )
+        enrolled_user_ids = set(CourseEnrollment.objects.filter(
+            course_id=course_id, user__in=[user.id for user in existing_users.itervalues()], is_active=True
+        ).values_list('user_id', flat=True))
+        # The username of the row of each existing user's email, to enroll them at once
+        usernames_to_enroll = {}
+
         generated_passwords = []
         row_num = 0
         for student in students:
@@ -362,14 +378,14 @@ def register_and_enroll_students(request, course_id):  # pylint: disable=too-man
                 row_errors.append({
                     'username': username, 'email': email, 'response': _('Invalid email {email_address}.').format(email_address=email)})
             else:
-                if User.objects.filter(email=email).exists():
+                if email.lower() in existing_users:
                     # Email address already exists. assume it is the correct user
                     # and just register the user in the course and send an enrollment email.
-                    user = User.objects.get(email=email)
+                    user = existing_users[email.lower()]
 
                     # see if it is an exact match with email and username
                     # if it's not an exact match then just display a warning message, but continue onwards
-                    if not User.objects.filter(email=email, username=username).exists():
+                    if user.username.lower() != username.lower():
                         warning_message = _(
                             'An account with email {email} exists but the provided username {username} '
                             'is different. Enrolling anyway with {email}.'
@@ -386,15 +402,10 @@ def register_and_enroll_students(request, course_id):  # pylint: disable=too-man
                             email
                         )
 
-                    # make sure user is enrolled in course
-                    if not CourseEnrollment.is_enrolled(user, course_id):
-                        CourseEnrollment.enroll(user, course_id)
-                        log.info(
-                            u'user %s enrolled in the course %s',
-                            username,
-                            course.id,
-                        )
-                        enroll_email(course_id=course_id, student_email=email, auto_enroll=True, email_students=True, email_params=email_params)
+                    # make sure user is enrolled in course; all of them are enrolled at once below
+                    if user.id not in enrolled_user_ids:
+                        enrolled_user_ids.add(user.id)
+                        usernames_to_enroll[email] = username
                 else:
                     # This email does not yet exist, so we need to create a new account
                     # If username already exists in the database, then create_and_enroll_user
@@ -402,7 +413,7 @@ def register_and_enroll_students(request, course_id):  # pylint: disable=too-man
                     password = generate_unique_password(generated_passwords)
 
                     try:
-                        create_and_enroll_user(email, username, name, country, password, course_id)
+                        user = create_and_enroll_user(email, username, name, country, password, course_id)
                     except IntegrityError:
                         row_errors.append({
                             'username': username, 'email': email, 'response': _('Username {user} already exists.').format(user=username)})
@@ -411,6 +422,8 @@ def register_and_enroll_students(request, course_id):  # pylint: disable=too-man
                         row_errors.append({
                             'username': username, 'email': email, 'response': type(ex).__name__})
                     else:
+                        existing_users[email.lower()] = user
+                        enrolled_user_ids.add(user.id)
                         # It's a new user, an email will be sent to each newly created user.
                         email_params['message'] = 'account_creation_and_enrollment'
                         email_params['email_address'] = email
@@ -419,6 +432,24 @@ def register_and_enroll_students(request, course_id):  # pylint: disable=too-man
                         send_mail_to_student(email, email_params)
                         log.info(u'email sent to new created user at %s', email)
 
+        if usernames_to_enroll:
+            enrollment_results = enrollment.update_enrollments_by_identifier(
+                course_id, usernames_to_enroll.keys(), 'enroll', auto_enroll=True, email_students=True,
+                email_params=get_email_params(course, True, secure=request.is_secure())
+            )
+            for result in enrollment_results:
+                email = result['identifier']
+                if result.get('error'):
+                    row_errors.append({
+                        'username': usernames_to_enroll[email], 'email': email,
+                        'response': _('Could not enroll {email}.').format(email=email)})
+                else:
+                    log.info(
+                        u'user %s enrolled in the course %s',
+                        usernames_to_enroll[email],
+                        course.id,
+                    )
+
     else:
         general_errors.append({
             'username': '', 'email': '', 'response': _('File is not attached.')
@@ -473,6 +504,8 @@ def create_and_enroll_user(email, username, name, country, password, course_id):
     # try to enroll the user in this course
     CourseEnrollment.enroll(user, course_id)
 
+    return user
+
 
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
@@ -522,68 +555,42 @@ def students_update_enrollment(request, course_id):
     auto_enroll = request.POST.get('auto_enroll') in ['true', 'True', True]
     email_students = request.POST.get('email_students') in ['true', 'True', True]
 
+    if action not in ('enroll', 'unenroll'):
+        return HttpResponseBadRequest(strip_tags(
+            "Unrecognized action '{}'".format(action)
+        ))
+
+    if len(identifiers) > settings.BULK_ENROLLMENT_TASK_THRESHOLD:
+        # Enrolling this many students could outlast the request, so it is
+        # done by a background task, which uploads its results as a report.
+        identifiers_file = ContentFile(u'\n'.join(identifiers).encode('utf-8'))
+        file_name = DefaultStorage().save(
+            course_and_time_based_filename_generator(course_id, "enrollment") + '.txt', identifiers_file
+        )
+        try:
+            instructor_task.api.submit_update_enrollments(
+                request, course_id, file_name, action, auto_enroll, email_students
+            )
+        except AlreadyRunningError:
+            return JsonResponse(
+                {'error': _("Students are already being enrolled or unenrolled. Try again when that finishes.")},
+                status=400
+            )
+        return JsonResponse({
+            'action': action,
+            'results': [],
+            'auto_enroll': auto_enroll,
+            'task_submitted': True,
+        })
+
     email_params = {}
     if email_students:
         course = get_course_by_id(course_id)
         email_params = get_email_params(course, auto_enroll, secure=request.is_secure())
 
-    results = []
-    for identifier in identifiers:
-        # First try to get a user object from the identifer
-        user = None
-        email = None
-        language = None
-        try:
-            user = get_student_from_identifier(identifier)
-        except User.DoesNotExist:
-            email = identifier
-        else:
-            email = user.email
-            language = get_user_email_language(user)
-
-        try:
-            # Use django.core.validators.validate_email to check email address
-            # validity (obviously, cannot check if email actually /exists/,
-            # simply that it is plausibly valid)
-            validate_email(email)  # Raises ValidationError if invalid
-
-            if action == 'enroll':
-                before, after = enroll_email(
-                    course_id, email, auto_enroll, email_students, email_params, language=language
-                )
-            elif action == 'unenroll':
-                before, after = unenroll_email(
-                    course_id, email, email_students, email_params, language=language
-                )
-            else:
-                return HttpResponseBadRequest(strip_tags(
-                    "Unrecognized action '{}'".format(action)
-                ))
-
-        except ValidationError:
-            # Flag this email as an error if invalid, but continue checking
-            # the remaining in the list
-            results.append({
-                'identifier': identifier,
-                'invalidIdentifier': True,
-            })
-
-        except Exception as exc:  # pylint: disable=broad-except
-            # catch and log any exceptions
-            # so that one error doesn't cause a 500.
-            log.exception(u"Error while #{}ing student")
-            log.exception(exc)
-            results.append({
-                'identifier': identifier,
-                'error': True,
-            })
-
-        else:
-            results.append({
-                'identifier': identifier,
-                'before': before.to_dict(),
-                'after': after.to_dict(),
-            })
+    results = enrollment.update_enrollments_by_identifier(
+        course_id, identifiers, action, auto_enroll, email_students, email_params
+    )
 
     response_payload = {
         'action': action,
@@ -2386,36 +2393,71 @@ def enable_certificate_generation(request, course_id=None):
     return redirect(_instructor_dash_url(course_key, section='certificates'))
 
 
-#---- Gradebook (shown to small courses only) ----
+#---- Gradebook ----
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @require_level('staff')
 def spoc_gradebook(request, course_id):
     """
-    Show the gradebook for this course:
-    - Only shown for courses with enrollment < settings.FEATURES.get("MAX_ENROLLMENT_INSTR_BUTTONS")
+    Show a page of the gradebook for this course, from the grades last computed
+    offline by `refresh_spoc_gradebook`:
+    - Sorted by `sort`, one of offline_gradecalc.GRADEBOOK_SORTS, by username by default
+    - Filtered by `letter_grade`, 'None' for students without one, and by
+      `min_percent` and `max_percent`, from 0 to 100
+    - Continued from the `cursor` the previous page links to
     - Only displayed to course staff
+
+    The grades of courses with enrollment <= settings.FEATURES.get("MAX_ENROLLMENT_INSTR_BUTTONS")
+    are recomputed within the request when they are older than
+    offline_gradecalc.SMALL_COURSE_GRADES_MAX_AGE.
     """
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
-    course = get_course_with_access(request.user, 'staff', course_key, depth=None)
+    course = get_course_with_access(request.user, 'staff', course_key)
 
-    enrolled_students = User.objects.filter(
-        courseenrollment__course_id=course_key,
-        courseenrollment__is_active=1
-    ).order_by('username').select_related("profile")
+    grades_log = offline_grades_available(course_key)
+    max_enrollment_for_buttons = settings.FEATURES.get("MAX_ENROLLMENT_INSTR_BUTTONS")
+    live_grades = CourseEnrollment.num_enrolled_in(course_key) <= max_enrollment_for_buttons
+    if live_grades and (not grades_log or timezone.now() - grades_log.created > SMALL_COURSE_GRADES_MAX_AGE):
+        grades_log = calculate_offline_grades(course_key, CourseEnrollment.users_enrolled_in(course_key))
 
-    # possible extension: implement pagination to show to large courses
+    sort = request.GET.get('sort', 'username')
+    letter_grade = request.GET.get('letter_grade', '')
+    try:
+        min_percent, max_percent = [
+            float(request.GET[param]) / 100 if request.GET.get(param) else None
+            for param in ('min_percent', 'max_percent')
+        ]
+        ocgs, next_cursor = offline_grades_page(
+            course_key,
+            sort=sort,
+            letter_grade=('' if letter_grade == 'None' else letter_grade) or None,
+            min_percent=min_percent,
+            max_percent=max_percent,
+            cursor=request.GET.get('cursor'),
+        )
+    except ValueError:
+        return HttpResponseBadRequest(_("Invalid gradebook sort, filter or page."))
 
     student_info = [
         {
-            'username': student.username,
-            'id': student.id,
-            'email': student.email,
-            'grade_summary': student_grades(student, request, course),
-            'realname': student.profile.name,
+            'username': ocg.user.username,
+            'id': ocg.user.id,
+            'email': ocg.user.email,
+            'grade_summary': json.loads(ocg.gradeset),
+            'realname': ocg.user.profile.name,
         }
-        for student in enrolled_students
+        for ocg in ocgs
     ]
 
+    next_page_url = None
+    if next_cursor is not None:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_page_url = u'{}?{}'.format(request.path, params.urlencode())
+
+    refreshing = instructor_task.api.get_running_instructor_tasks(course_key).filter(
+        task_type='refresh_gradebook'
+    ).exists()
+
     return render_to_response('courseware/gradebook.html', {
         'students': student_info,
         'course': course,
@@ -2423,9 +2465,35 @@ def spoc_gradebook(request, course_id):
         # Checked above
         'staff_access': True,
         'ordered_grades': sorted(course.grade_cutoffs.items(), key=lambda i: i[1], reverse=True),
+        'grades_log': grades_log,
+        'live_grades': live_grades,
+        'refreshing': refreshing,
+        'sort': sort,
+        'letter_grade_filter': letter_grade,
+        'min_percent': request.GET.get('min_percent', ''),
+        'max_percent': request.GET.get('max_percent', ''),
+        'next_page_url': next_page_url,
     })
 
 
+@ensure_csrf_cookie
+@cache_control(no_cache=True, no_store=True, must_revalidate=True)
+@require_level('staff')
+@require_POST
+def refresh_spoc_gradebook(request, course_id):
+    """
+    Start an instructor task recomputing the grades the gradebook of this
+    course shows, and go back to the gradebook.
+    """
+    course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
+    try:
+        instructor_task.api.submit_refresh_gradebook(request, course_key)
+    except AlreadyRunningError:
+        # The gradebook says its grades are being recomputed either way
+        pass
+    return redirect(reverse('spoc_gradebook', kwargs={'course_id': course_key.to_deprecated_string()}))
+
+
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @require_level('staff')
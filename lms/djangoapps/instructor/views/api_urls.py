@@ -107,6 +107,8 @@ urlpatterns = patterns(
     # spoc gradebook
     url(r'^gradebook$',
         'instructor.views.api.spoc_gradebook', name='spoc_gradebook'),
+    url(r'^gradebook/refresh$',
+        'instructor.views.api.refresh_spoc_gradebook', name='refresh_spoc_gradebook'),
 
     # Cohort management
     url(r'add_users_to_cohorts$',
@@ -97,6 +97,34 @@ def get_student_from_identifier(unique_student_identifier):
     return student
 
 
+def get_students_from_identifiers(unique_student_identifiers):
+    """
+    Gets the student objects of many email addresses or usernames at once,
+    as get_student_from_identifier() gets each of them.
+
+    Returns a dict of the student object of each identifier which one is
+    found for. Identifiers are matched regardless of case, as the database
+    matches them.
+    """
+    identifiers = [strip_if_string(identifier) for identifier in unique_student_identifiers]
+    emails = [identifier for identifier in identifiers if "@" in identifier]
+    usernames = [identifier for identifier in identifiers if "@" not in identifier]
+
+    students = {}
+    if emails:
+        students.update((student.email.lower(), student) for student in User.objects.filter(email__in=emails))
+    if usernames:
+        students.update(
+            (student.username.lower(), student) for student in User.objects.filter(username__in=usernames)
+        )
+
+    return dict(
+        (identifier, students[strip_if_string(identifier).lower()])
+        for identifier in unique_student_identifiers
+        if strip_if_string(identifier).lower() in students
+    )
+
+
 def require_student_from_identifier(unique_student_identifier):
     """
     Same as get_student_from_identifier() but will raise a DashboardError if
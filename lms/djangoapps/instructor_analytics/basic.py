@@ -17,6 +17,9 @@ from django.core.exceptions import ObjectDoesNotExist
 from microsite_configuration import microsite
 
 
+# Number of students loaded at a time by iter_enrolled_students_features
+STUDENT_FEATURES_CHUNK_SIZE = 1000
+
 STUDENT_FEATURES = ('id', 'username', 'first_name', 'last_name', 'is_staff', 'email')
 PROFILE_FEATURES = ('name', 'language', 'location', 'year_of_birth', 'gender',
                     'level_of_education', 'mailing_address', 'goals', 'meta')
@@ -159,6 +162,16 @@ def enrolled_students_features(course_key, features):
         {'username': 'username3', 'first_name': 'firstname3'}
     ]
     """
+    return list(iter_enrolled_students_features(course_key, features, chunk_size=None))
+
+
+def iter_enrolled_students_features(course_key, features, chunk_size=STUDENT_FEATURES_CHUNK_SIZE):
+    """
+    Like `enrolled_students_features`, but yield the student features one
+    student at a time. Students are loaded `chunk_size` at a time, or all at
+    once if `chunk_size` is None, so that the memory used doesn't grow with
+    the number of students enrolled.
+    """
     include_cohort_column = 'cohort' in features
 
     students = User.objects.filter(
@@ -206,7 +219,21 @@ def enrolled_students_features(course_key, features):
             )
         return student_dict
 
-    return [extract_student(student, features) for student in students]
+    last_username = None
+    while True:
+        students_chunk = students
+        if chunk_size is not None:
+            if last_username is not None:
+                students_chunk = students_chunk.filter(username__gt=last_username)
+            students_chunk = students_chunk[:chunk_size]
+        students_chunk = list(students_chunk)
+
+        for student in students_chunk:
+            yield extract_student(student, features)
+
+        if chunk_size is None or len(students_chunk) < chunk_size:
+            return
+        last_username = students_chunk[-1].username
 
 
 def coupon_codes_features(features, coupons_list):
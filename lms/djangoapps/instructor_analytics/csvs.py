@@ -14,6 +14,11 @@ def create_csv_response(filename, header, datarows):
 
     header   e.g. ['Name', 'Email']
     datarows e.g. [['Jim', 'jim@edy.org'], ['Jake', 'jake@edy.org'], ...]
+
+    `datarows` may be any iterable of rows, such as a generator. The whole
+    body is written before the response is returned, so that middleware
+    can read its content and any queries run within the request; reports
+    too large for that are stored with a ReportStore instead.
     """
     response = HttpResponse(mimetype='text/csv')
     response['Content-Disposition'] = 'attachment; filename={0}'\
@@ -64,17 +69,26 @@ def format_dictlist(dictlist, features):
     }
     """
 
+    header = features
+    datarows = list(iter_dictlist_rows(dictlist, features))
+
+    return header, datarows
+
+
+def iter_dictlist_rows(dictlist, features):
+    """
+    Like `format_dictlist`, but yield the datarows one at a time, so that
+    `dictlist` may be any iterable of dictionaries, such as a generator.
+    """
     def dict_to_entry(dct):
         """ Convert dictionary to a list for a csv row """
         relevant_items = [(k, v) for (k, v) in dct.items() if k in features]
-        ordered = sorted(relevant_items, key=lambda (k, v): header.index(k))
+        ordered = sorted(relevant_items, key=lambda (k, v): features.index(k))
         vals = [v for (_, v) in ordered]
         return vals
 
-    header = features
-    datarows = map(dict_to_entry, dictlist)
-
-    return header, datarows
+    for dct in dictlist:
+        yield dict_to_entry(dct)
 
 
 def format_instances(instances, features):
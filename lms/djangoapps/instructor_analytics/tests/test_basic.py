@@ -15,6 +15,7 @@ from shoppingcart.models import (
 from course_modes.models import CourseMode
 from instructor_analytics.basic import (
     sale_record_features, sale_order_record_features, enrolled_students_features, course_registration_features,
+    iter_enrolled_students_features,
     coupon_codes_features, AVAILABLE_FEATURES, STUDENT_FEATURES, PROFILE_FEATURES
 )
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
@@ -52,6 +53,15 @@ class TestAnalyticsBasic(ModuleStoreTestCase):
             self.assertEqual(userreport.keys(), ['username'])
             self.assertIn(userreport['username'], [user.username for user in self.users])
 
+    def test_iter_enrolled_students_features_chunked(self):
+        # 30 students in chunks of 7 take 5 queries, the last one partial
+        with self.assertNumQueries(5):
+            userreports = list(iter_enrolled_students_features(self.course_key, ['username'], chunk_size=7))
+        self.assertEqual(
+            [userreport['username'] for userreport in userreports],
+            sorted(user.username for user in self.users)
+        )
+
     def test_enrolled_students_features_keys(self):
         query_features = ('username', 'name', 'email')
         for feature in query_features:
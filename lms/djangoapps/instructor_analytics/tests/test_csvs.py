@@ -27,6 +27,16 @@ class TestAnalyticsCSVS(TestCase):
         self.assertEqual(res['Content-Disposition'], 'attachment; filename={0}'.format('robot.csv'))
         self.assertEqual(res.content.strip(), '"Name","Email"\r\n"Jim","jim@edy.org"\r\n"Jake","jake@edy.org"\r\n"Jeeves","jeeves@edy.org"')
 
+    def test_create_csv_response_generator(self):
+        header = ['Name', 'Email']
+        datarows = ([name, '{}@edy.org'.format(name.lower())] for name in ['Jim', 'Jake'])
+
+        res = create_csv_response('robot.csv', header, datarows)
+        # The rows are all written before the response is returned
+        self.assertEqual(list(datarows), [])
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        self.assertEqual(res.content.strip(), '"Name","Email"\r\n"Jim","jim@edy.org"\r\n"Jake","jake@edy.org"')
+
     def test_create_csv_response_empty(self):
         header = []
         datarows = []
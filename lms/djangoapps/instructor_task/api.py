@@ -22,6 +22,8 @@ from instructor_task.tasks import (
     calculate_problem_grade_report,
     calculate_students_features_csv,
     cohort_students,
+    update_enrollments,
+    refresh_gradebook,
 )
 
 from instructor_task.api_helper import (
@@ -373,3 +375,39 @@ def submit_cohort_students(request, course_key, file_name):
     task_key = ""
 
     return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
+def submit_update_enrollments(request, course_key, file_name, action, auto_enroll, email_students):
+    """
+    Request to have students, listed by email or username in the stored
+    file `file_name`, enrolled or unenrolled in bulk.
+
+    Raises AlreadyRunningError if students are currently being enrolled or unenrolled.
+    """
+    task_type = 'update_enrollments'
+    task_class = update_enrollments
+    task_input = {
+        'file_name': file_name,
+        'action': action,
+        'auto_enroll': auto_enroll,
+        'email_students': email_students,
+        'secure': request.is_secure(),
+    }
+    task_key = ""
+
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
+def submit_refresh_gradebook(request, course_key):
+    """
+    Request to have the grades of all students computed and saved for the
+    gradebook of the course.
+
+    Raises AlreadyRunningError if the gradebook is already being refreshed.
+    """
+    task_type = 'refresh_gradebook'
+    task_class = refresh_gradebook
+    task_input = {}
+    task_key = ""
+
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
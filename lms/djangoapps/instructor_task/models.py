@@ -19,6 +19,7 @@ import csv
 import json
 import hashlib
 import os.path
+import tempfile
 import urllib
 
 from boto.s3.connection import S3Connection
@@ -190,12 +191,50 @@ class InstructorTask(models.Model):
         return json.dumps({'message': 'Task revoked before running'})
 
 
+class InstructorSubtask(models.Model):
+    """
+    Stores the status of one subtask of an InstructorTask.
+
+    Each subtask updates only its own row, so that subtasks completing at the
+    same time don't wait on each other; the progress of the parent task is
+    rolled up from these rows.
+
+    `instructor_task` is the InstructorTask the subtask does part of the work of.
+    `subtask_id` stores the id used by celery for the subtask.
+    `state` stores the last known celery state of the subtask.
+    The counts are those of a `instructor_task.subtasks.SubtaskStatus`.
+    """
+    instructor_task = models.ForeignKey(InstructorTask, db_index=True)
+    subtask_id = models.CharField(max_length=255)
+    state = models.CharField(max_length=50, db_index=True)
+    attempted = models.IntegerField(default=0)
+    succeeded = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    retried_nomax = models.IntegerField(default=0)
+    retried_withmax = models.IntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = (('instructor_task', 'subtask_id'),)
+
+    def __repr__(self):
+        return 'InstructorSubtask<%r>' % ({
+            'instructor_task_id': self.instructor_task_id,  # pylint: disable=no-member
+            'subtask_id': self.subtask_id,
+            'state': self.state,
+        },)
+
+    def __unicode__(self):
+        return unicode(repr(self))
+
+
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. `store_rows()` accepts any iterable of rows, such as a
+    generator, and writes them out as they are produced, so the memory used
+    to store a report doesn't depend on its number of rows.
     """
     @classmethod
     def from_config(cls):
@@ -211,13 +250,85 @@ class ReportStore(object):
 
     def _get_utf8_encoded_rows(self, rows):
         """
-        Given a list of `rows` containing unicode strings, return a
-        new list of rows with those strings encoded as utf-8 for CSV
+        Given an iterable of `rows` containing unicode strings, yield
+        the rows with those strings encoded as utf-8 for CSV
         compatibility.
         """
         for row in rows:
             yield [unicode(item).encode('utf-8') for item in row]
 
+    def _get_unicode_rows(self, csv_file):
+        """
+        Read the utf-8 encoded CSV `csv_file` and yield its rows as lists of
+        unicode strings, closing the file once all of them are read.
+        """
+        try:
+            for row in csv.reader(csv_file):
+                yield [item.decode('utf-8') for item in row]
+        finally:
+            csv_file.close()
+
+
+class S3MultipartUpload(object):
+    """
+    A write-only file object that uploads what is written to it to an S3
+    `key`. Data is buffered until `part_size` bytes have been written, and
+    each full part is then uploaded as part of a multipart upload, so memory
+    use doesn't depend on the size of the file. Files that fit in a single
+    part are uploaded with a single request when the file is closed.
+
+    S3 requires every part but the last to be at least 5MB.
+    """
+    def __init__(self, key, headers, part_size):
+        self.key = key
+        self.headers = headers
+        self.part_size = part_size
+        self.buffer = StringIO()
+        self.multipart_upload = None
+        self.num_parts = 0
+
+    def write(self, data):
+        """
+        Buffer `data`, uploading the buffer as a part once it is full.
+        """
+        self.buffer.write(data)
+        if self.buffer.tell() >= self.part_size:
+            self._upload_part()
+
+    def _upload_part(self):
+        """
+        Upload the buffered data as the next part of the multipart upload,
+        starting it if needed.
+        """
+        if self.multipart_upload is None:
+            self.multipart_upload = self.key.bucket.initiate_multipart_upload(self.key.key, headers=self.headers)
+        self.num_parts += 1
+        self.multipart_upload.upload_part_from_file(StringIO(self.buffer.getvalue()), self.num_parts)
+        self.buffer = StringIO()
+
+    def close(self):
+        """
+        Upload any remaining data and complete the upload.
+        """
+        if self.multipart_upload is None:
+            data = self.buffer.getvalue()
+            headers = dict(self.headers)
+            headers["Content-Length"] = len(data)
+            self.key.set_contents_from_string(data, headers=headers)
+        else:
+            if self.buffer.tell():
+                self._upload_part()
+            self.multipart_upload.complete_upload()
+        self.buffer = StringIO()
+
+    def cancel(self):
+        """
+        Abort the upload, discarding any parts already uploaded.
+        """
+        if self.multipart_upload is not None:
+            self.multipart_upload.cancel_upload()
+        self.buffer = StringIO()
+
 
 class S3ReportStore(ReportStore):
     """
@@ -231,8 +342,12 @@ class S3ReportStore(ReportStore):
     conventions on where files are stored to know what to display. Clients using
     this class can name the final file whatever they want.
     """
-    def __init__(self, bucket_name, root_path):
+    # Size of the parts in which reports are uploaded to S3, in bytes
+    MULTIPART_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, bucket_name, root_path, gzip=True):
         self.root_path = root_path
+        self.gzip = gzip
 
         conn = S3Connection(
             settings.AWS_ACCESS_KEY_ID,
@@ -252,13 +367,16 @@ class S3ReportStore(ReportStore):
             ROOT_PATH : The path you want to store all course files under. Do not
                         use a leading or trailing slash. e.g. "staging" or
                         "staging/2013", not "/staging", or "/staging/"
+            GZIP : Optional. Whether CSV files are stored gzip-encoded, which
+                   browsers decompress transparently. Defaults to True.
 
         Since S3 access relies on boto, you must also define `AWS_ACCESS_KEY_ID`
         and `AWS_SECRET_ACCESS_KEY` in settings.
         """
         return cls(
             settings.GRADES_DOWNLOAD['BUCKET'],
-            settings.GRADES_DOWNLOAD['ROOT_PATH']
+            settings.GRADES_DOWNLOAD['ROOT_PATH'],
+            gzip=settings.GRADES_DOWNLOAD.get('GZIP', True),
         )
 
     def key_for(self, course_id, filename):
@@ -307,30 +425,66 @@ class S3ReportStore(ReportStore):
 
     def store_rows(self, course_id, filename, rows):
         """
-        Given a `course_id`, `filename`, and `rows` (each row is an iterable of
-        strings), create a buffer that is a gzip'd csv file, and then `store()`
-        that buffer.
+        Given a `course_id`, `filename`, and `rows` (an iterable of rows, each
+        an iterable of strings), write them as a csv file, gzip'd unless the
+        store is configured otherwise, and upload it to S3 in parts as it is
+        written.
 
         Even though we store it in gzip format, browsers will transparently
         download and decompress it. Filenames should end in `.csv`, not `.gz`.
         """
-        output_buffer = StringIO()
-        gzip_file = GzipFile(fileobj=output_buffer, mode="wb")
-        csvwriter = csv.writer(gzip_file)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        gzip_file.close()
-
-        self.store(course_id, filename, output_buffer)
+        headers = {"Content-Type": "text/csv"}
+        if self.gzip:
+            headers["Content-Encoding"] = "gzip"
+        upload = S3MultipartUpload(self.key_for(course_id, filename), headers, self.MULTIPART_UPLOAD_PART_SIZE)
+        try:
+            output_file = GzipFile(fileobj=upload, mode="wb") if self.gzip else upload
+            csvwriter = csv.writer(output_file)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            if self.gzip:
+                output_file.close()
+            upload.close()
+        except Exception:
+            upload.cancel()
+            raise
+
+    def iter_rows(self, course_id, filename):
+        """
+        Return an iterator over the rows, as lists of unicode strings, of the
+        CSV file stored by `store_rows()` under `filename`. The file is
+        downloaded to a temporary file rather than read into memory. Raises
+        IOError if there is no such file.
+        """
+        key = self.bucket.get_key(self.key_for(course_id, filename).key)
+        if key is None:
+            raise IOError(u"No report file {} for course {}".format(filename, course_id))
+        temp_file = tempfile.TemporaryFile()
+        key.get_contents_to_file(temp_file)
+        temp_file.seek(0)
+        if self.gzip:
+            return self._get_unicode_rows(GzipFile(fileobj=temp_file, mode="rb"))
+        return self._get_unicode_rows(temp_file)
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file stored under `filename`, if there is one.
+        """
+        self.key_for(course_id, filename).delete()
 
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples. `url`
-        can be plugged straight into an href
+        can be plugged straight into an href. Files stored in subdirectories of
+        the course, such as partial reports, are not listed.
         """
         course_dir = self.key_for(course_id, '')
+        keys = [
+            key for key in self.bucket.list(prefix=course_dir.key)
+            if "/" not in key.key[len(course_dir.key):]
+        ]
         return [
             (key.key.split("/")[-1], key.generate_url(expires_in=300))
-            for key in sorted(self.bucket.list(prefix=course_dir.key), reverse=True, key=lambda k: k.last_modified)
+            for key in sorted(keys, reverse=True, key=lambda k: k.last_modified)
         ]
 
 
@@ -381,21 +535,48 @@ class LocalFSReportStore(ReportStore):
         full_path = self.path_to(course_id, filename)
         directory = os.path.dirname(full_path)
         if not os.path.exists(directory):
-            os.mkdir(directory)
+            os.makedirs(directory)
 
         with open(full_path, "wb") as f:
             f.write(buff.getvalue())
 
     def store_rows(self, course_id, filename, rows):
         """
-        Given a course_id, filename, and rows (each row is an iterable of strings),
-        write this data out.
+        Given a course_id, filename, and rows (an iterable of rows, each an
+        iterable of strings), write this data out. Rows are written to a
+        temporary file as they are produced, which is only moved into place
+        once complete, so a partially written file is never visible.
+        """
+        full_path = self.path_to(course_id, filename)
+        directory = os.path.dirname(full_path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        temp_fd, temp_path = tempfile.mkstemp(dir=self.root_path)
+        try:
+            with os.fdopen(temp_fd, "wb") as temp_file:
+                csvwriter = csv.writer(temp_file)
+                csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            os.rename(temp_path, full_path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+    def iter_rows(self, course_id, filename):
+        """
+        Return an iterator over the rows, as lists of unicode strings, of the
+        CSV file stored under `filename`. Raises IOError if there is no such
+        file.
         """
-        output_buffer = StringIO()
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+        return self._get_unicode_rows(open(self.path_to(course_id, filename), "rb"))
 
-        self.store(course_id, filename, output_buffer)
+    def delete(self, course_id, filename):
+        """
+        Delete the file stored under `filename`, if there is one.
+        """
+        full_path = self.path_to(course_id, filename)
+        if os.path.exists(full_path):
+            os.remove(full_path)
 
     def links_for(self, course_id):
         """
@@ -403,12 +584,17 @@ class LocalFSReportStore(ReportStore):
         can be plugged straight into an href. Note that `LocalFSReportStore`
         will generate `file://` type URLs, so you'll need to copy the URL and
         open it in a new browser window. Again, this class is only meant for
-        local development.
+        local development. Files stored in subdirectories of the course, such
+        as partial reports, are not listed.
         """
         course_dir = self.path_to(course_id, '')
         if not os.path.exists(course_dir):
             return []
-        files = [(filename, os.path.join(course_dir, filename)) for filename in os.listdir(course_dir)]
+        files = [
+            (filename, os.path.join(course_dir, filename))
+            for filename in os.listdir(course_dir)
+            if os.path.isfile(os.path.join(course_dir, filename))
+        ]
         files.sort(key=lambda (filename, full_path): os.path.getmtime(full_path), reverse=True)
 
         return [
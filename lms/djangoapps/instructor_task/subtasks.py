@@ -12,9 +12,11 @@ from celery.states import SUCCESS, READY_STATES, RETRY
 import dogstats_wrapper as dog_stats_api
 
 from django.db import transaction, DatabaseError
+from django.db.models import Count, Sum
 from django.core.cache import cache
+from django.utils import timezone
 
-from instructor_task.models import InstructorTask, PROGRESS, QUEUING
+from instructor_task.models import InstructorTask, InstructorSubtask, PROGRESS, QUEUING
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -23,6 +25,13 @@ SUBTASK_LOCK_EXPIRE = 60 * 10  # Lock expires in 10 minutes
 # Number of times to retry if a subtask update encounters a lock on the InstructorTask.
 # (These are recursive retries, so don't make this number too large.)
 MAX_DATABASE_LOCK_RETRIES = 5
+# The progress of an InstructorTask is rolled up from the status of its subtasks at most
+# once in this many seconds, and when its last subtask completes.
+PROGRESS_ROLLUP_INTERVAL = 5
+# Number of InstructorSubtask rows to create per query.
+SUBTASK_CREATE_BATCH_SIZE = 50
+# The counts of SubtaskStatus that are stored in InstructorSubtask.
+SUBTASK_STATUS_COUNTS = ['attempted', 'succeeded', 'failed', 'skipped', 'retried_nomax', 'retried_withmax']
 
 
 class DuplicateTaskException(Exception):
@@ -213,6 +222,18 @@ class SubtaskStatus(object):
         """Return unicode version of a SubtaskStatus object representation."""
         return unicode(repr(self))
 
+    @classmethod
+    def from_model(cls, subtask):
+        """Construct a SubtaskStatus object from an InstructorSubtask."""
+        options = {name: getattr(subtask, name) for name in SUBTASK_STATUS_COUNTS}
+        return cls.create(subtask.subtask_id, state=subtask.state, **options)
+
+    def update_model(self, subtask):
+        """Copy the status to an InstructorSubtask."""
+        for name in SUBTASK_STATUS_COUNTS:
+            setattr(subtask, name, getattr(self, name))
+        subtask.state = self.state
+
 
 def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
     """
@@ -226,14 +247,14 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
     task_progress messages.
 
     The InstructorTask's "subtasks" field is also initialized.  This is also a JSON-serialized dict.
-    Keys include 'total', 'succeeded', 'retried', 'failed', which are counters for the number of
-    subtasks.  'Total' is set here to the total number, while the other three are initialized to zero.
+    Keys include 'total', 'succeeded', 'failed', which are counters for the number of
+    subtasks.  'Total' is set here to the total number, while the other two are initialized to zero.
     Once the counters for 'succeeded' and 'failed' match the 'total', the subtasks are done and
     the InstructorTask's "status" will be changed to SUCCESS.
 
-    The "subtasks" field also contains a 'status' key, that contains a dict that stores status
-    information for each subtask.  The value for each subtask (keyed by its task_id)
-    is its subtask status, as defined by SubtaskStatus.to_dict().
+    An InstructorSubtask is created for each subtask, to store its status, as defined by
+    SubtaskStatus.  Any InstructorSubtasks of an earlier queuing of the same InstructorTask
+    are deleted, so that those subtasks are rejected if they run.
 
     This information needs to be set up in the InstructorTask before any of the subtasks start
     running.  If not, there is a chance that the subtasks could complete before the parent task
@@ -259,22 +280,35 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
 
     # Write out the subtasks information.
     num_subtasks = len(subtask_id_list)
-    # Note that may not be necessary to store initial value with all those zeroes!
-    # Write out as a dict, so it will go more smoothly into json.
-    subtask_status = {subtask_id: (SubtaskStatus.create(subtask_id)).to_dict() for subtask_id in subtask_id_list}
     subtask_dict = {
         'total': num_subtasks,
         'succeeded': 0,
         'failed': 0,
-        'status': subtask_status
     }
     entry.subtasks = json.dumps(subtask_dict)
 
-    # and save the entry immediately, before any subtasks actually start work:
+    # and save the entry and its subtasks immediately, before any subtasks actually start work:
     entry.save_now()
+    _create_subtasks(entry, subtask_id_list)
     return task_progress
 
 
+@transaction.autocommit
+def _create_subtasks(entry, subtask_id_list):
+    """
+    Replace the InstructorSubtasks of the InstructorTask `entry` by one for each of
+    `subtask_id_list`, in the initial state.
+
+    Autocommit annotation makes sure the rows are committed before the subtasks are queued.
+    """
+    InstructorSubtask.objects.filter(instructor_task=entry).delete()
+    for index in range(0, len(subtask_id_list), SUBTASK_CREATE_BATCH_SIZE):
+        InstructorSubtask.objects.bulk_create([
+            InstructorSubtask(instructor_task=entry, subtask_id=subtask_id, state=QUEUING)
+            for subtask_id in subtask_id_list[index:index + SUBTASK_CREATE_BATCH_SIZE]
+        ])
+
+
 # pylint: disable=bad-continuation
 def queue_subtasks_for_query(
     entry,
@@ -415,9 +449,9 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
     # Confirm that the InstructorTask knows about this particular subtask.
-    subtask_dict = json.loads(entry.subtasks)
-    subtask_status_info = subtask_dict['status']
-    if current_task_id not in subtask_status_info:
+    try:
+        subtask = InstructorSubtask.objects.get(instructor_task=entry, subtask_id=current_task_id)
+    except InstructorSubtask.DoesNotExist:
         format_str = "Unexpected task_id '{}': unable to find status for subtask of instructor task '{}': rejecting task {}"
         msg = format_str.format(current_task_id, entry, new_subtask_status)
         TASK_LOG.warning(msg)
@@ -426,7 +460,7 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
 
     # Confirm that the InstructorTask doesn't think that this subtask has already been
     # performed successfully.
-    subtask_status = SubtaskStatus.from_dict(subtask_status_info[current_task_id])
+    subtask_status = SubtaskStatus.from_model(subtask)
     subtask_state = subtask_status.state
     if subtask_state in READY_STATES:
         format_str = "Unexpected task_id '{}': already completed - status {} for subtask of instructor task '{}': rejecting task {}"
@@ -462,18 +496,20 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
 
 def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0):
     """
-    Update the status of the subtask in the parent InstructorTask object tracking its progress.
+    Update the status of the subtask, and the progress of the parent InstructorTask.
 
-    Because select_for_update is used to lock the InstructorTask object while it is being updated,
-    multiple subtasks updating at the same time may time out while waiting for the lock.
-    The actual update operation is surrounded by a try/except/else that permits the update to be
-    retried if the transaction times out.
+    The status of each subtask is stored in its own InstructorSubtask, so subtasks don't
+    wait on each other to update it.  Updates may still fail, for instance if the database
+    times out, so the actual update operation is surrounded by a try/except/else that
+    permits the update to be retried.
 
     The subtask lock acquired in the call to check_subtask_is_valid() is released here, only when
     the attempting of retries has concluded.
+
+    Returns True if this update completed the last of the subtasks of the InstructorTask.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        return _update_subtask_status(entry_id, current_task_id, new_subtask_status)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
@@ -481,7 +517,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
             TASK_LOG.info("Retrying to update status for subtask %s of instructor task %d with status %s:  retry %d",
                           current_task_id, entry_id, new_subtask_status, retry_count)
             dog_stats_api.increment('instructor_task.subtask.retry_after_failed_update')
-            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
+            return update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
         else:
             TASK_LOG.info("Failed to update status after %d retries for subtask %s of instructor task %d with status %s",
                           retry_count, current_task_id, entry_id, new_subtask_status)
@@ -497,89 +533,51 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 @transaction.commit_manually
 def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     """
-    Update the status of the subtask in the parent InstructorTask object tracking its progress.
+    Update the status of the subtask in its InstructorSubtask, and then the progress of
+    the parent InstructorTask.
 
-    Uses select_for_update to lock the InstructorTask object while it is being updated.
-    The operation is surrounded by a try/except/else that permit the manual transaction to be
+    Only the subtask's own InstructorSubtask is locked while its status is written, and the
+    write is committed before the parent's progress is rolled up, so that the rollup sees it.
+    The operations are surrounded by a try/except/else that permit the manual transaction to be
     committed on completion, or rolled back on error.
 
-    The InstructorTask's "task_output" field is updated.  This is a JSON-serialized dict.
-    Accumulates values for 'attempted', 'succeeded', 'failed', 'skipped' from `new_subtask_status`
-    into the corresponding values in the InstructorTask's task_output.  Also updates the 'duration_ms'
-    value with the current interval since the original InstructorTask started.  Note that this
-    value is only approximate, since the subtask may be running on a different server than the
-    original task, so is subject to clock skew.
+    When a subtask is done, the progress of the parent InstructorTask is rolled up from the
+    status of all of its subtasks; see _rollup_subtask_status.  To keep that from being done
+    for every subtask of a task with many of them, it is done at most once in each
+    PROGRESS_ROLLUP_INTERVAL, and when the last subtask is done.
 
-    The InstructorTask's "subtasks" field is also updated.  This is also a JSON-serialized dict.
-    Keys include 'total', 'succeeded', 'retried', 'failed', which are counters for the number of
-    subtasks.  'Total' is expected to have been set at the time the subtasks were created.
-    The other three counters are incremented depending on the value of `status`.  Once the counters
-    for 'succeeded' and 'failed' match the 'total', the subtasks are done and the InstructorTask's
-    "status" is changed to SUCCESS.
-
-    The "subtasks" field also contains a 'status' key, that contains a dict that stores status
-    information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
-    is the value of the SubtaskStatus.to_dict(), but could be expanded in future to store information
-    about failure messages, progress made, etc.
+    Returns True if this update completed the InstructorTask.  Subtasks finishing at the same
+    time may each find that all of the subtasks are done, but only one of them completes it.
     """
     TASK_LOG.info("Preparing to update status for subtask %s for instructor task %d with status %s",
                   current_task_id, entry_id, new_subtask_status)
 
     try:
-        entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
-        subtask_dict = json.loads(entry.subtasks)
-        subtask_status_info = subtask_dict['status']
-        if current_task_id not in subtask_status_info:
+        try:
+            subtask = InstructorSubtask.objects.select_for_update().get(
+                instructor_task_id=entry_id, subtask_id=current_task_id
+            )
+        except InstructorSubtask.DoesNotExist:
             # unexpected error -- raise an exception
             format_str = "Unexpected task_id '{}': unable to update status for subtask of instructor task '{}'"
             msg = format_str.format(current_task_id, entry_id)
             TASK_LOG.warning(msg)
             raise ValueError(msg)
 
-        # Update status:
-        subtask_status_info[current_task_id] = new_subtask_status.to_dict()
-
-        # Update the parent task progress.
-        # Set the estimate of duration, but only if it
-        # increases.  Clock skew between time() returned by different machines
-        # may result in non-monotonic values for duration.
-        task_progress = json.loads(entry.task_output)
-        start_time = task_progress['start_time']
-        prev_duration = task_progress['duration_ms']
-        new_duration = int((time() - start_time) * 1000)
-        task_progress['duration_ms'] = max(prev_duration, new_duration)
+        new_subtask_status.update_model(subtask)
+        subtask.save()
+        transaction.commit()
 
-        # Update counts only when subtask is done.
+        # Progress is only rolled up when a subtask is done.
         # In future, we can make this more responsive by updating status
-        # between retries, by comparing counts that change from previous
-        # retry.
-        new_state = new_subtask_status.state
-        if new_subtask_status is not None and new_state in READY_STATES:
-            for statname in ['attempted', 'succeeded', 'failed', 'skipped']:
-                task_progress[statname] += getattr(new_subtask_status, statname)
-
-        # Figure out if we're actually done (i.e. this is the last task to complete).
-        # This is easier if we just maintain a counter, rather than scanning the
-        # entire new_subtask_status dict.
-        if new_state == SUCCESS:
-            subtask_dict['succeeded'] += 1
-        elif new_state in READY_STATES:
-            subtask_dict['failed'] += 1
-        num_remaining = subtask_dict['total'] - subtask_dict['succeeded'] - subtask_dict['failed']
-
-        # If we're done with the last task, update the parent status to indicate that.
-        # At present, we mark the task as having succeeded.  In future, we should see
-        # if there was a catastrophic failure that occurred, and figure out how to
-        # report that here.
-        if num_remaining <= 0:
-            entry.task_state = SUCCESS
-        entry.subtasks = json.dumps(subtask_dict)
-        entry.task_output = InstructorTask.create_output_for_success(task_progress)
-
-        TASK_LOG.debug("about to save....")
-        entry.save()
-        TASK_LOG.info("Task output updated to %s for subtask %s of instructor task %d",
-                      entry.task_output, current_task_id, entry_id)
+        # between retries.
+        completed = False
+        if new_subtask_status.state in READY_STATES:
+            done = not InstructorSubtask.objects.filter(
+                instructor_task_id=entry_id
+            ).exclude(state__in=READY_STATES).exists()
+            if done or cache.add("instructor_task-rollup-{}".format(entry_id), 'true', PROGRESS_ROLLUP_INTERVAL):
+                completed = _rollup_subtask_status(entry_id, done)
     except Exception:
         TASK_LOG.exception("Unexpected error while updating InstructorTask.")
         transaction.rollback()
@@ -588,3 +586,75 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     else:
         TASK_LOG.debug("about to commit....")
         transaction.commit()
+        return completed
+
+
+def _rollup_subtask_status(entry_id, done):
+    """
+    Update the progress of the InstructorTask with id `entry_id` from the status of its subtasks.
+
+    The InstructorTask's "task_output" field is updated.  This is a JSON-serialized dict.
+    Values for 'attempted', 'succeeded', 'failed', 'skipped' are summed over the subtasks that
+    are done.  Also updates the 'duration_ms' value with the current interval since the original
+    InstructorTask started.  Note that this value is only approximate, since the subtask may be
+    running on a different server than the original task, so is subject to clock skew.
+
+    The InstructorTask's "subtasks" field is also updated.  This is also a JSON-serialized dict.
+    Keys include 'total', 'succeeded', 'failed', which are counters for the number of subtasks.
+    'Total' is expected to have been set at the time the subtasks were created.  The other two
+    count the subtasks that succeeded, or are done but didn't.  If `done`, all the subtasks are
+    done, and the InstructorTask's "status" is changed to SUCCESS.
+
+    The rollup is one query grouping the InstructorSubtasks by state, and the InstructorTask is
+    written with an update rather than locked: subtasks completing at the same time may each
+    write a rollup, and an update never overwrites the final one.  The update only matches a
+    task that isn't complete yet, so of the subtasks finding that all of them are done, only
+    the first to write its rollup changes a row.
+
+    Returns True if this rollup completed the InstructorTask.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_dict = json.loads(entry.subtasks)
+    task_progress = json.loads(entry.task_output)
+
+    subtask_dict['succeeded'] = 0
+    subtask_dict['failed'] = 0
+    for statname in ['attempted', 'succeeded', 'failed', 'skipped']:
+        task_progress[statname] = 0
+    totals_by_state = InstructorSubtask.objects.filter(instructor_task_id=entry_id).values('state').annotate(
+        num_subtasks=Count('id'),
+        attempted=Sum('attempted'),
+        succeeded=Sum('succeeded'),
+        failed=Sum('failed'),
+        skipped=Sum('skipped'),
+    )
+    for totals in totals_by_state:
+        if totals['state'] not in READY_STATES:
+            continue
+        if totals['state'] == SUCCESS:
+            subtask_dict['succeeded'] += totals['num_subtasks']
+        else:
+            subtask_dict['failed'] += totals['num_subtasks']
+        for statname in ['attempted', 'succeeded', 'failed', 'skipped']:
+            task_progress[statname] += totals[statname]
+
+    # Set the estimate of duration, but only if it
+    # increases.  Clock skew between time() returned by different machines
+    # may result in non-monotonic values for duration.
+    new_duration = int((time() - task_progress['start_time']) * 1000)
+    task_progress['duration_ms'] = max(task_progress['duration_ms'], new_duration)
+
+    # If we're done with the last task, update the parent status to indicate that.
+    # At present, we mark the task as having succeeded.  In future, we should see
+    # if there was a catastrophic failure that occurred, and figure out how to
+    # report that here.
+    updates = {
+        'subtasks': json.dumps(subtask_dict),
+        'task_output': InstructorTask.create_output_for_success(task_progress),
+        'updated': timezone.now(),
+    }
+    if done:
+        updates['task_state'] = SUCCESS
+    num_updated = InstructorTask.objects.filter(pk=entry_id).exclude(task_state__in=READY_STATES).update(**updates)
+    TASK_LOG.info("Task output updated to %s for instructor task %d", updates['task_output'], entry_id)
+    return done and num_updated == 1
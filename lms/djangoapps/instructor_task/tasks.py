@@ -36,8 +36,11 @@ from instructor_task.tasks_helper import (
     delete_problem_module_state,
     upload_grades_csv,
     upload_problem_grade_report,
+    upload_report_part,
     upload_students_csv,
-    cohort_students_and_upload
+    cohort_students_and_upload,
+    update_enrollments_and_upload,
+    refresh_offline_grades,
 )
 
 
@@ -71,7 +74,7 @@ def rescore_problem(entry_id, xmodule_instance_args):
         """Filter that matches problems which are marked as being done"""
         return modules_to_update.filter(state__contains='"done": true')
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn)
+    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn, prefetch_field_data=True)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -173,6 +176,22 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_report_part(entry_id, report_name, start_time, part_index, first_student_id, last_student_id,
+                          subtask_status_dict):
+    """
+    Generate the part of a grade report, or problem grade report, for a range
+    of students, as a subtask of `calculate_grades_csv` or
+    `calculate_problem_grade_report`.
+
+    Progress is recorded in the InstructorTask `entry_id` by the subtask
+    machinery in instructor_task.subtasks, rather than by BaseInstructorTask.
+    """
+    return upload_report_part(
+        entry_id, report_name, start_time, part_index, first_student_id, last_student_id, subtask_status_dict
+    )
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
@@ -195,3 +214,25 @@ def cohort_students(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('cohorted')
     task_fn = partial(cohort_students_and_upload, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
+
+
+@task(base=BaseInstructorTask)  # pylint: disable=not-callable
+def update_enrollments(entry_id, xmodule_instance_args):
+    """
+    Enroll or unenroll students in bulk, and upload the results.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('updated')
+    task_fn = partial(update_enrollments_and_upload, xmodule_instance_args)
+    return run_main_task(entry_id, task_fn, action_name)
+
+
+@task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def refresh_gradebook(entry_id, xmodule_instance_args):
+    """
+    Grade a course and save the grades for the gradebook of the instructor dashboard.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('graded')
+    task_fn = partial(refresh_offline_grades, xmodule_instance_args)
+    return run_main_task(entry_id, task_fn, action_name)
@@ -7,13 +7,14 @@ import json
 from collections import OrderedDict
 from datetime import datetime
 from eventtracking import tracker
-from itertools import chain
+from itertools import chain, count
 from time import time
 import unicodecsv
 import logging
 
 from celery import Task, current_task
 from celery.states import SUCCESS, FAILURE
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.files.storage import DefaultStorage
 from django.db import transaction, reset_queries
@@ -26,14 +27,23 @@ from xmodule.modulestore.django import modulestore
 from xmodule.split_test_module import get_split_user_partitions
 
 from certificates.models import CertificateWhitelist, certificate_info_for_user
+from courseware import persistent_grades
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.grades import iterate_grades_for
 from courseware.models import StudentModule
-from courseware.model_data import FieldDataCache
+from courseware.model_data import FieldDataCache, MultiUserFieldDataCache, chunks
 from courseware.module_render import get_module_for_descriptor_internal
-from instructor_analytics.basic import enrolled_students_features
-from instructor_analytics.csvs import format_dictlist
+from instructor.enrollment import BULK_ENROLLMENT_BATCH_SIZE, get_email_params, update_enrollments_by_identifier
+from instructor.offline_gradecalc import calculate_offline_grades
+from instructor_analytics.basic import iter_enrolled_students_features
+from instructor_analytics.csvs import iter_dictlist_rows
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
@@ -55,6 +65,10 @@ UPDATE_STATUS_SUCCEEDED = 'succeeded'
 UPDATE_STATUS_FAILED = 'failed'
 UPDATE_STATUS_SKIPPED = 'skipped'
 
+# Number of StudentModules updated together when their students' field data
+# is prefetched by perform_module_state_update
+MODULE_STATE_UPDATE_CHUNK_SIZE = 100
+
 # The setting name used for events when "settings" (account settings, preferences, profile information) change.
 REPORT_REQUESTED_EVENT_NAME = u'edx.instructor.report.requested'
 
@@ -154,6 +168,14 @@ class UpdateProblemModuleStateError(Exception):
     pass
 
 
+class ReportPartsError(Exception):
+    """
+    Error signaling that parts of a report generated by subtasks failed,
+    so the report was not published.
+    """
+    pass
+
+
 def _get_current_task():
     """
     Stub to make it easier to test without actually running Celery.
@@ -272,7 +294,8 @@ def run_main_task(entry_id, task_fcn, action_name):
     return task_progress
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name,
+                                prefetch_field_data=False):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -290,6 +313,10 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     the update is successful; False indicates the update on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If `prefetch_field_data` is True, the StudentModules are visited in chunks, the field data of the
+    problems is loaded for all of the students of a chunk at once, and the update_fcn is also passed
+    the student's FieldDataCache as a `field_data_cache` keyword argument.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -350,27 +377,54 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+    for module_chunk in chunks(modules_to_update.select_related('student'), MODULE_STATE_UPDATE_CHUNK_SIZE):
+        field_data_cache = None
+        if prefetch_field_data:
+            field_data_cache = _get_field_data_cache_for_modules(course_id, module_chunk, problems)
+
+        for module_to_update in module_chunk:
+            task_progress.attempted += 1
+            module_descriptor = problems[unicode(module_to_update.module_state_key)]
+            update_kwargs = {}
+            if field_data_cache is not None:
+                update_kwargs['field_data_cache'] = field_data_cache.for_user(module_to_update.student)
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            with dog_stats_api.timer(
+                'instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]
+            ):
+                update_status = update_fcn(module_descriptor, module_to_update, **update_kwargs)
+                if update_status == UPDATE_STATUS_SUCCEEDED:
+                    # If the update_fcn returns true, then it performed some kind of work.
+                    # Logging of failures is left to the update_fcn itself.
+                    task_progress.succeeded += 1
+                elif update_status == UPDATE_STATUS_FAILED:
+                    task_progress.failed += 1
+                elif update_status == UPDATE_STATUS_SKIPPED:
+                    task_progress.skipped += 1
+                else:
+                    raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
 
     return task_progress.update_task_state()
 
 
+def _get_field_data_cache_for_modules(course_id, student_modules, problems):
+    """
+    Return a MultiUserFieldDataCache holding the field data of the problems
+    (and their descendents) referenced by `student_modules`, for all of
+    their students.
+    """
+    students = dict((module.student_id, module.student) for module in student_modules)
+    descriptors = dict(
+        (unicode(module.module_state_key), problems[unicode(module.module_state_key)])
+        for module in student_modules
+    )
+    field_data_cache = MultiUserFieldDataCache([], course_id, students.values())
+    for descriptor in descriptors.itervalues():
+        field_data_cache.add_descriptor_descendents(descriptor)
+    return field_data_cache
+
+
 def _get_task_id_from_xmodule_args(xmodule_instance_args):
     """Gets task_id from `xmodule_instance_args` dict, or returns default value if missing."""
     return xmodule_instance_args.get('task_id', UNKNOWN_TASK_ID) if xmodule_instance_args is not None else UNKNOWN_TASK_ID
@@ -398,16 +452,20 @@ def _get_track_function_for_task(student, xmodule_instance_args=None, source_pag
 
 
 def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args=None,
-                                  grade_bucket_type=None):
+                                  grade_bucket_type=None, field_data_cache=None):
     """
     Fetches a StudentModule instance for a given `course_id`, `student` object, and `module_descriptor`.
 
     `xmodule_instance_args` is used to provide information for creating a track function and an XQueue callback.
     These are passed, along with `grade_bucket_type`, to get_module_for_descriptor_internal, which sidesteps
     the need for a Request object when instantiating an xmodule instance.
+
+    If `field_data_cache` is not None, it must already hold the student's data for `module_descriptor`
+    and its descendents; otherwise that data is loaded from the database.
     """
     # reconstitute the problem's corresponding XModule:
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
+    if field_data_cache is None:
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
 
     # get request-related tracking information from args passthrough, and supplement with task-specific
     # information:
@@ -441,11 +499,14 @@ def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule
 
 
 @transaction.autocommit
-def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module):
+def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, field_data_cache=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
     performs rescoring on the student's problem submission.
 
+    If `field_data_cache` is given, the problem is instantiated from the student's
+    data already loaded in it.
+
     Throws exceptions if the rescoring is fatal and should be aborted if in a loop.
     In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
     or if the module doesn't support rescoring.
@@ -457,7 +518,14 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
     course_id = student_module.course_id
     student = student_module.student
     usage_key = student_module.module_state_key
-    instance = _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args, grade_bucket_type='rescore')
+    instance = _get_module_instance_for_task(
+        course_id,
+        student,
+        module_descriptor,
+        xmodule_instance_args,
+        grade_bucket_type='rescore',
+        field_data_cache=field_data_cache,
+    )
 
     if instance is None:
         # Either permissions just changed, or someone is trying to be clever
@@ -520,11 +588,15 @@ def reset_attempts_module_state(xmodule_instance_args, _module_descriptor, stude
 @transaction.autocommit
 def delete_problem_module_state(xmodule_instance_args, _module_descriptor, student_module):
     """
-    Delete the StudentModule entry.
+    Delete the StudentModule entry, and the persisted grades that depended on it.
 
     Always returns UPDATE_STATUS_SUCCEEDED, indicating success, if it doesn't raise an exception due to database error.
     """
     student_module.delete()
+    if persistent_grades.persistent_grades_enabled():
+        persistent_grades.invalidate_block_grade(
+            student_module.student_id, student_module.course_id, student_module.module_state_key
+        )
     # get request-related tracking information from args passthrough,
     # and supplement with task-specific information:
     track_function = _get_track_function_for_task(student_module.student, xmodule_instance_args)
@@ -537,8 +609,8 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp):
     Upload data as a CSV using ReportStore.
 
     Arguments:
-        rows: CSV data in the following format (first column may be a
-            header):
+        rows: CSV data, as a list or any other iterable of rows, in the
+            following format (first column may be a header):
             [
                 [row1_colum1, row1_colum2, ...],
                 ...
@@ -559,7 +631,7 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp):
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
 
-def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):  # pylint: disable=too-many-statements
+def upload_grades_csv(_xmodule_instance_args, entry_id, course_id, _task_input, action_name):
     """
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
@@ -568,25 +640,62 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
     that are visible in ReportStore will be complete ones.
 
+    Courses with more than settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK enrolled
+    students are graded by subtasks instead; see `_queue_report_subtasks`.
+
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
     do here.
     """
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
     fmt = u'Task: {task_id}, InstructorTask ID: {entry_id}, Course: {course_id}, Input: {task_input}'
     task_info_string = fmt.format(
         task_id=_xmodule_instance_args.get('task_id') if _xmodule_instance_args is not None else None,
-        entry_id=_entry_id,
+        entry_id=entry_id,
         course_id=course_id,
         task_input=_task_input
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
+    if _should_queue_report_subtasks(entry_id, task_progress.total):
+        return _queue_report_subtasks(
+            entry_id, course_id, enrolled_students, task_progress.total, action_name, 'grade_report', start_time
+        )
+
+    rows, err_rows = _grade_report_rows(course_id, enrolled_students, task_progress, task_info_string)
+
+    # By this point, we've got the rows we're going to stuff into our CSV files.
+    current_step = {'step': 'Uploading CSVs'}
+    task_progress.update_task_state(extra_meta=current_step)
+    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
+
+    # Perform the actual upload
+    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+
+    # If there are any error rows (don't count the header), write them out as well
+    if len(err_rows) > 1:
+        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+
+    # One last update before we close out...
+    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def _grade_report_rows(course_id, students, task_progress, task_info_string):  # pylint: disable=too-many-statements
+    """
+    Grade `students` and return a tuple of (rows, err_rows) for the grade
+    report of `course_id`, updating `task_progress` as students are graded.
+
+    `rows` begins with the header row, unless no student could be graded, in
+    which case it is empty. `err_rows` always begins with its header row.
+    """
+    status_interval = 100
+    action_name = task_progress.action_name
+
     course = get_course_by_id(course_id)
     course_is_cohorted = is_course_cohorted(course.id)
     cohorts_header = ['Cohort Name'] if course_is_cohorted else []
@@ -604,7 +713,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
 
-    total_enrolled_students = enrolled_students.count()
+    total_enrolled_students = task_progress.total
     student_counter = 0
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Starting grade calculation for total students: %s',
@@ -613,7 +722,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         current_step,
         total_enrolled_students
     )
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
+    for student, gradeset, err_msg in iterate_grades_for(course_id, students):
         # Periodically update task status (this is a cache write)
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
@@ -695,22 +804,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         student_counter,
         total_enrolled_students
     )
-
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
-    TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
-
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
-
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
-
-    # One last update before we close out...
-    TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
-    return task_progress.update_task_state(extra_meta=current_step)
+    return rows, err_rows
 
 
 def _order_problems(blocks):
@@ -763,37 +857,75 @@ def _order_problems(blocks):
     return problems
 
 
-def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+def upload_problem_grade_report(_xmodule_instance_args, entry_id, course_id, _task_input, action_name):
     """
     Generate a CSV containing all students' problem grades within a given
     `course_id`.
+
+    Courses with more than settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK enrolled
+    students are graded by subtasks instead; see `_queue_report_subtasks`.
     """
     start_time = time()
     start_date = datetime.now(UTC)
-    status_interval = 100
     enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
-    # This struct encapsulates both the display names of each static item in the
-    # header row as values as well as the django User field names of those items
-    # as the keys.  It is structured in this way to keep the values related.
-    header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
-
     try:
-        course_structure = CourseStructure.objects.get(course_id=course_id)
-        blocks = course_structure.ordered_blocks
-        problems = _order_problems(blocks)
+        problems = _problem_grade_report_problems(course_id)
     except CourseStructure.DoesNotExist:
         return task_progress.update_task_state(
             extra_meta={'step': 'Generating course structure. Please refresh and try again.'}
         )
 
+    if _should_queue_report_subtasks(entry_id, task_progress.total):
+        return _queue_report_subtasks(
+            entry_id, course_id, enrolled_students, task_progress.total, action_name, 'problem_grade_report', start_time
+        )
+
+    rows, error_rows = _problem_grade_report_rows(course_id, enrolled_students, task_progress, None, problems)
+
+    # Perform the upload if any students have been successfully graded
+    if len(rows) > 1:
+        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
+    # If there are any error rows, write them out as well
+    if len(error_rows) > 1:
+        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+
+    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+
+
+def _problem_grade_report_problems(course_id):
+    """
+    Return the ordered dict of problems reported on by the problem grade
+    report of `course_id`, as built by `_order_problems`. Raises
+    CourseStructure.DoesNotExist if the structure of the course hasn't been
+    generated yet.
+    """
+    course_structure = CourseStructure.objects.get(course_id=course_id)
+    return _order_problems(course_structure.ordered_blocks)
+
+
+def _problem_grade_report_rows(course_id, students, task_progress, _task_info_string, problems=None):
+    """
+    Grade `students` and return a tuple of (rows, error_rows) for the problem
+    grade report of `course_id`, updating `task_progress` as students are
+    graded. Both lists begin with their header row.
+    """
+    status_interval = 100
+    if problems is None:
+        problems = _problem_grade_report_problems(course_id)
+
+    # This struct encapsulates both the display names of each static item in the
+    # header row as values as well as the django User field names of those items
+    # as the keys.  It is structured in this way to keep the values related.
+    header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
+
     # Just generate the static fields for now.
     rows = [list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))]
     error_rows = [list(header_row.values()) + ['error_msg']]
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students, keep_raw_scores=True):
+    for student, gradeset, err_msg in iterate_grades_for(course_id, students, keep_raw_scores=True):
         student_fields = [getattr(student, field_name) for field_name in header_row]
         task_progress.attempted += 1
 
@@ -824,14 +956,206 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
 
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
-    # If there are any error rows, write them out as well
-    if len(error_rows) > 1:
-        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+    return rows, error_rows
 
-    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+
+# Functions returning the (rows, error_rows) of the reports that can be split
+# into subtasks, keyed by report name.
+REPORT_ROWS_FUNCTIONS = {
+    'grade_report': _grade_report_rows,
+    'problem_grade_report': _problem_grade_report_rows,
+}
+
+
+def _should_queue_report_subtasks(entry_id, num_students):
+    """
+    Return True if a report on `num_students` students should be split into
+    subtasks. Reports that aren't run as an InstructorTask never are.
+    """
+    students_per_task = settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK
+    return entry_id is not None and bool(students_per_task) and num_students > students_per_task
+
+
+def _report_part_filename(task_id, csv_name, part_index):
+    """
+    Return the ReportStore filename of part `part_index` of the `csv_name`
+    CSV generated by the subtasks of the task `task_id`. Parts are stored in
+    a subdirectory so that they aren't listed as reports.
+    """
+    return u"parts/{task_id}/{csv_name}_{part_index:05d}.csv".format(
+        task_id=task_id, csv_name=csv_name, part_index=part_index
+    )
+
+
+def _queue_report_subtasks(entry_id, course_id, students, num_students, action_name, report_name, start_time):
+    """
+    Split the generation of the `report_name` report on `students` between
+    subtasks, each of which handles a range of at most
+    settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK student ids, and queue them.
+
+    Each subtask stores its part of the report as partial CSVs. The last
+    subtask to complete merges the parts into the final report; see
+    `upload_report_part`.
+
+    Returns the task progress as stored in the InstructorTask.
+    """
+    # Imported here since instructor_task.tasks imports this module.
+    from instructor_task.tasks import calculate_report_part
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+
+    # As with bulk email, the task may be run again after it has queued its
+    # subtasks, in which case they must not be queued a second time.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u"Task %s has already queued subtasks for %s", entry.task_id, report_name)
+        return json.loads(entry.task_output)
+
+    part_indexes = count()
+
+    def _create_report_part_subtask(student_list, initial_subtask_status):
+        """Creates a subtask to generate the part of the report for a range of students."""
+        return calculate_report_part.subtask(
+            (
+                entry_id,
+                report_name,
+                start_time,
+                next(part_indexes),
+                student_list[0]['pk'],
+                student_list[-1]['pk'],
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_report_part_subtask,
+        [students.order_by('id')],
+        [],
+        settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK,
+        num_students,
+    )
+
+
+def upload_report_part(entry_id, report_name, start_time, part_index, first_student_id, last_student_id,
+                       subtask_status_dict):
+    """
+    Generate part `part_index` of the `report_name` report, for the enrolled
+    students with ids from `first_student_id` to `last_student_id`, and store
+    it in the ReportStore as partial CSVs.
+
+    The subtask that completes the last part of the report merges all of them
+    into the final report, timestamped with `start_time`.
+
+    Returns the subtask status, as a dict.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+
+    # Raises a DuplicateTaskException if this subtask has already been run.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    course_id = entry.course_id
+    students = CourseEnrollment.users_enrolled_in(course_id).filter(
+        id__gte=first_student_id, id__lte=last_student_id
+    ).order_by('id')
+    task_progress = TaskProgress(json.loads(entry.task_output)['action_name'], students.count(), time())
+    fmt = u'Task: {task_id}, Subtask: {subtask_id}, InstructorTask ID: {entry_id}, Course: {course_id}'
+    task_info_string = fmt.format(
+        task_id=entry.task_id, subtask_id=current_task_id, entry_id=entry_id, course_id=course_id
+    )
+
+    try:
+        rows, error_rows = REPORT_ROWS_FUNCTIONS[report_name](course_id, students, task_progress, task_info_string)
+        report_store = ReportStore.from_config()
+        if len(rows) > 1:
+            report_store.store_rows(course_id, _report_part_filename(entry.task_id, report_name, part_index), rows)
+        if len(error_rows) > 1:
+            report_store.store_rows(
+                course_id, _report_part_filename(entry.task_id, report_name + '_err', part_index), error_rows
+            )
+    except Exception:
+        # Count every student of this part as failed, to keep the counts of
+        # the whole task consistent, and let the task fail.
+        TASK_LOG.exception(u'%s, Report part %s failed', task_info_string, part_index)
+        subtask_status.increment(failed=task_progress.total, state=FAILURE)
+        _complete_report_part(entry_id, current_task_id, subtask_status, report_name, start_time)
+        raise
+
+    subtask_status.increment(succeeded=task_progress.succeeded, failed=task_progress.failed, state=SUCCESS)
+    _complete_report_part(entry_id, current_task_id, subtask_status, report_name, start_time)
+    return subtask_status.to_dict()
+
+
+def _complete_report_part(entry_id, current_task_id, subtask_status, report_name, start_time):
+    """
+    Record the status of a report part subtask, and merge the parts of the
+    report if it was the last one to complete.
+    """
+    if update_subtask_status(entry_id, current_task_id, subtask_status):
+        _merge_report_parts(entry_id, report_name, start_time)
+
+
+def _merge_report_parts(entry_id, report_name, start_time):
+    """
+    Merge the partial CSVs stored by the subtasks of the InstructorTask
+    `entry_id` into the final `report_name` report and error report, then
+    delete them. Rows are streamed from the parts, in student id order,
+    rather than read into memory.
+
+    If any part failed, the report would be missing its range of students,
+    so nothing is published and the InstructorTask is marked as failed.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    course_id = entry.course_id
+    subtask_counts = json.loads(entry.subtasks)
+    num_parts = subtask_counts['total']
+    report_store = ReportStore.from_config()
+    timestamp = datetime.fromtimestamp(start_time, UTC)
+
+    for csv_name in (report_name, report_name + '_err'):
+        part_filenames = [_report_part_filename(entry.task_id, csv_name, index) for index in xrange(num_parts)]
+        if not subtask_counts['failed']:
+            rows = _merged_report_rows(report_store, course_id, part_filenames)
+            first_row = next(rows, None)
+            if first_row is not None:
+                upload_csv_to_report_store(chain([first_row], rows), csv_name, course_id, timestamp)
+        for filename in part_filenames:
+            report_store.delete(course_id, filename)
+
+    if subtask_counts['failed']:
+        error = ReportPartsError(u"{failed} of {total} parts of the {report_name} report failed".format(
+            failed=subtask_counts['failed'], total=num_parts, report_name=report_name
+        ))
+        TASK_LOG.error(u'Task %s: %s', entry.task_id, error)
+        entry.task_output = InstructorTask.create_output_for_failure(error, None)
+        entry.task_state = FAILURE
+        entry.save_now()
+
+
+def _merged_report_rows(report_store, course_id, part_filenames):
+    """
+    Yield the header row of the first of the partial CSVs `part_filenames`,
+    followed by the other rows of all of them. Parts that were not stored,
+    because they had no rows or their subtask failed, are skipped.
+    """
+    header_yielded = False
+    for filename in part_filenames:
+        try:
+            part_rows = report_store.iter_rows(course_id, filename)
+        except IOError:
+            continue
+        header = next(part_rows, None)
+        if header is None:
+            continue
+        if not header_yielded:
+            yield header
+            header_yielded = True
+        for row in part_rows:
+            yield row
 
 
 def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
@@ -846,21 +1170,27 @@ def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input
     current_step = {'step': 'Calculating Profile Info'}
     task_progress.update_task_state(extra_meta=current_step)
 
-    # compute the student features table and format it
+    # compute the student features table and format it, streaming the rows
+    # to the report store as they are computed
     query_features = task_input.get('features')
-    student_data = enrolled_students_features(course_id, query_features)
-    header, rows = format_dictlist(student_data, query_features)
-
-    task_progress.attempted = task_progress.succeeded = len(rows)
-    task_progress.skipped = task_progress.total - task_progress.attempted
+    student_data = iter_enrolled_students_features(course_id, query_features)
+    rows = iter_dictlist_rows(student_data, query_features)
 
-    rows.insert(0, header)
+    def _counted_rows():
+        """Yield the header row and then `rows`, counting them in the task progress."""
+        yield query_features
+        for row in rows:
+            task_progress.attempted += 1
+            yield row
 
     current_step = {'step': 'Uploading CSV'}
     task_progress.update_task_state(extra_meta=current_step)
 
     # Perform the upload
-    upload_csv_to_report_store(rows, 'student_profile_info', course_id, start_date)
+    upload_csv_to_report_store(_counted_rows(), 'student_profile_info', course_id, start_date)
+
+    task_progress.succeeded = task_progress.attempted
+    task_progress.skipped = task_progress.total - task_progress.attempted
 
     return task_progress.update_task_state(extra_meta=current_step)
 
@@ -948,3 +1278,80 @@ def cohort_students_and_upload(_xmodule_instance_args, _entry_id, course_id, tas
     upload_csv_to_report_store(output_rows, 'cohort_results', course_id, start_date)
 
     return task_progress.update_task_state(extra_meta=current_step)
+
+
+def update_enrollments_and_upload(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
+    """
+    Within a given course, enroll or unenroll students in bulk, then upload
+    the result for each student using a `ReportStore`.
+    """
+    start_time = time()
+    start_date = datetime.now(UTC)
+
+    storage = DefaultStorage()
+    try:
+        with storage.open(task_input['file_name']) as f:
+            identifiers = [line.strip() for line in f.read().decode('utf-8').splitlines() if line.strip()]
+    finally:
+        # The uploaded file is only needed by this task
+        storage.delete(task_input['file_name'])
+
+    task_progress = TaskProgress(action_name, len(identifiers), start_time)
+    current_step = {'step': 'Updating Enrollments'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    email_params = {}
+    if task_input['email_students']:
+        course = get_course_by_id(course_id)
+        email_params = get_email_params(course, task_input['auto_enroll'], secure=task_input['secure'])
+
+    rows = [['Identifier', 'Result', 'Enrolled Before', 'Enrolled After', 'Allowed After']]
+    for batch in chunks(identifiers, BULK_ENROLLMENT_BATCH_SIZE):
+        with transaction.commit_on_success():
+            results = update_enrollments_by_identifier(
+                course_id, batch, task_input['action'], task_input['auto_enroll'],
+                task_input['email_students'], email_params
+            )
+        for result in results:
+            task_progress.attempted += 1
+            if result.get('invalidIdentifier'):
+                task_progress.failed += 1
+                rows.append([result['identifier'], 'Invalid identifier', '', '', ''])
+            elif result.get('error'):
+                task_progress.failed += 1
+                rows.append([result['identifier'], 'Error', '', '', ''])
+            else:
+                task_progress.succeeded += 1
+                rows.append([
+                    result['identifier'], 'Updated', result['before']['enrollment'],
+                    result['after']['enrollment'], result['after']['allowed'],
+                ])
+        task_progress.update_task_state(extra_meta=current_step)
+
+    current_step['step'] = 'Uploading CSV'
+    task_progress.update_task_state(extra_meta=current_step)
+    upload_csv_to_report_store(rows, 'enrollment_results', course_id, start_date)
+
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def refresh_offline_grades(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    """
+    Within a given course, compute the grades of all enrolled students and
+    save them as the offline computed grades the gradebook shows.
+    """
+    start_time = time()
+    enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
+    task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
+    current_step = {'step': 'Calculating Grades'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    def update_progress(succeeded, failed):  # pylint: disable=missing-docstring
+        task_progress.attempted = succeeded + failed
+        task_progress.succeeded = succeeded
+        task_progress.failed = failed
+        task_progress.update_task_state(extra_meta=current_step)
+
+    calculate_offline_grades(course_id, enrolled_students.iterator(), update_progress)
+
+    return task_progress.update_task_state(extra_meta=current_step)
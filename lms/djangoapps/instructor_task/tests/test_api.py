@@ -16,6 +16,7 @@ from instructor_task.api import (
     submit_bulk_course_email,
     submit_calculate_students_features_csv,
     submit_cohort_students,
+    submit_refresh_gradebook,
 )
 
 from instructor_task.api_helper import AlreadyRunningError
@@ -214,3 +215,10 @@ class InstructorTaskCourseSubmitTest(TestReportMixin, InstructorTaskCourseTestCa
             file_name=u'filename.csv'
         )
         self._test_resubmission(api_call)
+
+    def test_submit_refresh_gradebook(self):
+        api_call = lambda: submit_refresh_gradebook(
+            self.create_task_request(self.instructor),
+            self.course.id
+        )
+        self._test_resubmission(api_call)
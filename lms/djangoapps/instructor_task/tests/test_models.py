@@ -8,7 +8,7 @@ import time
 from datetime import datetime
 from unittest import TestCase
 
-from instructor_task.models import LocalFSReportStore, S3ReportStore
+from instructor_task.models import LocalFSReportStore, S3MultipartUpload, S3ReportStore
 from instructor_task.tests.test_base import TestReportMixin
 from opaque_keys.edx.locator import CourseLocator
 
@@ -44,6 +44,26 @@ class MockBucket(object):
         return self.keys
 
 
+class MockMultipartUpload(object):
+    """ Mocking a boto S3 MultiPartUpload object. """
+    def __init__(self):
+        self.parts = []
+        self.completed = False
+        self.cancelled = False
+
+    def upload_part_from_file(self, fp, part_num):
+        """ Expected method on a MultiPartUpload object. """
+        self.parts.append((part_num, fp.read()))
+
+    def complete_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.completed = True
+
+    def cancel_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.cancelled = True
+
+
 class MockS3Connection(object):
     """ Mocking a boto S3 Connection """
     def __init__(self, access_key, secret_key):
@@ -93,6 +113,45 @@ class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase
         """ Create and return a LocalFSReportStore. """
         return LocalFSReportStore.from_config()
 
+    def test_iter_rows(self):
+        report_store = self.create_report_store()
+        rows = [[u'username', u'grade'], [u'ni\xf1o', 0.5]]
+        report_store.store_rows(self.course_id, 'parts/task/report.csv', rows)
+        self.assertEqual(
+            list(report_store.iter_rows(self.course_id, 'parts/task/report.csv')),
+            [[u'username', u'grade'], [u'ni\xf1o', u'0.5']]
+        )
+
+        report_store.delete(self.course_id, 'parts/task/report.csv')
+        with self.assertRaises(IOError):
+            report_store.iter_rows(self.course_id, 'parts/task/report.csv')
+
+    def test_links_for_excludes_subdirectories(self):
+        report_store = self.create_report_store()
+        report_store.store(self.course_id, 'report', StringIO())
+        report_store.store(self.course_id, 'parts/task/report', StringIO())
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report'])
+
+    def test_store_rows_generator(self):
+        report_store = self.create_report_store()
+        rows = ([u'student{}'.format(index), index] for index in xrange(3))
+        report_store.store_rows(self.course_id, 'report.csv', rows)
+        self.assertEqual(
+            list(report_store.iter_rows(self.course_id, 'report.csv')),
+            [[u'student0', u'0'], [u'student1', u'1'], [u'student2', u'2']]
+        )
+
+    def test_store_rows_error(self):
+        def failing_rows():
+            """ Yield a row, then fail. """
+            yield [u'username']
+            raise ValueError()
+
+        report_store = self.create_report_store()
+        with self.assertRaises(ValueError):
+            report_store.store_rows(self.course_id, 'report.csv', failing_rows())
+        self.assertEqual(report_store.links_for(self.course_id), [])
+
 
 @mock.patch('instructor_task.models.S3Connection', new=MockS3Connection)
 @mock.patch('instructor_task.models.Key', new=MockKey)
@@ -105,3 +164,41 @@ class S3ReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase):
     def create_report_store(self):
         """ Create and return a S3ReportStore. """
         return S3ReportStore.from_config()
+
+
+class S3MultipartUploadTestCase(TestCase):
+    """
+    Test the S3MultipartUpload file object.
+    """
+    def setUp(self):
+        super(S3MultipartUploadTestCase, self).setUp()
+        self.multipart_upload = MockMultipartUpload()
+        self.key = mock.Mock()
+        self.key.key = 'report.csv'
+        self.key.bucket.initiate_multipart_upload.return_value = self.multipart_upload
+        self.upload = S3MultipartUpload(self.key, {'Content-Type': 'text/csv'}, part_size=4)
+
+    def test_single_part(self):
+        self.upload.write('abc')
+        self.upload.close()
+        self.key.set_contents_from_string.assert_called_once_with(
+            'abc', headers={'Content-Type': 'text/csv', 'Content-Length': 3}
+        )
+        self.assertFalse(self.key.bucket.initiate_multipart_upload.called)
+
+    def test_multiple_parts(self):
+        for data in ('abc', 'def', 'ghij', 'k'):
+            self.upload.write(data)
+        self.upload.close()
+        self.key.bucket.initiate_multipart_upload.assert_called_once_with(
+            'report.csv', headers={'Content-Type': 'text/csv'}
+        )
+        self.assertEqual(self.multipart_upload.parts, [(1, 'abcdef'), (2, 'ghij'), (3, 'k')])
+        self.assertTrue(self.multipart_upload.completed)
+        self.assertFalse(self.key.set_contents_from_string.called)
+
+    def test_cancel(self):
+        self.upload.write('abcdef')
+        self.upload.cancel()
+        self.assertTrue(self.multipart_upload.cancelled)
+        self.assertFalse(self.multipart_upload.completed)
@@ -1,13 +1,19 @@
 """
 Unit tests for instructor_task subtasks.
 """
+import json
 from uuid import uuid4
 
+from celery.states import SUCCESS, FAILURE, RETRY
+from django.core.cache import cache
 from mock import Mock, patch
 
 from student.models import CourseEnrollment
 
-from instructor_task.subtasks import queue_subtasks_for_query
+from instructor_task.models import InstructorTask, InstructorSubtask, PROGRESS
+from instructor_task.subtasks import (
+    queue_subtasks_for_query, initialize_subtask_info, update_subtask_status, SubtaskStatus, _rollup_subtask_status
+)
 from instructor_task.tests.factories import InstructorTaskFactory
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase
 
@@ -80,3 +86,58 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         self.assertEqual(len(mock_create_subtask_fcn_args[0][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[1][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[2][0][0]), 5)
+
+    def test_subtask_status_rollup(self):
+        """Test that the progress of a task is rolled up from the status of its subtasks."""
+        instructor_task = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='bulk_course_email',
+        )
+        subtask_ids = [str(uuid4()) for _ in range(3)]
+        initialize_subtask_info(instructor_task, 'emailed', 30, subtask_ids)
+        self.assertEqual(InstructorSubtask.objects.filter(instructor_task=instructor_task).count(), 3)
+
+        def update(subtask_id, **options):
+            """Update the status of a subtask, without throttling the rollup."""
+            cache.clear()
+            return update_subtask_status(instructor_task.id, subtask_id, SubtaskStatus.create(subtask_id, **options))
+
+        def progress():
+            """Return the state, subtask counts and progress of the task."""
+            entry = InstructorTask.objects.get(pk=instructor_task.id)
+            return entry.task_state, json.loads(entry.subtasks), json.loads(entry.task_output)
+
+        # Subtasks that aren't done yet aren't counted
+        self.assertFalse(update(subtask_ids[0], state=RETRY, retried_nomax=1))
+        self.assertFalse(update(subtask_ids[1], state=SUCCESS, succeeded=10))
+        task_state, subtask_counts, task_progress = progress()
+        self.assertEqual(task_state, PROGRESS)
+        self.assertEqual(subtask_counts, {'total': 3, 'succeeded': 1, 'failed': 0})
+        self.assertDictContainsSubset({'attempted': 10, 'succeeded': 10, 'failed': 0, 'total': 30}, task_progress)
+
+        self.assertFalse(update(subtask_ids[0], state=SUCCESS, succeeded=9, failed=1, retried_nomax=1))
+        self.assertTrue(update(subtask_ids[2], state=FAILURE, succeeded=4, failed=1, skipped=5))
+        task_state, subtask_counts, task_progress = progress()
+        self.assertEqual(task_state, SUCCESS)
+        self.assertEqual(subtask_counts, {'total': 3, 'succeeded': 2, 'failed': 1})
+        self.assertDictContainsSubset(
+            {'attempted': 25, 'succeeded': 23, 'failed': 2, 'skipped': 5, 'total': 30}, task_progress
+        )
+
+        # Only the first rollup to find every subtask done completes the task
+        self.assertFalse(_rollup_subtask_status(instructor_task.id, True))
+
+    def test_unknown_subtask(self):
+        """Test that updating the status of a subtask the task doesn't define fails."""
+        instructor_task = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='bulk_course_email',
+        )
+        initialize_subtask_info(instructor_task, 'emailed', 10, [str(uuid4())])
+        bogus_id = str(uuid4())
+        with self.assertRaises(ValueError):
+            update_subtask_status(instructor_task.id, bogus_id, SubtaskStatus.create(bogus_id, state=SUCCESS))
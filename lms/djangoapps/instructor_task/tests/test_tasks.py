@@ -438,3 +438,13 @@ class TestDeleteStateInstructorTask(TestInstructorTasks):
                 StudentModule.objects.get(course_id=self.course.id,
                                           student=student,
                                           module_state_key=self.location)
+
+    @patch('instructor_task.tasks_helper.persistent_grades')
+    def test_delete_invalidates_grades(self, mock_persistent_grades):
+        mock_persistent_grades.persistent_grades_enabled.return_value = True
+        students = self._create_students_with_state(2)
+        self._test_run_with_task(delete_problem_state, 'deleted', 2)
+        self.assertItemsEqual(
+            mock_persistent_grades.invalidate_block_grade.call_args_list,
+            [((student.id, self.course.id, self.location),) for student in students]
+        )
@@ -6,14 +6,23 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 Tests that CSV grade report generation works with unicode emails.
 
 """
+import json
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+
 import ddt
+from celery.states import SUCCESS, FAILURE
+from django.test.utils import override_settings
 from mock import Mock, patch
+from pytz import UTC
 import tempfile
 import unicodecsv
 
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
 from certificates.tests.factories import GeneratedCertificateFactory, CertificateWhitelistFactory
 from course_modes.models import CourseMode
+from courseware.models import OfflineComputedGrade, OfflineComputedGradeLog
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase, TestReportMixin, InstructorTaskModuleTestCase
 from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitionGroup
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
@@ -24,9 +33,11 @@ from student.models import CourseEnrollment
 from verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
-from instructor_task.models import ReportStore
+from instructor_task.models import InstructorTask, ReportStore
+from instructor_task.tests.factories import InstructorTaskFactory
 from instructor_task.tasks_helper import (
-    cohort_students_and_upload, upload_grades_csv, upload_problem_grade_report, upload_students_csv
+    cohort_students_and_upload, upload_grades_csv, upload_problem_grade_report, upload_students_csv,
+    update_enrollments_and_upload, refresh_offline_grades,
 )
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase, TestConditionalContent
 
@@ -264,6 +275,94 @@ class TestInstructorGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
         self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
 
 
+@override_settings(GRADES_DOWNLOAD_STUDENTS_PER_TASK=2)
+@patch('instructor_task.tasks_helper._get_current_task')
+class TestGradeReportSubtasks(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that grade reports of large courses are generated by subtasks.
+    """
+    def setUp(self):
+        super(TestGradeReportSubtasks, self).setUp()
+        self.course = CourseFactory.create()
+        self.students = [self.create_student(u'student{}'.format(index)) for index in range(5)]
+        self.entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_id=str(uuid4()),
+            task_key='dummy value',
+        )
+
+    def _report_rows(self, file_index=0):
+        """
+        Return the rows of a report stored for the course.
+        """
+        report_store = ReportStore.from_config()
+        report_csv_filename = report_store.links_for(self.course.id)[file_index][0]
+        with open(report_store.path_to(self.course.id, report_csv_filename)) as csv_file:
+            return list(unicodecsv.DictReader(csv_file))
+
+    def test_grade_report(self, _mock_current_task):
+        upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['total'], 3)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0}, json.loads(entry.task_output)
+        )
+
+        # The parts have been merged, in student order, into a single report.
+        self.assertEqual(len(ReportStore.from_config().links_for(self.course.id)), 1)
+        self.assertEqual(
+            [row['username'] for row in self._report_rows()],
+            [student.username for student in self.students]
+        )
+
+    def test_problem_grade_report(self, _mock_current_task):
+        with patch('instructor_task.tasks_helper._problem_grade_report_problems') as mock_problems:
+            mock_problems.return_value = {}
+            upload_problem_grade_report(None, self.entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(
+            [row['Username'] for row in self._report_rows()],
+            [student.username for student in self.students]
+        )
+
+    @patch('instructor_task.tasks_helper.iterate_grades_for')
+    def test_grading_failure(self, mock_iterate_grades_for, _mock_current_task):
+        mock_iterate_grades_for.side_effect = lambda course_id, students: [
+            (student, {}, 'Cannot grade student') for student in students
+        ]
+        upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 0, 'failed': 5}, json.loads(entry.task_output)
+        )
+        links = ReportStore.from_config().links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        self.assertIn('grade_report_err', links[0][0])
+        self.assertEqual(len(self._report_rows()), 5)
+
+    @patch('instructor_task.tasks_helper.iterate_grades_for')
+    def test_part_failure(self, mock_iterate_grades_for, _mock_current_task):
+        def _iterate_grades_for(course_id, students):  # pylint: disable=unused-argument
+            """Fail to generate the part containing the third student."""
+            if self.students[2] in students:
+                raise Exception('Part failed')
+            return [(student, {}, 'Cannot grade student') for student in students]
+        mock_iterate_grades_for.side_effect = _iterate_grades_for
+        upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded')
+
+        # No report is published without the students of the failed part
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['exception'], 'ReportPartsError')
+        self.assertEqual(ReportStore.from_config().links_for(self.course.id), [])
+
+
 class TestProblemGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
     """
     Test that the problem CSV generation works.
@@ -562,6 +661,10 @@ class MockDefaultStorage(object):
         """Mock out DefaultStorage.open with standard python open"""
         return open(file_name)
 
+    def delete(self, file_name):
+        """Mock out DefaultStorage.delete with os.remove"""
+        os.remove(file_name)
+
 
 @patch('instructor_task.tasks_helper.DefaultStorage', new=MockDefaultStorage)
 class TestCohortStudents(TestReportMixin, InstructorTaskCourseTestCase):
@@ -789,6 +892,98 @@ class TestCohortStudents(TestReportMixin, InstructorTaskCourseTestCase):
         )
 
 
+@patch('instructor_task.tasks_helper.DefaultStorage', new=MockDefaultStorage)
+class TestUpdateEnrollments(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that bulk enrollment works.
+    """
+    def setUp(self):
+        super(TestUpdateEnrollments, self).setUp()
+
+        self.course = CourseFactory.create()
+        self.student_1 = UserFactory.create(username='student_1', email='student_1@example.com')
+        self.student_2 = UserFactory.create(username='student_2', email='student_2@example.com')
+        self.csv_header_row = ['Identifier', 'Result', 'Enrolled Before', 'Enrolled After', 'Allowed After']
+
+    def _update_enrollments_and_upload(self, identifiers, action):
+        """
+        Call `update_enrollments_and_upload` with a file listing `identifiers`.
+        """
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            temp_file.write(u'\n'.join(identifiers).encode('utf-8'))
+        task_input = {
+            'file_name': temp_file.name,
+            'action': action,
+            'auto_enroll': False,
+            'email_students': False,
+            'secure': True,
+        }
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            result = update_enrollments_and_upload(None, None, self.course.id, task_input, 'updated')
+        # The uploaded file is deleted once it has been read
+        self.assertFalse(os.path.exists(temp_file.name))
+        return result
+
+    def test_enroll(self):
+        result = self._update_enrollments_and_upload(
+            ['student_1', 'student_2@example.com', 'new@example.com', 'not an email'], 'enroll'
+        )
+        self.assertDictContainsSubset({'total': 4, 'attempted': 4, 'succeeded': 3, 'failed': 1}, result)
+        self.assertTrue(CourseEnrollment.is_enrolled(self.student_1, self.course.id))
+        self.assertTrue(CourseEnrollment.is_enrolled(self.student_2, self.course.id))
+        self.verify_rows_in_csv(
+            [
+                dict(zip(self.csv_header_row, ['student_1', 'Updated', 'False', 'True', 'False'])),
+                dict(zip(self.csv_header_row, ['student_2@example.com', 'Updated', 'False', 'True', 'False'])),
+                dict(zip(self.csv_header_row, ['new@example.com', 'Updated', 'False', 'False', 'True'])),
+                dict(zip(self.csv_header_row, ['not an email', 'Invalid identifier', '', '', ''])),
+            ]
+        )
+
+    def test_unenroll(self):
+        CourseEnrollment.enroll(self.student_1, self.course.id)
+        result = self._update_enrollments_and_upload(['student_1', 'student_2'], 'unenroll')
+        self.assertDictContainsSubset({'total': 2, 'attempted': 2, 'succeeded': 2, 'failed': 0}, result)
+        self.assertFalse(CourseEnrollment.is_enrolled(self.student_1, self.course.id))
+        self.verify_rows_in_csv(
+            [
+                dict(zip(self.csv_header_row, ['student_1', 'Updated', 'True', 'False', 'False'])),
+                dict(zip(self.csv_header_row, ['student_2', 'Updated', 'False', 'False', 'False'])),
+            ]
+        )
+
+
+class TestRefreshOfflineGrades(InstructorTaskCourseTestCase):
+    """
+    Tests that the grades shown in the gradebook are computed.
+    """
+    def setUp(self):
+        super(TestRefreshOfflineGrades, self).setUp()
+        self.course = CourseFactory.create()
+
+    def test_refresh(self):
+        student_1 = self.create_student('student_1')
+        student_2 = self.create_student('student_2')
+        unenrolled = UserFactory.create()
+        for user in (student_1, unenrolled):
+            OfflineComputedGrade.objects.create(
+                user=user, course_id=self.course.id, gradeset='{}', percent_grade=0.5, letter_grade='Pass'
+            )
+        OfflineComputedGrade.objects.update(updated=datetime.now(UTC) - timedelta(days=1))
+
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            result = refresh_offline_grades(None, None, self.course.id, {}, 'graded')
+
+        self.assertDictContainsSubset({'total': 2, 'attempted': 2, 'succeeded': 2, 'failed': 0}, result)
+        ocgs = OfflineComputedGrade.objects.filter(course_id=self.course.id)
+        self.assertItemsEqual([ocg.user_id for ocg in ocgs], [student_1.id, student_2.id])
+        for ocg in ocgs:
+            self.assertEqual(ocg.percent_grade, 0)
+            self.assertEqual(ocg.letter_grade, '')
+            self.assertIn('section_breakdown', json.loads(ocg.gradeset))
+        self.assertEqual(OfflineComputedGradeLog.objects.get(course_id=self.course.id).nstudents, 2)
+
+
 @ddt.ddt
 @patch('instructor_task.tasks_helper.DefaultStorage', new=MockDefaultStorage)
 class TestGradeReportEnrollmentAndCertificateInfo(TestReportMixin, InstructorTaskModuleTestCase):
@@ -142,13 +142,17 @@ class StudentProblemList(object):
             log.error("Called add_problem_data without a valid problem list" + self.course_error_ending)
             return valid_problems
 
+        # Find the paths to all of the problems at once, as they share most of their ancestors.
+        usage_keys = [
+            self.course_id.make_usage_key_from_deprecated_string(problem['location'])
+            for problem in self.problem_list
+        ]
+        paths = search.paths_to_locations(modulestore(), usage_keys)
+
         # Iterate through all of our problems and add data.
-        for problem in self.problem_list:
-            try:
-                # Try to load the problem.
-                usage_key = self.course_id.make_usage_key_from_deprecated_string(problem['location'])
-                problem_url_parts = search.path_to_location(modulestore(), usage_key)
-            except (ItemNotFoundError, NoPathToItem):
+        for problem, usage_key in zip(self.problem_list, usage_keys):
+            problem_url_parts = paths.get(usage_key)
+            if problem_url_parts is None:
                 # If the problem cannot be found at the location received from the grading controller server,
                 # it has been deleted by the course author. We should not display it.
                 error_message = "Could not find module for course {0} at location {1}".format(self.course_id,
@@ -60,6 +60,11 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# The number of connections to the comments service each process keeps alive,
+# and the number of requests to it a page may make at the same time
+COMMENTS_SERVICE_POOL_SIZE = 10
+COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS = 4
+
 
 # Features
 FEATURES = {
@@ -395,6 +400,10 @@ FEATURES = {
 
     # Teams feature
     'ENABLE_TEAMS': False,
+
+    # Store computed subsection and course grades in the database, and serve
+    # them instead of regrading when nothing relevant has changed.
+    'ENABLE_PERSISTENT_GRADES': False,
 }
 
 # Ignore static asset files on import which match this pattern
@@ -438,6 +447,8 @@ NODE_PATH = ':'.join(node_paths)
 # For geolocation ip database
 GEOIP_PATH = REPO_ROOT / "common/static/data/geoip/GeoIP.dat"
 GEOIPV6_PATH = REPO_ROOT / "common/static/data/geoip/GeoIPv6.dat"
+# How many IP addresses to remember the country of, per process, for embargo checks
+EMBARGO_GEOIP_CACHE_SIZE = 10000
 
 # Where to look for a status message
 STATUS_MESSAGE_PATH = ENV_ROOT / "status_message.json"
@@ -695,6 +706,10 @@ XBLOCK_SELECT_FUNCTION = prefer_xmodules
 
 MODULESTORE_BRANCH = 'published-only'
 CONTENTSTORE = None
+# Local disk cache for the bodies of course assets too large to keep in
+# memcached, served by contentserver.middleware.StaticContentServer. Set to a
+# dict with the cache 'DIRECTORY' and its 'MAX_SIZE' in bytes to enable it.
+STATIC_CONTENT_DISK_CACHE = None
 DOC_STORE_CONFIG = {
     'host': 'localhost',
     'db': 'xmodule',
@@ -717,6 +732,8 @@ MODULESTORE = {
                         'default_class': 'xmodule.hidden_module.HiddenDescriptor',
                         'fs_root': DATA_DIR,
                         'render_template': 'edxmako.shortcuts.render_to_string',
+                        # Number of course structures each process keeps decoded between requests
+                        'structure_cache_size': 10,
                     }
                 },
                 {
@@ -767,6 +784,17 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Cache for the results of running problem code in the sandbox: an in-process
+# LRU tier in front of the Django cache named by 'CACHE'. Results whose
+# compressed size is over 'MAX_ITEM_SIZE' bytes aren't cached.
+SAFE_EXEC_CACHE = {
+    'CACHE': 'default',
+    'MAX_LOCAL_ENTRIES': 1000,
+    'MAX_LOCAL_SIZE': 32 * 1024 * 1024,
+    'MAX_ITEM_SIZE': 1024 * 1024,
+    'TIMEOUT': None,
+}
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG/TEMPLATE_DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1585,6 +1613,21 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of seconds an idle connection to the mail server is kept open, to be
+# reused by the next bulk email subtask run by the same worker process.  Set
+# to 0 to open a connection for each subtask.
+BULK_EMAIL_CONNECTION_MAX_AGE = 60
+
+# Maximum number of bulk email messages per second sent over one connection
+# to the mail server, or None to send them as fast as the server accepts them.
+BULK_EMAIL_CONNECTION_MAX_SEND_RATE = None
+
+############################# Bulk Enrollment #################################
+
+# Instructors enrolling or unenrolling more students than this at once have
+# them enrolled by a background task, rather than within the request.
+BULK_ENROLLMENT_TASK_THRESHOLD = 500
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -1752,6 +1795,7 @@ INSTALLED_APPS = (
     'lms.djangoapps.lms_xblock',
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
     'course_structure_api',
 
     # Mailchimp Syncing
@@ -1949,6 +1993,11 @@ CERT_NAME_LONG = "Certificate of Achievement"
 ###################### Grade Downloads ######################
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
+# Grade reports of courses with more enrolled students than this are split
+# into subtasks that each grade a range of at most this many students.
+# Set to 0 to always generate grade reports in a single task.
+GRADES_DOWNLOAD_STUDENTS_PER_TASK = 1000
+
 GRADES_DOWNLOAD = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-grades',
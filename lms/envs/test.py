@@ -68,6 +68,11 @@ FEATURES['ALLOW_COURSE_STAFF_GRADE_DOWNLOADS'] = True
 
 # Toggles embargo on for testing
 FEATURES['EMBARGO'] = True
+# Tests mock the GeoIP country of the same addresses differently
+EMBARGO_GEOIP_CACHE_SIZE = 0
+
+# Tests mock the bulk email connection of each subtask differently
+BULK_EMAIL_CONNECTION_MAX_AGE = 0
 
 FEATURES['ENABLE_COMBINED_LOGIN_REGISTRATION'] = True
 
@@ -301,6 +306,10 @@ GIT_REPO_DIR = TEST_ROOT / "course_repos"
 CELERY_ALWAYS_EAGER = True
 CELERY_RESULT_BACKEND = 'djcelery.backends.cache:CacheBackend'
 
+# Make concurrent comments service requests one after the other, in order, so
+# that tests can mock and check them deterministically
+COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS = 1
+
 ######################### MARKETING SITE ###############################
 
 MKTG_URL_LINK_MAP = {
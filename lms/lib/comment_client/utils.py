@@ -2,13 +2,23 @@ from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
 import logging
 import requests
+import threading
 from django.conf import settings
+from multiprocessing.pool import ThreadPool
+from requests.adapters import HTTPAdapter
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
 
 log = logging.getLogger(__name__)
 
+# The comments service session and the pool of threads which make concurrent
+# requests are created on first use, so that each process gets its own.
+_session = None
+_thread_pool = None
+_lock = threading.Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -31,6 +41,72 @@ def merge_dict(dic1, dic2):
     return dict(dic1.items() + dic2.items())
 
 
+def get_session():
+    """
+    Return the requests Session shared by all comments service requests in
+    this process, which keeps up to COMMENTS_SERVICE_POOL_SIZE connections
+    to the service alive between requests.
+    """
+    global _session  # pylint: disable=global-statement
+    with _lock:
+        if _session is None:
+            pool_size = getattr(settings, "COMMENTS_SERVICE_POOL_SIZE", 10)
+            session = requests.Session()
+            for prefix in ('http://', 'https://'):
+                session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            _session = session
+        return _session
+
+
+def _get_thread_pool():
+    """
+    Return the pool of threads that `perform_concurrently` runs functions in.
+    """
+    global _thread_pool  # pylint: disable=global-statement
+    with _lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPool(getattr(settings, "COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS", 4))
+        return _thread_pool
+
+
+def perform_concurrently(*functions):
+    """
+    Call each of `functions`, which take no arguments and should only make
+    comments service requests, concurrently, and return a list of their
+    results in the same order. If any of them raises an exception, the first
+    such exception, in the order of `functions`, is raised once all of them
+    have returned.
+
+    The functions run in other threads, in which the active language is that
+    of the calling thread; they must not use the database or the modulestore.
+    If COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS is 1, they are simply called
+    in order in this thread.
+    """
+    if getattr(settings, "COMMENTS_SERVICE_MAX_CONCURRENT_REQUESTS", 4) <= 1 or len(functions) <= 1:
+        return [function() for function in functions]
+
+    language = get_language()
+
+    def call_with_language(function):
+        """
+        Call `function` with the language of the calling thread active.
+        """
+        translation.activate(language)
+        try:
+            return function()
+        finally:
+            translation.deactivate()
+
+    async_results = [
+        _get_thread_pool().apply_async(call_with_language, (function,))
+        for function in functions
+    ]
+    # Wait for all of them before raising, so that no request is left running
+    for async_result in async_results:
+        async_result.wait()
+    return [async_result.get() for async_result in async_results]
+
+
 @contextmanager
 def request_timer(request_id, method, url, tags=None):
     start = time()
@@ -76,7 +152,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = get_session().request(
             method,
             url,
             data=data,
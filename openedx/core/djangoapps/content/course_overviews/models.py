@@ -0,0 +1,289 @@
+"""
+Declaration of CourseOverview model
+"""
+import json
+from datetime import datetime
+from math import exp
+
+import dateutil.parser
+from django.db import models
+from django.utils.timezone import UTC
+from django.utils.translation import ugettext as _
+from model_utils.models import TimeStampedModel
+
+from util.date_utils import strftime_localized
+from xmodule.course_module import CourseDescriptor, DEFAULT_START_DATE
+from xmodule.fields import Date
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule_django.models import CourseKeyField, UsageKeyField
+
+
+class CourseOverview(TimeStampedModel):
+    """
+    The fields of a course that course listings, such as the catalog and the
+    student dashboard, display or check access with, copied out of the
+    modulestore so that listing courses doesn't load each of them.
+
+    An overview is created from the modulestore the first time its course is
+    read through `get_from_id` or `get_from_ids`, and deleted when the course
+    is published, so that the next read picks up the published values.
+
+    The XML modulestore never publishes, so the overviews of XML courses are
+    never saved; they are built from the course, which that store keeps in
+    memory, every time they are read.
+
+    Overviews have the attributes and methods of CourseDescriptors that
+    listings use, so the two can be used interchangeably there.
+    """
+    id = CourseKeyField(db_index=True, primary_key=True, max_length=255)  # pylint: disable=invalid-name
+    location = UsageKeyField(max_length=255)
+
+    # Names
+    display_name = models.TextField(null=True)
+    display_name_with_default = models.TextField()
+    display_number_with_default = models.TextField()
+    display_org_with_default = models.TextField()
+
+    # Dates
+    start = models.DateTimeField(null=True)
+    end = models.DateTimeField(null=True)
+    advertised_start = models.TextField(null=True)
+    announcement = models.DateTimeField(null=True)
+    days_early_for_beta = models.FloatField(null=True)
+
+    # URLs
+    course_image_url = models.TextField()
+    social_sharing_url = models.TextField(null=True)
+    end_of_course_survey_url = models.TextField(null=True)
+
+    # Certification
+    certificates_display_behavior = models.TextField(null=True)
+    certificates_show_before_end = models.BooleanField(default=False)
+    cert_name_short = models.TextField()
+    cert_name_long = models.TextField()
+    lowest_passing_grade = models.FloatField(null=True)
+
+    # Access
+    visible_to_staff_only = models.BooleanField(default=False)
+    mobile_available = models.BooleanField(default=False)
+    catalog_visibility = models.TextField(null=True)
+    ispublic = models.NullBooleanField()
+    invitation_only = models.BooleanField(default=False)
+    enrollment_start = models.DateTimeField(null=True)
+    enrollment_end = models.DateTimeField(null=True)
+    enrollment_domain = models.TextField(null=True)
+    pre_requisite_courses_json = models.TextField(default='[]')
+
+    @classmethod
+    def _create_from_course(cls, course, save=True):
+        """
+        Create the CourseOverview of `course`, a CourseDescriptor, and save it
+        if `save`.
+        """
+        # Imported here because the course image URL can only be computed in
+        # the LMS, which is the only place overviews are created.
+        from courseware.courses import course_image_url
+
+        try:
+            lowest_passing_grade = course.lowest_passing_grade
+        except ValueError:
+            # The course has no grade cutoffs
+            lowest_passing_grade = None
+
+        course_overview = cls(
+            id=course.id,
+            location=course.location,
+            display_name=course.display_name,
+            display_name_with_default=course.display_name_with_default,
+            display_number_with_default=course.display_number_with_default,
+            display_org_with_default=course.display_org_with_default,
+            start=course.start,
+            end=course.end,
+            advertised_start=course.advertised_start,
+            announcement=course.announcement,
+            days_early_for_beta=course.days_early_for_beta,
+            course_image_url=course_image_url(course),
+            social_sharing_url=course.social_sharing_url,
+            end_of_course_survey_url=course.end_of_course_survey_url,
+            certificates_display_behavior=course.certificates_display_behavior,
+            certificates_show_before_end=course.certificates_show_before_end,
+            cert_name_short=course.cert_name_short,
+            cert_name_long=course.cert_name_long,
+            lowest_passing_grade=lowest_passing_grade,
+            visible_to_staff_only=course.visible_to_staff_only,
+            mobile_available=course.mobile_available,
+            catalog_visibility=course.catalog_visibility,
+            ispublic=course.ispublic,
+            invitation_only=course.invitation_only,
+            enrollment_start=course.enrollment_start,
+            enrollment_end=course.enrollment_end,
+            enrollment_domain=course.enrollment_domain,
+            pre_requisite_courses_json=json.dumps(course.pre_requisite_courses),
+        )
+        if save:
+            course_overview.save()
+        return course_overview
+
+    @staticmethod
+    def _is_cacheable(course_id):
+        """
+        Return True if the overview of the course with `course_id` can be
+        saved: that is, if its modulestore signals when it is published.
+        """
+        return modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml
+
+    @classmethod
+    def get_from_id(cls, course_id):
+        """
+        Return the CourseOverview of the course with `course_id`, creating it
+        from the modulestore if there is none yet.
+
+        Raises CourseOverview.DoesNotExist if the course doesn't exist or
+        can't be loaded.
+        """
+        cacheable = cls._is_cacheable(course_id)
+        if cacheable:
+            try:
+                return cls.objects.get(id=course_id)
+            except cls.DoesNotExist:
+                pass
+
+        course = modulestore().get_course(course_id)
+        # get_course returns None if the course doesn't exist and an
+        # ErrorDescriptor if it failed to load; neither is worth keeping.
+        if not isinstance(course, CourseDescriptor):
+            raise cls.DoesNotExist(u"Course {} does not exist or could not be loaded".format(course_id))
+        return cls._create_from_course(course, save=cacheable)
+
+    @classmethod
+    def get_from_ids(cls, course_ids):
+        """
+        Return a dict mapping each of `course_ids` that exists and can be
+        loaded to its CourseOverview. The existing overviews are read in one
+        query; only the courses without one are loaded from the modulestore.
+        """
+        course_overviews = {
+            course_overview.id: course_overview
+            for course_overview in cls.objects.filter(
+                id__in=[course_id for course_id in course_ids if cls._is_cacheable(course_id)]
+            )
+        }
+        for course_id in course_ids:
+            if course_id not in course_overviews:
+                try:
+                    course_overviews[course_id] = cls.get_from_id(course_id)
+                except cls.DoesNotExist:
+                    continue
+        return course_overviews
+
+    @property
+    def number(self):
+        return self.location.course
+
+    @property
+    def org(self):
+        return self.location.org
+
+    @property
+    def pre_requisite_courses(self):
+        """
+        The keys, as strings, of the courses that are prerequisites of this one.
+        """
+        return json.loads(self.pre_requisite_courses_json)
+
+    def has_started(self):
+        """
+        Returns True if the current time is after the course start date.
+        """
+        return datetime.now(UTC()) > self.start
+
+    def has_ended(self):
+        """
+        Returns True if the current time is after the course end date.
+        Returns False if there is no end date specified.
+        """
+        if self.end is None:
+            return False
+
+        return datetime.now(UTC()) > self.end
+
+    def may_certify(self):
+        """
+        Return True if it is acceptable to show the student a certificate download link
+        """
+        show_early = (
+            self.certificates_display_behavior in ('early_with_info', 'early_no_info') or
+            self.certificates_show_before_end
+        )
+        return show_early or self.has_ended()
+
+    @property
+    def start_date_is_still_default(self):
+        """
+        Checks if the start date set for the course is still default, i.e. .start has not been modified,
+        and .advertised_start has not been set.
+        """
+        return self.advertised_start is None and self.start == DEFAULT_START_DATE
+
+    def start_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the desired text corresponding the course's start date and time in UTC.  Prefers .advertised_start,
+        then falls back to .start
+        """
+        if self.advertised_start is not None:
+            try:
+                advertised_start = Date().from_json(self.advertised_start)
+            except ValueError:
+                advertised_start = None
+            if advertised_start is None:
+                return self.advertised_start.title()
+            when = advertised_start
+        elif self.start_date_is_still_default:
+            # Translators: TBD stands for 'To Be Determined' and is used when a course
+            # does not yet have an announced start date.
+            return _('TBD')
+        else:
+            when = self.start
+
+        text = strftime_localized(when, format_string)
+        return text + u" UTC" if format_string == "DATE_TIME" else text
+
+    def end_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the end date or date_time for the course formatted as a string.
+
+        If the course does not have an end date set (course.end is None), an empty string will be returned.
+        """
+        if self.end is None:
+            return ''
+        text = strftime_localized(self.end, format_string)
+        return text if format_string == "SHORT_DATE" else text + u" UTC"
+
+    @property
+    def sorting_score(self):
+        """
+        Returns a score that can be used to sort courses by how "new" they
+        are, computed as CourseDescriptor.sorting_score does. The lower the
+        number the "newer" the course.
+        """
+        now = datetime.now(UTC())
+        scale = 300.0  # about a year
+        if self.announcement:
+            return -exp(-(now - self.announcement).days / scale)
+
+        try:
+            start = dateutil.parser.parse(self.advertised_start)
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=UTC())
+        except (ValueError, AttributeError):
+            start = self.start
+        return exp((now - start).days / scale)
+
+    def __unicode__(self):
+        return unicode(self.id)
+
+
+# Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
+# at the end of this file to avoid circular dependencies.
+import signals  # pylint: disable=unused-import
@@ -0,0 +1,22 @@
+"""
+Signal handler for invalidating cached course overviews
+"""
+from django.dispatch.dispatcher import receiver
+
+from xmodule.modulestore.django import SignalHandler
+
+
+@receiver(SignalHandler.course_published)
+def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Delete the overview of a course when it is published, so that it is
+    created again with the published values the next time it is read.
+
+    Deleting is cheap enough to do in the publishing process, and means a
+    course that can no longer be loaded after the publish is never listed
+    from a stale overview.
+    """
+    # Import here to avoid a circular import.
+    from .models import CourseOverview
+
+    CourseOverview.objects.filter(id=course_key.for_branch(None).version_agnostic()).delete()
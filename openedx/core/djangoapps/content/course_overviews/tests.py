@@ -0,0 +1,171 @@
+"""
+Tests for course_overviews app.
+"""
+import datetime
+
+import ddt
+from django.utils.timezone import UTC
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from courseware.access import has_access
+from courseware.courses import course_image_url
+from student.tests.factories import UserFactory
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase, TEST_DATA_MIXED_TOY_MODULESTORE
+from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls
+
+from .models import CourseOverview
+
+
+@ddt.ddt
+class CourseOverviewTestCase(ModuleStoreTestCase):
+    """
+    Tests for CourseOverview model.
+    """
+    NOW = datetime.datetime.now(UTC()).replace(microsecond=0)
+    NEXT_WEEK = NOW + datetime.timedelta(days=7)
+    LAST_WEEK = NOW - datetime.timedelta(days=7)
+
+    def check_course_overview_against_course(self, course):
+        """
+        Check that the overview of `course` has the same values as it for
+        everything listings use.
+        """
+        course_overview = CourseOverview.get_from_id(course.id)
+
+        self.assertEqual(course_overview.id, course.id)
+        self.assertEqual(course_overview.location, course.location)
+        for attribute in (
+                'display_name', 'display_name_with_default', 'display_number_with_default',
+                'display_org_with_default', 'number', 'org', 'start', 'end', 'advertised_start',
+                'days_early_for_beta', 'start_date_is_still_default', 'sorting_score',
+                'social_sharing_url', 'end_of_course_survey_url', 'certificates_display_behavior',
+                'certificates_show_before_end', 'cert_name_short', 'cert_name_long', 'lowest_passing_grade',
+                'visible_to_staff_only', 'mobile_available', 'catalog_visibility', 'invitation_only',
+                'enrollment_start', 'enrollment_end', 'enrollment_domain', 'pre_requisite_courses',
+        ):
+            self.assertEqual(getattr(course_overview, attribute), getattr(course, attribute), attribute)
+
+        for method in ('has_started', 'has_ended', 'may_certify'):
+            self.assertEqual(getattr(course_overview, method)(), getattr(course, method)(), method)
+
+        for format_string in ('SHORT_DATE', 'DATE_TIME'):
+            self.assertEqual(
+                course_overview.start_datetime_text(format_string), course.start_datetime_text(format_string)
+            )
+            self.assertEqual(
+                course_overview.end_datetime_text(format_string), course.end_datetime_text(format_string)
+            )
+
+        self.assertEqual(course_image_url(course_overview), course_image_url(course))
+
+    @ddt.data(ModuleStoreEnum.Type.split, ModuleStoreEnum.Type.mongo)
+    def test_course_overview_fields(self, modulestore_type):
+        courses = [
+            # A course with default values
+            dict(),
+            # A course that has started and ended, with an advertised start and other values set
+            dict(
+                display_name='Test Course',
+                start=self.LAST_WEEK,
+                end=self.LAST_WEEK,
+                advertised_start='Spring 2015',
+                display_coursenumber='CS-101',
+                display_organization='Test University',
+                social_sharing_url='https://example.com/share',
+                certificates_show_before_end=True,
+                mobile_available=True,
+                catalog_visibility='about',
+                invitation_only=True,
+                pre_requisite_courses=['course-v1:edX+PRQ+2015'],
+            ),
+            # A course that hasn't started yet, with an advertised start date
+            dict(
+                start=self.NEXT_WEEK,
+                advertised_start='2015-01-01T12:00',
+                days_early_for_beta=3.0,
+                visible_to_staff_only=True,
+                enrollment_start=self.LAST_WEEK,
+                enrollment_end=self.NEXT_WEEK,
+                certificates_display_behavior='early_no_info',
+            ),
+        ]
+        for fields in courses:
+            course = CourseFactory.create(default_store=modulestore_type, **fields)
+            self.check_course_overview_against_course(course)
+
+    @ddt.data(ModuleStoreEnum.Type.split, ModuleStoreEnum.Type.mongo)
+    def test_course_overview_is_cached(self, modulestore_type):
+        course = CourseFactory.create(default_store=modulestore_type)
+
+        CourseOverview.get_from_id(course.id)
+        with check_mongo_calls(0):
+            course_overview = CourseOverview.get_from_id(course.id)
+        self.assertEqual(course_overview.id, course.id)
+
+    @ddt.data(ModuleStoreEnum.Type.split, ModuleStoreEnum.Type.mongo)
+    def test_course_overview_deleted_on_publish(self, modulestore_type):
+        course = CourseFactory.create(default_store=modulestore_type, display_name='Old Name')
+        self.assertEqual(CourseOverview.get_from_id(course.id).display_name, 'Old Name')
+
+        course.display_name = 'New Name'
+        self.store.update_item(course, ModuleStoreEnum.UserID.test)
+        self.assertFalse(CourseOverview.objects.filter(id=course.id).exists())
+        self.assertEqual(CourseOverview.get_from_id(course.id).display_name, 'New Name')
+
+    def test_nonexistent_course(self):
+        course_key = modulestore().make_course_key('Non', 'Existent', 'Course')
+        with self.assertRaises(CourseOverview.DoesNotExist):
+            CourseOverview.get_from_id(course_key)
+        self.assertEqual(CourseOverview.get_from_ids([course_key]), {})
+
+    def test_get_from_ids(self):
+        courses = [CourseFactory.create() for __ in range(3)]
+        CourseOverview.get_from_id(courses[0].id)
+        course_keys = [course.id for course in courses]
+        missing_key = modulestore().make_course_key('Non', 'Existent', 'Course')
+
+        course_overviews = CourseOverview.get_from_ids(course_keys + [missing_key])
+        self.assertItemsEqual(course_overviews.keys(), course_keys)
+        self.assertEqual(CourseOverview.objects.count(), 3)
+
+        # All the overviews now exist, so they are read in one query
+        with self.assertNumQueries(1):
+            CourseOverview.get_from_ids(course_keys)
+
+    @ddt.data(
+        ('load', dict(start=LAST_WEEK)),
+        ('load', dict(start=NEXT_WEEK)),
+        ('load', dict(start=LAST_WEEK, visible_to_staff_only=True)),
+        ('enroll', dict(enrollment_start=LAST_WEEK, enrollment_end=NEXT_WEEK)),
+        ('enroll', dict(enrollment_start=NEXT_WEEK)),
+        ('enroll', dict(enrollment_start=LAST_WEEK, invitation_only=True)),
+        ('see_in_catalog', dict(catalog_visibility='none')),
+        ('see_about_page', dict(catalog_visibility='about')),
+        ('view_courseware_with_prerequisites', dict()),
+    )
+    @ddt.unpack
+    def test_has_access(self, action, fields):
+        course = CourseFactory.create(**fields)
+        course_overview = CourseOverview.get_from_id(course.id)
+        for user in (UserFactory.create(), UserFactory.create(is_staff=True)):
+            self.assertEqual(
+                has_access(user, action, course_overview),
+                has_access(user, action, course),
+            )
+
+
+class XMLCourseOverviewTestCase(ModuleStoreTestCase):
+    """
+    Tests for the CourseOverviews of XML courses.
+    """
+    MODULESTORE = TEST_DATA_MIXED_TOY_MODULESTORE
+
+    def test_xml_course_overview_not_saved(self):
+        # The XML modulestore never publishes, so a saved overview would never be refreshed
+        course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        course_overview = CourseOverview.get_from_id(course_key)
+        self.assertEqual(course_overview.id, course_key)
+        self.assertEqual(CourseOverview.get_from_ids([course_key]).keys(), [course_key])
+        self.assertFalse(CourseOverview.objects.filter(id=course_key).exists())